@@ -0,0 +1,44 @@
+# =========================================================
+# etl/audit/comptage.py
+# Comptage rapide des lignes de fichiers texte (CSV, TXT GTFS)
+#
+# Le fichier est projeté en mémoire (mmap) et les sauts de ligne
+# sont comptés sur le tampon binaire par blocs de TAILLE_BLOC
+# octets, sans décodage ni itération ligne à ligne.
+# Les résultats sont mémorisés par (chemin, taille, mtime) : un
+# fichier inchangé n'est compté qu'une fois par exécution.
+# =========================================================
+
+import mmap
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+TAILLE_BLOC = 16 * 1024 * 1024
+
+
+def compter_lignes_tampon(tampon) -> int:
+    """Lignes de données (hors en-tête) d'un tampon binaire (bytes ou mmap)."""
+    taille = len(tampon)
+    sauts = sum(tampon[i:i + TAILLE_BLOC].count(b"\n") for i in range(0, taille, TAILLE_BLOC))
+    if taille and tampon[taille - 1:taille] != b"\n":
+        sauts += 1  # dernière ligne sans saut final
+    return max(0, sauts - 1)
+
+
+@lru_cache(maxsize=4096)
+def _compter(chemin: str, taille: int, mtime_ns: int) -> int:
+    if taille == 0:
+        return 0
+    with open(chemin, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as tampon:
+        return compter_lignes_tampon(tampon)
+
+
+def compter_lignes(chemin) -> Optional[int]:
+    """Nombre de lignes de données (hors en-tête) d'un fichier, None s'il est illisible."""
+    try:
+        chemin = Path(chemin).resolve()
+        st = chemin.stat()
+        return _compter(str(chemin), st.st_size, st.st_mtime_ns)
+    except (OSError, ValueError):
+        return None
@@ -11,6 +11,9 @@ import sys
 import os
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from comptage import compter_lignes
+
 # Chemins de base
 BASE_DIR = Path(__file__).parent.parent.parent
 RAW_DIR = BASE_DIR / "data" / "raw"
@@ -27,14 +30,6 @@ RAW_SOURCES = {
     "gtfs_de": RAW_DIR / "gtfs_de",
 }
 
-def compter_lignes_csv(chemin):
-    """Compte les lignes d'un CSV de manière efficace"""
-    try:
-        with open(chemin, 'r', encoding='utf-8', errors='ignore') as f:
-            return sum(1 for _ in f) - 1  # -1 pour l'en-tête
-    except:
-        return None
-
 def analyser_fichier_csv(chemin, nrows=10):
     """Analyse un fichier CSV et retourne ses informations"""
     result = {
@@ -51,7 +46,7 @@ def analyser_fichier_csv(chemin, nrows=10):
     
     try:
         result['taille_kb'] = Path(chemin).stat().st_size / 1024
-        result['lignes'] = compter_lignes_csv(chemin)
+        result['lignes'] = compter_lignes(chemin)
         
         # Lire l'aperçu
         df = pd.read_csv(chemin, nrows=nrows, low_memory=False)
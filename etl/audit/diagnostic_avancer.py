@@ -5,7 +5,6 @@
 #         Couverture européenne, pertes, cohérence, jour/nuit
 # =========================================================
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
 import sys
@@ -15,6 +14,10 @@ import json
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from comptage import compter_lignes
+from profilage import bilan_profilage, enregistrer_cache, lire_csv, profiler_fichier
+
 # =========================================================
 # CONFIGURATION DES CHEMINS
 # =========================================================
@@ -62,64 +65,34 @@ PAYS_MAJEURS_EU = [
 # 1. FONCTIONS DE LECTURE / ANALYSE DE FICHIERS
 # =========================================================
 
-def compter_lignes_exact(chemin: Path) -> int | None:
-    """Compte exactement le nombre de lignes de données (hors en-tête)."""
-    try:
-        with open(chemin, "r", encoding="utf-8", errors="ignore") as f:
-            return max(0, sum(1 for _ in f) - 1)
-    except Exception:
-        return None
-
-
-def analyser_fichier(chemin: Path, max_apercu: int = 4) -> dict:
+def analyser_fichier(chemin: Path, max_apercu: int = 4, garder_dataframe: bool = False) -> dict:
     """
     Analyse complète d'un fichier CSV ou TSV :
-      - nombre exact de lignes (lecture ligne à ligne)
+      - nombre exact de lignes
       - colonnes, taille, doublons, nulls par colonne
       - aperçu limité à max_apercu lignes
-    Les statistiques portent sur 100 % des données.
+    Les statistiques portent sur 100 % des données ; elles proviennent du
+    moteur de profilage, qui ne relit le fichier que s'il a changé.
     """
+    profil = profiler_fichier(chemin, garder_dataframe=garder_dataframe)
     info = {
         "nom":             Path(chemin).name,
         "chemin":          str(chemin),
-        "lignes":          0,
-        "colonnes":        0,
-        "colonnes_noms":   [],
-        "taille_kb":       0.0,
-        "doublons":        0,
-        "nulls_par_col":   {},
-        "total_nulls":     0,
-        "total_valeurs":   0,
-        "apercu":          [],
-        "erreur":          None,
+        "lignes":          profil.get("lignes_physiques", 0),
+        "colonnes":        profil.get("colonnes", 0),
+        "colonnes_noms":   profil.get("colonnes_noms", []),
+        "taille_kb":       profil.get("taille_octets", 0) / 1024,
+        "doublons":        profil.get("doublons", 0),
+        "nulls_par_col":   profil.get("nulls_par_col", {}),
+        "total_nulls":     profil.get("total_nulls", 0),
+        "total_valeurs":   profil.get("total_valeurs", 0),
+        "apercu":          profil.get("apercu", [])[:max_apercu],
+        "erreur":          profil.get("erreur"),
     }
-    try:
-        info["taille_kb"] = chemin.stat().st_size / 1024
-        info["lignes"]    = compter_lignes_exact(chemin)
-
-        sep = "\t" if chemin.suffix == ".tsv" else ","
-        df  = pd.read_csv(chemin, sep=sep, low_memory=False)
-
-        info["colonnes"]      = len(df.columns)
-        info["colonnes_noms"] = df.columns.tolist()
-        info["doublons"]      = int(df.duplicated().sum())
-        info["total_valeurs"] = int(df.size)
-
-        for col in df.columns:
-            n = int(df[col].isna().sum())
-            if n > 0:
-                info["nulls_par_col"][col] = n
-        info["total_nulls"] = sum(info["nulls_par_col"].values())
-
-        info["apercu"] = df.head(max_apercu).to_dict(orient="records")
-
-    except Exception as exc:
-        info["erreur"] = str(exc)[:250]
-
     return info
 
 
-def analyser_dossier(dossier: Path, recursif: bool = True) -> list[dict]:
+def analyser_dossier(dossier: Path, recursif: bool = True, garder_dataframes: bool = False) -> list[dict]:
     """Retourne la liste des analyses pour tous les CSV/TSV d'un dossier."""
     if not dossier.exists():
         return []
@@ -130,7 +103,7 @@ def analyser_dossier(dossier: Path, recursif: bool = True) -> list[dict]:
         fichiers += sorted(dossier.glob("**/*.tsv"))
     else:
         fichiers += sorted(dossier.glob("*.tsv"))
-    return [analyser_fichier(f) for f in fichiers]
+    return [analyser_fichier(f, garder_dataframe=garder_dataframes) for f in fichiers]
 
 
 def _afficher_fichier(info: dict, indent: str = "   ") -> None:
@@ -229,7 +202,8 @@ def diagnostiquer_warehouse() -> dict:
         print("   ❌ Dossier warehouse introuvable.")
         return warehouse
 
-    for f in analyser_dossier(WAREHOUSE_DIR, recursif=True):
+    # DataFrames conservés : les analyses métier relisent ces fichiers
+    for f in analyser_dossier(WAREHOUSE_DIR, recursif=True, garder_dataframes=True):
         nom = f["nom"].lower()
         if nom.startswith("dim_"):
             warehouse["dimensions"].append(f)
@@ -360,7 +334,7 @@ def analyser_jour_nuit(warehouse: dict) -> dict:
     for f in warehouse.get("dashboard", []):
         if "operator_dashboard" in f["nom"].lower() and not f["erreur"]:
             try:
-                df = pd.read_csv(f["chemin"])
+                df = lire_csv(f["chemin"])
                 if "nb_trains_jour" in df.columns and "nb_trains_nuit" in df.columns:
                     result["trains_jour"] = int(df["nb_trains_jour"].sum())
                     result["trains_nuit"] = int(df["nb_trains_nuit"].sum())
@@ -373,7 +347,7 @@ def analyser_jour_nuit(warehouse: dict) -> dict:
         for f in warehouse.get("faits", []):
             if "facts_night_trains" in f["nom"].lower() and not f["erreur"]:
                 try:
-                    df = pd.read_csv(f["chemin"])
+                    df = lire_csv(f["chemin"])
                     if "is_night" in df.columns:
                         result["trains_nuit"] = int(df[df["is_night"] == True].shape[0])
                         result["trains_jour"] = int(df[df["is_night"] == False].shape[0])
@@ -409,7 +383,7 @@ def analyser_couverture_pays(warehouse: dict) -> list[dict]:
     for f in warehouse.get("dashboard", []):
         if "dashboard_metrics" in f["nom"].lower() and not f["erreur"]:
             try:
-                df_metrics = pd.read_csv(f["chemin"])
+                df_metrics = lire_csv(f["chemin"])
             except Exception:
                 pass
 
@@ -419,13 +393,13 @@ def analyser_couverture_pays(warehouse: dict) -> list[dict]:
         for f in warehouse.get("faits", []):
             if "facts_country_stats" in f["nom"].lower() and not f["erreur"]:
                 try:
-                    df_facts = pd.read_csv(f["chemin"])
+                    df_facts = lire_csv(f["chemin"])
                 except Exception:
                     pass
         for f in warehouse.get("dimensions", []):
             if "dim_countries" in f["nom"].lower() and not f["erreur"]:
                 try:
-                    df_dim = pd.read_csv(f["chemin"])
+                    df_dim = lire_csv(f["chemin"])
                 except Exception:
                     pass
 
@@ -473,7 +447,7 @@ def analyser_trains_par_pays(warehouse: dict) -> dict:
     for f in warehouse.get("dimensions", []):
         if "dim_countries" in f["nom"].lower() and not f["erreur"]:
             try:
-                df_dim = pd.read_csv(f["chemin"])
+                df_dim = lire_csv(f["chemin"])
             except Exception:
                 pass
 
@@ -490,7 +464,7 @@ def analyser_trains_par_pays(warehouse: dict) -> dict:
         if "facts_night_trains" not in f["nom"].lower() or f["erreur"]:
             continue
         try:
-            df = pd.read_csv(f["chemin"])
+            df = lire_csv(f["chemin"])
             if "country_id" not in df.columns or "is_night" not in df.columns:
                 continue
             for cid, grp in df.groupby("country_id"):
@@ -533,7 +507,7 @@ def analyser_repartition_pays_gtfs() -> dict:
             parent = "INCONNU"
 
         try:
-            nb_lignes = compter_lignes_exact(trips_file)
+            nb_lignes = compter_lignes(trips_file)
             if parent not in pays_trips:
                 pays_trips[parent] = {"trips_processed": 0, "fichiers": []}
             pays_trips[parent]["trips_processed"] += nb_lignes or 0
@@ -550,7 +524,7 @@ def analyser_repartition_pays_gtfs() -> dict:
             continue
         code = src_name.replace("gtfs_", "").upper()
         for f in src_dir.glob("trips.csv"):
-            nb = compter_lignes_exact(f)
+            nb = compter_lignes(f)
             if nb:
                 raw_trips[code] = raw_trips.get(code, 0) + nb
 
@@ -596,7 +570,7 @@ def controle_coherence(warehouse: dict) -> dict:
         if "facts_night_trains" not in f["nom"].lower() or f["erreur"]:
             continue
         try:
-            df = pd.read_csv(f["chemin"])
+            df = lire_csv(f["chemin"])
 
             # Distances nulles ou négatives
             if "distance_km" in df.columns:
@@ -659,7 +633,7 @@ def controle_coherence(warehouse: dict) -> dict:
         # Coordonnées géographiques (dim_stops)
         if "dim_stops" in f["nom"].lower():
             try:
-                df = pd.read_csv(f["chemin"])
+                df = lire_csv(f["chemin"])
                 if "stop_lat" in df.columns and "stop_lon" in df.columns:
                     hors_europe = df[
                         (df["stop_lat"] < 35) | (df["stop_lat"] > 72) |
@@ -678,7 +652,7 @@ def controle_coherence(warehouse: dict) -> dict:
     for f in warehouse.get("dashboard", []):
         if "operator_dashboard" in f["nom"].lower() and not f["erreur"]:
             try:
-                df = pd.read_csv(f["chemin"])
+                df = lire_csv(f["chemin"])
                 if "nb_trains_jour" in df.columns and "nb_trains_nuit" in df.columns:
                     incoh = df[(df["nb_trains_jour"] < 0) | (df["nb_trains_nuit"] < 0)]
                     if not incoh.empty:
@@ -1063,6 +1037,7 @@ def sauvegarder_rapport_json(
             "date_diagnostic": datetime.now().isoformat(),
             "projet":          "ObRail Europe — MSPR E6.1",
             "version":         "2.1",
+            "profilage":       bilan_profilage(),
         },
         "raw":        simplifier_stats(raw_stats),
         "processed":  simplifier_stats(processed_stats),
@@ -1106,6 +1081,8 @@ def main():
     raw_stats       = diagnostiquer_raw()
     processed_stats = diagnostiquer_processed()
     warehouse       = diagnostiquer_warehouse()
+    bilan = bilan_profilage()
+    print(f"\n🗂️  Profilage : {bilan['reprofiles']} fichier(s) analysé(s), {bilan['depuis_cache']} repris du cache")
 
     # ── Analyses métier ────────────────────────────────────────────
     pertes            = analyser_pertes(raw_stats, processed_stats, warehouse)
@@ -1129,6 +1106,7 @@ def main():
         pertes, jour_nuit, couverture, trains_nuit_pays, repartition_gtfs,
         coherence, representativite,
     )
+    enregistrer_cache()
 
 
 if __name__ == "__main__":
@@ -31,7 +31,9 @@ from typing import Any, Optional
 
 import numpy as np
 import pandas as pd
-from scipy import stats as scipy_stats
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from profilage import bilan_profilage, enregistrer_cache, lire_csv, profiler_fichier, profiler_fichiers
 
 warnings.filterwarnings("ignore")
 
@@ -88,6 +90,7 @@ class DatasetInfo:
     colonnes_numeriques: list = field(default_factory=list)
     colonnes_categoriques: list = field(default_factory=list)
     colonnes_temporelles: list = field(default_factory=list)
+    approximatif: bool = False    # profil en flux : distincts/quantiles estimés
     erreur: Optional[str] = None
 
 
@@ -123,14 +126,17 @@ def lister_fichiers_tabulaires(dossier: Path) -> list[Path]:
     return sorted(set(fichiers))
 
 
-def detecter_type_semantique(serie: pd.Series, nom_colonne: str, nb_lignes: int) -> str:
+def detecter_type_semantique(colonne: dict, nb_lignes: int) -> str:
     """
     Détermine le rôle probable d'une colonne pour le ML, à partir de
     ses caractéristiques statistiques réelles (pas de règle métier).
+    `colonne` est le profil de colonne calculé par profilage.py.
     """
-    nb_uniques = serie.nunique(dropna=True)
+    nom_colonne = colonne["nom"]
+    nb_uniques = colonne["nb_uniques"]
     taux_unicite = nb_uniques / nb_lignes if nb_lignes > 0 else 0
-    dtype = str(serie.dtype)
+    dtype = colonne["dtype"]
+    est_numerique = colonne["numerique"]
 
     if nb_uniques <= 1:
         return "constante"
@@ -147,7 +153,7 @@ def detecter_type_semantique(serie: pd.Series, nom_colonne: str, nb_lignes: int)
         return "identifiant"
 
     # Booléen (vérifié avant le numérique : pandas considère bool comme numérique)
-    if dtype == "bool" or set(serie.dropna().unique().tolist()) <= {0, 1, True, False}:
+    if colonne["binaire"]:
         return "booleen"
 
     # Temporel : nom de colonne évocateur + parseable en date OU dtype datetime
@@ -155,21 +161,15 @@ def detecter_type_semantique(serie: pd.Series, nom_colonne: str, nb_lignes: int)
         return "temporel"
     nom_lower = nom_colonne.lower()
     if any(mot in nom_lower for mot in ["date", "year", "annee", "année", "time", "heure"]):
-        try:
-            echantillon_non_null = serie.dropna()
-            if len(echantillon_non_null) > 0:
-                pd.to_datetime(echantillon_non_null.head(20), errors="raise")
-                return "temporel"
-        except Exception:
-            pass
+        if colonne["date_parseable"]:
+            return "temporel"
         # Cas année numérique (ex: 2010-2024)
-        if pd.api.types.is_numeric_dtype(serie):
-            valeurs = serie.dropna()
-            if len(valeurs) > 0 and valeurs.min() > 1900 and valeurs.max() < 2100:
-                return "temporel"
+        stats = colonne["stats"]
+        if est_numerique and stats and stats["min"] > 1900 and stats["max"] < 2100:
+            return "temporel"
 
     # Numérique continu (dtype bool déjà écarté ci-dessus)
-    if pd.api.types.is_numeric_dtype(serie) and dtype != "bool":
+    if est_numerique:
         return "numerique"
 
     # Catégorique (le reste, cardinalité raisonnable)
@@ -179,50 +179,24 @@ def detecter_type_semantique(serie: pd.Series, nom_colonne: str, nb_lignes: int)
     return "inutilisable"
 
 
-def analyser_colonne(serie: pd.Series, nom: str, nb_lignes: int) -> ColonneInfo:
-    nb_nulls = int(serie.isna().sum())
-    nb_uniques = int(serie.nunique(dropna=True))
+def analyser_colonne(colonne: dict, nb_lignes: int) -> ColonneInfo:
+    nb_nulls = colonne["nb_nulls"]
+    nb_uniques = colonne["nb_uniques"]
 
-    type_sem = detecter_type_semantique(serie, nom, nb_lignes)
+    type_sem = detecter_type_semantique(colonne, nb_lignes)
     constante = type_sem == "constante"
     if constante:
         type_sem = "inutilisable"
 
+    # Statistiques numériques (quantiles, skewness, kurtosis, outliers IQR)
+    # ou catégories principales, déjà calculées par le profil
     stats_dict: dict[str, Any] = {}
-    if pd.api.types.is_numeric_dtype(serie) and str(serie.dtype) != "bool" and not constante:
-        valeurs = serie.dropna()
-        if len(valeurs) > 0:
-            stats_dict = {
-                "min":     float(valeurs.min()),
-                "max":     float(valeurs.max()),
-                "moyenne": float(valeurs.mean()),
-                "mediane": float(valeurs.median()),
-                "ecart_type": float(valeurs.std()) if len(valeurs) > 1 else 0.0,
-                "q1": float(valeurs.quantile(0.25)),
-                "q3": float(valeurs.quantile(0.75)),
-                "skewness": float(scipy_stats.skew(valeurs)) if len(valeurs) > 2 else 0.0,
-                "kurtosis": float(scipy_stats.kurtosis(valeurs)) if len(valeurs) > 2 else 0.0,
-            }
-            # Détection d'outliers via IQR
-            iqr = stats_dict["q3"] - stats_dict["q1"]
-            if iqr > 0:
-                borne_basse = stats_dict["q1"] - 1.5 * iqr
-                borne_haute = stats_dict["q3"] + 1.5 * iqr
-                nb_outliers = int(((valeurs < borne_basse) | (valeurs > borne_haute)).sum())
-                stats_dict["nb_outliers_iqr"] = nb_outliers
-                stats_dict["pct_outliers_iqr"] = round(nb_outliers / len(valeurs) * 100, 2)
-    elif type_sem == "categorique" and not constante:
-        valeurs = serie.dropna()
-        if len(valeurs) > 0:
-            top = valeurs.value_counts(normalize=True).head(5)
-            stats_dict = {
-                "top_categories": {str(k): round(float(v) * 100, 2) for k, v in top.items()},
-                "nb_categories_distinctes": nb_uniques,
-            }
+    if "min" in colonne["stats"] or type_sem == "categorique":
+        stats_dict = dict(colonne["stats"])
 
     return ColonneInfo(
-        nom=nom,
-        dtype=str(serie.dtype),
+        nom=colonne["nom"],
+        dtype=colonne["dtype"],
         nb_nulls=nb_nulls,
         taux_nulls=round(nb_nulls / nb_lignes * 100, 2) if nb_lignes > 0 else 0.0,
         nb_uniques=nb_uniques,
@@ -233,56 +207,57 @@ def analyser_colonne(serie: pd.Series, nom: str, nb_lignes: int) -> ColonneInfo:
     )
 
 
-def analyser_dataset(chemin: Path) -> DatasetInfo:
+def analyser_dataset(chemin: Path, garder_dataframe: bool = False, profil: dict = None) -> DatasetInfo:
     """
     Analyse exhaustive d'un fichier tabulaire : lecture intégrale
-    (aucun nrows, aucun skip), calcul de toutes les statistiques
-    demandées colonne par colonne.
+    (aucun nrows, aucun skip) par le moteur de profilage, qui ne relit
+    le fichier que s'il a changé depuis le dernier diagnostic.
+    profil : profil déjà calculé (cf. scanner_repertoires).
     """
     nom = chemin.name
     info = DatasetInfo(
         nom=nom, chemin=str(chemin), lignes=0, colonnes=0,
         memoire_mb=0.0, taux_nulls_global=0.0, taux_doublons=0.0,
     )
-    try:
-        sep = "\t" if chemin.suffix == ".tsv" else ","
-        df = pd.read_csv(chemin, sep=sep, low_memory=False)  # lecture intégrale, pas de nrows
-
-        info.lignes = len(df)
-        info.colonnes = len(df.columns)
-        info.memoire_mb = round(df.memory_usage(deep=True).sum() / (1024 ** 2), 3)
-
-        total_cellules = df.size
-        total_nulls = int(df.isna().sum().sum())
-        info.taux_nulls_global = round(total_nulls / total_cellules * 100, 2) if total_cellules > 0 else 0.0
-        info.taux_doublons = round(df.duplicated().sum() / len(df) * 100, 2) if len(df) > 0 else 0.0
-
-        for col in df.columns:
-            c_info = analyser_colonne(df[col], col, len(df))
-            info.colonnes_info.append(c_info)
-
-            if c_info.constante:
-                info.colonnes_constantes.append(col)
-            if c_info.type_semantique == "inutilisable":
-                info.colonnes_inutilisables.append(col)
-            elif c_info.type_semantique == "numerique":
-                info.colonnes_numeriques.append(col)
-            elif c_info.type_semantique == "categorique":
-                info.colonnes_categoriques.append(col)
-            elif c_info.type_semantique == "temporel":
-                info.colonnes_temporelles.append(col)
-
-    except Exception as exc:
-        info.erreur = str(exc)[:300]
+    if profil is None:
+        profil = profiler_fichier(chemin, garder_dataframe=garder_dataframe)
+    if profil.get("erreur"):
+        info.erreur = profil["erreur"]
+        return info
+
+    nb_lignes = profil["lignes"]
+    info.lignes = nb_lignes
+    info.colonnes = profil["colonnes"]
+    info.memoire_mb = profil["memoire_mb"]
+    info.approximatif = any(c.get("approximatif") for c in profil["colonnes_profil"])
+
+    total_cellules = profil["total_valeurs"]
+    info.taux_nulls_global = round(profil["total_nulls"] / total_cellules * 100, 2) if total_cellules > 0 else 0.0
+    info.taux_doublons = round(profil["doublons"] / nb_lignes * 100, 2) if nb_lignes > 0 else 0.0
+
+    for colonne in profil["colonnes_profil"]:
+        c_info = analyser_colonne(colonne, nb_lignes)
+        info.colonnes_info.append(c_info)
+
+        col = colonne["nom"]
+        if c_info.constante:
+            info.colonnes_constantes.append(col)
+        if c_info.type_semantique == "inutilisable":
+            info.colonnes_inutilisables.append(col)
+        elif c_info.type_semantique == "numerique":
+            info.colonnes_numeriques.append(col)
+        elif c_info.type_semantique == "categorique":
+            info.colonnes_categoriques.append(col)
+        elif c_info.type_semantique == "temporel":
+            info.colonnes_temporelles.append(col)
 
     return info
 
 
 def charger_dataframe(chemin: Path) -> Optional[pd.DataFrame]:
-    """Recharge le DataFrame complet pour analyses approfondies (jointures, scoring)."""
+    """DataFrame complet pour analyses approfondies (jointures, scoring), lu une fois par exécution."""
     try:
-        sep = "\t" if chemin.suffix == ".tsv" else ","
-        return pd.read_csv(chemin, sep=sep, low_memory=False)
+        return lire_csv(chemin)
     except Exception:
         return None
 
@@ -292,15 +267,21 @@ def charger_dataframe(chemin: Path) -> Optional[pd.DataFrame]:
 # =========================================================
 
 def scanner_repertoires() -> dict[str, DatasetInfo]:
-    """Analyse exhaustive de tous les fichiers tabulaires de processed/ et warehouse/."""
-    datasets: dict[str, DatasetInfo] = {}
-
-    for racine, label in [(PROCESSED_DIR, "processed"), (WAREHOUSE_DIR, "warehouse")]:
-        for fichier in lister_fichiers_tabulaires(racine):
-            cle = f"{label}/{fichier.relative_to(racine)}"
-            datasets[cle] = analyser_dataset(fichier)
+    """
+    Analyse exhaustive de tous les fichiers tabulaires de processed/ et warehouse/.
+    Les fichiers modifiés sont d'abord profilés ensemble, en parallèle
+    (profiler_fichiers), puis chaque profil est interprété.
+    """
+    fichiers = {
+        f"{label}/{fichier.relative_to(racine)}": fichier
+        for racine, label in [(PROCESSED_DIR, "processed"), (WAREHOUSE_DIR, "warehouse")]
+        for fichier in lister_fichiers_tabulaires(racine)
+    }
+    # Les DataFrames du warehouse sont réutilisés par les analyses suivantes
+    warehouse = [f for cle, f in fichiers.items() if cle.startswith("warehouse/")]
+    profils = profiler_fichiers(fichiers.values(), garder=warehouse)
 
-    return datasets
+    return {cle: analyser_dataset(fichier, profil=profils[fichier]) for cle, fichier in fichiers.items()}
 
 
 # =========================================================
@@ -327,6 +308,8 @@ def afficher_qualite_donnees(datasets: dict[str, DatasetInfo]) -> None:
         print(f"     Mémoire utilisée     : {info.memoire_mb:.3f} MB")
         print(f"     Taux de nulls global : {info.taux_nulls_global}%")
         print(f"     Taux de doublons     : {info.taux_doublons}%")
+        if info.approximatif:
+            print("     ℹ️  Profil en flux : nb de valeurs distinctes et quantiles estimés")
         print(
             f"     Typage détecté        : "
             f"{len(info.colonnes_numeriques)} numérique(s), "
@@ -1116,6 +1099,7 @@ def exporter_json(
             "date_diagnostic": datetime.now().isoformat(),
             "projet": "ObRail Europe — MSPR Diagnostic ML",
             "version": "1.0",
+            "profilage": bilan_profilage(),
         },
         "datasets": {
             cle: {
@@ -1129,6 +1113,7 @@ def exporter_json(
                 "colonnes_numeriques": d.colonnes_numeriques,
                 "colonnes_categoriques": d.colonnes_categoriques,
                 "colonnes_temporelles": d.colonnes_temporelles,
+                "approximatif": d.approximatif,
                 "erreur": d.erreur,
             }
             for cle, d in datasets.items()
@@ -1161,6 +1146,8 @@ def main() -> None:
 
     # ── Phase 1 : scan exhaustif ────────────────────────────────────
     datasets = scanner_repertoires()
+    bilan = bilan_profilage()
+    print(f"\n  Profilage : {bilan['reprofiles']} fichier(s) analysé(s), {bilan['depuis_cache']} repris du cache")
     if not datasets:
         print("\n❌ Aucun fichier CSV/TSV trouvé dans processed/ ou warehouse/.")
         print("   Vérifiez que le pipeline ETL a bien été exécuté avant ce diagnostic.")
@@ -1187,6 +1174,7 @@ def main() -> None:
 
     # ── Export JSON ─────────────────────────────────────────────────
     exporter_json(datasets, rep, classement, meilleur)
+    enregistrer_cache()
 
 
 if __name__ == "__main__":
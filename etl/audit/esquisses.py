@@ -0,0 +1,160 @@
+# =========================================================
+# etl/audit/esquisses.py
+# Structures d'estimation en flux ("sketches") pour le profilage
+# des fichiers trop volumineux pour être chargés en mémoire :
+#   - HyperLogLog : nombre de valeurs distinctes (erreur ~0,8 %)
+#   - TDigest     : quantiles et fonction de répartition, précis
+#                   aux extrémités (outliers IQR)
+#   - Moments     : moyenne, variance, skewness, kurtosis exacts,
+#                   fusionnés bloc par bloc (formules de Chan et al.)
+# Toutes les mises à jour sont vectorisées (numpy / pandas) et
+# reçoivent un bloc de valeurs à la fois.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+
+def hacher(valeurs) -> np.ndarray:
+    """Hash 64 bits stable des valeurs, quel que soit leur dtype."""
+    return pd.util.hash_pandas_object(pd.Series(valeurs), index=False).to_numpy()
+
+
+class HyperLogLog:
+    """Comptage approximatif de valeurs distinctes, 2**p registres."""
+
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.m = 1 << p
+        self.registres = np.zeros(self.m, dtype=np.uint8)
+
+    def ajouter_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        indices = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        reste = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Rang = position du premier bit à 1 ; frexp est exact (reste < 2**53)
+        _, exposant = np.frexp(reste.astype(np.float64))
+        rangs = np.where(reste == 0, 64 - self.p + 1, 64 - self.p - exposant + 1).astype(np.uint8)
+        maxima = pd.Series(rangs).groupby(indices).max()
+        cibles = maxima.index.to_numpy()
+        self.registres[cibles] = np.maximum(self.registres[cibles], maxima.to_numpy())
+
+    def ajouter(self, valeurs) -> None:
+        self.ajouter_hashes(hacher(valeurs))
+
+    def estimation(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        brute = alpha * self.m ** 2 / np.sum(np.ldexp(1.0, -self.registres.astype(np.int64)))
+        vides = int(np.count_nonzero(self.registres == 0))
+        if brute <= 2.5 * self.m and vides:
+            # Petites cardinalités : comptage linéaire
+            return int(round(self.m * np.log(self.m / vides)))
+        return int(round(brute))
+
+
+class TDigest:
+    """
+    t-digest "fusionnant" : les centroïdes sont regroupés selon la
+    fonction d'échelle k1 (arcsin), plus fine aux extrémités.
+    """
+
+    def __init__(self, compression: float = 500):
+        self.compression = compression
+        self.moyennes = np.empty(0)
+        self.poids = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def total(self) -> float:
+        return float(self.poids.sum())
+
+    def ajouter(self, valeurs) -> None:
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        valeurs = valeurs[~np.isnan(valeurs)]
+        if len(valeurs) == 0:
+            return
+        self.min = min(self.min, float(valeurs.min()))
+        self.max = max(self.max, float(valeurs.max()))
+
+        moyennes = np.concatenate([self.moyennes, valeurs])
+        poids = np.concatenate([self.poids, np.ones(len(valeurs))])
+        ordre = np.argsort(moyennes, kind="stable")
+        moyennes, poids = moyennes[ordre], poids[ordre]
+
+        cumul = np.cumsum(poids)
+        q = (cumul - poids / 2) / cumul[-1]
+        groupes = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)).astype(np.int64)
+        debuts = np.flatnonzero(np.r_[True, groupes[1:] != groupes[:-1]])
+
+        poids_groupes = np.add.reduceat(poids, debuts)
+        self.moyennes = np.add.reduceat(moyennes * poids, debuts) / poids_groupes
+        self.poids = poids_groupes
+
+    def _positions(self):
+        cumul = np.cumsum(self.poids)
+        return np.r_[0.0, cumul - self.poids / 2, cumul[-1]], np.r_[self.min, self.moyennes, self.max]
+
+    def quantile(self, q: float) -> float:
+        if len(self.poids) == 0:
+            return float("nan")
+        positions, valeurs = self._positions()
+        return float(np.interp(q * positions[-1], positions, valeurs))
+
+    def cdf(self, x) -> np.ndarray:
+        """Proportion estimée de valeurs ≤ x."""
+        if len(self.poids) == 0:
+            return np.zeros_like(np.asarray(x, dtype=np.float64))
+        positions, valeurs = self._positions()
+        return np.interp(x, valeurs, positions / positions[-1])
+
+
+class Moments:
+    """Moments centrés d'ordre 1 à 4 de plusieurs colonnes, fusionnés bloc par bloc."""
+
+    def __init__(self, nb_colonnes: int):
+        self.n = np.zeros(nb_colonnes)
+        self.moyenne = np.zeros(nb_colonnes)
+        self.m2 = np.zeros(nb_colonnes)
+        self.m3 = np.zeros(nb_colonnes)
+        self.m4 = np.zeros(nb_colonnes)
+
+    def ajouter(self, bloc: np.ndarray) -> None:
+        """bloc : tableau 2D (lignes × colonnes), NaN ignorés."""
+        nb = (~np.isnan(bloc)).sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mb = np.where(nb > 0, np.nansum(bloc, axis=0) / nb, 0.0)
+            ecarts = np.nan_to_num(bloc - mb)
+            m2b = (ecarts ** 2).sum(axis=0)
+            m3b = (ecarts ** 3).sum(axis=0)
+            m4b = (ecarts ** 4).sum(axis=0)
+
+            na, ma, m2a, m3a = self.n, self.moyenne, self.m2, self.m3
+            n = na + nb
+            n_sur = np.where(n > 0, n, 1.0)
+            delta = mb - ma
+            self.m4 = (self.m4 + m4b
+                       + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n_sur ** 3
+                       + 6 * delta ** 2 * (na ** 2 * m2b + nb ** 2 * m2a) / n_sur ** 2
+                       + 4 * delta * (na * m3b - nb * m3a) / n_sur)
+            self.m3 = (m3a + m3b + delta ** 3 * na * nb * (na - nb) / n_sur ** 2
+                       + 3 * delta * (na * m2b - nb * m2a) / n_sur)
+            self.m2 = m2a + m2b + delta ** 2 * na * nb / n_sur
+            self.moyenne = ma + delta * nb / n_sur
+            self.n = n
+
+    def ecart_type(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 1, np.sqrt(self.m2 / np.maximum(self.n - 1, 1)), 0.0)
+
+    def skewness(self) -> np.ndarray:
+        """Coefficient d'asymétrie biaisé (comme scipy.stats.skew)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where((self.n > 2) & (self.m2 > 0), np.sqrt(self.n) * self.m3 / self.m2 ** 1.5, 0.0)
+
+    def kurtosis(self) -> np.ndarray:
+        """Kurtosis de Fisher biaisée (comme scipy.stats.kurtosis)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where((self.n > 2) & (self.m2 > 0), self.n * self.m4 / self.m2 ** 2 - 3, 0.0)
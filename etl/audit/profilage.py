@@ -0,0 +1,561 @@
+# =========================================================
+# etl/audit/profilage.py
+# Moteur de profilage incrémental des fichiers CSV/TSV
+#
+# Un profil regroupe, en une seule lecture du fichier, tout ce
+# dont ont besoin diagnostic_avancer.py et diagnostic_ml.py :
+#   - lignes physiques, lignes de données, colonnes, taille
+#   - doublons, nulls par colonne, mémoire, aperçu
+#   - par colonne : cardinalité, statistiques numériques
+#     (quantiles, skewness, kurtosis, outliers IQR) ou
+#     catégories principales, indices de type (binaire, date)
+#
+# Deux modes :
+#   - "exact" : fichier chargé entièrement, statistiques calculées
+#     sur tout le DataFrame d'un coup (opérations vectorisées) ;
+#   - "flux"  : au-delà de PROFIL_SEUIL_FLUX_MO, lecture par blocs
+#     de PROFIL_TAILLE_BLOC lignes ; distincts par HyperLogLog,
+#     quantiles et outliers par t-digest (cf. esquisses.py),
+#     moments et doublons exacts. La mémoire ne dépend plus de la
+#     taille du fichier (hors 8 octets par ligne pour les doublons).
+#
+# Les profils sont conservés dans data/audit/profils_cache.json,
+# indexés par chemin avec taille, mtime et SHA-256 du contenu :
+#   - taille et mtime inchangés  → profil réutilisé sans lecture
+#   - mtime modifié, même hash   → profil réutilisé (fichier réécrit à l'identique)
+#   - sinon                      → fichier re-profilé
+# Seuls les fichiers modifiés sont donc relus d'un diagnostic à l'autre.
+#
+# profiler_fichiers() répartit les fichiers à (re)profiler sur un
+# pool de processus, les plus gros en premier.
+# =========================================================
+
+import hashlib
+import io
+import json
+import os
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from comptage import compter_lignes_tampon
+from esquisses import HyperLogLog, Moments, TDigest, hacher
+
+warnings.filterwarnings("ignore")
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+AUDIT_DIR = BASE_DIR / "data" / "audit"
+CACHE_PROFILS = AUDIT_DIR / "profils_cache.json"
+
+# À incrémenter dès que le contenu d'un profil change (invalide le cache)
+VERSION_PROFIL = 2
+MAX_APERCU = 5
+NB_TOP_CATEGORIES = 5
+
+# Fichiers plus gros (Mo) profilés en flux plutôt que chargés en mémoire
+PROFIL_SEUIL_FLUX_MO = float(os.getenv("PROFIL_SEUIL_FLUX_MO", "256"))
+PROFIL_TAILLE_BLOC = int(os.getenv("PROFIL_TAILLE_BLOC", "200000"))
+# Processus de profilage en parallèle. Chaque processus peut charger en
+# mémoire un fichier jusqu'à PROFIL_SEUIL_FLUX_MO (plusieurs fois sa taille
+# une fois en DataFrame) : défaut borné à 4, quel que soit le nombre de cœurs
+PROFIL_N_JOBS = int(os.getenv("PROFIL_N_JOBS", "0")) or min(4, os.cpu_count() or 1)
+# Mode flux : comptage exact des modalités tant qu'elles restent en deçà
+LIMITE_MODALITES_EXACTES = 10_000
+
+_cache = {"chemin": None, "fichiers": None, "modifie": False}
+_bilan = {"depuis_cache": 0, "reprofiles": 0}
+# DataFrames déjà chargés pendant l'exécution : (chemin, mtime_ns) → DataFrame
+_dataframes: dict = {}
+
+
+# =========================================================
+# 1. STATISTIQUES DE COLONNES (MODE EXACT, VECTORISÉ)
+# =========================================================
+
+def _separateur(chemin: Path) -> str:
+    return "\t" if Path(chemin).suffix == ".tsv" else ","
+
+
+def _est_numerique(serie: pd.Series) -> bool:
+    return bool(pd.api.types.is_numeric_dtype(serie) and str(serie.dtype) != "bool")
+
+
+def _indices_type(serie: pd.Series, modalites) -> tuple[bool, bool]:
+    """(binaire, date_parseable) d'une colonne ; `modalites` = valeurs distinctes si ≤ 2, sinon None."""
+    binaire = str(serie.dtype) == "bool" or (
+        modalites is not None and set(modalites) <= {0, 1, True, False}
+    )
+    echantillon = serie.dropna().head(20)
+    if binaire or len(echantillon) == 0:
+        return binaire, False
+    try:
+        pd.to_datetime(echantillon, errors="raise")
+        return binaire, True
+    except Exception:
+        return binaire, False
+
+
+def _stats_numeriques(q1, mediane, q3, mini, maxi, moyenne, ecart_type, skewness, kurtosis, nb_valeurs, nb_outliers):
+    stats = {
+        "min":        float(mini),
+        "max":        float(maxi),
+        "moyenne":    float(moyenne),
+        "mediane":    float(mediane),
+        "ecart_type": float(ecart_type),
+        "q1": float(q1),
+        "q3": float(q3),
+        "skewness": float(skewness),
+        "kurtosis": float(kurtosis),
+    }
+    if q3 - q1 > 0:
+        stats["nb_outliers_iqr"] = int(nb_outliers)
+        stats["pct_outliers_iqr"] = round(float(nb_outliers) / float(nb_valeurs) * 100, 2)
+    return stats
+
+
+def _top_categories(comptes: pd.Series, nb_valeurs: int) -> dict:
+    top = comptes.sort_values(ascending=False, kind="stable").head(NB_TOP_CATEGORIES)
+    return {str(k): round(float(v) / float(nb_valeurs) * 100, 2) for k, v in top.items()}
+
+
+def _profil_colonnes(df: pd.DataFrame) -> list[dict]:
+    """
+    Profil de toutes les colonnes : cardinalités, nulls, quantiles, moments
+    et outliers sont calculés sur le DataFrame entier (une opération par
+    statistique, pas une boucle par colonne).
+    """
+    nb_uniques = df.nunique(dropna=True)
+    nb_nulls = df.isna().sum()
+    nb_valeurs = len(df) - nb_nulls
+
+    numeriques = [c for c in df.columns if _est_numerique(df[c]) and nb_uniques[c] > 1]
+    stats = {}
+    if numeriques:
+        bloc = df[numeriques].astype("float64")
+        quartiles = bloc.quantile([0.25, 0.5, 0.75])
+        q1, mediane, q3 = quartiles.iloc[0], quartiles.iloc[1], quartiles.iloc[2]
+        iqr = q3 - q1
+        outliers = ((bloc < q1 - 1.5 * iqr) | (bloc > q3 + 1.5 * iqr)).sum()
+        moments = Moments(len(numeriques))
+        moments.ajouter(bloc.to_numpy())
+        mins, maxs, moyennes, ecarts = bloc.min(), bloc.max(), bloc.mean(), bloc.std()
+        for i, col in enumerate(numeriques):
+            stats[col] = _stats_numeriques(
+                q1[col], mediane[col], q3[col], mins[col], maxs[col], moyennes[col],
+                ecarts[col] if nb_valeurs[col] > 1 else 0.0,
+                moments.skewness()[i], moments.kurtosis()[i], nb_valeurs[col], outliers[col],
+            )
+
+    colonnes = []
+    for col in df.columns:
+        serie = df[col]
+        if col not in stats and not _est_numerique(serie) and str(serie.dtype) != "bool" and nb_uniques[col] > 1:
+            stats[col] = {
+                "top_categories": _top_categories(serie.value_counts(), nb_valeurs[col]),
+                "nb_categories_distinctes": int(nb_uniques[col]),
+            }
+        modalites = serie.dropna().unique().tolist() if nb_uniques[col] <= 2 else None
+        binaire, date_parseable = _indices_type(serie, modalites)
+        colonnes.append({
+            "nom": str(col),
+            "dtype": str(serie.dtype),
+            "numerique": _est_numerique(serie),
+            "nb_nulls": int(nb_nulls[col]),
+            "nb_uniques": int(nb_uniques[col]),
+            "binaire": bool(binaire),
+            "date_parseable": bool(date_parseable),
+            "stats": stats.get(col, {}),
+            "approximatif": False,
+        })
+    return colonnes
+
+
+def _profil_vide(chemin: Path, taille: int, mode: str) -> dict:
+    return {
+        "nom": chemin.name,
+        "chemin": str(chemin),
+        "mode": mode,
+        "taille_octets": taille,
+        "lignes_physiques": 0,
+        "lignes": 0,
+        "colonnes": 0,
+        "colonnes_noms": [],
+        "doublons": 0,
+        "nulls_par_col": {},
+        "total_nulls": 0,
+        "total_valeurs": 0,
+        "memoire_mb": 0.0,
+        "apercu": [],
+        "colonnes_profil": [],
+        "erreur": None,
+    }
+
+
+def _apercu(df: pd.DataFrame) -> list:
+    # Passage par JSON : NaN → null, types numpy → natifs
+    return json.loads(df.head(MAX_APERCU).to_json(orient="records", date_format="iso"))
+
+
+def _profiler_contenu(chemin: Path, contenu: bytes):
+    """Mode exact : profil complet depuis le contenu déjà lu. Retourne (profil, DataFrame)."""
+    profil = _profil_vide(chemin, len(contenu), "exact")
+    profil["lignes_physiques"] = compter_lignes_tampon(contenu)
+    df = None
+    try:
+        df = pd.read_csv(io.BytesIO(contenu), sep=_separateur(chemin), low_memory=False)
+        nulls = df.isna().sum()
+        profil.update({
+            "lignes": len(df),
+            "colonnes": len(df.columns),
+            "colonnes_noms": [str(c) for c in df.columns],
+            "doublons": int(df.duplicated().sum()),
+            "nulls_par_col": {str(c): int(n) for c, n in nulls.items() if n > 0},
+            "total_nulls": int(nulls.sum()),
+            "total_valeurs": int(df.size),
+            "memoire_mb": round(df.memory_usage(deep=True).sum() / (1024 ** 2), 3),
+            "apercu": _apercu(df),
+            "colonnes_profil": _profil_colonnes(df),
+        })
+    except Exception as exc:
+        profil["erreur"] = str(exc)[:300]
+    return profil, df
+
+
+# =========================================================
+# 2. MODE FLUX (FICHIERS VOLUMINEUX)
+# =========================================================
+
+class _LectureHachee:
+    """Fichier binaire dont chaque lecture alimente le SHA-256 et le comptage de lignes."""
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+        self.sha256 = hashlib.sha256()
+        self.sauts = 0
+        self.dernier = b""
+
+    def read(self, taille=-1):
+        donnees = self.fichier.read(taille)
+        if donnees:
+            self.sha256.update(donnees)
+            self.sauts += donnees.count(b"\n")
+            self.dernier = donnees[-1:]
+        return donnees
+
+    def lignes_physiques(self) -> int:
+        nb = self.sauts + (1 if self.dernier not in (b"", b"\n") else 0)
+        return max(0, nb - 1)
+
+
+class _ColonneFlux:
+    """Accumulateurs d'une colonne en mode flux."""
+
+    def __init__(self, serie: pd.Series):
+        self.dtype = str(serie.dtype)
+        self.numerique = _est_numerique(serie)
+        self.echantillon = serie.dropna().head(20)
+        self.hll = HyperLogLog()
+        self.comptes = pd.Series(dtype="int64")
+        self.exact = True
+        self.digest = TDigest() if self.numerique else None
+
+    def ajouter(self, serie: pd.Series) -> None:
+        valeurs = serie.dropna()
+        if len(valeurs) == 0:
+            return
+        if len(self.echantillon) < 20:
+            self.echantillon = pd.concat([self.echantillon, valeurs.head(20)]).head(20)
+        self.hll.ajouter_hashes(hacher(valeurs))
+        self.comptes = self.comptes.add(valeurs.value_counts(), fill_value=0)
+        if len(self.comptes) > LIMITE_MODALITES_EXACTES:
+            # Au-delà : seules les modalités les plus fréquentes sont suivies
+            self.comptes = self.comptes.nlargest(LIMITE_MODALITES_EXACTES)
+            self.exact = False
+        if self.digest is not None:
+            self.digest.ajouter(valeurs.to_numpy(dtype=np.float64))
+
+    def nb_uniques(self) -> int:
+        return len(self.comptes) if self.exact else self.hll.estimation()
+
+    def quantiles(self, qs) -> list[float]:
+        """Quantiles (interpolation linéaire, comme pandas) : exacts tant que les modalités sont suivies."""
+        if not self.exact:
+            return [self.digest.quantile(q) for q in qs]
+        comptes = self.comptes.sort_index()
+        valeurs, cumul = comptes.index.to_numpy(dtype=np.float64), comptes.to_numpy().cumsum()
+        resultats = []
+        for q in qs:
+            h = (cumul[-1] - 1) * q
+            bas, haut = np.searchsorted(cumul, [np.floor(h), np.ceil(h)], side="right")
+            resultats.append(float(valeurs[bas] + (h - np.floor(h)) * (valeurs[haut] - valeurs[bas])))
+        return resultats
+
+    def nb_hors(self, borne_basse: float, borne_haute: float, nb_valeurs: int) -> int:
+        """Valeurs hors de [borne_basse, borne_haute]."""
+        if not self.exact:
+            part = self.digest.cdf(borne_basse) + 1 - self.digest.cdf(borne_haute)
+            return round(float(part) * nb_valeurs)
+        valeurs = self.comptes.index.to_numpy(dtype=np.float64)
+        return int(self.comptes[(valeurs < borne_basse) | (valeurs > borne_haute)].sum())
+
+
+def _profiler_flux(chemin: Path, taille: int):
+    """Mode flux : une lecture par blocs. Retourne (profil, sha256)."""
+    profil = _profil_vide(chemin, taille, "flux")
+    with open(chemin, "rb") as f:
+        lecteur = _LectureHachee(f)
+        try:
+            colonnes, nulls, hashes_lignes = None, None, []
+            numeriques, moments, memoire, nb_lignes = [], None, 0, 0
+            for bloc in pd.read_csv(lecteur, sep=_separateur(chemin), chunksize=PROFIL_TAILLE_BLOC, low_memory=False):
+                if colonnes is None:
+                    colonnes = {c: _ColonneFlux(bloc[c]) for c in bloc.columns}
+                    nulls = pd.Series(0, index=bloc.columns, dtype="int64")
+                    numeriques = [c for c, acc in colonnes.items() if acc.numerique]
+                    moments = Moments(len(numeriques))
+                    profil["apercu"] = _apercu(bloc)
+                if numeriques:
+                    # Les blocs suivants peuvent être inférés autrement : on force le type du premier
+                    bloc[numeriques] = bloc[numeriques].apply(pd.to_numeric, errors="coerce")
+                    moments.ajouter(bloc[numeriques].to_numpy(dtype=np.float64))
+                nb_lignes += len(bloc)
+                nulls += bloc.isna().sum()
+                memoire += int(bloc.memory_usage(deep=True).sum())
+                hashes_lignes.append(pd.util.hash_pandas_object(bloc, index=False).to_numpy())
+                for col, acc in colonnes.items():
+                    acc.ajouter(bloc[col])
+        except Exception as exc:
+            profil["erreur"] = str(exc)[:300]
+            colonnes = None
+        # Lecture du reste éventuel pour un hash complet
+        while lecteur.read(1 << 20):
+            pass
+
+    profil["lignes_physiques"] = lecteur.lignes_physiques()
+    if colonnes is None:
+        return profil, lecteur.sha256.hexdigest()
+
+    hashes = np.concatenate(hashes_lignes) if hashes_lignes else np.empty(0, dtype=np.uint64)
+    profil.update({
+        "lignes": nb_lignes,
+        "colonnes": len(colonnes),
+        "colonnes_noms": [str(c) for c in colonnes],
+        "doublons": int(len(hashes) - len(np.unique(hashes))),
+        "nulls_par_col": {str(c): int(n) for c, n in nulls.items() if n > 0},
+        "total_nulls": int(nulls.sum()),
+        "total_valeurs": nb_lignes * len(colonnes),
+        "memoire_mb": round(memoire / (1024 ** 2), 3),
+    })
+
+    ecarts, skews, kurts = moments.ecart_type(), moments.skewness(), moments.kurtosis()
+    for col, acc in colonnes.items():
+        nb_uniques = acc.nb_uniques()
+        nb_valeurs = nb_lignes - int(nulls[col])
+        stats = {}
+        if acc.numerique and nb_uniques > 1:
+            i = numeriques.index(col)
+            q1, mediane, q3 = acc.quantiles((0.25, 0.5, 0.75))
+            iqr = q3 - q1
+            stats = _stats_numeriques(
+                q1, mediane, q3, acc.digest.min, acc.digest.max, moments.moyenne[i], ecarts[i],
+                skews[i], kurts[i], nb_valeurs, acc.nb_hors(q1 - 1.5 * iqr, q3 + 1.5 * iqr, nb_valeurs),
+            )
+        elif not acc.numerique and acc.dtype != "bool" and nb_uniques > 1:
+            stats = {
+                "top_categories": _top_categories(acc.comptes, nb_valeurs),
+                "nb_categories_distinctes": nb_uniques,
+            }
+        modalites = acc.comptes.index.tolist() if acc.exact and nb_uniques <= 2 else None
+        binaire, date_parseable = _indices_type(acc.echantillon.astype(acc.dtype, errors="ignore"), modalites)
+        profil["colonnes_profil"].append({
+            "nom": str(col),
+            "dtype": acc.dtype,
+            "numerique": acc.numerique,
+            "nb_nulls": int(nulls[col]),
+            "nb_uniques": int(nb_uniques),
+            "binaire": bool(binaire),
+            "date_parseable": bool(date_parseable),
+            "stats": stats,
+            "approximatif": not acc.exact,
+        })
+    return profil, lecteur.sha256.hexdigest()
+
+
+# =========================================================
+# 3. CACHE DES PROFILS
+# =========================================================
+
+def _charger_cache(chemin_cache: Path = None) -> dict:
+    chemin_cache = Path(chemin_cache or CACHE_PROFILS)
+    if _cache["chemin"] != chemin_cache:
+        fichiers = {}
+        try:
+            with open(chemin_cache, "r", encoding="utf-8") as f:
+                contenu = json.load(f)
+            if contenu.get("version") == VERSION_PROFIL:
+                fichiers = contenu.get("fichiers", {})
+        except (OSError, ValueError):
+            pass
+        _cache.update(chemin=chemin_cache, fichiers=fichiers, modifie=False)
+    return _cache["fichiers"]
+
+
+def _a_jour(entree, st) -> bool:
+    return bool(entree) and entree["taille"] == st.st_size and entree["mtime_ns"] == st.st_mtime_ns
+
+
+def _sha256_fichier(chemin: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(bloc)
+    return sha256.hexdigest()
+
+
+def _calculer_entree(chemin: Path, entree: dict = None, mode: str = None):
+    """
+    Entrée de cache à jour pour un fichier. Retourne (entrée, depuis_cache, DataFrame).
+    mode : None (selon la taille), "exact" ou "flux". Sans état global :
+    exécutable dans un processus du pool.
+    """
+    chemin = Path(chemin)
+    st = chemin.stat()
+    if _a_jour(entree, st):
+        return entree, True, None
+
+    if mode == "flux" or (mode is None and st.st_size > PROFIL_SEUIL_FLUX_MO * 1024 ** 2):
+        if entree and entree["taille"] == st.st_size and _sha256_fichier(chemin) == entree["sha256"]:
+            return {**entree, "mtime_ns": st.st_mtime_ns}, True, None
+        profil, sha256 = _profiler_flux(chemin, st.st_size)
+        return {"taille": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256, "profil": profil}, False, None
+
+    contenu = chemin.read_bytes()
+    sha256 = hashlib.sha256(contenu).hexdigest()
+    if entree and entree["taille"] == len(contenu) and entree["sha256"] == sha256:
+        return {**entree, "mtime_ns": st.st_mtime_ns}, True, None
+    profil, df = _profiler_contenu(chemin, contenu)
+    return {"taille": len(contenu), "mtime_ns": st.st_mtime_ns, "sha256": sha256, "profil": profil}, False, df
+
+
+def _calculer_entree_processus(chemin: str, entree: dict, mode: str):
+    entree, depuis_cache, _ = _calculer_entree(Path(chemin), entree, mode)
+    return entree, depuis_cache
+
+
+def _enregistrer_entree(cle: str, entree: dict, depuis_cache: bool) -> None:
+    fichiers = _cache["fichiers"]
+    if fichiers.get(cle) is not entree:
+        fichiers[cle] = entree
+        _cache["modifie"] = True
+    _bilan["depuis_cache" if depuis_cache else "reprofiles"] += 1
+
+
+def profiler_fichier(chemin: Path, garder_dataframe: bool = False, chemin_cache: Path = None,
+                     mode: str = None) -> dict:
+    """
+    Profil d'un fichier, depuis le cache s'il n'a pas changé.
+    garder_dataframe : conserve le DataFrame lu pour un lire_csv() ultérieur
+    (évite une seconde lecture quand le fichier vient d'être re-profilé).
+    """
+    chemin = Path(chemin)
+    fichiers = _charger_cache(chemin_cache)
+    cle = str(chemin.resolve())
+    try:
+        entree, depuis_cache, df = _calculer_entree(chemin, fichiers.get(cle), mode)
+    except OSError as exc:
+        return {"nom": chemin.name, "chemin": str(chemin), "erreur": str(exc)[:300]}
+
+    _enregistrer_entree(cle, entree, depuis_cache)
+    if garder_dataframe and df is not None:
+        _dataframes[(cle, entree["mtime_ns"])] = df
+    return entree["profil"]
+
+
+def profiler_fichiers(chemins, n_jobs: int = None, chemin_cache: Path = None, mode: str = None,
+                      garder=()) -> dict:
+    """
+    Met à jour le cache pour une liste de fichiers ; les fichiers à
+    (re)profiler sont répartis sur `n_jobs` processus, les plus gros
+    d'abord pour que le plus long ne démarre pas en dernier.
+    garder : fichiers dont le DataFrame est conservé pour lire_csv()
+    (seulement quand ils sont profilés dans ce processus).
+    Retourne {chemin: profil}.
+    """
+    fichiers = _charger_cache(chemin_cache)
+    n_jobs = n_jobs or PROFIL_N_JOBS
+    garder = {Path(chemin) for chemin in garder}
+    profils, a_profiler = {}, []
+    for chemin in map(Path, chemins):
+        cle = str(chemin.resolve())
+        try:
+            st = chemin.stat()
+        except OSError as exc:
+            profils[chemin] = {"nom": chemin.name, "chemin": str(chemin), "erreur": str(exc)[:300]}
+            continue
+        if _a_jour(fichiers.get(cle), st):
+            _enregistrer_entree(cle, fichiers[cle], True)
+            profils[chemin] = fichiers[cle]["profil"]
+        else:
+            a_profiler.append((st.st_size, chemin, cle))
+
+    a_profiler.sort(key=lambda item: item[0], reverse=True)
+    if n_jobs <= 1 or len(a_profiler) <= 1:
+        for _, chemin, _ in a_profiler:
+            profils[chemin] = profiler_fichier(chemin, chemin in garder, chemin_cache, mode)
+        return profils
+
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(a_profiler))) as pool:
+        taches = {
+            pool.submit(_calculer_entree_processus, str(chemin), fichiers.get(cle), mode): (chemin, cle)
+            for _, chemin, cle in a_profiler
+        }
+        for tache in as_completed(taches):
+            chemin, cle = taches[tache]
+            try:
+                entree, depuis_cache = tache.result()
+            except Exception as exc:
+                profils[chemin] = {"nom": chemin.name, "chemin": str(chemin), "erreur": str(exc)[:300]}
+                continue
+            _enregistrer_entree(cle, entree, depuis_cache)
+            profils[chemin] = entree["profil"]
+    return profils
+
+
+def enregistrer_cache() -> None:
+    """Écrit le cache (atomiquement) en retirant les fichiers disparus."""
+    fichiers = _charger_cache(_cache["chemin"])
+    disparus = [cle for cle in fichiers if not Path(cle).exists()]
+    for cle in disparus:
+        del fichiers[cle]
+    if not (_cache["modifie"] or disparus):
+        return
+    chemin_cache = _cache["chemin"]
+    chemin_cache.parent.mkdir(parents=True, exist_ok=True)
+    tmp = chemin_cache.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION_PROFIL, "fichiers": fichiers}, f, ensure_ascii=False)
+    os.replace(tmp, chemin_cache)
+    _cache["modifie"] = False
+
+
+def bilan_profilage() -> dict:
+    """Nombre de profils servis depuis le cache / recalculés pendant l'exécution."""
+    return dict(_bilan)
+
+
+def lire_csv(chemin: Path) -> pd.DataFrame:
+    """
+    DataFrame complet d'un fichier, lu au plus une fois par exécution : les
+    analyses métier qui consultent plusieurs fois le même fichier du
+    warehouse partagent le même objet (à ne pas modifier en place).
+    """
+    chemin = Path(chemin)
+    cle = (str(chemin.resolve()), chemin.stat().st_mtime_ns)
+    if cle not in _dataframes:
+        _dataframes[cle] = pd.read_csv(chemin, sep=_separateur(chemin), low_memory=False)
+    return _dataframes[cle]
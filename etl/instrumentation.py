@@ -0,0 +1,326 @@
+# =========================================================
+# etl/instrumentation.py
+# Mesure des étapes du pipeline ETL (extraction, transformation,
+# chargement) : durée, temps CPU, pic de mémoire, lignes et
+# octets lus / écrits.
+#
+#   with execution("etl_complet"):          # une exécution = un enregistrement
+#       with etape("transform.eurostat") as e:
+#           transform_eurostat(...)
+#           e.fichiers(entree=[RAW / "eurostat"], sortie=[PROCESSED / "eurostat"])
+#
+# Une execution() ouverte à l'intérieur d'une autre n'est qu'une
+# étape de plus : main_transform et main_load s'instrumentent
+# eux-mêmes, qu'ils soient lancés seuls ou depuis main_etl.
+#
+# En fin d'exécution :
+#   - data/audit/etl_runs.jsonl : une ligne JSON par exécution
+#     (historique pour comparer les exécutions entre elles) ;
+#   - data/audit/etl_metrics.prom : métriques au format texte
+#     Prometheus (collecteur textfile de node_exporter, ou poussées
+#     telles quelles vers ETL_PUSHGATEWAY_URL si défini).
+#
+# Mémoire : le pic (VmHWM) est remis à zéro à l'entrée de chaque
+# étape via /proc/self/clear_refs, ce qui donne le pic propre à
+# l'étape ; hors Linux, repli sur ru_maxrss (pic du processus).
+# Octets : rchar / wchar de /proc/self/io (fichiers et réseau).
+# Lignes : les fichiers déclarés via fichiers() sont comptés à la fin
+# de l'étape, une fois durée, CPU, mémoire et octets relevés.
+# =========================================================
+
+import json
+import os
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "audit"))
+from comptage import compter_lignes
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+AUDIT_DIR = Path(os.getenv("ETL_AUDIT_DIR", str(BASE_DIR / "data" / "audit")))
+JOURNAL_EXECUTIONS = "etl_runs.jsonl"
+FICHIER_METRIQUES = "etl_metrics.prom"
+ETL_PUSHGATEWAY_URL = os.getenv("ETL_PUSHGATEWAY_URL")
+
+EXTENSIONS_TABULAIRES = {".csv", ".tsv", ".txt"}
+
+_pile = []           # étapes ouvertes, de la plus externe à la plus interne
+_execution = None    # exécution en cours
+
+
+# =========================================================
+# 1. LECTURES SYSTÈME
+# =========================================================
+
+def _rusage_cpu() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _io() -> dict:
+    """Compteurs d'E/S du processus (octets), vides hors Linux."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            return {cle: int(valeur) for cle, valeur in (ligne.split(":") for ligne in f)}
+    except OSError:
+        return {}
+
+
+def _reinitialiser_pic_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _pic_rss() -> int:
+    """Pic de mémoire résidente (octets) depuis la dernière remise à zéro."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for ligne in f:
+                if ligne.startswith("VmHWM:"):
+                    return int(ligne.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# =========================================================
+# 2. ÉTAPES
+# =========================================================
+
+class Etape:
+    def __init__(self, nom: str, parent: str = None, contexte: dict = None):
+        self.nom = nom
+        self.parent = parent
+        self.contexte = contexte or {}
+        self.statut = "en_cours"
+        self.erreur = None
+        self.lignes_entree = None
+        self.lignes_sortie = None
+        self.pic_rss = 0
+        self._debut_horloge = time.time()
+        self._debut = time.perf_counter()
+        self._debut_cpu = _rusage_cpu()
+        self._debut_io = _io()
+        self.duree_s = self.cpu_s = 0.0
+        self.octets_lus = self.octets_ecrits = None
+        self._fichiers_entree, self._fichiers_sortie = [], []
+
+    def lignes(self, entree: int = None, sortie: int = None) -> None:
+        """Ajoute des lignes lues / produites par l'étape."""
+        if entree is not None:
+            self.lignes_entree = (self.lignes_entree or 0) + int(entree)
+        if sortie is not None:
+            self.lignes_sortie = (self.lignes_sortie or 0) + int(sortie)
+
+    def fichiers(self, entree=(), sortie=()) -> None:
+        """
+        Déclare les fichiers tabulaires lus / écrits (fichiers ou dossiers
+        parcourus récursivement). Leurs lignes sont comptées par terminer(),
+        après le relevé des mesures : le comptage (parfois des Go de GTFS)
+        ne gonfle ni la durée ni les octets lus de l'étape. Côté sortie,
+        seuls les fichiers modifiés depuis le début de l'étape sont comptés.
+        """
+        self._fichiers_entree.extend(entree)
+        self._fichiers_sortie.extend(sortie)
+
+    def terminer(self, erreur: BaseException = None) -> None:
+        self.duree_s = time.perf_counter() - self._debut
+        self.cpu_s = _rusage_cpu() - self._debut_cpu
+        self.pic_rss = max(self.pic_rss, _pic_rss())
+        fin_io = _io()
+        if fin_io and self._debut_io:
+            self.octets_lus = fin_io["rchar"] - self._debut_io["rchar"]
+            self.octets_ecrits = fin_io["wchar"] - self._debut_io["wchar"]
+        if erreur is not None:
+            self.statut, self.erreur = "erreur", f"{type(erreur).__name__}: {erreur}"[:300]
+        elif self.statut == "en_cours":
+            self.statut = "ok"
+        if self._fichiers_entree or self._fichiers_sortie:
+            self.lignes(
+                entree=_lignes_fichiers(self._fichiers_entree),
+                sortie=_lignes_fichiers(self._fichiers_sortie, self._debut_horloge),
+            )
+
+    def to_dict(self) -> dict:
+        return {
+            "nom": self.nom,
+            "parent": self.parent,
+            "statut": self.statut,
+            "erreur": self.erreur,
+            "debut": datetime.fromtimestamp(self._debut_horloge).isoformat(timespec="seconds"),
+            "duree_s": round(self.duree_s, 3),
+            "cpu_s": round(self.cpu_s, 3),
+            "pic_rss_mo": round(self.pic_rss / 1024 ** 2, 1),
+            "lignes_entree": self.lignes_entree,
+            "lignes_sortie": self.lignes_sortie,
+            "octets_lus": self.octets_lus,
+            "octets_ecrits": self.octets_ecrits,
+            **({"contexte": self.contexte} if self.contexte else {}),
+        }
+
+
+def _lignes_fichiers(chemins, depuis: float = None):
+    total, trouve = 0, False
+    for chemin in map(Path, chemins):
+        fichiers = chemin.rglob("*") if chemin.is_dir() else [chemin]
+        for fichier in fichiers:
+            if fichier.suffix not in EXTENSIONS_TABULAIRES or not fichier.is_file():
+                continue
+            if depuis is not None and fichier.stat().st_mtime < depuis:
+                continue
+            nb = compter_lignes(fichier)
+            if nb is not None:
+                total, trouve = total + nb, True
+    return total if trouve else None
+
+
+@contextmanager
+def etape(nom: str, **contexte):
+    """Mesure le bloc ; les exceptions sont enregistrées puis propagées."""
+    parent = _pile[-1] if _pile else None
+    if parent is not None:
+        # Le pic observé jusqu'ici appartient au parent avant remise à zéro
+        parent.pic_rss = max(parent.pic_rss, _pic_rss())
+    _reinitialiser_pic_rss()
+    mesure = Etape(nom, parent.nom if parent else None, contexte)
+    _pile.append(mesure)
+    try:
+        yield mesure
+    except BaseException as exc:
+        mesure.terminer(exc)
+        raise
+    else:
+        mesure.terminer()
+    finally:
+        _pile.pop()
+        if parent is not None:
+            parent.pic_rss = max(parent.pic_rss, mesure.pic_rss)
+        if _execution is not None:
+            _execution["etapes"].append(mesure.to_dict())
+
+
+def instrumenter(nom: str = None):
+    """Décorateur : chaque appel de la fonction est une étape."""
+    def decorateur(fonction):
+        def enveloppe(*args, **kwargs):
+            with etape(nom or fonction.__name__):
+                return fonction(*args, **kwargs)
+        enveloppe.__name__ = fonction.__name__
+        enveloppe.__doc__ = fonction.__doc__
+        return enveloppe
+    return decorateur
+
+
+# =========================================================
+# 3. EXÉCUTIONS ET EXPORTS
+# =========================================================
+
+@contextmanager
+def execution(nom: str, dossier: Path = None):
+    """
+    Exécution instrumentée : étape racine dont toutes les sous-étapes sont
+    écrites dans le journal et le fichier de métriques à la sortie.
+    Imbriquée dans une autre exécution, se comporte comme etape(nom).
+    """
+    global _execution
+    if _execution is not None:
+        with etape(nom) as mesure:
+            yield mesure
+        return
+
+    _execution = {"id": uuid.uuid4().hex[:12], "nom": nom, "etapes": []}
+    enregistrement = _execution
+    try:
+        with etape(nom) as mesure:
+            yield mesure
+    finally:
+        _execution = None
+        racine = enregistrement["etapes"][-1]
+        enregistrement.update(
+            debut=racine["debut"],
+            duree_s=racine["duree_s"],
+            statut=racine["statut"],
+            python=sys.version.split()[0],
+        )
+        exporter(enregistrement, Path(dossier or AUDIT_DIR))
+
+
+def exporter(enregistrement: dict, dossier: Path) -> None:
+    """Ajoute l'exécution au journal JSONL et réécrit le fichier de métriques."""
+    try:
+        dossier.mkdir(parents=True, exist_ok=True)
+        with open(dossier / JOURNAL_EXECUTIONS, "a", encoding="utf-8") as f:
+            f.write(json.dumps(enregistrement, ensure_ascii=False) + "\n")
+        texte = metriques_prometheus(enregistrement)
+        tmp = dossier / (FICHIER_METRIQUES + ".tmp")
+        tmp.write_text(texte, encoding="utf-8")
+        os.replace(tmp, dossier / FICHIER_METRIQUES)
+    except OSError as exc:
+        print(f"⚠️  Journal d'exécution ETL non écrit : {exc}")
+        return
+
+    if ETL_PUSHGATEWAY_URL:
+        try:
+            import requests
+            requests.put(
+                f"{ETL_PUSHGATEWAY_URL.rstrip('/')}/metrics/job/etl/run/{enregistrement['nom']}",
+                data=texte.encode("utf-8"),
+                timeout=5,
+            )
+        except Exception as exc:
+            print(f"⚠️  Pushgateway injoignable : {exc}")
+
+
+METRIQUES = [
+    # (nom Prometheus, clé de l'étape, facteur, aide)
+    ("etl_stage_duration_seconds", "duree_s", 1, "Durée de l'étape (s)"),
+    ("etl_stage_cpu_seconds", "cpu_s", 1, "Temps CPU de l'étape (s)"),
+    ("etl_stage_peak_rss_bytes", "pic_rss_mo", 1024 ** 2, "Pic de mémoire résidente pendant l'étape (octets)"),
+    ("etl_stage_rows_in", "lignes_entree", 1, "Lignes lues par l'étape"),
+    ("etl_stage_rows_out", "lignes_sortie", 1, "Lignes produites par l'étape"),
+    ("etl_stage_read_bytes", "octets_lus", 1, "Octets lus par l'étape"),
+    ("etl_stage_written_bytes", "octets_ecrits", 1, "Octets écrits par l'étape"),
+]
+
+
+def _nombre(valeur) -> str:
+    valeur = float(valeur)
+    return str(int(valeur)) if valeur.is_integer() else repr(round(valeur, 6))
+
+
+def _label(valeur) -> str:
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def metriques_prometheus(enregistrement: dict) -> str:
+    """Exposition texte Prometheus de la dernière exécution (une série par étape)."""
+    run = _label(enregistrement["nom"])
+    lignes = [
+        "# HELP etl_run_timestamp_seconds Fin de la dernière exécution ETL (epoch)",
+        "# TYPE etl_run_timestamp_seconds gauge",
+        f'etl_run_timestamp_seconds{{run="{run}"}} {time.time():.0f}',
+        "# HELP etl_run_success 1 si la dernière exécution ETL s'est terminée sans erreur",
+        "# TYPE etl_run_success gauge",
+        f'etl_run_success{{run="{run}"}} {int(enregistrement["statut"] == "ok")}',
+        "# HELP etl_stage_success 1 si l'étape s'est terminée sans erreur",
+        "# TYPE etl_stage_success gauge",
+    ]
+    etapes = enregistrement["etapes"]
+    labels = [f'run="{run}",stage="{_label(e["nom"])}",parent="{_label(e["parent"] or "")}"' for e in etapes]
+    lignes += [f"etl_stage_success{{{lab}}} {int(e['statut'] == 'ok')}" for e, lab in zip(etapes, labels)]
+    for nom, cle, facteur, aide in METRIQUES:
+        lignes += [f"# HELP {nom} {aide}", f"# TYPE {nom} gauge"]
+        lignes += [
+            f"{nom}{{{lab}}} {_nombre(e[cle] * facteur)}"
+            for e, lab in zip(etapes, labels) if e[cle] is not None
+        ]
+    return "\n".join(lignes) + "\n"
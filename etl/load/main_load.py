@@ -7,6 +7,7 @@ current_dir = Path(__file__).parent
 project_root = current_dir.parent
 sys.path.insert(0, str(project_root))
 
+from instrumentation import etape, execution
 from .database import db
 from .load_countries import load_countries
 from .load_years import load_years
@@ -14,6 +15,7 @@ from .load_operators import load_operators
 from .load_stops import load_stops
 from .load_country_stats import load_country_stats
 from .load_night_trains import load_night_trains
+from .migrations import appliquer_migrations
 
 def init_schema():
     """Initialise le schéma SQL"""
@@ -45,8 +47,37 @@ def init_schema():
     finally:
         db.close()
 
+WAREHOUSE_DIR = Path("data/warehouse")
+
+# (table, fonction de chargement), dans l'ordre imposé par les clés étrangères
+CHARGEMENTS = [
+    ("dim_countries", load_countries),
+    ("dim_years", load_years),
+    ("dim_operators", load_operators),
+    ("dim_stops", load_stops),
+    ("facts_country_stats", load_country_stats),
+    ("facts_night_trains", load_night_trains),
+]
+
+
+def charger_table(table, fonction):
+    """Charge une table en mesurant l'étape (lignes CSV lues, lignes en base)."""
+    with etape(f"load.{table}") as mesure:
+        mesure.fichiers(entree=[WAREHOUSE_DIR / f"{table}.csv"])
+        if not fonction():
+            mesure.statut = "echec"
+        cursor = db.execute_query(f"SELECT COUNT(*) FROM {table}")
+        if cursor:
+            mesure.lignes(sortie=cursor.fetchone()[0])
+
+
 def mainload():
-    """Chargement complet"""
+    """Chargement complet (chaque table est une étape mesurée)"""
+    with execution("chargement"):
+        _mainload()
+
+
+def _mainload():
     print("=" * 60)
     print("💾 CHARGEMENT DATA WAREHOUSE → POSTGRESQL")
     print("=" * 60)
@@ -58,25 +89,33 @@ def mainload():
             print("❌ Impossible d'initialiser le schéma. Abandon.")
             return
     
+    # Index ajoutés depuis la création de la base (sql/migrations)
+    print("\n🔧 MIGRATIONS:")
+    with etape("load.migrations") as mesure:
+        try:
+            appliquer_migrations()
+        except Exception as e:
+            mesure.statut = "echec"
+            print(f"⚠️  Migrations non appliquées (chargement poursuivi) : {e}")
+    
     print("\n" + "=" * 60)
     print("📥 CHARGEMENT DES DONNÉES")
     print("=" * 60)
     
     # 1. Dimensions (ordre important pour les FK)
     print("\n📐 DIMENSIONS:")
-    load_countries()
-    load_years()
-    load_operators()
-    load_stops()
+    for table, fonction in CHARGEMENTS[:4]:
+        charger_table(table, fonction)
     
     # 2. Faits (après les dimensions)
     print("\n📊 FAITS:")
-    load_country_stats()
-    load_night_trains()
+    for table, fonction in CHARGEMENTS[4:]:
+        charger_table(table, fonction)
     
     # 3. Vues
     print("\n📈 VUES:")
-    db.refresh_views()
+    with etape("load.refresh_views"):
+        db.refresh_views()
     
     # 4. Résumé
     print("\n" + "=" * 60)
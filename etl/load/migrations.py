@@ -0,0 +1,71 @@
+# etl/load/migrations.py
+"""
+Migrations SQL d'une base existante (sql/migrations/*.sql, ordre alphabétique).
+
+sql/01_init.sql et 02_indexes.sql ne sont joués par le conteneur db que sur
+un volume neuf ; les fichiers de sql/migrations/ amènent une base déjà
+peuplée au même état. Chaque instruction est exécutée seule, en autocommit
+(CREATE INDEX CONCURRENTLY est interdit dans une transaction), et doit être
+idempotente (IF NOT EXISTS) : les migrations sont rejouées à chaque chargement.
+
+Un index laissé INVALID par un CREATE INDEX CONCURRENTLY interrompu est
+supprimé puis recréé (IF NOT EXISTS l'ignorerait sinon).
+
+Usage autonome : python -m load.migrations (depuis etl/)
+"""
+import re
+from pathlib import Path
+
+import psycopg2
+
+from .database import db
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+_INDEX_NAME = re.compile(r"CREATE\s+INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE)
+
+
+def lire_instructions(chemin):
+    """Instructions d'un fichier SQL (commentaires -- retirés, séparateur ;)."""
+    lignes = [ligne.split("--", 1)[0] for ligne in Path(chemin).read_text(encoding="utf-8").splitlines()]
+    return [instruction.strip() for instruction in "\n".join(lignes).split(";") if instruction.strip()]
+
+
+def _index_invalide(cursor, nom):
+    cursor.execute(
+        "SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = %s",
+        (nom,),
+    )
+    ligne = cursor.fetchone()
+    return bool(ligne and ligne[0])
+
+
+def appliquer_migrations(dossier=MIGRATIONS_DIR):
+    """Applique toutes les migrations ; retourne le nombre d'instructions exécutées."""
+    fichiers = sorted(Path(dossier).glob("*.sql"))
+    if not fichiers:
+        print(f"⚠️  Aucune migration dans {dossier}")
+        return 0
+
+    connection = psycopg2.connect(**db.config)
+    connection.autocommit = True
+    executees = 0
+    try:
+        with connection.cursor() as cursor:
+            for fichier in fichiers:
+                print(f"   🔧 {fichier.name}")
+                for instruction in lire_instructions(fichier):
+                    nom = _INDEX_NAME.search(instruction)
+                    if nom and _index_invalide(cursor, nom.group(1)):
+                        print(f"      ♻️  index invalide {nom.group(1)} recréé")
+                        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nom.group(1)}")
+                    cursor.execute(instruction)
+                    executees += 1
+    finally:
+        connection.close()
+    return executees
+
+
+if __name__ == "__main__":
+    print(f"✅ {appliquer_migrations()} instruction(s) de migration appliquée(s)")
@@ -9,6 +9,7 @@ from datetime import datetime
 import sys
 from pathlib import Path
 
+from instrumentation import etape, execution
 
 # --- EXTRACTION ---
 try:
@@ -56,15 +57,17 @@ def run_extraction():
         ("Émissions CO2", download_eurostat_via_api),
     ]
     
-    # Exécution séquentielle de chaque extracteur
-    for name, func in extractors:
-        print(f"📄 Extraction de {name}...")
-        try:
-            func()
-            print(f"✅ {name} extrait avec succès")
-        except Exception as e:
-            print(f"❌ Erreur lors de l'extraction de {name}: {e}")
-        print()
+    # Exécution séquentielle de chaque extracteur (une étape mesurée chacun)
+    with execution("extraction"):
+        for name, func in extractors:
+            print(f"📄 Extraction de {name}...")
+            try:
+                with etape(f"extract.{func.__name__}", source=name):
+                    func()
+                print(f"✅ {name} extrait avec succès")
+            except Exception as e:
+                print(f"❌ Erreur lors de l'extraction de {name}: {e}")
+            print()
     
     print("✅ Extraction terminée")
 
@@ -96,14 +99,16 @@ def run_full_etl():
     print(f"Date et heure : {datetime.now()}")
     print("=" * 60)
     
-    # EXTRACTION
-    run_extraction()
-    
-    # TRANSFORMATION
-    run_transformation()
-    
-    # CHARGEMENT
-    run_chargement()
+    # Une seule exécution instrumentée : les trois phases en sont les étapes
+    with execution("etl_complet"):
+        # EXTRACTION
+        run_extraction()
+        
+        # TRANSFORMATION
+        run_transformation()
+        
+        # CHARGEMENT
+        run_chargement()
     
     print("\n" + "=" * 60)
     print("🎉 PIPELINE ETL TERMINÉ AVEC SUCCÈS !")
@@ -0,0 +1,100 @@
+import json
+import time
+
+import pytest
+
+import instrumentation
+from instrumentation import etape, execution
+
+
+def _lire_journal(dossier):
+    return [json.loads(ligne) for ligne in (dossier / "etl_runs.jsonl").read_text(encoding="utf-8").splitlines()]
+
+
+def test_execution_enregistre_chaque_etape_dans_le_journal(tmp_path):
+    entree = tmp_path / "raw" / "source.csv"
+    entree.parent.mkdir()
+    entree.write_text("a,b\n1,2\n3,4\n", encoding="utf-8")
+    sortie = tmp_path / "processed"
+    sortie.mkdir()
+
+    with execution("transformation", dossier=tmp_path):
+        with etape("transform.source") as mesure:
+            donnees = bytearray(64 * 1024 ** 2)
+            (sortie / "source_processed.csv").write_text("a\n1\n", encoding="utf-8")
+            mesure.fichiers(entree=[entree.parent], sortie=[sortie])
+            del donnees
+        with etape("transform.vide"):
+            pass
+
+    (run,) = _lire_journal(tmp_path)
+    etapes = {e["nom"]: e for e in run["etapes"]}
+    assert run["nom"] == "transformation" and run["statut"] == "ok"
+    assert list(etapes) == ["transform.source", "transform.vide", "transformation"]
+    source = etapes["transform.source"]
+    assert source["parent"] == "transformation"
+    assert (source["lignes_entree"], source["lignes_sortie"]) == (2, 1)
+    assert source["pic_rss_mo"] >= 64
+    assert etapes["transformation"]["pic_rss_mo"] >= source["pic_rss_mo"]
+    assert source["duree_s"] >= 0 and source["cpu_s"] >= 0
+    assert etapes["transform.vide"]["lignes_entree"] is None
+
+
+# Le comptage des lignes a lieu après le relevé de la durée de l'étape
+def test_comptage_des_fichiers_hors_duree_de_l_etape(tmp_path, monkeypatch):
+    entree = tmp_path / "gtfs" / "stop_times.txt"
+    entree.parent.mkdir()
+    entree.write_text("trip_id,stop_id\n1,A\n1,B\n", encoding="utf-8")
+    comptage = instrumentation.compter_lignes
+
+    def _comptage_lent(fichier):
+        time.sleep(0.3)
+        return comptage(fichier)
+
+    monkeypatch.setattr(instrumentation, "compter_lignes", _comptage_lent)
+
+    with execution("transformation", dossier=tmp_path):
+        with etape("transform.gtfs") as mesure:
+            mesure.fichiers(entree=[entree.parent])
+
+    (run,) = _lire_journal(tmp_path)
+    gtfs = run["etapes"][0]
+    assert gtfs["lignes_entree"] == 2
+    assert gtfs["duree_s"] < 0.3
+
+
+def test_execution_imbriquee_est_une_simple_etape(tmp_path):
+    with execution("etl_complet", dossier=tmp_path):
+        with execution("chargement", dossier=tmp_path):
+            with etape("load.dim_years") as mesure:
+                mesure.lignes(entree=10, sortie=10)
+
+    (run,) = _lire_journal(tmp_path)
+    assert [(e["nom"], e["parent"]) for e in run["etapes"]] == [
+        ("load.dim_years", "chargement"), ("chargement", "etl_complet"), ("etl_complet", None),
+    ]
+
+
+def test_erreur_enregistree_puis_propagee(tmp_path):
+    with pytest.raises(ValueError):
+        with execution("extraction", dossier=tmp_path):
+            with etape("extract.gtfs_fr"):
+                raise ValueError("flux indisponible")
+
+    (run,) = _lire_journal(tmp_path)
+    assert run["statut"] == "erreur"
+    assert run["etapes"][0]["erreur"] == "ValueError: flux indisponible"
+
+
+def test_metriques_au_format_texte_prometheus(tmp_path):
+    with execution("chargement", dossier=tmp_path):
+        with etape("load.dim_countries") as mesure:
+            mesure.lignes(entree=45, sortie=45)
+
+    texte = (tmp_path / "etl_metrics.prom").read_text(encoding="utf-8")
+    assert '# TYPE etl_stage_duration_seconds gauge' in texte
+    assert 'etl_stage_rows_out{run="chargement",stage="load.dim_countries",parent="chargement"} 45' in texte
+    assert 'etl_run_success{run="chargement"} 1' in texte
+    for ligne in texte.splitlines():
+        assert ligne.startswith("#") or len(ligne.rsplit(" ", 1)) == 2
+    assert not list(tmp_path.glob("*.tmp"))
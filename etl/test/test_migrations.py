@@ -0,0 +1,35 @@
+import re
+from pathlib import Path
+
+from load.migrations import MIGRATIONS_DIR, lire_instructions
+
+SQL_DIR = Path(__file__).resolve().parents[2] / "sql"
+
+
+def _noms_index(texte):
+    return set(re.findall(r"IF NOT EXISTS (idx_\w+)", texte))
+
+
+def test_lire_instructions_retire_commentaires_et_decoupe(tmp_path):
+    fichier = tmp_path / "001_test.sql"
+    fichier.write_text(
+        "-- en-tête ; ignoré\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a\n    ON t (a); -- fin\n\n"
+        "ANALYZE t;\n",
+        encoding="utf-8",
+    )
+
+    assert lire_instructions(fichier) == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a\n    ON t (a)",
+        "ANALYZE t",
+    ]
+
+
+# La migration d'une base existante crée les mêmes index que 02_indexes.sql
+def test_migration_couvre_tous_les_index_de_02_indexes():
+    initiaux = _noms_index((SQL_DIR / "02_indexes.sql").read_text(encoding="utf-8"))
+    migrations = [i for f in sorted(MIGRATIONS_DIR.glob("*.sql")) for i in lire_instructions(f)]
+
+    assert initiaux
+    assert initiaux <= _noms_index("\n".join(migrations))
+    assert all("CONCURRENTLY" in i for i in migrations if i.upper().startswith("CREATE INDEX"))
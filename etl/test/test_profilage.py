@@ -0,0 +1,146 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from audit import profilage
+
+
+@pytest.fixture(autouse=True)
+def cache_isole(tmp_path, monkeypatch):
+    monkeypatch.setattr(profilage, "CACHE_PROFILS", tmp_path / "audit" / "profils_cache.json")
+    monkeypatch.setattr(profilage, "_cache", {"chemin": None, "fichiers": None, "modifie": False})
+    monkeypatch.setattr(profilage, "_bilan", {"depuis_cache": 0, "reprofiles": 0})
+    monkeypatch.setattr(profilage, "_dataframes", {})
+
+
+def _ecrire_csv(chemin):
+    pd.DataFrame({
+        "pays": ["France", "France", "Italy", None, "Spain", "Spain"],
+        "annee": [2020, 2020, 2021, 2022, 2023, 2023],
+        "passagers": [10.0, 10.0, 12.5, 11.0, 500.0, 13.0],
+        "is_night": [True, True, False, True, False, False],
+    }).to_csv(chemin, index=False)
+
+
+def test_profil_calcule_toutes_les_statistiques_en_une_lecture(tmp_path):
+    chemin = tmp_path / "facts.csv"
+    _ecrire_csv(chemin)
+
+    profil = profilage.profiler_fichier(chemin)
+
+    assert profil["lignes"] == profil["lignes_physiques"] == 6
+    assert profil["colonnes_noms"] == ["pays", "annee", "passagers", "is_night"]
+    assert profil["doublons"] == 1
+    assert profil["nulls_par_col"] == {"pays": 1}
+    colonnes = {c["nom"]: c for c in profil["colonnes_profil"]}
+    assert colonnes["passagers"]["stats"]["nb_outliers_iqr"] == 1
+    assert colonnes["pays"]["stats"]["nb_categories_distinctes"] == 3
+    assert colonnes["is_night"]["binaire"] is True
+    assert colonnes["annee"]["numerique"] is True
+
+
+def test_seuls_les_fichiers_modifies_sont_reprofiles(tmp_path):
+    inchange, retouche, modifie = (tmp_path / f"{nom}.csv" for nom in ("a", "b", "c"))
+    for chemin in (inchange, retouche, modifie):
+        _ecrire_csv(chemin)
+    for chemin in (inchange, retouche, modifie):
+        profilage.profiler_fichier(chemin)
+    profilage.enregistrer_cache()
+
+    # Nouvelle exécution : cache relu depuis le disque
+    profilage._cache.update(chemin=None, fichiers=None)
+    profilage._bilan.update(depuis_cache=0, reprofiles=0)
+    st = retouche.stat()
+    os.utime(retouche, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    with open(modifie, "a", encoding="utf-8") as f:
+        f.write("Germany,2024,9.0,True\n")
+
+    profils = [profilage.profiler_fichier(chemin) for chemin in (inchange, retouche, modifie)]
+
+    assert profilage.bilan_profilage() == {"depuis_cache": 2, "reprofiles": 1}
+    assert [p["lignes"] for p in profils] == [6, 6, 7]
+
+
+def test_lire_csv_reutilise_le_dataframe_du_profilage(tmp_path, monkeypatch):
+    chemin = tmp_path / "dim.csv"
+    _ecrire_csv(chemin)
+    profilage.profiler_fichier(chemin, garder_dataframe=True)
+
+    def lecture_interdite(*args, **kwargs):
+        raise AssertionError("fichier relu")
+
+    monkeypatch.setattr(profilage.pd, "read_csv", lecture_interdite)
+
+    assert len(profilage.lire_csv(chemin)) == 6
+    assert profilage.lire_csv(chemin) is profilage.lire_csv(chemin)
+
+
+def test_mode_flux_approche_les_statistiques_exactes(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "duree": rng.lognormal(size=20_000),
+        "gare": rng.integers(0, 15_000, 20_000),
+        "pays": rng.choice(["FR", "DE", "IT"], 20_000),
+    })
+    chemin = tmp_path / "trajets.csv"
+    pd.concat([df, df.head(50)]).to_csv(chemin, index=False)
+    monkeypatch.setattr(profilage, "PROFIL_TAILLE_BLOC", 3_000)
+
+    exact = profilage.profiler_fichier(chemin, mode="exact")
+    profilage._cache.update(chemin=None, fichiers=None)
+    flux = profilage.profiler_fichier(chemin, mode="flux")
+
+    assert flux["mode"] == "flux"
+    for cle in ("lignes", "lignes_physiques", "doublons", "nulls_par_col", "colonnes_noms"):
+        assert flux[cle] == exact[cle]
+    colonnes_exactes = {c["nom"]: c for c in exact["colonnes_profil"]}
+    for colonne in flux["colonnes_profil"]:
+        attendu = colonnes_exactes[colonne["nom"]]
+        assert colonne["nb_uniques"] == pytest.approx(attendu["nb_uniques"], rel=0.02)
+        for stat, valeur in attendu["stats"].items():
+            if stat == "top_categories":
+                assert colonne["stats"][stat] == valeur
+            elif stat in ("skewness", "kurtosis", "moyenne", "ecart_type", "min", "max"):
+                assert colonne["stats"][stat] == pytest.approx(valeur, rel=1e-9)
+            else:
+                assert colonne["stats"][stat] == pytest.approx(valeur, rel=0.02, abs=0.05)
+    approximatifs = {c["nom"]: c["approximatif"] for c in flux["colonnes_profil"]}
+    assert approximatifs == {"duree": True, "gare": True, "pays": False}
+
+
+def test_profiler_fichiers_plus_gros_d_abord_et_cache_partage(tmp_path, monkeypatch):
+    chemins = []
+    for nom, nb in (("petit", 1), ("gros", 20), ("moyen", 5)):
+        chemin = tmp_path / f"{nom}.csv"
+        pd.DataFrame({"x": range(nb * 10)}).to_csv(chemin, index=False)
+        chemins.append(chemin)
+    profilage.profiler_fichier(chemins[0])
+
+    ordre = []
+    original = profilage.profiler_fichier
+    monkeypatch.setattr(profilage, "profiler_fichier",
+                        lambda chemin, *args, **kwargs: ordre.append(chemin.stem) or original(chemin, *args, **kwargs))
+
+    profils = profilage.profiler_fichiers(chemins, n_jobs=1)
+
+    assert ordre == ["gros", "moyen"]
+    assert [profils[c]["lignes"] for c in chemins] == [10, 200, 50]
+    assert profilage.bilan_profilage() == {"depuis_cache": 1, "reprofiles": 3}
+
+
+def test_profiler_fichiers_en_parallele(tmp_path):
+    chemins = [tmp_path / f"{i}.csv" for i in range(3)]
+    for i, chemin in enumerate(chemins):
+        _ecrire_csv(chemin)
+        with open(chemin, "a", encoding="utf-8") as f:
+            f.write("Germany,2024,9.0,True\n" * i)
+
+    profils = profilage.profiler_fichiers(chemins, n_jobs=2)
+    profilage.enregistrer_cache()
+
+    assert [profils[c]["lignes"] for c in chemins] == [6, 7, 8]
+    assert profilage.bilan_profilage() == {"depuis_cache": 0, "reprofiles": 3}
+    profilage._cache.update(chemin=None, fichiers=None)
+    assert profilage.profiler_fichiers(chemins, n_jobs=2) == profils
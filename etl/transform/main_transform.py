@@ -20,6 +20,9 @@ import numpy as np
 current_dir = Path(__file__).parent
 project_root = current_dir.parent.parent
 sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(current_dir.parent))
+
+from instrumentation import etape, execution
 
 # Maintenant on peut importer les modules
 try:
@@ -77,8 +80,14 @@ def convert_numpy_types(obj):
 
 def main_transform_pipeline():
     """
-    Pipeline principal de transformation
+    Pipeline principal de transformation (chaque étape est mesurée,
+    cf. etl/instrumentation.py)
     """
+    with execution("transformation"):
+        _main_transform_pipeline()
+
+
+def _main_transform_pipeline():
     logger.info("🚀 Démarrage du pipeline de transformation ETL")
     
     # Configuration des chemins
@@ -109,7 +118,9 @@ def main_transform_pipeline():
         print("\n" + "="*60)
         print("TRANSFORMATION BACK ON TRACK")
         print("="*60)
-        report1 = transform_back_on_track(str(RAW_DIR), str(PROCESSED_DIR))
+        with etape("transform.back_on_track") as mesure:
+            report1 = transform_back_on_track(str(RAW_DIR), str(PROCESSED_DIR))
+            mesure.fichiers(entree=[RAW_DIR / "back_on_track"], sortie=[PROCESSED_DIR / "back_on_track"])
         if report1:
             quality_reports.append(convert_numpy_types(report1))
         
@@ -117,7 +128,9 @@ def main_transform_pipeline():
         print("\n" + "="*60)
         print("TRANSFORMATION EUROSTAT")
         print("="*60)
-        report2 = transform_eurostat(str(RAW_DIR), str(PROCESSED_DIR))
+        with etape("transform.eurostat") as mesure:
+            report2 = transform_eurostat(str(RAW_DIR), str(PROCESSED_DIR))
+            mesure.fichiers(entree=[RAW_DIR / "eurostat"], sortie=[PROCESSED_DIR / "eurostat"])
         if report2:
             quality_reports.append(convert_numpy_types(report2))
         
@@ -125,7 +138,9 @@ def main_transform_pipeline():
         print("\n" + "="*60)
         print("TRANSFORMATION ÉMISSIONS CO2")
         print("="*60)
-        report3 = transform_emissions(str(RAW_DIR), str(PROCESSED_DIR))
+        with etape("transform.emissions") as mesure:
+            report3 = transform_emissions(str(RAW_DIR), str(PROCESSED_DIR))
+            mesure.fichiers(entree=[RAW_DIR / "emission_co2"], sortie=[PROCESSED_DIR / "emissions"])
         if report3:
             quality_reports.append(convert_numpy_types(report3))
         
@@ -133,7 +148,12 @@ def main_transform_pipeline():
         print("\n" + "="*60)
         print("TRANSFORMATION GTFS (FR, CH, DE)")
         print("="*60)
-        reports_gtfs = transform_all_gtfs(str(RAW_DIR), str(PROCESSED_DIR))
+        with etape("transform.gtfs") as mesure:
+            reports_gtfs = transform_all_gtfs(str(RAW_DIR), str(PROCESSED_DIR))
+            mesure.fichiers(
+                entree=[RAW_DIR / f"gtfs_{pays}" for pays in ("fr", "ch", "de")],
+                sortie=[PROCESSED_DIR / "gtfs"],
+            )
         if reports_gtfs:
             quality_reports.extend([convert_numpy_types(r) for r in reports_gtfs if r])
         
@@ -141,10 +161,12 @@ def main_transform_pipeline():
         print("\n" + "="*60)
         print("ENRICHISSEMENT ET PRÉPARATION DATA WAREHOUSE")
         print("="*60)
-        traceability_report = enrich_and_prepare_for_warehouse(
-            str(PROCESSED_DIR), 
-            str(WAREHOUSE_DIR)
-        )
+        with etape("transform.enrichment") as mesure:
+            traceability_report = enrich_and_prepare_for_warehouse(
+                str(PROCESSED_DIR), 
+                str(WAREHOUSE_DIR)
+            )
+            mesure.fichiers(entree=[PROCESSED_DIR], sortie=[WAREHOUSE_DIR])
         
         # Convertir le rapport de traçabilité
         traceability_report = convert_numpy_types(traceability_report) if traceability_report else {}
@@ -0,0 +1,241 @@
+# ia/src/ml/backtest.py
+#
+# Backtest temporel ("expanding window" par année) des modèles entraînés.
+#
+# Le split de prepare_*_data ne donne qu'un seul jeu de test (les dernières
+# années). Ici, pour chaque année de coupure T :
+#   - entraînement sur toutes les années < T (fenêtre croissante),
+#   - test séparé sur chaque année T + h - 1, h = 1..MAX_HORIZON,
+# et les métriques sont agrégées par horizon h (1 = année suivant la dernière
+# année d'entraînement).
+#
+# Coût : les preprocesseurs et matrices de chaque fold sont calculés une
+# seule fois par dataset et stockés dans le stockage de features (.npy en
+# memory-map) ; chaque modèle ne fait ensuite qu'un fit par fold, et les
+# couples (modèle, fold) tournent en parallèle (joblib). Le coût croît avec
+# le nombre d'années et de modèles, pas avec la taille d'une grille.
+#
+# Usage :
+#   python -m ia.src.ml.backtest                     (modèles sauvegardés, deux axes)
+#   python -m ia.src.ml.backtest --axis regression --max-horizon 3
+
+import argparse
+import hashlib
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.base import clone
+
+from .config import (
+    CLASSIF_DATASET_PATH, FEATURE_STORE_DIR, MODELS_DIR, REGRESSION_DATASET_PATH, REPORTS_DIR,
+)
+from .models.train_utils import (
+    CLF_CATEGORICAL_FEATURES, CLF_NUMERIC_FEATURES, REG_CATEGORICAL_FEATURES, REG_NUMERIC_FEATURES,
+    _file_sha256, _store_features, build_preprocessor, evaluate_classification,
+    evaluate_regression, load_classification_data, load_regression_data, training_n_jobs,
+)
+
+MIN_TRAIN_YEARS = 5
+MAX_HORIZON = 3
+
+AXES = {
+    "classification": {
+        "suffix": "clf",
+        "dataset": CLASSIF_DATASET_PATH,
+        "load": load_classification_data,
+        "numeric": CLF_NUMERIC_FEATURES,
+        "categorical": CLF_CATEGORICAL_FEATURES,
+        "evaluate": evaluate_classification,
+        "models": ["logistic", "random_forest", "xgboost", "mlp", "xgboost_optimized"],
+    },
+    "regression": {
+        "suffix": "reg",
+        "dataset": REGRESSION_DATASET_PATH,
+        "load": load_regression_data,
+        "numeric": REG_NUMERIC_FEATURES,
+        "categorical": REG_CATEGORICAL_FEATURES,
+        "evaluate": evaluate_regression,
+        "models": ["ridge", "random_forest", "xgboost", "ridge_optimized", "xgboost_optimized"],
+    },
+}
+
+
+def year_folds(years, min_train_years: int = MIN_TRAIN_YEARS, max_horizon: int = MAX_HORIZON) -> list[dict]:
+    """
+    Folds "expanding window" : [{"cutoff": T, "train": masque années < T,
+    "tests": {h: masque année = (dernière année d'entraînement) + h}}].
+    """
+    years = np.asarray(years)
+    unique = sorted(set(years.tolist()))
+    folds = []
+    for i in range(min_train_years, len(unique)):
+        tests = {
+            h: years == unique[i + h - 1]
+            for h in range(1, max_horizon + 1)
+            if i + h - 1 < len(unique)
+        }
+        folds.append({"cutoff": unique[i], "train": years < unique[i], "tests": tests})
+    return folds
+
+
+def cv_splits(years, min_train_years: int = MIN_TRAIN_YEARS) -> list[tuple]:
+    """
+    Folds de year_folds à l'horizon 1, en couples d'indices (entraînement,
+    validation) : argument cv des recherches d'hyperparamètres (GridSearchCV,
+    RandomizedSearchCV, HalvingXGBSearch) sur les matrices du stockage de features.
+    """
+    splits = [
+        (np.flatnonzero(fold["train"]), np.flatnonzero(fold["tests"][1]))
+        for fold in year_folds(years, min_train_years, max_horizon=1)
+    ]
+    if not splits:
+        raise ValueError(f"Moins de {min_train_years + 1} années distinctes : validation temporelle impossible")
+    return splits
+
+
+# ---------------------------------------------------------------------------
+# Matrices des folds (calculées une fois par dataset)
+# ---------------------------------------------------------------------------
+
+def _folds_key(axis: str, min_train_years: int, max_horizon: int) -> str:
+    spec = AXES[axis]
+    payload = json.dumps({
+        "dataset": _file_sha256(spec["dataset"]),
+        "numeric": spec["numeric"], "categorical": spec["categorical"],
+        "min_train_years": min_train_years, "max_horizon": max_horizon,
+        "sklearn": sklearn.__version__,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_folds(axis: str, min_train_years: int = MIN_TRAIN_YEARS, max_horizon: int = MAX_HORIZON):
+    """
+    Prétraite chaque fold (preprocesseur ajusté sur ses seules années
+    d'entraînement) et le met en cache. Retourne (dossier, métadonnées).
+    """
+    spec = AXES[axis]
+    entry_dir = FEATURE_STORE_DIR / f"backtest-{axis}-{_folds_key(axis, min_train_years, max_horizon)}"
+
+    if not (entry_dir / "meta.json").exists():
+        X, y = spec["load"]()
+        y = np.asarray(y)
+        arrays, preprocessors, folds_meta = {}, {}, []
+        for fold in year_folds(X["year"], min_train_years, max_horizon):
+            cutoff = fold["cutoff"]
+            preprocessor = build_preprocessor(spec["numeric"], spec["categorical"])
+            arrays[f"{cutoff}_X_train"] = preprocessor.fit_transform(X[fold["train"]])
+            arrays[f"{cutoff}_y_train"] = y[fold["train"]]
+            for h, mask in fold["tests"].items():
+                arrays[f"{cutoff}_X_h{h}"] = preprocessor.transform(X[mask])
+                arrays[f"{cutoff}_y_h{h}"] = y[mask]
+            preprocessors[cutoff] = preprocessor
+            folds_meta.append({
+                "cutoff": int(cutoff),
+                "horizons": {str(h): int(X["year"][mask].iloc[0]) for h, mask in fold["tests"].items()},
+                "train_rows": int(fold["train"].sum()),
+            })
+        meta = {"axis": f"backtest-{axis}", "min_train_years": min_train_years,
+                "max_horizon": max_horizon, "folds": folds_meta}
+        _store_features(entry_dir, arrays, preprocessors, meta)
+        print(f"✅ Folds {axis} mis en cache : {len(folds_meta)} années de coupure ({entry_dir.name})")
+
+    meta = json.loads((entry_dir / "meta.json").read_text(encoding="utf-8"))
+    return entry_dir, meta
+
+
+def _load(entry_dir, name):
+    return np.load(entry_dir / f"{name}.npy", mmap_mode="r")
+
+
+def _fit_fold(entry_dir, fold: dict, model_name: str, model, evaluate) -> list[dict]:
+    """Un fit par fold, puis une évaluation par horizon (exécuté dans un worker joblib)."""
+    cutoff = fold["cutoff"]
+    model.fit(_load(entry_dir, f"{cutoff}_X_train"), _load(entry_dir, f"{cutoff}_y_train"))
+    rows = []
+    for h, test_year in fold["horizons"].items():
+        y_test = _load(entry_dir, f"{cutoff}_y_h{h}")
+        metrics = evaluate(model, _load(entry_dir, f"{cutoff}_X_h{h}"), y_test)
+        rows.append({
+            "model": model_name, "cutoff": cutoff, "horizon": int(h), "test_year": test_year,
+            "train_rows": fold["train_rows"], "test_rows": len(y_test), **metrics,
+        })
+    return rows
+
+
+def backtest(axis: str, models: dict, min_train_years: int = MIN_TRAIN_YEARS,
+             max_horizon: int = MAX_HORIZON, n_jobs: int = None) -> pd.DataFrame:
+    """
+    Backtest de modèles (nom → estimateur, réentraîné par clone sur chaque
+    fold). Retourne une ligne par (modèle, année de coupure, horizon).
+    """
+    entry_dir, meta = build_folds(axis, min_train_years, max_horizon)
+    n_jobs = training_n_jobs() if n_jobs is None else n_jobs
+    evaluate = AXES[axis]["evaluate"]
+
+    jobs = []
+    for name, model in models.items():
+        for fold in meta["folds"]:
+            estimator = clone(model)
+            # Parallélisme porté par les folds : un thread par modèle
+            if n_jobs != 1 and "n_jobs" in estimator.get_params():
+                estimator.set_params(n_jobs=1)
+            jobs.append(delayed(_fit_fold)(entry_dir, fold, name, estimator, evaluate))
+
+    results = Parallel(n_jobs=n_jobs)(jobs)
+    return pd.DataFrame([row for rows in results for row in rows])
+
+
+def summarize(df: pd.DataFrame) -> pd.DataFrame:
+    """Métriques moyennes par modèle et horizon (+ nombre de folds)."""
+    metric_cols = [c for c in df.columns
+                   if c not in ("model", "cutoff", "horizon", "test_year", "train_rows", "test_rows")]
+    summary = df.groupby(["model", "horizon"], sort=False)[metric_cols].mean()
+    summary["folds"] = df.groupby(["model", "horizon"], sort=False).size()
+    return summary.reset_index()
+
+
+def load_saved_models(axis: str) -> dict:
+    """Modèles sauvegardés par run_training / l'optimiseur (hyperparamètres repris tels quels)."""
+    spec = AXES[axis]
+    models = {}
+    for name in spec["models"]:
+        path = MODELS_DIR / f"{name}_{spec['suffix']}.joblib"
+        if path.exists():
+            models[name] = joblib.load(path)
+    return models
+
+
+def run_axis(axis: str, min_train_years: int = MIN_TRAIN_YEARS, max_horizon: int = MAX_HORIZON):
+    """Backtest des modèles sauvegardés d'un axe ; rapports backtest_<axe>[_folds].csv."""
+    models = load_saved_models(axis)
+    if not models:
+        print(f"⚠️  Aucun modèle {axis} sauvegardé à backtester.")
+        return None
+
+    df = backtest(axis, models, min_train_years, max_horizon)
+    summary = summarize(df)
+    df.to_csv(REPORTS_DIR / f"backtest_{axis}_folds.csv", index=False)
+    summary.to_csv(REPORTS_DIR / f"backtest_{axis}.csv", index=False)
+    print(f"✅ Backtest {axis} : {REPORTS_DIR / f'backtest_{axis}.csv'}")
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ObRail Europe — Backtest temporel par année")
+    parser.add_argument("--axis", choices=list(AXES), default=None)
+    parser.add_argument("--max-horizon", type=int, default=MAX_HORIZON)
+    parser.add_argument("--min-train-years", type=int, default=MIN_TRAIN_YEARS)
+    args = parser.parse_args(argv)
+
+    for axis in ([args.axis] if args.axis else list(AXES)):
+        print(f"\n📊 Backtest temporel — Axe {axis}")
+        run_axis(axis, args.min_train_years, args.max_horizon)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,4 +24,7 @@ CLASSIF_DATASET_PATH       = DATA_ML_DIR / "classification_dataset.csv"
 
 # Preprocesseurs
 PREPROCESSOR_REG_PATH      = DATA_ML_DIR / "preprocessor_regression.joblib"
-PREPROCESSOR_CLF_PATH      = DATA_ML_DIR / "preprocessor_classification.joblib"
\ No newline at end of file
+PREPROCESSOR_CLF_PATH      = DATA_ML_DIR / "preprocessor_classification.joblib"
+
+# Matrices prétraitées partagées entre scripts d'entraînement (train_utils)
+FEATURE_STORE_DIR          = DATA_ML_DIR / "feature_store"
@@ -0,0 +1,223 @@
+# ia/src/ml/fused.py
+#
+# Chemin d'inférence "fusionné" : preprocesseur + modèle sans pandas ni
+# dispatch ColumnTransformer.
+#
+# À l'export, le ColumnTransformer ajusté (StandardScaler + OneHotEncoder)
+# est réduit à trois tableaux NumPy : moyennes, écarts-types et vocabulaire
+# pays → colonne one-hot. Ensuite :
+#   - Ridge / modèles linéaires : le scaler est replié dans les coefficients
+#     (w / σ, b − Σ w·μ/σ) et le one-hot devient un simple décalage par pays ;
+#   - XGBoost : matrice de features construite en NumPy puis
+#     Booster.inplace_predict (pas de DMatrix, pas de wrapper sklearn).
+#
+# Chaque export est vérifié contre le pipeline sklearn d'origine sur un jeu
+# de lignes de contrôle (tous les pays connus + un pays inconnu) ; au-delà de
+# FUSED_TOLERANCE, l'export échoue et predict.py garde le chemin sklearn.
+#
+# Usage CLI (écart max + latence unitaire des deux chemins) :
+#   python -m ia.src.ml.fused --axis regression
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.base import is_classifier
+
+NUMERIC_FEATURES = [
+    "year",
+    "co2_emissions",
+    "co2_per_passenger",
+    "co2_lag1",
+    "passengers_lag1",
+    "passengers_lag2",
+]
+CATEGORICAL_FEATURE = "country_name"
+
+# Écart maximal toléré avec le pipeline sklearn : absolu pour les
+# probabilités, relatif à la valeur prédite pour la régression.
+FUSED_TOLERANCE = 1e-9
+
+
+class FusedExportError(ValueError):
+    """Preprocesseur ou modèle non repliable, ou écart avec sklearn hors tolérance."""
+
+
+class FusedPreprocessor:
+    """Équivalent NumPy du ColumnTransformer (StandardScaler + OneHotEncoder)."""
+
+    def __init__(self, mean, scale, categories):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.categories = list(categories)
+        self.country_index = {c: i for i, c in enumerate(self.categories)}
+        self.n_numeric = len(self.mean)
+        self.n_features = self.n_numeric + len(self.categories)
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor):
+        transformers = {name: (trans, cols) for name, trans, cols in preprocessor.transformers_}
+        if set(transformers) - {"remainder"} != {"num", "cat"}:
+            raise FusedExportError(f"Transformers inattendus : {list(transformers)}")
+        scaler, num_cols = transformers["num"]
+        encoder, cat_cols = transformers["cat"]
+        if list(num_cols) != NUMERIC_FEATURES or list(cat_cols) != [CATEGORICAL_FEATURE]:
+            raise FusedExportError(f"Colonnes inattendues : {num_cols} / {cat_cols}")
+        if encoder.handle_unknown != "ignore" or encoder.drop is not None:
+            raise FusedExportError("OneHotEncoder non supporté (handle_unknown='ignore', drop=None requis)")
+        if getattr(encoder, "infrequent_categories_", None):
+            raise FusedExportError("OneHotEncoder avec catégories rares non supporté")
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(len(num_cols))
+        scale = scaler.scale_ if scaler.with_std else np.ones(len(num_cols))
+        return cls(mean, scale, encoder.categories_[0])
+
+    def split(self, rows):
+        """Lignes (dicts predict_batch) → matrice numérique brute + index pays (-1 si inconnu)."""
+        numeric = np.array([[row[f] for f in NUMERIC_FEATURES] for row in rows], dtype=np.float64)
+        countries = np.array([self.country_index.get(row["country"], -1) for row in rows], dtype=np.intp)
+        return numeric, countries
+
+    def transform(self, rows) -> np.ndarray:
+        numeric, countries = self.split(rows)
+        X = np.zeros((len(rows), self.n_features), dtype=np.float64)
+        X[:, :self.n_numeric] = (numeric - self.mean) / self.scale
+        known = countries >= 0
+        X[np.nonzero(known)[0], self.n_numeric + countries[known]] = 1.0
+        return X
+
+
+class FusedLinear:
+    """Modèle linéaire avec scaler replié dans les coefficients."""
+
+    kind = "linear"
+
+    def __init__(self, prep: FusedPreprocessor, model):
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        if coef.shape[0] != prep.n_features:
+            raise FusedExportError(f"{coef.shape[0]} coefficients pour {prep.n_features} features")
+        w_num = coef[:prep.n_numeric]
+        self.prep = prep
+        self.coef = w_num / prep.scale
+        self.intercept = float(np.ravel(model.intercept_)[0]) - float(np.dot(w_num, prep.mean / prep.scale))
+        # Pays inconnu (handle_unknown="ignore") : décalage nul
+        self.country_offset = np.append(coef[prep.n_numeric:], 0.0)
+
+    def predict(self, rows) -> np.ndarray:
+        numeric, countries = self.prep.split(rows)
+        return numeric @ self.coef + self.intercept + self.country_offset[countries]
+
+
+class FusedXGBClassifier:
+    """Features NumPy + Booster.inplace_predict (classification binaire)."""
+
+    kind = "xgboost"
+
+    def __init__(self, prep: FusedPreprocessor, model):
+        if getattr(model, "n_classes_", 2) != 2:
+            raise FusedExportError("Seule la classification binaire est supportée")
+        self.prep = prep
+        self.booster = model.get_booster()
+        try:
+            self.iteration_range = (0, model.best_iteration + 1)
+        except AttributeError:
+            self.iteration_range = (0, 0)
+
+    def predict_proba(self, rows) -> np.ndarray:
+        """Probabilité de la classe 1 pour chaque ligne."""
+        X = self.prep.transform(rows)
+        return np.asarray(
+            self.booster.inplace_predict(X, iteration_range=self.iteration_range), dtype=np.float64
+        ).ravel()
+
+    def predict(self, rows) -> np.ndarray:
+        return (self.predict_proba(rows) > 0.5).astype(int)
+
+
+def _probe_rows(prep: FusedPreprocessor, n_per_country: int = 3, seed: int = 0) -> list[dict]:
+    """Lignes de contrôle : chaque pays connu + un inconnu, valeurs autour de la distribution d'entraînement."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for country in prep.categories + ["__pays_inconnu__"]:
+        values = prep.mean + rng.normal(0, 1.5, size=(n_per_country, prep.n_numeric)) * prep.scale
+        for v in values:
+            row = dict(zip(NUMERIC_FEATURES, (float(x) for x in v)))
+            row["year"] = int(round(row["year"]))
+            row["country"] = country
+            rows.append(row)
+    return rows
+
+
+def _sklearn_outputs(model, preprocessor, rows, proba: bool) -> np.ndarray:
+    df = pd.DataFrame(rows).rename(columns={"country": CATEGORICAL_FEATURE})
+    X = preprocessor.transform(df[NUMERIC_FEATURES + [CATEGORICAL_FEATURE]])
+    return model.predict_proba(X)[:, 1] if proba else np.asarray(model.predict(X), dtype=np.float64)
+
+
+def max_deviation(fused, model, preprocessor, rows=None) -> float:
+    """Écart max (absolu en classification, relatif en régression) avec le pipeline sklearn."""
+    rows = rows if rows is not None else _probe_rows(fused.prep)
+    if fused.kind == "xgboost":
+        expected = _sklearn_outputs(model, preprocessor, rows, proba=True)
+        return float(np.max(np.abs(fused.predict_proba(rows) - expected)))
+    expected = _sklearn_outputs(model, preprocessor, rows, proba=False)
+    return float(np.max(np.abs(fused.predict(rows) - expected) / np.maximum(1.0, np.abs(expected))))
+
+
+def export_fused(model, preprocessor, tolerance: float = FUSED_TOLERANCE):
+    """
+    Replie preprocesseur + modèle en un prédicteur NumPy, vérifié contre sklearn.
+    Lève FusedExportError si le couple n'est pas supporté ou hors tolérance.
+    """
+    prep = FusedPreprocessor.from_column_transformer(preprocessor)
+    if hasattr(model, "get_booster"):
+        if not is_classifier(model):
+            # XGBRegressor : pas de seuil 0.5 ni de predict_proba, non replié
+            raise FusedExportError(f"XGBoost non classifieur non supporté : {type(model).__name__}")
+        fused = FusedXGBClassifier(prep, model)
+    elif hasattr(model, "coef_") and hasattr(model, "intercept_") and not hasattr(model, "predict_proba"):
+        fused = FusedLinear(prep, model)
+    else:
+        raise FusedExportError(f"Modèle non supporté : {type(model).__name__}")
+
+    deviation = max_deviation(fused, model, preprocessor)
+    if deviation > tolerance:
+        raise FusedExportError(f"Écart avec sklearn {deviation:.3e} > {tolerance:.0e}")
+    fused.deviation = deviation
+    return fused
+
+
+# ---------------------------------------------------------------------------
+# Interface CLI
+# ---------------------------------------------------------------------------
+
+def _latency_us(fn, rounds=2000) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    from .predict import load_model
+
+    parser = argparse.ArgumentParser(description="ObRail Europe — Export et vérification du chemin fusionné")
+    parser.add_argument("--axis", choices=["classification", "regression"], required=True)
+    args = parser.parse_args()
+
+    loaded = load_model(args.axis)
+    fused = export_fused(loaded.model, loaded.preprocessor)
+    row = _probe_rows(fused.prep, n_per_country=1)[0]
+    proba = fused.kind == "xgboost"
+
+    sklearn_us = _latency_us(lambda: _sklearn_outputs(loaded.model, loaded.preprocessor, [row], proba), rounds=200)
+    fused_us = _latency_us(lambda: fused.predict_proba([row]) if proba else fused.predict([row]))
+
+    print(f"[{args.axis.upper()}] {loaded.version} ({fused.kind})")
+    print(f"  Écart max vs sklearn : {fused.deviation:.3e}")
+    print(f"  Latence unitaire     : sklearn {sklearn_us:,.0f} µs → fusionné {fused_us:,.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
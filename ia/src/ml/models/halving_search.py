@@ -0,0 +1,288 @@
+# ia/src/ml/models/halving_search.py
+#
+# Recherche d'hyperparamètres XGBoost par "successive halving" (même principe
+# que HalvingRandomSearchCV), la ressource étant le nombre d'arbres :
+#
+#   rung 0 : n candidats tirés au hasard, budget min_resource arbres
+#   rung i : seul le meilleur 1/factor est conservé, budget × factor
+#            (plafonné à max_resource)
+#
+# Chaque évaluation (candidat × fold × budget) s'arrête dès que la métrique
+# native XGBoost ne s'améliore plus (early_stopping_rounds) : un candidat
+# médiocre coûte quelques dizaines d'arbres au lieu de n_estimators. L'arrêt
+# est décidé sur une part (EARLY_STOPPING_FRACTION) retenue dans le fold
+# d'entraînement, jamais sur le fold de validation : le score du fold n'est
+# pas biaisé par le choix du nombre d'arbres.
+#
+# Les résultats par fold sont ajoutés au fil de l'eau dans un fichier JSONL
+# (SEARCH_CACHE_DIR) dont le nom dépend des données et de la configuration :
+# une recherche interrompue reprend là où elle s'était arrêtée, et relancer la
+# même recherche sur les mêmes données ne réentraîne rien.
+
+import hashlib
+import json
+
+import numpy as np
+import xgboost as xgb
+from joblib import Parallel, delayed
+from sklearn.metrics import f1_score, r2_score
+from sklearn.model_selection import KFold, ParameterSampler, StratifiedKFold, train_test_split
+
+from ..config import MODELS_DIR
+
+SEARCH_CACHE_DIR = MODELS_DIR / "search_cache"
+
+EARLY_STOPPING_ROUNDS = 20
+# Part du fold d'entraînement réservée à l'early stopping
+EARLY_STOPPING_FRACTION = 0.2
+
+
+def _data_digest(X, y) -> str:
+    digest = hashlib.sha256()
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def _params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, default=float)
+
+
+class HalvingXGBSearch:
+    """
+    Successive halving sur XGBClassifier / XGBRegressor avec early stopping.
+
+    task        : "classification" (score F1, early stopping sur logloss)
+                  ou "regression" (score R², early stopping sur rmse)
+    base_params : paramètres fixes du modèle (random_state, scale_pos_weight...)
+    cv          : nombre de folds (KFold / StratifiedKFold mélangés) ou liste
+                  de couples d'indices (entraînement, validation), par exemple
+                  les folds temporels de backtest.cv_splits
+    n_jobs      : évaluations (candidat, fold) menées en parallèle ; chaque
+                  modèle XGBoost est alors limité à un thread
+    """
+
+    def __init__(self, task, param_distributions, base_params=None, n_candidates=81,
+                 factor=3, min_resource=10, max_resource=1000, cv=5, random_state=42, n_jobs=1,
+                 cache_name=None, verbose=1):
+        if task not in ("classification", "regression"):
+            raise ValueError(f"Tâche inconnue : {task}")
+        self.task = task
+        self.param_distributions = param_distributions
+        self.base_params = dict(base_params or {})
+        self.n_candidates = n_candidates
+        self.factor = factor
+        self.min_resource = min_resource
+        self.max_resource = max_resource
+        self.cv = cv
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.cache_name = cache_name
+        self.verbose = verbose
+
+    # ------------------------------------------------------------------
+    # Planification
+    # ------------------------------------------------------------------
+
+    def rungs(self) -> list[tuple[int, int]]:
+        """[(nombre de candidats, budget d'arbres)] de chaque rung."""
+        # On s'arrête au dernier rung qui garde encore au moins `factor` candidats
+        n_rungs = 1
+        while self.n_candidates // self.factor ** n_rungs >= self.factor:
+            n_rungs += 1
+        return [
+            (self.n_candidates // self.factor ** i, min(self.min_resource * self.factor ** i, self.max_resource))
+            for i in range(n_rungs)
+        ]
+
+    def _folds(self, X, y):
+        if not isinstance(self.cv, int):
+            return [(np.asarray(train_idx), np.asarray(val_idx)) for train_idx, val_idx in self.cv]
+        splitter_cls = StratifiedKFold if self.task == "classification" else KFold
+        splitter = splitter_cls(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        return list(splitter.split(X, y))
+
+    def _early_stopping_split(self, train_idx, y):
+        """(indices d'ajustement, indices d'early stopping) pris dans le fold d'entraînement."""
+        stratify = y[train_idx] if self.task == "classification" else None
+        return train_test_split(
+            train_idx, test_size=EARLY_STOPPING_FRACTION, stratify=stratify, random_state=self.random_state
+        )
+
+    def _fold_matrices(self, X, y, train_idx, val_idx):
+        fit_idx, stop_idx = self._early_stopping_split(train_idx, y)
+        return (
+            xgb.DMatrix(X[fit_idx], label=y[fit_idx]),
+            xgb.DMatrix(X[stop_idx], label=y[stop_idx]),
+            xgb.DMatrix(X[val_idx], label=y[val_idx]),
+            y[val_idx],
+        )
+
+    def _model(self, params: dict, n_estimators: int, n_threads: int):
+        cls = xgb.XGBClassifier if self.task == "classification" else xgb.XGBRegressor
+        eval_metric = "logloss" if self.task == "classification" else "rmse"
+        return cls(**{
+            **self.base_params, **params,
+            "n_estimators": n_estimators,
+            "eval_metric": eval_metric,
+            "n_jobs": n_threads,
+        })
+
+    def _booster_params(self, params: dict, n_threads) -> dict:
+        """Paramètres xgb.train équivalents au wrapper sklearn (_model)."""
+        merged = {**self.base_params, **params}
+        merged.pop("n_jobs", None)
+        merged["seed"] = merged.pop("random_state", 0)
+        merged["objective"] = "binary:logistic" if self.task == "classification" else "reg:squarederror"
+        merged["eval_metric"] = "logloss" if self.task == "classification" else "rmse"
+        if n_threads is not None:
+            merged["nthread"] = n_threads
+        return merged
+
+    def _score(self, y_true, raw_pred) -> float:
+        if self.task == "classification":
+            return float(f1_score(y_true, raw_pred > 0.5, zero_division=0))
+        return float(r2_score(y_true, raw_pred))
+
+    # ------------------------------------------------------------------
+    # Cache des folds
+    # ------------------------------------------------------------------
+
+    def _cache_path(self, X, y, folds):
+        folds_digest = hashlib.sha256()
+        for train_idx, val_idx in folds:
+            folds_digest.update(np.ascontiguousarray(train_idx, dtype=np.int64).tobytes() + b"|")
+            folds_digest.update(np.ascontiguousarray(val_idx, dtype=np.int64).tobytes() + b";")
+        config = {
+            "task": self.task, "base": self.base_params,
+            "space": {k: repr(v) for k, v in self.param_distributions.items()},
+            "n": self.n_candidates, "factor": self.factor,
+            "min": self.min_resource, "max": self.max_resource,
+            "folds": folds_digest.hexdigest(), "seed": self.random_state,
+            "es": EARLY_STOPPING_ROUNDS, "es_fraction": EARLY_STOPPING_FRACTION,
+            "xgboost": xgb.__version__,
+        }
+        digest = hashlib.sha256(
+            (_data_digest(X, y) + json.dumps(config, sort_keys=True, default=str)).encode()
+        ).hexdigest()[:16]
+        return SEARCH_CACHE_DIR / f"{self.cache_name or self.task}-{digest}.jsonl"
+
+    @staticmethod
+    def _read_cache(path) -> dict:
+        results = {}
+        if not path.exists():
+            return results
+        content = path.read_bytes()
+        complete = content[:content.rfind(b"\n") + 1]
+        if len(complete) != len(content):
+            # Dernière ligne tronquée par une interruption : retirée pour que
+            # les prochains ajouts commencent sur une ligne propre
+            with open(path, "r+b") as f:
+                f.truncate(len(complete))
+        for line in complete.decode("utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            results[(entry["params"], entry["resource"], entry["fold"])] = entry
+        return results
+
+    # ------------------------------------------------------------------
+    # Évaluation
+    # ------------------------------------------------------------------
+
+    def _evaluate(self, params: dict, resource: int, fold: int, dtrain, dstop, dval, y_val, n_threads) -> dict:
+        """
+        API native xgb.train sur des DMatrix construites une fois par fold :
+        on évite la reconstruction des matrices à chaque essai du wrapper
+        sklearn, qui domine le coût sur un dataset de cette taille.
+        """
+        booster = xgb.train(
+            self._booster_params(params, n_threads), dtrain,
+            num_boost_round=resource,
+            evals=[(dstop, "early_stopping")],
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+            verbose_eval=False,
+        )
+        best_iteration = int(booster.best_iteration)
+        raw_pred = booster.predict(dval, iteration_range=(0, best_iteration + 1))
+        return {
+            "params": _params_key(params),
+            "resource": resource,
+            "fold": fold,
+            "score": self._score(y_val, raw_pred),
+            "best_iteration": best_iteration,
+        }
+
+    def fit(self, X, y):
+        X = np.asarray(X)
+        y = np.asarray(y)
+        candidates = list(ParameterSampler(
+            self.param_distributions, n_iter=self.n_candidates, random_state=self.random_state
+        ))
+        splits = self._folds(X, y)
+        folds = [self._fold_matrices(X, y, train_idx, val_idx) for train_idx, val_idx in splits]
+        cache_path = self._cache_path(X, y, splits)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cached = self._read_cache(cache_path)
+        n_threads = 1 if self.n_jobs != 1 else self.base_params.get("n_jobs", None)
+
+        self.history_ = []
+        self.n_fits_ = 0
+        self.n_cached_ = 0
+
+        survivors = candidates
+        for rung, (n_keep, resource) in enumerate(self.rungs()):
+            survivors = survivors[:n_keep]
+            todo = [
+                (params, fold, matrices)
+                for params in survivors
+                for fold, matrices in enumerate(folds)
+                if (_params_key(params), resource, fold) not in cached
+            ]
+            self.n_cached_ += len(survivors) * len(folds) - len(todo)
+
+            # Chaque résultat est écrit dès sa fin : une interruption ne perd
+            # que les évaluations en cours. Threads : XGBoost libère le GIL et
+            # les DMatrix sont partagées sans sérialisation.
+            with open(cache_path, "a", encoding="utf-8") as cache_file:
+                results = Parallel(n_jobs=self.n_jobs, backend="threading", return_as="generator")(
+                    delayed(self._evaluate)(params, resource, fold, *matrices, n_threads)
+                    for params, fold, matrices in todo
+                )
+                for entry in results:
+                    cached[(entry["params"], entry["resource"], entry["fold"])] = entry
+                    cache_file.write(json.dumps(entry) + "\n")
+                    cache_file.flush()
+                    self.n_fits_ += 1
+
+            scored = []
+            for params in survivors:
+                entries = [cached[(_params_key(params), resource, fold)] for fold in range(len(folds))]
+                score = float(np.mean([e["score"] for e in entries]))
+                best_iteration = int(np.mean([e["best_iteration"] for e in entries]))
+                scored.append((score, best_iteration, params))
+                self.history_.append({
+                    "rung": rung, "resource": resource, "params": params,
+                    "score": score, "best_iteration": best_iteration,
+                })
+            scored.sort(key=lambda s: s[0], reverse=True)
+            survivors = [params for _, _, params in scored]
+
+            if self.verbose:
+                print(f"   Rung {rung} : {len(scored)} candidats × {len(folds)} folds, "
+                      f"≤ {resource} arbres → meilleur score {scored[0][0]:.4f}")
+
+        self.best_score_, best_iteration, self.best_params_ = scored[0]
+        self.best_n_estimators_ = best_iteration + 1
+
+        # Réentraînement sur tout le jeu d'entraînement au nombre d'arbres
+        # retenu par l'early stopping (moyenne des folds)
+        self.best_estimator_ = self._model(
+            self.best_params_, self.best_n_estimators_, self.base_params.get("n_jobs", None)
+        )
+        self.best_estimator_.fit(X, y, verbose=False)
+        self.cache_path_ = cache_path
+        return self
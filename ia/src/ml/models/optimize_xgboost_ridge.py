@@ -8,20 +8,63 @@
 # Ridge (sklearn.linear_model.Ridge) n'accepte pas ce paramètre — il lève un TypeError
 # dans certaines versions de scikit-learn et est ignoré dans d'autres.
 # Ridge est un solveur déterministe (pas d'aléatoire), random_state n'a pas de sens.
+#
+# Recherche XGBoost : successive halving + early stopping par défaut
+# (halving_search.py, espace de recherche élargi, folds mis en cache pour
+# reprise). SEARCH_STRATEGY=random rétablit l'ancien RandomizedSearchCV.
+#
+# Validation croisée temporelle : toutes les recherches utilisent les folds
+# "expanding window" du backtest (backtest.cv_splits, horizon 1) sur le jeu
+# d'entraînement, au lieu de KFold mélangés qui font valider sur des années
+# antérieures à celles vues à l'entraînement.
 
 import json
+import os
 from pathlib import Path
+from scipy.stats import loguniform, randint, uniform
 from sklearn.model_selection import RandomizedSearchCV, GridSearchCV
 from sklearn.linear_model import Ridge
 import xgboost as xgb
 
+from ..backtest import cv_splits
+from .halving_search import HalvingXGBSearch
 from .train_utils import (
-    load_classification_data, prepare_classification_data,
-    load_regression_data, prepare_regression_data,
+    load_classification_features, load_regression_features,
     save_model_and_metrics, evaluate_classification, evaluate_regression,
+    training_n_jobs, train_years,
 )
 from ..config import MODELS_DIR
 
+SEARCH_STRATEGY = os.getenv("SEARCH_STRATEGY", "halving")
+HALVING_CANDIDATES = int(os.getenv("HALVING_CANDIDATES", "81"))
+HALVING_MIN_TREES = int(os.getenv("HALVING_MIN_TREES", "10"))
+HALVING_MAX_TREES = int(os.getenv("HALVING_MAX_TREES", "1000"))
+
+# Espace élargi pour le successive halving (n_estimators est la ressource,
+# fixée par l'early stopping)
+HALVING_SPACE = {
+    'max_depth': randint(2, 9),
+    'learning_rate': loguniform(0.01, 0.3),
+    'subsample': uniform(0.6, 0.4),
+    'colsample_bytree': uniform(0.5, 0.5),
+    'min_child_weight': loguniform(0.5, 10),
+    'reg_lambda': loguniform(0.1, 10),
+    'gamma': uniform(0, 1),
+}
+
+
+def _halving_search(task, X_train, y_train, cv, space, base_params, cache_name):
+    search = HalvingXGBSearch(
+        task, space, base_params=base_params,
+        n_candidates=HALVING_CANDIDATES,
+        min_resource=HALVING_MIN_TREES, max_resource=HALVING_MAX_TREES,
+        cv=cv, random_state=42, n_jobs=training_n_jobs(), cache_name=cache_name,
+    )
+    search.fit(X_train, y_train)
+    print(f"   {search.n_fits_} entraînements, {search.n_cached_} repris du cache ({search.cache_path_.name})")
+    print(f"   n_estimators retenu (early stopping) : {search.best_n_estimators_}")
+    return search
+
 
 # ==================================================================
 # Optimisation Classification XGBoost (F1)
@@ -30,9 +73,31 @@ from ..config import MODELS_DIR
 def optimize_xgboost_clf():
     print("\n--- Optimisation Classification : XGBoost ---")
 
-    X, y = load_classification_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_classification_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_classification_features()
+    cv = cv_splits(train_years(X_train, preprocessor))
+
+    if SEARCH_STRATEGY == "halving":
+        random_search = _halving_search(
+            "classification", X_train, y_train, cv,
+            {**HALVING_SPACE, 'scale_pos_weight': uniform(1, 1.5)},
+            {'random_state': 42}, "xgboost_clf",
+        )
+    else:
+        random_search = _random_search_clf(X_train, y_train, cv)
+
+    best_model = random_search.best_estimator_
+    print("Meilleurs paramètres :", random_search.best_params_)
+    print(f"Meilleur F1 (CV) : {random_search.best_score_:.4f}")
+
+    metrics = evaluate_classification(best_model, X_test, y_test)
+    print("Métriques sur le jeu de test :")
+    for k, v in metrics.items():
+        print(f"  {k}: {v:.4f}" if v is not None else f"  {k}: N/A")
+
+    save_model_and_metrics(best_model, metrics, "xgboost_optimized", preprocessor=preprocessor, axis="clf")
+
 
+def _random_search_clf(X_train, y_train, cv):
     param_dist = {
         'n_estimators': [50, 100, 200, 300],
         'max_depth': [2, 3, 4, 5],
@@ -48,23 +113,12 @@ def optimize_xgboost_clf():
         param_distributions=param_dist,
         n_iter=30,
         scoring='f1',
-        cv=5,
+        cv=cv,
         verbose=1,
         random_state=42,
         n_jobs=-1
     )
-    random_search.fit(X_train, y_train)
-
-    best_model = random_search.best_estimator_
-    print("Meilleurs paramètres :", random_search.best_params_)
-    print(f"Meilleur F1 (CV) : {random_search.best_score_:.4f}")
-
-    metrics = evaluate_classification(best_model, X_test, y_test)
-    print("Métriques sur le jeu de test :")
-    for k, v in metrics.items():
-        print(f"  {k}: {v:.4f}" if v is not None else f"  {k}: N/A")
-
-    save_model_and_metrics(best_model, metrics, "xgboost_optimized", preprocessor=preprocessor, axis="clf")
+    return random_search.fit(X_train, y_train)
 
 
 # ==================================================================
@@ -74,9 +128,29 @@ def optimize_xgboost_clf():
 def optimize_xgboost_reg():
     print("\n--- Optimisation Régression : XGBoost ---")
 
-    X, y = load_regression_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_regression_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_regression_features()
+    cv = cv_splits(train_years(X_train, preprocessor))
+
+    if SEARCH_STRATEGY == "halving":
+        random_search = _halving_search(
+            "regression", X_train, y_train, cv, HALVING_SPACE, {'random_state': 42}, "xgboost_reg",
+        )
+    else:
+        random_search = _random_search_reg(X_train, y_train, cv)
+
+    best_model = random_search.best_estimator_
+    print("Meilleurs paramètres :", random_search.best_params_)
+    print(f"Meilleur R² (CV) : {random_search.best_score_:.4f}")
+
+    metrics = evaluate_regression(best_model, X_test, y_test)
+    print("Métriques sur le jeu de test :")
+    for k, v in metrics.items():
+        print(f"  {k}: {v:.4f}")
+
+    save_model_and_metrics(best_model, metrics, "xgboost_optimized", preprocessor=preprocessor, axis="reg")
+
 
+def _random_search_reg(X_train, y_train, cv):
     param_dist = {
         'n_estimators': [50, 100, 200, 300],
         'max_depth': [2, 3, 4, 5],
@@ -91,23 +165,12 @@ def optimize_xgboost_reg():
         param_distributions=param_dist,
         n_iter=30,
         scoring='r2',
-        cv=5,
+        cv=cv,
         verbose=1,
         random_state=42,
         n_jobs=-1
     )
-    random_search.fit(X_train, y_train)
-
-    best_model = random_search.best_estimator_
-    print("Meilleurs paramètres :", random_search.best_params_)
-    print(f"Meilleur R² (CV) : {random_search.best_score_:.4f}")
-
-    metrics = evaluate_regression(best_model, X_test, y_test)
-    print("Métriques sur le jeu de test :")
-    for k, v in metrics.items():
-        print(f"  {k}: {v:.4f}")
-
-    save_model_and_metrics(best_model, metrics, "xgboost_optimized", preprocessor=preprocessor, axis="reg")
+    return random_search.fit(X_train, y_train)
 
 
 # ==================================================================
@@ -117,8 +180,8 @@ def optimize_xgboost_reg():
 def optimize_ridge_reg():
     print("\n--- Optimisation Régression : Ridge ---")
 
-    X, y = load_regression_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_regression_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_regression_features()
+    cv = cv_splits(train_years(X_train, preprocessor))
 
     param_grid = {
         'alpha': [0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 50.0, 100.0]
@@ -130,7 +193,7 @@ def optimize_ridge_reg():
         ridge,
         param_grid,
         scoring='r2',
-        cv=5,
+        cv=cv,
         n_jobs=-1
     )
     grid_search.fit(X_train, y_train)
@@ -3,7 +3,7 @@
 
 from sklearn.neural_network import MLPClassifier
 from .train_utils import (
-    load_classification_data, prepare_classification_data,
+    load_classification_features,
     evaluate_classification, save_model_and_metrics
 )
 
@@ -11,8 +11,7 @@ from .train_utils import (
 def train_mlp():
     print("\n--- Classification : MLP (Neural Network) ---")
 
-    X, y = load_classification_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_classification_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_classification_features()
 
     model = MLPClassifier(
         hidden_layer_sizes=(64, 32),
@@ -4,22 +4,21 @@
 
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from .train_utils import (
-    load_classification_data, prepare_classification_data, evaluate_classification,
-    load_regression_data, prepare_regression_data, evaluate_regression,
-    save_model_and_metrics
+    load_classification_features, evaluate_classification,
+    load_regression_features, evaluate_regression,
+    save_model_and_metrics, training_n_jobs
 )
 
 
 def train_random_forest():
     print("\n--- Classification : Random Forest ---")
 
-    X, y = load_classification_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_classification_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_classification_features()
 
     model = RandomForestClassifier(
         n_estimators=100,
         random_state=42,
-        n_jobs=-1,
+        n_jobs=training_n_jobs(),
         class_weight="balanced"
     )
     model.fit(X_train, y_train)
@@ -35,13 +34,12 @@ def train_random_forest():
 def train_random_forest_regressor():
     print("\n--- Régression : Random Forest Regressor ---")
 
-    X, y = load_regression_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_regression_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_regression_features()
 
     model = RandomForestRegressor(
         n_estimators=100,
         random_state=42,
-        n_jobs=-1
+        n_jobs=training_n_jobs()
     )
     model.fit(X_train, y_train)
 
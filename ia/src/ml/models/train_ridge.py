@@ -3,7 +3,7 @@
 
 from sklearn.linear_model import Ridge
 from .train_utils import (
-    load_regression_data, prepare_regression_data,
+    load_regression_features,
     evaluate_regression, save_model_and_metrics
 )
 
@@ -11,8 +11,7 @@ from .train_utils import (
 def train_ridge():
     print("\n--- Régression : Ridge ---")
 
-    X, y = load_regression_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_regression_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_regression_features()
 
     model = Ridge(alpha=1.0)
     model.fit(X_train, y_train)
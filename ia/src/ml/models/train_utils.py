@@ -4,12 +4,19 @@
 #   - Régression  : prévision de passengers
 #   - Classification : détection des pays en déclin
 
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 import joblib
 import json
+import sklearn
 
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import cross_val_score
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.metrics import (
@@ -23,8 +30,9 @@ from sklearn.metrics import (
 from ..config import (
     REGRESSION_DATASET_PATH, CLASSIF_DATASET_PATH,
     PREPROCESSOR_REG_PATH, PREPROCESSOR_CLF_PATH,
-    MODELS_DIR
+    MODELS_DIR, FEATURE_STORE_DIR
 )
+from .. import registry
 
 # ------------------------------------------------------------------
 # Features — Régression
@@ -55,6 +63,37 @@ CLF_CATEGORICAL_FEATURES = ["country_name"]
 CLF_TARGET = "en_declin"
 
 
+def training_n_jobs() -> int:
+    """
+    Cœurs alloués au modèle courant : budget fixé par l'orchestrateur
+    (TRAINING_N_JOBS), ou tous les cœurs (-1) en exécution isolée.
+    """
+    return int(os.getenv("TRAINING_N_JOBS", "-1"))
+
+
+def temporal_test_mask(years, test_size=0.20):
+    """
+    Lignes du jeu de test : les dernières années (part test_size des années
+    distinctes, au moins une). Un split aléatoire mélangerait les années et,
+    avec les features de lag, ferait prédire au modèle des années antérieures
+    à celles qu'il a vues.
+    """
+    years = np.asarray(years)
+    unique = np.unique(years)
+    if len(unique) < 2:
+        raise ValueError("Au moins deux années distinctes sont nécessaires au split temporel")
+    n_test = min(len(unique) - 1, max(1, int(round(len(unique) * test_size))))
+    return years >= unique[-n_test]
+
+
+def train_years(X_processed, preprocessor):
+    """Année de chaque ligne d'une matrice prétraitée (StandardScaler de "year" inversé)."""
+    _, scaler, numeric = preprocessor.transformers_[0]
+    col = list(numeric).index("year")
+    years = np.asarray(X_processed[:, col]) * scaler.scale_[col] + scaler.mean_[col]
+    return np.rint(years).astype(int)
+
+
 def build_preprocessor(numeric_features, categorical_features):
     """Pipeline de prétraitement générique."""
     return ColumnTransformer(
@@ -87,10 +126,9 @@ def load_regression_data():
     return X, y
 
 
-def prepare_regression_data(X, y, test_size=0.20, random_state=42):
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state
-    )
+def prepare_regression_data(X, y, test_size=0.20):
+    test = temporal_test_mask(X["year"], test_size)
+    X_train, X_test, y_train, y_test = X[~test], X[test], y[~test], y[test]
     preprocessor = build_preprocessor(REG_NUMERIC_FEATURES, REG_CATEGORICAL_FEATURES)
     X_train_p = preprocessor.fit_transform(X_train)
     X_test_p  = preprocessor.transform(X_test)
@@ -132,13 +170,9 @@ def load_classification_data():
     return X, y
 
 
-def prepare_classification_data(X, y, test_size=0.20, random_state=42):
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y,
-        test_size=test_size,
-        stratify=y,
-        random_state=random_state
-    )
+def prepare_classification_data(X, y, test_size=0.20):
+    test = temporal_test_mask(X["year"], test_size)
+    X_train, X_test, y_train, y_test = X[~test], X[test], y[~test], y[test]
     preprocessor = build_preprocessor(CLF_NUMERIC_FEATURES, CLF_CATEGORICAL_FEATURES)
     X_train_p = preprocessor.fit_transform(X_train)
     X_test_p  = preprocessor.transform(X_test)
@@ -154,7 +188,8 @@ def evaluate_classification(model, X_test, y_test):
         "recall":    float(recall_score(y_test, y_pred, zero_division=0)),
         "f1":        float(f1_score(y_test, y_pred, zero_division=0)),
     }
-    if hasattr(model, "predict_proba"):
+    # ROC-AUC indéfinie si le jeu de test ne contient qu'une classe (petits folds du backtest)
+    if hasattr(model, "predict_proba") and len(np.unique(y_test)) > 1:
         y_proba = model.predict_proba(X_test)[:, 1]
         metrics["roc_auc"] = float(roc_auc_score(y_test, y_proba))
     else:
@@ -162,10 +197,142 @@ def evaluate_classification(model, X_test, y_test):
     return metrics
 
 
+# ==================================================================
+# STOCKAGE DES FEATURES
+# ==================================================================
+#
+# Chaque script d'entraînement rechargeait le CSV, refaisait le split et
+# réajustait le ColumnTransformer sur les mêmes données. Les matrices
+# prétraitées sont désormais calculées une fois par axe et stockées en .npy :
+#
+#   FEATURE_STORE_DIR/<axe>-<clé>/
+#       X_train.npy  X_test.npy  y_train.npy  y_test.npy
+#       preprocessor.joblib  meta.json
+#
+# Clé = hash du dataset CSV + paramètres du split (temporel, test_size) + liste
+# des features + version de scikit-learn. Les .npy sont ouverts en
+# memory-map (lecture seule) : les processus de l'orchestrateur partagent
+# les mêmes pages sans copie.
+
+FEATURE_ARRAYS = ("X_train", "X_test", "y_train", "y_test")
+
+
+def _file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def feature_key(dataset_path, numeric_features, categorical_features, test_size) -> str:
+    """Clé du stockage : change dès que les données, le split ou les features changent."""
+    payload = json.dumps({
+        "dataset": _file_sha256(dataset_path),
+        "numeric": list(numeric_features),
+        "categorical": list(categorical_features),
+        "split": "temporal",
+        "test_size": test_size,
+        "sklearn": sklearn.__version__,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _store_features(entry_dir, arrays: dict, preprocessor, meta: dict):
+    """
+    Écrit une entrée dans un dossier temporaire puis le renomme (atomique) :
+    un autre processus ne voit jamais d'entrée partielle. Si une entrée
+    identique a été publiée entre-temps, la nôtre est simplement abandonnée.
+    """
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=entry_dir.parent, prefix=f".{entry_dir.name}."))
+    try:
+        for name, array in arrays.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+        joblib.dump(preprocessor, staging / "preprocessor.joblib")
+        (staging / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        os.rename(staging, entry_dir)
+    except OSError:
+        if not entry_dir.exists():
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    # Autres entrées du même axe (dataset ou split précédent) : une seule conservée
+    for old in entry_dir.parent.glob(f"{meta['axis']}-*"):
+        if old != entry_dir:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _load_features(entry_dir):
+    arrays = [np.load(entry_dir / f"{name}.npy", mmap_mode="r") for name in FEATURE_ARRAYS]
+    preprocessor = joblib.load(entry_dir / "preprocessor.joblib")
+    return (*arrays, preprocessor)
+
+
+def _cached_features(axis, dataset_path, numeric_features, categorical_features,
+                     load_fn, prepare_fn, test_size):
+    key = feature_key(dataset_path, numeric_features, categorical_features, test_size)
+    entry_dir = FEATURE_STORE_DIR / f"{axis}-{key}"
+
+    if not (entry_dir / "meta.json").exists():
+        X, y = load_fn()
+        X_train, X_test, y_train, y_test, preprocessor = prepare_fn(X, y, test_size=test_size)
+        arrays = {
+            "X_train": X_train, "X_test": X_test,
+            "y_train": np.asarray(y_train), "y_test": np.asarray(y_test),
+        }
+        meta = {"axis": axis, "key": key, "dataset": str(dataset_path),
+                "split": "temporal", "test_size": test_size,
+                "shapes": {name: list(a.shape) for name, a in arrays.items()}}
+        _store_features(entry_dir, arrays, preprocessor, meta)
+        print(f"✅ Features {axis} mises en cache : {entry_dir}")
+    else:
+        print(f"   [{axis}] Features lues depuis le cache : {entry_dir.name}")
+
+    return _load_features(entry_dir)
+
+
+def load_regression_features(test_size=0.20):
+    """
+    (X_train, X_test, y_train, y_test, preprocessor) de l'axe régression,
+    identiques à load_regression_data + prepare_regression_data, mais calculés
+    une seule fois par dataset (matrices en memory-map, lecture seule).
+    """
+    return _cached_features(
+        "regression", REGRESSION_DATASET_PATH, REG_NUMERIC_FEATURES, REG_CATEGORICAL_FEATURES,
+        load_regression_data, prepare_regression_data, test_size,
+    )
+
+
+def load_classification_features(test_size=0.20):
+    """Équivalent de load_regression_features pour l'axe classification."""
+    return _cached_features(
+        "classification", CLASSIF_DATASET_PATH, CLF_NUMERIC_FEATURES, CLF_CATEGORICAL_FEATURES,
+        load_classification_data, prepare_classification_data, test_size,
+    )
+
+
 # ==================================================================
 # SAUVEGARDE / CHARGEMENT
 # ==================================================================
 
+def _dump_atomic(obj, path):
+    """
+    joblib.dump via un temporaire du même dossier puis os.replace : les modèles
+    d'un même axe, entraînés en parallèle, peuvent écrire le preprocesseur
+    partagé en même temps sans qu'un lecteur voie un fichier tronqué.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    os.close(fd)
+    try:
+        joblib.dump(obj, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
 def save_model_and_metrics(model, metrics, model_name, preprocessor=None, axis="clf"):
     model_path   = MODELS_DIR / f"{model_name}_{axis}.joblib"
     metrics_path = MODELS_DIR / f"{model_name}_{axis}_metrics.json"
@@ -185,11 +352,25 @@ def save_model_and_metrics(model, metrics, model_name, preprocessor=None, axis="
     if preprocessor is not None:
         prep_path = PREPROCESSOR_CLF_PATH if axis == "clf" else PREPROCESSOR_REG_PATH
         if not prep_path.exists():
-            joblib.dump(preprocessor, prep_path)
+            _dump_atomic(preprocessor, prep_path)
             print(f"✅ Preprocesseur sauvegardé : {prep_path}")
         else:
             print(f"ℹ️  Preprocesseur déjà présent, non écrasé : {prep_path}")
 
+    # Modèles servis par l'API : publication d'une version immuable dans le
+    # registre (avec le preprocesseur ajusté en même temps que le modèle).
+    # L'API bascule dessus à chaud via le pointeur "current".
+    registry_axis = registry.AXIS_SUFFIXES.get(axis)
+    if registry_axis and model_name in registry.SERVED_MODELS[registry_axis]:
+        prep_path = PREPROCESSOR_CLF_PATH if axis == "clf" else PREPROCESSOR_REG_PATH
+        version = registry.publish(
+            registry_axis, model,
+            preprocessor if preprocessor is not None else prep_path,
+            model_name, metrics=metrics,
+        )
+        print(f"✅ Version publiée dans le registre : {registry_axis}/{version} "
+              f"(servie : {registry.current_version(registry_axis)})")
+
 
 def load_model_and_metrics(model_name, axis="clf"):
     model_path   = MODELS_DIR / f"{model_name}_{axis}.joblib"
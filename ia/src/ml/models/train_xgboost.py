@@ -2,20 +2,21 @@
 # Axe Classification — XGBoost Classifier
 # Axe Régression    — XGBoost Regressor
 
+import numpy as np
 import xgboost as xgb
 from .train_utils import (
-    load_classification_data, prepare_classification_data, evaluate_classification,
-    load_regression_data, prepare_regression_data, evaluate_regression,
-    save_model_and_metrics
+    load_classification_features, evaluate_classification,
+    load_regression_features, evaluate_regression,
+    save_model_and_metrics, training_n_jobs
 )
 
 
 def train_xgboost():
     print("\n--- Classification : XGBoost ---")
 
-    X, y = load_classification_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_classification_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_classification_features()
 
+    y = np.concatenate([y_train, y_test])
     n_neg = (y == 0).sum()
     n_pos = (y == 1).sum()
     scale = float(n_neg / n_pos) if n_pos > 0 else 1.0
@@ -26,7 +27,8 @@ def train_xgboost():
         max_depth=4,
         random_state=42,
         eval_metric="logloss",
-        scale_pos_weight=scale
+        scale_pos_weight=scale,
+        n_jobs=training_n_jobs()
     )
     model.fit(X_train, y_train)
 
@@ -41,15 +43,15 @@ def train_xgboost():
 def train_xgboost_regressor():
     print("\n--- Régression : XGBoost Regressor ---")
 
-    X, y = load_regression_data()
-    X_train, X_test, y_train, y_test, preprocessor = prepare_regression_data(X, y)
+    X_train, X_test, y_train, y_test, preprocessor = load_regression_features()
 
     model = xgb.XGBRegressor(
         n_estimators=100,
         learning_rate=0.1,
         max_depth=4,
         random_state=42,
-        eval_metric="rmse"
+        eval_metric="rmse",
+        n_jobs=training_n_jobs()
     )
     model.fit(X_train, y_train)
 
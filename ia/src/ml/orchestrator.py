@@ -0,0 +1,170 @@
+# ia/src/ml/orchestrator.py
+#
+# Orchestrateur d'entraînement parallèle (utilisé par run_training.py).
+#
+# Chaque modèle candidat est une TrainingTask avec un budget de cœurs. Les
+# tâches tournent dans des processus séparés (un processus neuf par tâche,
+# contexte "spawn") et l'ordonnanceur n'en démarre une que si la somme des
+# budgets en cours reste ≤ TRAINING_CPUS : processus × n_jobs ne dépasse
+# jamais la machine.
+#
+# Le budget est posé dans l'environnement du parent juste le temps de
+# Process.start() : le fils "spawn" en hérite dès son démarrage, avant qu'il
+# ne réimporte ce module (et donc pandas / numpy et leur BLAS) :
+#   - TRAINING_N_JOBS            → n_jobs des modèles (train_utils.training_n_jobs)
+#   - OMP / OpenBLAS / MKL       → threads natifs (XGBoost, BLAS de l'MLP / logistic)
+#
+# Un échec (exception ou crash du processus) n'affecte que sa tâche. La sortie
+# de chaque tâche est capturée puis affichée d'un bloc à sa fin, et un rapport
+# de durées est écrit dans REPORTS_DIR/training_timings.csv.
+
+import importlib
+import io
+import multiprocessing as mp
+import os
+import time
+import traceback
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+
+import pandas as pd
+
+from .config import REPORTS_DIR
+
+TRAINING_CPUS = int(os.getenv("TRAINING_CPUS", str(os.cpu_count() or 1)))
+
+TIMINGS_REPORT = "training_timings.csv"
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+BUDGET_ENV_VARS = ("TRAINING_N_JOBS", *THREAD_ENV_VARS)
+
+
+@dataclass(frozen=True)
+class TrainingTask:
+    """Modèle candidat : fonction d'entraînement + budget de cœurs souhaité."""
+    name: str
+    module_path: str
+    func_name: str
+    cores: int = 1
+
+
+@contextmanager
+def _budget_env(cores: int):
+    """Budget de cœurs dans l'environnement du parent, restauré à la sortie."""
+    saved = {var: os.environ.get(var) for var in BUDGET_ENV_VARS}
+    os.environ.update({var: str(cores) for var in BUDGET_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _run_task(task: TrainingTask, conn):
+    """Point d'entrée du processus fils (budget hérité de l'environnement) : entraîne, renvoie le résultat."""
+    output = io.StringIO()
+    result = {"status": "ok", "error": None}
+    start = time.perf_counter()
+    with redirect_stdout(output), redirect_stderr(output):
+        try:
+            module = importlib.import_module(task.module_path, package="ia.src.ml")
+            getattr(module, task.func_name)()
+        except Exception as e:
+            traceback.print_exc()
+            result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+    result["duration_s"] = time.perf_counter() - start
+    result["output"] = output.getvalue()
+    conn.send(result)
+    conn.close()
+
+
+def _budget(task: TrainingTask, total: int) -> int:
+    return max(1, min(task.cores, total))
+
+
+def run_tasks(tasks, total_cores: int = None) -> list[dict]:
+    """
+    Exécute les tâches en parallèle sous budget de cœurs.
+    Les plus gourmandes démarrent en premier ; une tâche ne démarre que si
+    son budget tient dans les cœurs libres. Retourne une ligne de rapport par tâche.
+    """
+    total = max(1, total_cores or TRAINING_CPUS)
+    ctx = mp.get_context("spawn")
+    pending = sorted(tasks, key=lambda t: _budget(t, total), reverse=True)
+    running = {}
+    free = total
+    started_at = time.perf_counter()
+    report = []
+
+    while pending or running:
+        for task in list(pending):
+            cores = _budget(task, total)
+            if cores > free:
+                continue
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(target=_run_task, args=(task, child_conn), name=task.name)
+            with _budget_env(cores):
+                process.start()
+            child_conn.close()
+            running[parent_conn] = (task, cores, process, time.perf_counter())
+            pending.remove(task)
+            free -= cores
+
+        # Attente sur les pipes (résultat ou EOF si le fils meurt) plutôt que
+        # sur les processus : un résultat volumineux ne bloque pas l'envoi.
+        for conn in wait(list(running)):
+            task, cores, process, start = running.pop(conn)
+            free += cores
+            try:
+                result = conn.recv()
+            except EOFError:
+                result = None
+            conn.close()
+            process.join()
+            if result is None:
+                result = {
+                    "status": "failed",
+                    "error": f"processus interrompu (exit code {process.exitcode})",
+                    "duration_s": time.perf_counter() - start,
+                    "output": "",
+                }
+            report.append(_report_row(task, cores, result, start - started_at))
+
+    return report
+
+
+def _report_row(task: TrainingTask, cores: int, result: dict, offset_s: float) -> dict:
+    status = "✅" if result["status"] == "ok" else "❌"
+    print(f"\n{status} [{task.name}] {result['duration_s']:.1f}s ({cores} cœur(s))")
+    if result["output"]:
+        print(result["output"].rstrip())
+    if result["error"]:
+        print(f"   Erreur : {result['error']}")
+    return {
+        "task": task.name,
+        "function": task.func_name,
+        "status": result["status"],
+        "cores": cores,
+        "start_s": round(offset_s, 2),
+        "duration_s": round(result["duration_s"], 2),
+        "error": result["error"],
+    }
+
+
+def save_timings(report: list[dict], wall_s: float, filename: str = TIMINGS_REPORT):
+    """Rapport de durées par modèle (+ ligne de total : durée murale vs somme des tâches)."""
+    df = pd.DataFrame(report)
+    total = {
+        "task": "TOTAL", "function": "", "status": "",
+        "cores": TRAINING_CPUS, "start_s": 0.0,
+        "duration_s": round(wall_s, 2), "error": None,
+    }
+    df = pd.concat([df, pd.DataFrame([total])], ignore_index=True)
+    output_path = REPORTS_DIR / filename
+    df.to_csv(output_path, index=False)
+    print(f"✅ Rapport de durées : {output_path}")
+    return output_path
@@ -3,23 +3,35 @@
 # Script de prédiction ObRail Europe — version améliorée
 #
 # Améliorations vs version initiale :
-#   - Cache LRU des artefacts (modèle + preprocesseur) : évite le rechargement disque
-#     à chaque appel depuis l'API (gain ~200-500ms/requête)
+#   - Modèles gardés en mémoire : évite le rechargement disque à chaque appel
+#     depuis l'API (gain ~200-500ms/requête)
+#   - Registre versionné (registry.py) : rechargement à chaud quand le pointeur
+#     "current" change, sans redémarrer l'API
+#   - Chemin d'inférence fusionné NumPy (fused.py), vérifié contre sklearn au chargement
 #   - Fallback modèle optimisé → modèle de base (comportement initial conservé)
 #   - Logging structuré des prédictions pour traçabilité
 #   - Validation renforcée des features avant transformation
 #   - Messages d'erreur enrichis pour diagnostics
 
 import argparse
+import contextvars
 import json
 import logging
+import os
 import sys
-from functools import lru_cache
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
+from threading import Lock
 
 import joblib
 import pandas as pd
 
+from . import registry
+from .fused import export_fused
+
 ROOT = Path(__file__).resolve().parents[3]
 MODELS_DIR  = ROOT / "ia" / "models"
 DATA_ML_DIR = ROOT / "data" / "ml"
@@ -70,35 +82,196 @@ def _resolve_model_path(axis: str) -> tuple[Path, Path]:
 
 
 # ---------------------------------------------------------------------------
-# Cache des artefacts — chargement unique en mémoire
+# Modèles chargés — rechargement à chaud depuis le registre
 # ---------------------------------------------------------------------------
 
-@lru_cache(maxsize=4)
-def _load_artifacts_cached(model_path_str: str, prep_path_str: str):
+# Intervalle minimal entre deux vérifications du pointeur "current" (secondes)
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "5"))
+# FUSED_INFERENCE=false : toujours passer par le pipeline sklearn (cf. fused.py)
+FUSED_INFERENCE = os.getenv("FUSED_INFERENCE", "true").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """Modèle + preprocesseur d'une version donnée, immuable une fois chargé."""
+    axis: str
+    version: str
+    model_name: str
+    trained_at: str
+    metrics: dict
+    model: object
+    preprocessor: object
+    source_key: tuple
+    fused: object = None
+
+
+_loaded: dict = {}
+_checked_at: dict = {}
+# Dernière source en échec par axe : ni rechargée ni re-signalée tant qu'elle ne change pas
+_failed_keys: dict = {}
+_load_locks = {"classification": Lock(), "regression": Lock()}
+
+# Observateurs des durées d'inférence par étape : fn(axis, stage, seconds)
+# avec stage = "preprocess" | "model" (l'API y branche ses histogrammes)
+_stage_observers: list = []
+# Faux dans le contexte courant pendant muted_stage_observers() (chauffe)
+_observe_enabled = contextvars.ContextVar("observe_enabled", default=True)
+
+
+def _source_key(axis: str) -> tuple:
     """
-    Charge et met en cache le modèle et le preprocesseur.
-    Le cache est indexé par les chemins de fichiers (strings, hashable).
-    Utiliser des strings plutôt que des Path objects (non-hashable par lru_cache).
+    Identifie la source courante d'un axe sans charger le modèle :
+    version du registre si publiée, sinon fichiers historiques + mtime
+    (un .joblib réécrit en place est ainsi détecté).
     """
-    model_path = Path(model_path_str)
-    prep_path  = Path(prep_path_str)
-
-    logger.info(f"Chargement du modèle depuis : {model_path.name}")
+    version = registry.current_version(axis)
+    if version is not None:
+        return ("registry", version)
+    model_path, prep_path = _resolve_model_path(axis)
+    return ("file", str(model_path), model_path.stat().st_mtime_ns,
+            str(prep_path), prep_path.stat().st_mtime_ns)
+
+
+def _load_source(axis: str, key: tuple) -> LoadedModel:
+    """Charge depuis le disque la source identifiée par _source_key."""
+    if key[0] == "registry":
+        version = key[1]
+        version_dir = registry.axis_dir(axis) / version
+        manifest = registry.read_manifest(axis, version)
+        model_path = version_dir / manifest["model"]["file"]
+        prep_path = version_dir / manifest["preprocessor"]["file"]
+        model_name = manifest["model_name"]
+        trained_at = manifest["trained_at"]
+        metrics = manifest.get("metrics", {})
+    else:
+        model_path, prep_path = Path(key[1]), Path(key[3])
+        mtime = datetime.fromtimestamp(key[2] / 1e9, timezone.utc)
+        model_name = model_path.stem.rsplit("_", 1)[0]
+        version = f"{model_path.stem}@{mtime.strftime('%Y%m%dT%H%M%SZ')}"
+        trained_at = mtime.isoformat(timespec="seconds")
+        metrics_path = model_path.with_name(f"{model_path.stem}_metrics.json")
+        metrics = json.loads(metrics_path.read_text()) if metrics_path.exists() else {}
+
+    logger.info(f"Chargement du modèle {axis} : {version}")
     model = joblib.load(model_path)
     preprocessor = joblib.load(prep_path)
-    logger.info(f"Modèle chargé et mis en cache : {model_path.name}")
 
-    return model, preprocessor
+    fused = None
+    if FUSED_INFERENCE:
+        try:
+            fused = export_fused(model, preprocessor)
+            logger.info(f"Chemin fusionné actif pour {axis} ({fused.kind}, écart {fused.deviation:.1e})")
+        except Exception as e:
+            logger.warning(f"Chemin fusionné indisponible pour {axis}, pipeline sklearn conservé : {e}")
+
+    return LoadedModel(
+        axis=axis, version=version, model_name=model_name, trained_at=trained_at,
+        metrics=metrics, model=model, preprocessor=preprocessor, source_key=key, fused=fused,
+    )
 
 
-def load_artifacts(axis: str):
+def refresh(axis: str) -> LoadedModel:
+    """
+    Vérifie la source courante de l'axe et recharge le modèle si elle a changé.
+    Le nouveau modèle est entièrement chargé avant de remplacer l'ancien :
+    les requêtes en cours terminent avec l'ancienne version, aucune n'échoue.
+    Si un autre thread est déjà en train de recharger, l'ancien modèle est servi.
+    Une nouvelle source qui échoue au chargement n'est retentée (et signalée)
+    qu'une fois modifiée.
+    """
+    current = _loaded.get(axis)
+    lock = _load_locks[axis]
+    if not lock.acquire(blocking=current is None):
+        return current
+    try:
+        current = _loaded.get(axis)
+        key = None
+        try:
+            key = _source_key(axis)
+            stale = current is None or current.source_key != key
+            if stale and (current is None or _failed_keys.get(axis) != key):
+                loaded = _load_source(axis, key)
+                _loaded[axis] = loaded
+                _failed_keys.pop(axis, None)
+                if current is not None:
+                    logger.info(f"Modèle {axis} remplacé : {current.version} → {loaded.version}")
+                current = loaded
+        except Exception as e:
+            if current is None:
+                raise
+            failed = key if key is not None else str(e)
+            if _failed_keys.get(axis) != failed:
+                _failed_keys[axis] = failed
+                logger.warning(f"Rechargement du modèle {axis} impossible, version {current.version} conservée : {e}")
+        _checked_at[axis] = time.monotonic()
+        return current
+    finally:
+        lock.release()
+
+
+def load_model(axis: str) -> LoadedModel:
     """
-    Retourne (model, preprocessor) depuis le cache ou depuis le disque.
+    Retourne le modèle servi pour l'axe.
     Premier appel : charge depuis le disque (~300ms).
-    Appels suivants : retourne depuis le cache mémoire (~0ms).
+    Appels suivants : mémoire, avec au plus une vérification du pointeur
+    toutes les MODEL_RELOAD_INTERVAL secondes.
     """
-    model_path, prep_path = _resolve_model_path(axis)
-    return _load_artifacts_cached(str(model_path), str(prep_path))
+    current = _loaded.get(axis)
+    if current is not None and time.monotonic() - _checked_at.get(axis, 0) < MODEL_RELOAD_INTERVAL:
+        return current
+    return refresh(axis)
+
+
+def load_artifacts(axis: str):
+    """Retourne (model, preprocessor) de la version servie pour l'axe."""
+    loaded = load_model(axis)
+    return loaded.model, loaded.preprocessor
+
+
+def loaded_models() -> dict:
+    """Modèles déjà en mémoire par axe, sans déclencher de chargement."""
+    return dict(_loaded)
+
+
+def add_stage_observer(fn):
+    """Enregistre fn(axis, stage, seconds), appelé après chaque étape d'inférence."""
+    if fn not in _stage_observers:
+        _stage_observers.append(fn)
+
+
+@contextmanager
+def muted_stage_observers():
+    """
+    Suspend les observateurs d'étape dans le contexte courant (thread ou
+    tâche) : les prédictions synthétiques de la chauffe ne doivent pas
+    alimenter les histogrammes de latence. Les autres requêtes ne sont pas touchées.
+    """
+    token = _observe_enabled.set(False)
+    try:
+        yield
+    finally:
+        _observe_enabled.reset(token)
+
+
+def _observe_stage(axis: str, stage: str, seconds: float):
+    if not _observe_enabled.get():
+        return
+    for fn in _stage_observers:
+        try:
+            fn(axis, stage, seconds)
+        except Exception as e:
+            logger.debug(f"Observateur d'étape {stage} en erreur : {e}")
+
+
+def model_info(axis: str) -> dict:
+    """Version, nom, date d'entraînement et métriques du modèle servi."""
+    loaded = load_model(axis)
+    return {
+        "version": loaded.version,
+        "model_name": loaded.model_name,
+        "trained_at": loaded.trained_at,
+        "metrics": loaded.metrics,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -116,37 +289,126 @@ EXPECTED_FEATURES = [
 ]
 
 
-def _build_input_df(
-    country: str,
-    year: int,
-    co2_emissions: float,
-    co2_per_passenger: float,
-    co2_lag1: float,
-    passengers_lag1: float,
-    passengers_lag2: float,
-) -> pd.DataFrame:
-    """Construit et valide le DataFrame d'entrée."""
-    row = {
-        "year": year,
-        "co2_emissions": co2_emissions,
-        "co2_per_passenger": co2_per_passenger,
-        "co2_lag1": co2_lag1,
-        "passengers_lag1": passengers_lag1,
-        "passengers_lag2": passengers_lag2,
-        "country_name": country,
-    }
-    df = pd.DataFrame([row])
-    # Vérification de cohérence
-    missing = [f for f in EXPECTED_FEATURES if f not in df.columns]
-    if missing:
-        raise ValueError(f"Features manquantes dans le DataFrame d'entrée : {missing}")
-    return df
+# Clés d'une ligne de predict_batch (mêmes noms que les paramètres de predict)
+BATCH_FIELDS = [
+    "country",
+    "year",
+    "co2_emissions",
+    "co2_per_passenger",
+    "co2_lag1",
+    "passengers_lag1",
+    "passengers_lag2",
+]
+
+
+def _check_rows(rows: list[dict]):
+    """
+    Valide un lot de lignes. Toutes les lignes sont vérifiées avant de
+    lever l'erreur, pour signaler d'un coup l'ensemble des lignes incomplètes.
+    """
+    errors = []
+    for i, row in enumerate(rows):
+        missing = [f for f in BATCH_FIELDS if f not in row]
+        if missing:
+            errors.append(f"ligne {i} : {missing}")
+    if errors:
+        raise ValueError(f"Features manquantes dans le lot d'entrée : {'; '.join(errors)}")
+
+
+def _build_batch_df(rows: list[dict]) -> pd.DataFrame:
+    """Construit le DataFrame d'entrée du preprocesseur sklearn."""
+    df = pd.DataFrame(rows, columns=BATCH_FIELDS).rename(columns={"country": "country_name"})
+    return df[EXPECTED_FEATURES]
+
+
+def _score(loaded: "LoadedModel", axis: str, rows: list[dict]):
+    """
+    Retourne (prédictions, probabilités de la classe 1 ou None).
+    Chemin fusionné NumPy si disponible, sinon pipeline sklearn.
+    Le chemin fusionné replie le preprocessing dans le modèle : tout son
+    temps est compté dans l'étape "model".
+    """
+    if loaded.fused is not None:
+        start = time.perf_counter()
+        if axis == "classification":
+            probas = loaded.fused.predict_proba(rows)
+            preds = (probas > 0.5).astype(int)
+        else:
+            preds, probas = loaded.fused.predict(rows), None
+        _observe_stage(axis, "model", time.perf_counter() - start)
+        return preds, probas
+
+    model, preprocessor = loaded.model, loaded.preprocessor
+    start = time.perf_counter()
+    X = preprocessor.transform(_build_batch_df(rows))
+    transformed = time.perf_counter()
+    _observe_stage(axis, "preprocess", transformed - start)
+    preds = model.predict(X)
+    probas = None
+    if axis == "classification" and hasattr(model, "predict_proba"):
+        probas = model.predict_proba(X)[:, 1]
+    _observe_stage(axis, "model", time.perf_counter() - transformed)
+    return preds, probas
 
 
 # ---------------------------------------------------------------------------
 # Fonction de prédiction principale
 # ---------------------------------------------------------------------------
 
+def predict_batch(axis: str, rows: list[dict]) -> list[dict]:
+    """
+    Prédiction vectorisée : un seul passage preprocesseur + modèle pour
+    l'ensemble du lot (chemin fusionné NumPy, ou pipeline sklearn).
+
+    Parameters
+    ----------
+    axis : "classification" | "regression"
+    rows : lignes contenant les clés de BATCH_FIELDS
+
+    Returns
+    -------
+    Une liste de dicts au même format que predict(), dans l'ordre des lignes.
+    """
+    if axis not in ("classification", "regression"):
+        raise ValueError(f"Axe invalide : '{axis}'. Valeurs acceptées : classification, regression.")
+    if not rows:
+        return []
+
+    _check_rows(rows)
+    loaded = load_model(axis)
+    preds, probas = _score(loaded, axis, rows)
+    results = []
+
+    if axis == "classification":
+        for i, row in enumerate(rows):
+            pred = int(preds[i])
+            results.append({
+                "axis": axis,
+                "country": row["country"],
+                "year": row["year"],
+                "prediction": pred,
+                "label": "En déclin" if pred == 1 else "En croissance",
+                "probability": round(float(probas[i]), 4) if probas is not None else None,
+                "model_version": loaded.version,
+                "model_trained_at": loaded.trained_at,
+            })
+    else:
+        for i, row in enumerate(rows):
+            pred = float(preds[i])
+            results.append({
+                "axis": axis,
+                "country": row["country"],
+                "year": row["year"],
+                "prediction": round(pred, 2),
+                "label": f"{max(0, round(pred)):,} milliers de passagers prévus",
+                "model_version": loaded.version,
+                "model_trained_at": loaded.trained_at,
+            })
+
+    logger.debug(f"[{axis.upper()}] lot de {len(results)} prédictions")
+    return results
+
+
 def predict(
     axis: str,
     country: str,
@@ -173,33 +435,21 @@ def predict(
 
     Returns
     -------
-    dict avec les clés : axis, country, year, prediction, label, [probability]
+    dict avec les clés : axis, country, year, prediction, label, [probability],
+    model_version, model_trained_at
     """
     if axis not in ("classification", "regression"):
         raise ValueError(f"Axe invalide : '{axis}'. Valeurs acceptées : classification, regression.")
 
-    model, preprocessor = load_artifacts(axis)
-    input_df = _build_input_df(
-        country, year, co2_emissions, co2_per_passenger,
-        co2_lag1, passengers_lag1, passengers_lag2,
-    )
-
-    X = preprocessor.transform(input_df)
-    result = {"axis": axis, "country": country, "year": year}
-
-    if axis == "classification":
-        pred = int(model.predict(X)[0])
-        result["prediction"] = pred
-        result["label"] = "En déclin" if pred == 1 else "En croissance"
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(X)[0]
-            result["probability"] = round(float(proba[1]), 4)
-        else:
-            result["probability"] = None
-    else:
-        pred = float(model.predict(X)[0])
-        result["prediction"] = round(pred, 2)
-        result["label"] = f"{max(0, round(pred)):,} milliers de passagers prévus"
+    result = predict_batch(axis, [{
+        "country": country,
+        "year": year,
+        "co2_emissions": co2_emissions,
+        "co2_per_passenger": co2_per_passenger,
+        "co2_lag1": co2_lag1,
+        "passengers_lag1": passengers_lag1,
+        "passengers_lag2": passengers_lag2,
+    }])[0]
 
     logger.debug(
         f"[{axis.upper()}] {country} {year} → {result['prediction']} "
@@ -0,0 +1,296 @@
+# ia/src/ml/registry.py
+#
+# Registre versionné des modèles servis par l'API.
+#
+# Arborescence (sous ia/models/registry/) :
+#   <axis>/<version>/model.joblib         modèle entraîné
+#   <axis>/<version>/preprocessor.joblib  preprocesseur ajusté avec ce modèle
+#   <axis>/<version>/manifest.json        hash, métriques, date d'entraînement
+#   <axis>/current                        nom de la version servie
+#
+# Rétention : après chaque publication, seules les MODEL_REGISTRY_KEEP
+# versions les plus récentes sont conservées par axe (plus la version
+# servie, toujours gardée, même ancienne après un rollback).
+#
+# Le pointeur "current" est réécrit via un fichier temporaire + os.replace :
+# un lecteur voit toujours l'ancienne ou la nouvelle version, jamais un état
+# intermédiaire. Une version publiée n'est jamais modifiée ensuite.
+#
+# Usage CLI :
+#   python -m ia.src.ml.registry list --axis classification
+#   python -m ia.src.ml.registry publish --axis regression --model ia/models/ridge_optimized_reg.joblib
+#   python -m ia.src.ml.registry promote --axis regression --version 20250101T000000Z-1a2b3c4d
+#   python -m ia.src.ml.registry prune --axis regression --keep 3
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+
+ROOT = Path(__file__).resolve().parents[3]
+REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", ROOT / "ia" / "models" / "registry"))
+
+AXES = ("classification", "regression")
+
+# Versions conservées par axe (la version servie s'y ajoute si plus ancienne)
+MODEL_REGISTRY_KEEP = int(os.getenv("MODEL_REGISTRY_KEEP", "5"))
+
+# Modèles servis par axe, par ordre de priorité (même logique que le fallback
+# optimisé → base de predict.py) : publier un modèle de base n'écarte pas
+# un modèle optimisé déjà en service.
+SERVED_MODELS = {
+    "classification": ["xgboost_optimized", "xgboost"],
+    "regression": ["ridge_optimized", "ridge"],
+}
+
+# Suffixes d'axe utilisés par train_utils.save_model_and_metrics
+AXIS_SUFFIXES = {"clf": "classification", "reg": "regression"}
+
+
+def _check_axis(axis: str):
+    if axis not in AXES:
+        raise ValueError(f"Axe invalide : '{axis}'. Valeurs acceptées : {', '.join(AXES)}.")
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, content: str):
+    """Écrit un fichier via un temporaire du même dossier puis os.replace (atomique)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def axis_dir(axis: str, registry_dir=None) -> Path:
+    _check_axis(axis)
+    return Path(registry_dir or REGISTRY_DIR) / axis
+
+
+def pointer_path(axis: str, registry_dir=None) -> Path:
+    return axis_dir(axis, registry_dir) / "current"
+
+
+def current_version(axis: str, registry_dir=None):
+    """Version servie pour l'axe, ou None si le registre est vide."""
+    try:
+        version = pointer_path(axis, registry_dir).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def read_manifest(axis: str, version: str, registry_dir=None) -> dict:
+    path = axis_dir(axis, registry_dir) / version / "manifest.json"
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def resolve_current(axis: str, registry_dir=None):
+    """
+    Retourne (dossier de version, manifest) de la version servie,
+    ou None si aucune version n'est publiée pour cet axe.
+    """
+    version = current_version(axis, registry_dir)
+    if version is None:
+        return None
+    version_dir = axis_dir(axis, registry_dir) / version
+    return version_dir, read_manifest(axis, version, registry_dir)
+
+
+def list_versions(axis: str, registry_dir=None) -> list[dict]:
+    """Manifests de toutes les versions publiées, de la plus ancienne à la plus récente."""
+    base = axis_dir(axis, registry_dir)
+    if not base.exists():
+        return []
+    # created_at est à la seconde : départage par date d'écriture du manifest
+    entries = [
+        (read_manifest(axis, d.name, registry_dir), (d / "manifest.json").stat().st_mtime_ns)
+        for d in base.iterdir()
+        if d.is_dir() and (d / "manifest.json").exists()
+    ]
+    return [m for m, _ in sorted(entries, key=lambda e: (e[0]["created_at"], e[1]))]
+
+
+def promote(axis: str, version: str, registry_dir=None):
+    """Fait pointer 'current' sur une version publiée (rollback inclus)."""
+    if not (axis_dir(axis, registry_dir) / version / "manifest.json").exists():
+        raise FileNotFoundError(f"Version '{version}' introuvable pour l'axe '{axis}'.")
+    _write_atomic(pointer_path(axis, registry_dir), version + "\n")
+
+
+def prune(axis: str, keep: int = None, registry_dir=None) -> list[str]:
+    """
+    Supprime les versions les plus anciennes au-delà des `keep` plus récentes,
+    sans jamais toucher à la version servie. Retourne les versions supprimées.
+    """
+    keep = max(1, MODEL_REGISTRY_KEEP if keep is None else keep)
+    current = current_version(axis, registry_dir)
+    versions = [m["version"] for m in list_versions(axis, registry_dir)]
+    removed = [v for v in versions[:-keep] if v != current]
+    base = axis_dir(axis, registry_dir)
+    for version in removed:
+        shutil.rmtree(base / version, ignore_errors=True)
+    return removed
+
+
+def _should_activate(axis: str, model_name: str, registry_dir=None) -> bool:
+    """Vrai si model_name est au moins aussi prioritaire que le modèle actuellement servi."""
+    current = resolve_current(axis, registry_dir)
+    if current is None:
+        return True
+    priority = SERVED_MODELS[axis]
+    current_name = current[1].get("model_name")
+    if current_name not in priority or model_name not in priority:
+        return True
+    return priority.index(model_name) <= priority.index(current_name)
+
+
+def publish(
+    axis: str,
+    model,
+    preprocessor,
+    model_name: str,
+    metrics: dict = None,
+    trained_at: str = None,
+    activate: bool = None,
+    registry_dir=None,
+) -> str:
+    """
+    Publie une nouvelle version (modèle + preprocesseur + manifest) puis,
+    si activate (par défaut : selon SERVED_MODELS), bascule 'current' dessus.
+    model / preprocessor : objets entraînés ou chemins de fichiers .joblib.
+    Retourne le nom de la version créée.
+    """
+    base = axis_dir(axis, registry_dir)
+    base.mkdir(parents=True, exist_ok=True)
+    if activate is None:
+        activate = _should_activate(axis, model_name, registry_dir)
+
+    # Écriture dans un dossier temporaire, renommé une fois complet
+    staging = Path(tempfile.mkdtemp(dir=base, prefix=".staging-"))
+    try:
+        files = {}
+        for kind, artifact in (("model", model), ("preprocessor", preprocessor)):
+            target = staging / f"{kind}.joblib"
+            if isinstance(artifact, (str, Path)):
+                shutil.copyfile(artifact, target)
+            else:
+                joblib.dump(artifact, target)
+            files[kind] = {"file": target.name, "sha256": _sha256(target)}
+
+        created_at = datetime.now(timezone.utc)
+        version = f"{created_at.strftime('%Y%m%dT%H%M%SZ')}-{files['model']['sha256'][:8]}"
+        manifest = {
+            "version": version,
+            "axis": axis,
+            "model_name": model_name,
+            "model": files["model"],
+            "preprocessor": files["preprocessor"],
+            "metrics": metrics or {},
+            "trained_at": trained_at or created_at.isoformat(timespec="seconds"),
+            "created_at": created_at.isoformat(timespec="seconds"),
+        }
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        version_dir = base / version
+        if version_dir.exists():
+            # Même modèle republié dans la même seconde : version déjà présente
+            shutil.rmtree(staging)
+        else:
+            os.replace(staging, version_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if activate:
+        promote(axis, version, registry_dir)
+    prune(axis, registry_dir=registry_dir)
+    return version
+
+
+# ---------------------------------------------------------------------------
+# Interface CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="ObRail Europe — Registre des modèles servis")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_list = sub.add_parser("list", help="Lister les versions publiées")
+    p_list.add_argument("--axis", choices=AXES, required=True)
+
+    p_pub = sub.add_parser("publish", help="Publier un modèle .joblib existant")
+    p_pub.add_argument("--axis", choices=AXES, required=True)
+    p_pub.add_argument("--model", required=True, help="Chemin du modèle .joblib")
+    p_pub.add_argument("--preprocessor", help="Chemin du preprocesseur (défaut : data/ml/preprocessor_<axis>.joblib)")
+    p_pub.add_argument("--name", help="Nom du modèle (défaut : déduit du fichier)")
+    p_pub.add_argument("--no-activate", action="store_true", help="Publier sans basculer 'current'")
+
+    p_pro = sub.add_parser("promote", help="Servir une version publiée (rollback)")
+    p_pro.add_argument("--axis", choices=AXES, required=True)
+    p_pro.add_argument("--version", required=True)
+
+    p_prune = sub.add_parser("prune", help="Supprimer les versions anciennes (hors version servie)")
+    p_prune.add_argument("--axis", choices=AXES, required=True)
+    p_prune.add_argument("--keep", type=int, default=MODEL_REGISTRY_KEEP)
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        current = current_version(args.axis)
+        for m in list_versions(args.axis):
+            marker = "*" if m["version"] == current else " "
+            print(f"{marker} {m['version']}  {m['model_name']:<20} {json.dumps(m['metrics'])}")
+        return
+
+    if args.command == "prune":
+        removed = prune(args.axis, args.keep)
+        print(f"✅ {len(removed)} version(s) supprimée(s) : {', '.join(removed) or '-'}")
+        return
+
+    if args.command == "promote":
+        promote(args.axis, args.version)
+        print(f"✅ {args.axis} → {args.version}")
+        return
+
+    model_path = Path(args.model)
+    prep_path = Path(args.preprocessor) if args.preprocessor else (
+        ROOT / "data" / "ml" / f"preprocessor_{args.axis}.joblib"
+    )
+    name = args.name or model_path.stem.rsplit("_", 1)[0]
+    metrics_path = model_path.with_name(f"{model_path.stem}_metrics.json")
+    metrics = json.loads(metrics_path.read_text(encoding="utf-8")) if metrics_path.exists() else {}
+    trained_at = datetime.fromtimestamp(model_path.stat().st_mtime, timezone.utc).isoformat(timespec="seconds")
+
+    try:
+        version = publish(
+            args.axis, model_path, prep_path, name, metrics=metrics, trained_at=trained_at,
+            activate=False if args.no_activate else None,
+        )
+    except FileNotFoundError as e:
+        print(f"\n❌ Fichier introuvable : {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ Version publiée : {version} (servie : {current_version(args.axis)})")
+
+
+if __name__ == "__main__":
+    main()
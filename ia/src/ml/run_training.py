@@ -3,15 +3,35 @@
 # Lance l'entraînement complet des deux axes :
 #   - Classification : logistic, random_forest, xgboost, mlp
 #   - Régression     : ridge, random_forest, xgboost
+# puis backtest temporel par année (backtest.py) et rapports comparatifs.
+#
+# Les modèles des deux axes sont entraînés en parallèle par l'orchestrateur
+# (un processus par modèle, budget de cœurs TRAINING_CPUS respecté).
 
 import sys
+import time
 import traceback
-import importlib
 
 from .config import (
     REGRESSION_DATASET_PATH, CLASSIF_DATASET_PATH,
     MODELS_DIR, REPORTS_DIR
 )
+from .models.train_utils import load_classification_features, load_regression_features
+from .orchestrator import TRAINING_CPUS, TrainingTask, run_tasks, save_timings
+
+# Budgets de cœurs : les forêts (n_jobs) et XGBoost (threads OpenMP) profitent
+# de plusieurs cœurs ; logistic, MLP et Ridge sont limités à un seul.
+TRAINING_TASKS = [
+    # Axe 1 — Classification : détection des pays en déclin
+    TrainingTask("clf/logistic",      ".models.train_logistic",      "train_logistic"),
+    TrainingTask("clf/random_forest", ".models.train_random_forest", "train_random_forest", cores=4),
+    TrainingTask("clf/xgboost",       ".models.train_xgboost",       "train_xgboost", cores=2),
+    TrainingTask("clf/mlp",           ".models.train_mlp",           "train_mlp"),
+    # Axe 2 — Régression : prévision de fréquentation
+    TrainingTask("reg/ridge",         ".models.train_ridge",         "train_ridge"),
+    TrainingTask("reg/random_forest", ".models.train_random_forest", "train_random_forest_regressor", cores=4),
+    TrainingTask("reg/xgboost",       ".models.train_xgboost",       "train_xgboost_regressor", cores=2),
+]
 
 
 def check_prerequisites():
@@ -29,17 +49,6 @@ def check_prerequisites():
     return True
 
 
-def run(module_path, func_name):
-    try:
-        module = importlib.import_module(module_path, package="ia.src.ml")
-        getattr(module, func_name)()
-        return True
-    except Exception:
-        print(f"❌ Erreur dans {func_name} :")
-        traceback.print_exc()
-        return False
-
-
 def main():
     print("🚀 Phase 4 — Entraînement des modèles candidats")
     print("=" * 60)
@@ -47,36 +56,36 @@ def main():
     if not check_prerequisites():
         sys.exit(1)
 
-    # ----------------------------------------------------------
-    # Axe 1 — Classification : détection des pays en déclin
-    # ----------------------------------------------------------
+    print(f"   {len(TRAINING_TASKS)} modèles candidats (classification + régression), "
+          f"{TRAINING_CPUS} cœur(s) disponibles")
+
+    # Prétraitement une seule fois par axe : les tâches relisent ensuite les
+    # mêmes matrices .npy en memory-map depuis le stockage de features.
+    start = time.perf_counter()
+    load_classification_features()
+    load_regression_features()
+    report = run_tasks(TRAINING_TASKS)
+    wall_s = time.perf_counter() - start
+
+    failed = [row["task"] for row in report if row["status"] != "ok"]
     print("\n" + "─" * 60)
-    print("AXE 1 — CLASSIFICATION (en_declin)")
-    print("─" * 60)
-
-    clf_tasks = [
-        (".models.train_logistic",      "train_logistic"),
-        (".models.train_random_forest", "train_random_forest"),
-        (".models.train_xgboost",       "train_xgboost"),
-        (".models.train_mlp",           "train_mlp"),
-    ]
-    for module_path, func_name in clf_tasks:
-        run(module_path, func_name)
+    print(f"⏱  Entraînement : {wall_s:.1f}s (somme des tâches : "
+          f"{sum(row['duration_s'] for row in report):.1f}s)")
+    if failed:
+        print(f"❌ Échecs : {', '.join(failed)}")
+    save_timings(report, wall_s)
 
     # ----------------------------------------------------------
-    # Axe 2 — Régression : prévision de fréquentation
+    # Backtest temporel (fenêtre croissante par année)
     # ----------------------------------------------------------
-    print("\n" + "─" * 60)
-    print("AXE 2 — RÉGRESSION (passengers)")
-    print("─" * 60)
-
-    reg_tasks = [
-        (".models.train_ridge",         "train_ridge"),
-        (".models.train_random_forest", "train_random_forest_regressor"),
-        (".models.train_xgboost",       "train_xgboost_regressor"),
-    ]
-    for module_path, func_name in reg_tasks:
-        run(module_path, func_name)
+    print("\n" + "=" * 60)
+    print("📊 Backtest temporel par horizon...")
+    try:
+        from .backtest import main as backtest_main
+        backtest_main([])
+    except Exception:
+        print("❌ Erreur lors du backtest temporel :")
+        traceback.print_exc()
 
     # ----------------------------------------------------------
     # Rapport comparatif
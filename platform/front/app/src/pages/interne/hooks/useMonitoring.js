@@ -1,6 +1,12 @@
 import { useCallback, useEffect, useState } from "react";
 import { emptyOverview } from "../../../services/mockData";
-import { getInternalOverview, runInternalDiagnostic, streamInternalTestsCategory } from "../../../services/api_interne";
+import {
+  getInternalJob,
+  getInternalOverview,
+  runInternalDiagnostic,
+  streamInternalJob,
+  streamInternalTestsCategory,
+} from "../../../services/api_interne";
 
 const TEST_CATEGORIES = [
   { key: "unit", label: "Unit Tests" },
@@ -9,6 +15,23 @@ const TEST_CATEGORIES = [
   { key: "frontend-e2e", label: "Frontend E2E" },
 ];
 
+const JOB_POLL_MS = 2000;
+
+const wait = (ms) => new Promise((resolve) => window.setTimeout(resolve, ms));
+
+// Une erreur du flux SSE (connexion coupée, timeout d'inactivité du proxy)
+// ne signifie pas que la tâche est finie : on interroge l'API jusqu'à
+// finished_at (ou "interrupted" pour une tâche d'une instance redémarrée)
+async function waitForJob(jobId) {
+  for (;;) {
+    const job = await getInternalJob(jobId);
+    if (job.finished_at || job.status === "interrupted") {
+      return job;
+    }
+    await wait(JOB_POLL_MS);
+  }
+}
+
 const initialTestsState = TEST_CATEGORIES.reduce((acc, item) => {
   acc[item.key] = {
     label: item.label,
@@ -50,7 +73,18 @@ export function useMonitoring(refreshMs = 30000) {
   const runDiagnostic = useCallback(async () => {
     setActionState((current) => ({ ...current, runningDiagnostic: true }));
     try {
-      const result = await runInternalDiagnostic();
+      // L'API renvoie immédiatement une tâche : on suit sa sortie jusqu'à la fin
+      const handle = await runInternalDiagnostic();
+      if (handle.id) {
+        await new Promise((resolve) => streamInternalJob(handle.id, null, resolve, resolve));
+      }
+      const job = handle.id ? await waitForJob(handle.id) : handle;
+      const result = {
+        ...job,
+        ...(job.result || {}),
+        stdout: (job.output || []).join("\n") || job.stdout,
+        stderr: job.error || job.stderr,
+      };
       setActionState((current) => ({ ...current, diagnostic: result, runningDiagnostic: false }));
       await refresh();
     } catch (err) {
@@ -49,6 +49,32 @@ export function streamInternalTests(onMessage, onError, onDone) {
   return source;
 }
 
+export function getInternalJob(jobId) {
+  return request(`/api/internal/jobs/${jobId}`);
+}
+
+export function streamInternalJob(jobId, onMessage, onError, onDone) {
+  const streamUrl = `${API_BASE_URL}/api/internal/jobs/${jobId}/stream`;
+  const source = new EventSource(streamUrl);
+  source.onmessage = (event) => {
+    try {
+      const payload = JSON.parse(event.data);
+      onMessage?.(payload);
+      if (payload.kind === "done") {
+        source.close();
+        onDone?.(payload);
+      }
+    } catch (err) {
+      onError?.(err);
+    }
+  };
+  source.onerror = (err) => {
+    source.close();
+    onError?.(err);
+  };
+  return source;
+}
+
 export function streamInternalTestsCategory(category, onMessage, onError, onDone) {
   const streamUrl = `${API_BASE_URL}/api/internal/tests/stream/${category}`;
   const source = new EventSource(streamUrl);
@@ -144,8 +144,13 @@ test.describe(
         }
 
         expect(body).toHaveProperty('ran_at');
-        expect(body).toHaveProperty('success');
-        expect(typeof body.success).toBe('boolean');
+        // Lancement asynchrone : tâche renvoyée immédiatement (sauf erreur de configuration)
+        if (body.id) {
+          expect(body).toHaveProperty('status');
+          expect(body.stream_url).toBe(`/api/internal/jobs/${body.id}/stream`);
+        } else {
+          expect(typeof body.success).toBe('boolean');
+        }
       }
     );
 
@@ -176,8 +181,13 @@ test.describe(
 
         // On ne logge plus le JSON des tests
         expect(body).toHaveProperty('ran_at');
-        expect(body).toHaveProperty('success');
-        expect(typeof body.success).toBe('boolean');
+        // Lancement asynchrone : tâche renvoyée immédiatement (sauf erreur de configuration)
+        if (body.id) {
+          expect(body).toHaveProperty('status');
+          expect(body.stream_url).toBe(`/api/internal/jobs/${body.id}/stream`);
+        } else {
+          expect(typeof body.success).toBe('boolean');
+        }
 
         // Les logs pytest sont optionnels : on les garde mais on peut les commenter si besoin
         if (body.stdout) {
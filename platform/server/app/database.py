@@ -3,6 +3,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import os
 
+from app.db_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_engine
+
+try:
+    import asyncpg  # noqa: F401  (driver du moteur async)
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+except ImportError:
+    create_async_engine = None
+
 # Configuration depuis les variables d'environnement
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
@@ -10,16 +18,71 @@ DB_NAME = os.getenv("DB_NAME", "obrail")
 DB_USER = os.getenv("DB_USER", "obrail_user")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "1234")
 
+# Active les routes de lecture async (asyncpg). Désactivé par défaut :
+# les tests SQLite et les environnements sans asyncpg restent sur le chemin sync.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Pool et timeouts — à dimensionner selon le nombre de workers uvicorn :
+# workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW) doit rester < max_connections PostgreSQL.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "obrail_api")
+# Cache de requêtes préparées côté serveur (asyncpg uniquement, 0 = désactivé)
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+
 # URL de connexion PostgreSQL
 SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    connect_args={
+        "application_name": DB_APPLICATION_NAME,
+        "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
+    },
+    **POOL_OPTIONS,
+)
+instrument_engine(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Moteur async : la concurrence est bornée par le pool de connexions,
+# plus par le threadpool de FastAPI (40 threads par défaut).
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC and create_async_engine is not None:
+    async_engine = create_async_engine(
+        f"{ASYNC_SQLALCHEMY_DATABASE_URL}?prepared_statement_cache_size={DB_PREPARED_STATEMENT_CACHE_SIZE}",
+        poolclass=InstrumentedAsyncQueuePool,
+        connect_args={
+            "server_settings": {
+                "application_name": DB_APPLICATION_NAME,
+                "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS),
+            },
+        },
+        **POOL_OPTIONS,
+    )
+    instrument_engine(async_engine.sync_engine, "async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+ASYNC_DB_ENABLED = AsyncSessionLocal is not None
+
 def get_db():
     """Dépendance pour obtenir une session de base de données"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,230 @@
+# app/db_metrics.py
+"""
+Métriques Prometheus du pool de connexions et des requêtes SQL.
+
+- temps d'attente au checkout d'une connexion (saturation du pool)
+- connexions utilisées / capacité du pool
+- requêtes lentes (> DB_SLOW_QUERY_MS) et annulées par statement_timeout
+- par endpoint : nombre de requêtes SQL, temps DB cumulé et lignes renvoyées
+  par requête HTTP (QueryMetricsMiddleware), exportés en histogrammes
+  étiquetés par handler et, si DB_SERVER_TIMING est activé, renvoyés
+  dans l'en-tête Server-Timing
+
+Permet de dimensionner DB_POOL_SIZE + DB_MAX_OVERFLOW par rapport au nombre
+de workers uvicorn et de voir l'épuisement du pool avant les erreurs 5xx ;
+un N+1 ou un agrégat lent apparaît directement sur l'endpoint concerné.
+"""
+import contextvars
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    Counter = Gauge = Histogram = None
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+# En-tête Server-Timing (db;dur=...) sur chaque réponse. Désactivé par défaut :
+# il expose à tout client le nombre de requêtes et le temps passé en base
+DB_SERVER_TIMING = os.getenv("DB_SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+if Histogram is not None:
+    POOL_CHECKOUT_WAIT = Histogram(
+        "obrail_db_pool_checkout_wait_seconds",
+        "Temps d'attente pour obtenir une connexion du pool",
+        ["engine"],
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+    POOL_CHECKED_OUT = Gauge(
+        "obrail_db_pool_checked_out",
+        "Connexions actuellement utilisées",
+        ["engine"],
+    )
+    POOL_CAPACITY = Gauge(
+        "obrail_db_pool_capacity",
+        "Capacité maximale du pool (pool_size + max_overflow)",
+        ["engine"],
+    )
+    POOL_SATURATION = Gauge(
+        "obrail_db_pool_saturation_ratio",
+        "Connexions utilisées / capacité du pool (1 = pool épuisé)",
+        ["engine"],
+    )
+    SLOW_QUERIES = Counter(
+        "obrail_db_slow_queries_total",
+        "Requêtes SQL plus lentes que DB_SLOW_QUERY_MS",
+        ["engine"],
+    )
+    STATEMENT_TIMEOUTS = Counter(
+        "obrail_db_statement_timeouts_total",
+        "Requêtes SQL annulées par statement_timeout",
+        ["engine"],
+    )
+    REQUEST_QUERIES = Histogram(
+        "obrail_db_queries_per_request",
+        "Requêtes SQL exécutées par requête HTTP",
+        ["handler"],
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+    )
+    REQUEST_DB_TIME = Histogram(
+        "obrail_db_time_per_request_seconds",
+        "Temps passé dans les requêtes SQL par requête HTTP",
+        ["handler"],
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 15),
+    )
+    REQUEST_ROWS = Histogram(
+        "obrail_db_rows_per_request",
+        "Lignes renvoyées par les requêtes SQL d'une requête HTTP",
+        ["handler"],
+        buckets=(0, 1, 10, 100, 1000, 10000, 100000),
+    )
+
+
+class RequestQueryStats:
+    """Requêtes SQL d'une requête HTTP (partagé avec le threadpool via contextvars)."""
+    __slots__ = ("queries", "duration", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+        self.rows = 0
+
+    def add(self, elapsed, rowcount):
+        self.queries += 1
+        self.duration += elapsed
+        # rowcount vaut -1 quand le driver ne le connaît pas (SELECT sous SQLite)
+        if rowcount and rowcount > 0:
+            self.rows += rowcount
+
+
+_current_request = contextvars.ContextVar("obrail_request_query_stats", default=None)
+
+
+def _observe_wait(label, started):
+    if Histogram is not None:
+        POOL_CHECKOUT_WAIT.labels(label).observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure le temps d'attente au checkout."""
+    metrics_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _observe_wait(self.metrics_label, started)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Équivalent async (asyncpg) de InstrumentedQueuePool."""
+    metrics_label = "async"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _observe_wait(self.metrics_label, started)
+
+
+def _pool_capacity(pool):
+    try:
+        return pool.size() + max(pool._max_overflow, 0)
+    except Exception:
+        return 0
+
+
+def instrument_engine(engine, label):
+    """
+    Branche les métriques pool, requêtes lentes et requêtes par endpoint
+    (cf. QueryMetricsMiddleware) sur un moteur sync
+    (pour un moteur async, passer async_engine.sync_engine).
+    """
+    if Histogram is not None:
+        POOL_CHECKED_OUT.labels(label).set_function(lambda: engine.pool.checkedout())
+        POOL_CAPACITY.labels(label).set_function(lambda: _pool_capacity(engine.pool))
+        POOL_SATURATION.labels(label).set_function(
+            lambda: engine.pool.checkedout() / _pool_capacity(engine.pool) if _pool_capacity(engine.pool) else 0
+        )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("obrail_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("obrail_query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = _current_request.get()
+        if stats is not None:
+            stats.add(elapsed, cursor.rowcount)
+        if Histogram is not None and elapsed * 1000 > DB_SLOW_QUERY_MS:
+            SLOW_QUERIES.labels(label).inc()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        starts = context.connection.info.get("obrail_query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        if Histogram is not None and "statement timeout" in str(context.original_exception):
+            STATEMENT_TIMEOUTS.labels(label).inc()
+
+    return engine
+
+
+class QueryMetricsMiddleware:
+    """
+    Middleware ASGI : ouvre un RequestQueryStats par requête HTTP, ajoute
+    l'en-tête Server-Timing au début de la réponse et alimente les
+    histogrammes par handler (chemin de la route, comme l'Instrumentator).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._handlers = {}
+
+    def _handler(self, scope):
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return None
+        if endpoint not in self._handlers:
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is not None:
+                    self._handlers.setdefault(route.endpoint, route.path)
+        return self._handlers.get(endpoint)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and DB_SERVER_TIMING:
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.queries} requetes, {stats.rows} lignes", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            handler = self._handler(scope)
+            if Histogram is not None and handler is not None:
+                REQUEST_QUERIES.labels(handler).observe(stats.queries)
+                REQUEST_DB_TIME.labels(handler).observe(stats.duration)
+                REQUEST_ROWS.labels(handler).observe(stats.rows)
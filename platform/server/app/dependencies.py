@@ -1,6 +1,7 @@
 # app/dependencies.py
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from app.database import SessionLocal
+from app import database
 
 def get_db() -> Generator:
     """
@@ -11,4 +12,15 @@ def get_db() -> Generator:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    """
+    Dépendance async (SQLAlchemy asyncio + asyncpg) pour les routes de lecture.
+    N'est utilisable que si DB_ASYNC est actif et asyncpg installé.
+    """
+    if database.AsyncSessionLocal is None:
+        raise RuntimeError("Moteur async indisponible (DB_ASYNC désactivé ou asyncpg absent).")
+    async with database.AsyncSessionLocal() as db:
+        yield db
@@ -1,13 +1,38 @@
 # Fichier: platform/server/app/main.py
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import countries, night_trains, dashboard, analysis, operators, metadata, statistics, internal, predict
+from fastapi.responses import JSONResponse
+from app.database import ASYNC_DB_ENABLED
+from app.db_metrics import QueryMetricsMiddleware
+from app.services import warmup
+from app.routers import countries, night_trains, dashboard, analysis, operators, metadata, statistics, internal, predict, async_reads
 try:
     from prometheus_fastapi_instrumentator import Instrumentator
 except ImportError:
     Instrumentator = None
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Chargement + chauffe des modèles ML en tâche de fond : uvicorn accepte
+    # les connexions tout de suite et /ready répond 503 jusqu'à la fin
+    warming = asyncio.create_task(run_in_threadpool(warmup.warm_up_models))
+    # Rechargement à chaud quand une nouvelle version est publiée au registre
+    watcher = asyncio.create_task(warmup.watch_models())
+    yield
+    for task in (warming, watcher):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await internal.close_http_client()
+    internal.JOBS.shutdown()
+
+
 app = FastAPI(
     title="ObRail API - Observatoire Européen du Rail",
     description="""
@@ -24,12 +49,15 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",  # Documentation Swagger UI
     openapi_url="/api/openapi.json",  # Documentation OpenAPI
-
+    lifespan=lifespan,
 )
 
 if Instrumentator is not None:
     Instrumentator().instrument(app).expose(app)
 
+# Requêtes SQL par endpoint (histogrammes + en-tête Server-Timing)
+app.add_middleware(QueryMetricsMiddleware)
+
 # Permet au frontend de communiquer avec l'API
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +69,11 @@ app.add_middleware(
     allow_headers=["*"],              # Autorise tous les headers
 )
 
+# Routes de lecture async (asyncpg) : enregistrées en premier, elles sont
+# prioritaires sur leurs équivalents sync quand DB_ASYNC est actif.
+if ASYNC_DB_ENABLED:
+    app.include_router(async_reads.router)
+
 #Tous les routeurs
 app.include_router(countries.router)
 app.include_router(night_trains.router)
@@ -59,3 +92,9 @@ def read_root():
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+# Readiness : 200 uniquement quand les modèles sont chargés et chauffés
+@app.get("/ready")
+async def readiness_check():
+    status = warmup.readiness()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
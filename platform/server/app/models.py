@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, ForeignKey, DECIMAL, Boolean, Float, text
+from sqlalchemy import Column, Integer, String, ForeignKey, DECIMAL, Boolean, Float, Index, text
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.ext.declarative import declared_attr
 
@@ -27,13 +27,18 @@ class DimYears(Base):
     __tablename__ = "dim_years"
 
     year_id = Column(Integer, primary_key=True, index=True)
-    year = Column(Integer, nullable=False, unique=True, index=True)
+    year = Column(Integer, nullable=False, unique=True)
     is_after_2010 = Column(Boolean, nullable=False, default=True)
 
     # Relations
     country_stats = relationship("FactsCountryStats", back_populates="year_dim")
     night_trains = relationship("FactsNightTrains", back_populates="year_dim")
 
+    # Filtre ?year= (voir sql/02_indexes.sql)
+    __table_args__ = (
+        Index("idx_dim_years_year", "year"),
+    )
+
     def __repr__(self):
         return f"<Year(id={self.year_id}, year={self.year}, after_2010={self.is_after_2010})>"
 
@@ -48,6 +53,14 @@ class DimOperators(Base):
     # Relations
     night_trains = relationship("FactsNightTrains", back_populates="operator")
 
+    # Index trigramme pour ILIKE '%...%' (voir sql/02_indexes.sql)
+    __table_args__ = (
+        Index(
+            "idx_dim_operators_name_trgm", "operator_name",
+            postgresql_using="gin", postgresql_ops={"operator_name": "gin_trgm_ops"},
+        ),
+    )
+
     def __repr__(self):
         return f"<Operator(id={self.operator_id}, name='{self.operator_name}')>"
 
@@ -78,12 +91,18 @@ class FactsCountryStats(Base):
 
     # Clés étrangères
     country_id = Column(Integer, ForeignKey("dim_countries.country_id"), nullable=False, index=True)
-    year_id = Column(Integer, ForeignKey("dim_years.year_id"), nullable=False, index=True)
+    year_id = Column(Integer, ForeignKey("dim_years.year_id"), nullable=False)
 
     # Relations
     country = relationship("DimCountries", back_populates="country_stats")
     year_dim = relationship("DimYears", back_populates="country_stats")
 
+    # Index composites (voir sql/02_indexes.sql)
+    __table_args__ = (
+        Index("idx_fcs_country_year", "country_id", "year_id"),
+        Index("idx_fcs_year", "year_id"),
+    )
+
     def __repr__(self):
         return f"<CountryStats(id={self.stat_id}, country={self.country_id}, year={self.year_id}, passengers={self.passengers})>"
 
@@ -109,6 +128,17 @@ class FactsNightTrains(Base):
     year_dim = relationship("DimYears", back_populates="night_trains")
     operator = relationship("DimOperators", back_populates="night_trains")
 
+    # Index composites et partiels (voir sql/02_indexes.sql)
+    __table_args__ = (
+        Index("idx_fnt_country_year_night", "country_id", "year_id", "is_night"),
+        Index("idx_fnt_year_night", "year_id", "is_night"),
+        Index("idx_fnt_operator", "operator_id", "is_night"),
+        Index("idx_fnt_night_country_year", "country_id", "year_id",
+              postgresql_where=text("is_night"), sqlite_where=text("is_night")),
+        Index("idx_fnt_day_country_year", "country_id", "year_id",
+              postgresql_where=text("NOT is_night"), sqlite_where=text("NOT is_night")),
+    )
+
     def __repr__(self):
         return f"<NightTrain(id={self.fact_id}, route={self.route_id}, train='{self.night_train}', night={self.is_night})>"
 
@@ -0,0 +1,21 @@
+# app/responses.py
+"""
+Chemin de sérialisation rapide pour les grandes listes.
+
+Les routes de liste construisent des dicts directement depuis les lignes SQL
+(colonnes déjà typées en float/str/bool par la requête) et les sérialisent
+avec orjson, sans instancier ni re-valider un modèle Pydantic par ligne.
+Le schéma (response_model) reste déclaré pour l'OpenAPI et est vérifié
+dans les tests d'intégration.
+"""
+from fastapi.responses import ORJSONResponse
+
+
+def rows_to_dicts(rows) -> list:
+    """Convertit des lignes SQLAlchemy (Row) en dicts clé = label de colonne."""
+    return [row._asdict() for row in rows]
+
+
+def rows_response(rows) -> ORJSONResponse:
+    """Réponse JSON orjson construite directement depuis les lignes SQL."""
+    return ORJSONResponse(rows_to_dicts(rows))
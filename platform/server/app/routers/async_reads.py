@@ -0,0 +1,112 @@
+# server/app/routers/async_reads.py
+# ROUTER: Versions async des endpoints de lecture les plus sollicités
+# ==================================================================
+# Rôle: Servir les lectures via SQLAlchemy asyncio + asyncpg sans
+#       occuper un thread du threadpool pendant l'attente PostgreSQL.
+#       Monté avant les routeurs sync dans main.py quand DB_ASYNC est actif ;
+#       les requêtes SQL sont partagées avec les routeurs sync.
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.dependencies import get_async_db
+from app.models import DashboardMetrics
+from app.responses import rows_response
+from app.routers.countries import _countries_query, _country_stats_query
+from app.routers.night_trains import _apply_filters, _apply_pagination, _build_night_trains_query
+from app.schemas.countries import CountryResponse, CountryStatsResponse, CountryStatsFilter
+from app.schemas.statistics import DashboardMetricsResponse, KPIsResponse
+from app.schemas.trains import NightTrainResponse, NightTrainSummary
+from app.services.aggregates import get_kpi_aggregates
+
+router = APIRouter()
+
+
+async def _list_trains(db: AsyncSession, is_night, skip, limit, country_code, operator_name, year):
+    query = _build_night_trains_query(is_night=is_night)
+    query = _apply_filters(query, country_code, operator_name, year)
+    return rows_response(await db.execute(_apply_pagination(query, skip, limit)))
+
+
+@router.get("/api/countries", response_model=List[CountryResponse])
+async def get_countries_async(
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Récupère la liste des pays européens référencés."""
+    return (await db.execute(_countries_query(skip, limit))).scalars().all()
+
+
+@router.get("/api/countries/stats", response_model=List[CountryStatsResponse])
+async def get_country_stats_async(
+    filter: CountryStatsFilter = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Récupère les statistiques par pays avec filtrage avancé."""
+    return rows_response(await db.execute(_country_stats_query(filter, skip, limit)))
+
+
+@router.get("/api/night-trains/summary", response_model=NightTrainSummary)
+async def get_night_trains_summary_async(db: AsyncSession = Depends(get_async_db)):
+    """Retourne le nombre total de trains, de trains de nuit et de trains de jour."""
+    totals = await db.run_sync(get_kpi_aggregates)
+    return NightTrainSummary(
+        total_trains=totals["total_trains"],
+        total_night_trains=totals["total_night_trains"],
+        total_day_trains=totals["total_day_trains"],
+    )
+
+
+@router.get("/api/night-trains", response_model=List[NightTrainResponse])
+async def get_all_night_trains_async(
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    country_code: Optional[str] = None,
+    operator_name: Optional[str] = None,
+    year: Optional[int] = None,
+):
+    """Récupère tous les trains (jour et nuit)."""
+    return await _list_trains(db, None, skip, limit, country_code, operator_name, year)
+
+
+@router.get("/api/night-trains/night", response_model=List[NightTrainResponse])
+async def get_night_trains_only_async(
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    country_code: Optional[str] = None,
+    operator_name: Optional[str] = None,
+    year: Optional[int] = None,
+):
+    """Récupère uniquement les trains de nuit (is_night = true)."""
+    return await _list_trains(db, True, skip, limit, country_code, operator_name, year)
+
+
+@router.get("/api/night-trains/day", response_model=List[NightTrainResponse])
+async def get_day_trains_only_async(
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    country_code: Optional[str] = None,
+    operator_name: Optional[str] = None,
+    year: Optional[int] = None,
+):
+    """Récupère uniquement les trains de jour (is_night = false)."""
+    return await _list_trains(db, False, skip, limit, country_code, operator_name, year)
+
+
+@router.get("/api/dashboard/metrics", response_model=List[DashboardMetricsResponse])
+async def get_dashboard_metrics_async(db: AsyncSession = Depends(get_async_db)):
+    """Métriques agrégées par pays. Vue: dashboard_metrics"""
+    return (await db.execute(select(DashboardMetrics))).scalars().all()
+
+
+@router.get("/api/dashboard/kpis", response_model=KPIsResponse)
+async def get_dashboard_kpis_async(db: AsyncSession = Depends(get_async_db)):
+    """Indicateurs clés de performance (une seule requête SQL, mémoïsée par version des données en base)."""
+    return KPIsResponse(**(await db.run_sync(get_kpi_aggregates)))
@@ -1,42 +1,43 @@
 # server/app/routers/countries.py
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Float, cast, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.dependencies import get_db
 from app.models import DimCountries, FactsCountryStats, DimYears
+from app.responses import rows_response
 from app.schemas.countries import CountryResponse, CountryStatsResponse, CountryStatsFilter
 
 router = APIRouter()
 
 
-@router.get("/api/countries", response_model=List[CountryResponse])
-def get_countries(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: Optional[int] = Query(None, ge=1)
-):
-    """Récupère la liste des pays européens référencés."""
-    query = db.query(DimCountries).offset(skip)
+def _countries_query(skip: int, limit: Optional[int]):
+    """Requête de liste des pays, partagée par les routes sync et async."""
+    query = select(DimCountries).offset(skip)
 
     if limit is not None:
         query = query.limit(limit)
 
-    return query.all()
+    return query
 
 
-@router.get("/api/countries/stats", response_model=List[CountryStatsResponse])
-def get_country_stats(
-    filter: CountryStatsFilter = Depends(),
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
-    limit: Optional[int] = Query(None, ge=1)
-):
-    """Récupère les statistiques par pays avec filtrage avancé."""
-    query = db.query(
-        FactsCountryStats,
+def _country_stats_query(filter: CountryStatsFilter, skip: int, limit: Optional[int]):
+    """
+    Requête statistiques pays filtrée, partagée par les routes sync et async.
+    Colonnes labellisées/typées comme CountryStatsResponse (sérialisation directe).
+    """
+    query = select(
+        FactsCountryStats.stat_id.label("stats_id"),
+        FactsCountryStats.country_id,
+        FactsCountryStats.year_id,
+        cast(FactsCountryStats.passengers, Float).label("passengers"),
+        cast(FactsCountryStats.co2_emissions, Float).label("co2_emissions"),
+        cast(FactsCountryStats.co2_per_passenger, Float).label("co2_per_passenger"),
         DimCountries.country_name,
         DimCountries.country_code,
         DimYears.year
+    ).select_from(
+        FactsCountryStats
     ).join(
         DimCountries, FactsCountryStats.country_id == DimCountries.country_id
     ).join(
@@ -61,21 +62,25 @@ def get_country_stats(
     if limit is not None:
         query = query.limit(limit)
 
-    results = query.all()
+    return query
+
+
+@router.get("/api/countries", response_model=List[CountryResponse])
+def get_countries(
+    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Récupère la liste des pays européens référencés."""
+    return db.execute(_countries_query(skip, limit)).scalars().all()
 
-    transformed_results = []
-    for stats, country_name, country_code, year in results:
-        response_item = CountryStatsResponse(
-            stats_id=stats.stat_id,      # corrigé : stats.stats_id → stats.stat_id
-            country_id=stats.country_id,
-            year_id=stats.year_id,
-            passengers=float(stats.passengers),
-            co2_emissions=float(stats.co2_emissions),
-            co2_per_passenger=float(stats.co2_per_passenger),
-            country_name=country_name,
-            country_code=country_code,
-            year=year
-        )
-        transformed_results.append(response_item)
 
-    return transformed_results
+@router.get("/api/countries/stats", response_model=List[CountryStatsResponse])
+def get_country_stats(
+    filter: CountryStatsFilter = Depends(),
+    db: Session = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Récupère les statistiques par pays avec filtrage avancé."""
+    return rows_response(db.execute(_country_stats_query(filter, skip, limit)))
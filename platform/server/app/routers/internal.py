@@ -1,22 +1,30 @@
+import asyncio
 import json
+import logging
 import os
+import secrets
 import subprocess
 import sys
+import time
 from shutil import which
 from datetime import datetime
 from pathlib import Path
-from urllib.error import URLError
-from urllib.request import Request, urlopen
 from threading import Lock
+from typing import Optional
 
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
-from sqlalchemy import func
-
+import httpx
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from app.database import SessionLocal
-from app.models import FactsNightTrains
+from app.services.aggregates import get_kpi_aggregates
+from app.services.files import count_lines
+from app.services import profiler
+from app.services.jobs import JobManager
+from app.services.prometheus import PrometheusClient
 
 router = APIRouter(prefix="/api/internal", tags=["internal"])
+logger = logging.getLogger("obrail.internal")
 
 APP_DIR = Path(__file__).resolve().parents[1]
 PROJECT_ROOT = APP_DIR.parents[2] if len(APP_DIR.parents) > 2 else Path("/app")
@@ -25,6 +33,13 @@ DIAGNOSTIC_REPORTS = [
     PROJECT_ROOT / "data" / "audit" / "diagnostic_report.json",
     Path("/app/data/audit/diagnostic_report.json"),
 ]
+# Rapports produits par etl/audit (profils mis en cache par profilage.py)
+AUDIT_DIRS = [PROJECT_ROOT / "data" / "audit", Path("/app/data/audit")]
+DIAGNOSTIC_FILES = {
+    "pipeline": "diagnostic_report.json",
+    "avance": "diagnostic_report_avance.json",
+    "ml": "diagnostic_ml_avance.json",
+}
 
 PROMETHEUS_URLS = [
     os.getenv("PROMETHEUS_URL", "http://prometheus:9090"),
@@ -38,6 +53,60 @@ GITHUB_ACTIONS_API = "https://api.github.com/repos/Oggye/MSPR_1_B3/actions/runs?
 RUNNING_TESTS = set()
 RUNNING_TESTS_LOCK = Lock()
 
+# Tâches longues (diagnostic ETL, pytest) : exécutées hors requête par JOBS
+JOBS = JobManager(os.getenv("INTERNAL_JOBS_DIR", str(APP_DIR / "reports" / "jobs")))
+DIAGNOSTIC_TIMEOUT = float(os.getenv("DIAGNOSTIC_TIMEOUT", "600"))
+TESTS_TIMEOUT = float(os.getenv("TESTS_TIMEOUT", "900"))
+# Intervalle (s) de scrutation des nouvelles lignes d'une tâche suivie en SSE
+JOBS_STREAM_POLL = float(os.getenv("JOBS_STREAM_POLL", "0.25"))
+
+# Profileur à la demande : désactivé tant que PROFILER_TOKEN n'est pas défini
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+
+# /overview : délai global de réponse (ms) ; les sources qui ne répondent
+# pas à temps sont servies depuis leur dernier snapshot
+OVERVIEW_DEADLINE_MS = float(os.getenv("OVERVIEW_DEADLINE_MS", "150"))
+# Timeout de chaque appel HTTP sortant (s)
+OVERVIEW_HTTP_TIMEOUT = float(os.getenv("OVERVIEW_HTTP_TIMEOUT", "2"))
+# Durée de validité (s) du snapshot de chaque source avant rafraîchissement
+OVERVIEW_TTLS = {
+    "prometheus": 5,
+    "grafana": 30,
+    "docker": 15,
+    "ci_cd": 120,
+    "db_totals": 30,
+    "reports": 10,
+}
+
+_http = {"client": None, "loop": None}
+
+
+def _http_client():
+    """
+    Client HTTP partagé (keep-alive) pour les appels sortants de /overview.
+    Lié à la boucle asyncio qui l'a créé : recréé si la boucle change.
+    """
+    loop = asyncio.get_running_loop()
+    client = _http["client"]
+    if client is None or client.is_closed or _http["loop"] is not loop:
+        client = httpx.AsyncClient(
+            timeout=OVERVIEW_HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _http.update(client=client, loop=loop)
+    return client
+
+
+PROMETHEUS = PrometheusClient(PROMETHEUS_URLS, lambda: _http_client())
+
+
+async def close_http_client():
+    """Ferme le client partagé (arrêt de l'application)."""
+    client = _http["client"]
+    _http.update(client=None, loop=None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
 
 def _now():
     return datetime.now().isoformat(timespec="seconds")
@@ -53,51 +122,25 @@ def _read_json(path):
     return None
 
 
-def _http_json(url, timeout=2):
+async def _http_json(url, params=None, headers=None, timeout=OVERVIEW_HTTP_TIMEOUT):
     try:
-        with urlopen(url, timeout=timeout) as response:
-            return json.loads(response.read().decode("utf-8"))
+        response = await _http_client().get(url, params=params, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
     except Exception as exc:
         return {"error": str(exc), "url": url}
 
 
-def _first_ok(urls, path):
+async def _first_ok(urls, path, params=None):
     last_error = None
     for base_url in urls:
-        result = _http_json(f"{base_url}{path}")
-        if "error" not in result:
+        result = await _http_json(f"{base_url}{path}", params=params)
+        if not (isinstance(result, dict) and "error" in result):
             return result, base_url
         last_error = result
     return last_error or {"error": "service unavailable"}, None
 
 
-def _prometheus_query(query):
-    encoded = query.replace(" ", "%20").replace("[", "%5B").replace("]", "%5D").replace("{", "%7B").replace("}", "%7D").replace('"', "%22").replace("|", "%7C").replace("=", "%3D").replace("~", "~").replace(",", "%2C").replace("*", "%2A")
-    result, _ = _first_ok(PROMETHEUS_URLS, f"/api/v1/query?query={encoded}")
-    try:
-        values = result["data"]["result"]
-        if not values:
-            return 0
-        return float(values[0]["value"][1])
-    except Exception:
-        return None
-
-
-def _prometheus_vector(query):
-    encoded = query.replace(" ", "%20").replace("[", "%5B").replace("]", "%5D").replace("{", "%7B").replace("}", "%7D").replace('"', "%22").replace("|", "%7C").replace("=", "%3D").replace("~", "~").replace(",", "%2C").replace("*", "%2A")
-    result, _ = _first_ok(PROMETHEUS_URLS, f"/api/v1/query?query={encoded}")
-    try:
-        return [
-            {
-                "metric": item.get("metric", {}),
-                "value": float(item["value"][1]),
-            }
-            for item in result["data"]["result"]
-        ]
-    except Exception:
-        return []
-
-
 def _run_command(command, cwd=None, timeout=20):
     try:
         completed = subprocess.run(
@@ -173,13 +216,11 @@ def _safe_float(value):
 def _db_totals():
     db = SessionLocal()
     try:
-        total_trains = db.query(func.count(FactsNightTrains.fact_id)).scalar() or 0
-        total_night = db.query(func.count(FactsNightTrains.fact_id)).filter(FactsNightTrains.is_night.is_(True)).scalar() or 0
-        total_day = db.query(func.count(FactsNightTrains.fact_id)).filter(FactsNightTrains.is_night.is_(False)).scalar() or 0
+        totals = get_kpi_aggregates(db)
         return {
-            "total_trains": int(total_trains),
-            "total_night_trains": int(total_night),
-            "total_day_trains": int(total_day),
+            "total_trains": totals["total_trains"],
+            "total_night_trains": totals["total_night_trains"],
+            "total_day_trains": totals["total_day_trains"],
         }
     except Exception as exc:
         return {"error": str(exc)}
@@ -187,7 +228,7 @@ def _db_totals():
         db.close()
 
 
-def _github_actions_status():
+async def _github_actions_status():
     token = os.getenv("GITHUB_TOKEN")
     headers = {}
     if token:
@@ -195,9 +236,9 @@ def _github_actions_status():
         headers["Accept"] = "application/vnd.github+json"
 
     try:
-        request = urlopen(GITHUB_ACTIONS_API, timeout=4) if not headers else urlopen(Request(GITHUB_ACTIONS_API, headers=headers), timeout=4)
-        payload = json.loads(request.read().decode("utf-8"))
-        runs = payload.get("workflow_runs", [])
+        response = await _http_client().get(GITHUB_ACTIONS_API, headers=headers, timeout=4)
+        response.raise_for_status()
+        runs = response.json().get("workflow_runs", [])
         return {
             "available": True,
             "source": "github_api",
@@ -226,14 +267,6 @@ def _github_actions_status():
         }
 
 
-def _line_count(path):
-    try:
-        with path.open("r", encoding="utf-8", errors="ignore") as file:
-            return max(sum(1 for _ in file) - 1, 0)
-    except Exception:
-        return None
-
-
 def _scan_csv_dir(path, recursive=False, with_lines=False):
     if not path.exists():
         return {"exists": False, "files": 0, "total_size_kb": 0, "details": []}
@@ -241,12 +274,13 @@ def _scan_csv_dir(path, recursive=False, with_lines=False):
     files = sorted(path.rglob("*.csv") if recursive else path.glob("*.csv"))
     details = []
     for file in files:
+        stat = file.stat()
         details.append(
             {
                 "name": file.name,
                 "path": str(file),
-                "size_kb": round(file.stat().st_size / 1024, 2),
-                "lines": _line_count(file) if with_lines else None,
+                "size_kb": round(stat.st_size / 1024, 2),
+                "lines": count_lines(file, stat) if with_lines else None,
             }
         )
 
@@ -290,48 +324,233 @@ def _reports_summary():
     return {"quality": quality, "diagnostic": diagnostic}
 
 
-@router.get("/overview")
-def get_internal_overview():
-    health = {"status": "ok", "checked_at": _now()}
-    prometheus_targets, prometheus_url = _first_ok(PROMETHEUS_URLS, "/api/v1/targets")
-    grafana_search, grafana_url = _first_ok(GRAFANA_URLS, "/api/search")
-    reports = _reports_summary()
-
-    active_targets = prometheus_targets.get("data", {}).get("activeTargets", []) if isinstance(prometheus_targets, dict) else []
-    fastapi_target = next((target for target in active_targets if target.get("labels", {}).get("job") == "fastapi"), None)
-
-    metrics = {
-        "api_up": _prometheus_query('up{job="fastapi"}'),
-        "requests_per_minute": _prometheus_query("sum(rate(http_requests_total[1m])) * 60"),
-        "errors_5xx_per_second": _prometheus_query('sum(rate(http_requests_total{status=~"5..|5xx"}[1m])) or vector(0)'),
-        "latency_p95_seconds": _prometheus_query("histogram_quantile(0.95, sum(rate(http_request_duration_highr_seconds_bucket[1m])) by (le))"),
-        "latency_avg_seconds": _prometheus_query("sum(rate(http_request_duration_seconds_sum[1m])) / sum(rate(http_request_duration_seconds_count[1m]))"),
-        "endpoints": _prometheus_vector("topk(10, sum(rate(http_requests_total[1m])) by (handler)) * 60"),
-    }
+PROMETHEUS_METRICS = {
+    "api_up": 'up{job="fastapi"}',
+    "requests_per_minute": "sum(rate(http_requests_total[1m])) * 60",
+    "errors_5xx_per_second": 'sum(rate(http_requests_total{status=~"5..|5xx"}[1m])) or vector(0)',
+    "latency_p95_seconds": "histogram_quantile(0.95, sum(rate(http_request_duration_highr_seconds_bucket[1m])) by (le))",
+    "latency_avg_seconds": "sum(rate(http_request_duration_seconds_sum[1m])) / sum(rate(http_request_duration_seconds_count[1m]))",
+}
+PROMETHEUS_ENDPOINTS = "topk(10, sum(rate(http_requests_total[1m])) by (handler)) * 60"
+# Séries des 30 dernières minutes pour les sparklines du tableau de bord
+PROMETHEUS_SPARKLINES = {
+    name: PROMETHEUS_METRICS[name]
+    for name in ("requests_per_minute", "errors_5xx_per_second", "latency_p95_seconds")
+}
+SPARKLINE_WINDOW = 30 * 60
+
 
+def _scalar(result):
+    if result is None:
+        return None
+    return result[0]["value"] if result else 0
+
+
+async def _prometheus_status():
+    metrics = {name: None for name in PROMETHEUS_METRICS}
+    metrics["endpoints"] = []
+    sparklines = {name: [] for name in PROMETHEUS_SPARKLINES}
+    active_targets = await PROMETHEUS.targets()
+    if active_targets is not None:
+        # Un seul aller-retour parallèle par rafraîchissement
+        values, series = await asyncio.gather(
+            PROMETHEUS.query_many({**PROMETHEUS_METRICS, "endpoints": PROMETHEUS_ENDPOINTS}),
+            PROMETHEUS.query_range_many(PROMETHEUS_SPARKLINES, SPARKLINE_WINDOW),
+        )
+        metrics = {name: _scalar(values[name]) for name in PROMETHEUS_METRICS}
+        metrics["endpoints"] = values["endpoints"] or []
+        sparklines = {name: result[0]["values"] if result else [] for name, result in series.items()}
+    active_targets = active_targets or []
     return {
-        "generated_at": _now(),
-        "health": health,
         "metrics": metrics,
         "prometheus": {
-            "url": prometheus_url,
-            "available": prometheus_url is not None,
-            "target": fastapi_target,
+            "url": PROMETHEUS.base_url,
+            "available": PROMETHEUS.base_url is not None,
+            "target": next((t for t in active_targets if t.get("labels", {}).get("job") == "fastapi"), None),
             "targets": active_targets,
+            "sparklines": sparklines,
         },
-        "grafana": {
-            "url": grafana_url,
-            "available": grafana_url is not None,
-            "dashboards": grafana_search if isinstance(grafana_search, list) else [],
+    }
+
+
+async def _grafana_status():
+    search, url = await _first_ok(GRAFANA_URLS, "/api/search")
+    return {
+        "url": url,
+        "available": url is not None,
+        "dashboards": search if isinstance(search, list) else [],
+        "dashboard_url": "http://localhost:3001/d/obrail-api-monitoring/obrail-api-monitoring",
+    }
+
+
+class _Snapshot:
+    """
+    Dernier résultat connu d'une source de /overview ("stale-while-revalidate") :
+    servi tel quel tant qu'il a moins de `ttl` secondes, sinon rafraîchi en
+    tâche de fond. Une seule tâche de rafraîchissement par source à la fois.
+    """
+
+    def __init__(self, name, fetch, ttl, placeholder):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.placeholder = placeholder
+        self.value = None
+        self.updated_at = None
+        self.duration_ms = None
+        self.error = None
+        self.task = None
+
+    def is_fresh(self):
+        return self.updated_at is not None and time.monotonic() - self.updated_at < self.ttl
+
+    def refresh(self):
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.task = loop.create_task(self._run())
+        return self.task
+
+    async def _run(self):
+        started = time.perf_counter()
+        try:
+            value = await self.fetch()
+        except Exception as exc:
+            logger.warning(f"Source /overview {self.name} en échec : {exc}")
+            self.error = str(exc)
+        else:
+            self.value, self.updated_at, self.error = value, time.monotonic(), None
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def status(self):
+        if self.value is None:
+            state = "error" if self.error else "pending"
+        else:
+            state = "fresh" if self.is_fresh() else "stale"
+        return {
+            "status": state,
+            "age_s": round(time.monotonic() - self.updated_at, 1) if self.updated_at is not None else None,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+        }
+
+    def reset(self):
+        self.value = self.updated_at = self.duration_ms = self.error = self.task = None
+
+
+def _overview_sources():
+    # Fonctions résolues à l'appel (lambda) ; les sources synchrones
+    # (subprocess, SQL, fichiers) passent par le threadpool
+    return {
+        "prometheus": _Snapshot("prometheus", lambda: _prometheus_status(), OVERVIEW_TTLS["prometheus"], lambda: {
+            "metrics": {**{name: None for name in PROMETHEUS_METRICS}, "endpoints": []},
+            "prometheus": {"url": None, "available": False, "target": None, "targets": [],
+                           "sparklines": {name: [] for name in PROMETHEUS_SPARKLINES}},
+        }),
+        "grafana": _Snapshot("grafana", lambda: _grafana_status(), OVERVIEW_TTLS["grafana"], lambda: {
+            "url": None, "available": False, "dashboards": [],
             "dashboard_url": "http://localhost:3001/d/obrail-api-monitoring/obrail-api-monitoring",
-        },
-        "docker": _docker_status(),
-        "ci_cd": _github_actions_status(),
-        "db_totals": _db_totals(),
+        }),
+        "docker": _Snapshot("docker", lambda: run_in_threadpool(_docker_status), OVERVIEW_TTLS["docker"],
+                            lambda: {"available": False, "success": False, "services": [], "pending": True}),
+        "ci_cd": _Snapshot("ci_cd", lambda: _github_actions_status(), OVERVIEW_TTLS["ci_cd"],
+                           lambda: {"available": False, "source": "pending", "runs": []}),
+        "db_totals": _Snapshot("db_totals", lambda: run_in_threadpool(_db_totals), OVERVIEW_TTLS["db_totals"],
+                               lambda: {"pending": True}),
+        "reports": _Snapshot("reports", lambda: run_in_threadpool(_reports_summary), OVERVIEW_TTLS["reports"],
+                             lambda: {"quality": {}, "diagnostic": None}),
+    }
+
+
+OVERVIEW_SOURCES = _overview_sources()
+
+
+def reset_overview_snapshots():
+    """Vide les snapshots de /overview (tests)."""
+    for source in OVERVIEW_SOURCES.values():
+        source.reset()
+    PROMETHEUS.clear()
+
+
+async def _collect_overview(deadline_s):
+    """
+    Rafraîchit en parallèle les sources périmées et attend au plus
+    `deadline_s`. Les tâches non terminées continuent en arrière-plan et
+    alimenteront le snapshot des appels suivants.
+    """
+    refreshing = [source.refresh() for source in OVERVIEW_SOURCES.values() if not source.is_fresh()]
+    if refreshing:
+        await asyncio.wait(refreshing, timeout=deadline_s)
+    values = {
+        name: source.value if source.value is not None else source.placeholder()
+        for name, source in OVERVIEW_SOURCES.items()
+    }
+    statuses = {name: source.status() for name, source in OVERVIEW_SOURCES.items()}
+    return values, statuses
+
+
+def _latest_data_mtime(data_dir):
+    """Date de dernière modification des fichiers tabulaires de data/ (simples stat)."""
+    latest = None
+    for stage in ("raw", "processed", "warehouse"):
+        stage_dir = data_dir / stage
+        if not stage_dir.exists():
+            continue
+        for pattern in ("*.csv", "*.tsv"):
+            for file in stage_dir.rglob(pattern):
+                mtime = file.stat().st_mtime
+                latest = mtime if latest is None or mtime > latest else latest
+    return latest
+
+
+def _cached_diagnostics(audit_dir):
+    """Derniers rapports de diagnostic, signalés périmés si une donnée a changé depuis."""
+    data_modified = _latest_data_mtime(audit_dir.parent)
+    reports = {}
+    for name, filename in DIAGNOSTIC_FILES.items():
+        path = audit_dir / filename
+        if not path.exists():
+            reports[name] = {"available": False, "path": str(path), "report": None}
+            continue
+        generated = path.stat().st_mtime
+        reports[name] = {
+            "available": True,
+            "path": str(path),
+            "generated_at": datetime.fromtimestamp(generated).isoformat(timespec="seconds"),
+            "stale": data_modified is not None and data_modified > generated,
+            "report": _read_json(path),
+        }
+    return {
+        "data_modified_at": datetime.fromtimestamp(data_modified).isoformat(timespec="seconds") if data_modified else None,
         "reports": reports,
     }
 
 
+@router.get("/overview")
+async def get_internal_overview():
+    started = time.perf_counter()
+    values, sources = await _collect_overview(OVERVIEW_DEADLINE_MS / 1000)
+    return {
+        "generated_at": _now(),
+        "health": {"status": "ok", "checked_at": _now()},
+        "metrics": values["prometheus"]["metrics"],
+        "prometheus": values["prometheus"]["prometheus"],
+        "grafana": values["grafana"],
+        "docker": values["docker"],
+        "ci_cd": values["ci_cd"],
+        "db_totals": values["db_totals"],
+        "reports": values["reports"],
+        "sources": sources,
+        "overview_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+@router.get("/diagnostic")
+def get_diagnostic():
+    """Rapports de diagnostic en cache, sans relancer d'analyse."""
+    audit_dir = next((path for path in AUDIT_DIRS if path.exists()), AUDIT_DIRS[0])
+    return {"checked_at": _now(), **_cached_diagnostics(audit_dir)}
+
+
 @router.post("/diagnostic/run")
 def run_diagnostic():
     candidates = [
@@ -347,13 +566,22 @@ def run_diagnostic():
             "ran_at": _now(),
         }
 
-    result = _run_command([sys.executable, str(script)], cwd=str(script.parents[2]), timeout=60)
+    job, deduplicated = JOBS.submit(
+        "diagnostic",
+        [sys.executable, str(script)],
+        cwd=str(script.parents[2]),
+        timeout=DIAGNOSTIC_TIMEOUT,
+        on_finish=_diagnostic_result,
+    )
+    return _job_handle(job, deduplicated)
+
+
+def _diagnostic_result(job):
     report = _reports_summary().get("diagnostic")
-    if not report:
-        report = _quick_diagnostic_report(result.get("error") or result.get("stderr"))
-        result["fallback"] = "quick_diagnostic_report"
-    result["report"] = report
-    return result
+    if report:
+        return {"report": report}
+    reason = job.error or "\n".join(list(job.lines)[-20:])
+    return {"report": _quick_diagnostic_report(reason), "fallback": "quick_diagnostic_report"}
 
 
 @router.post("/tests/run")
@@ -368,19 +596,114 @@ def run_tests():
             "error": "Dossier de tests introuvable depuis l'API",
             "ran_at": _now(),
         }
-    return _run_command(
-        [
-            sys.executable,
-            "-m",
-            "pytest",
-            str(test_dir),
-            "-vv",
-            "-s",
-            "-rA",
-        ],
+    job, deduplicated = JOBS.submit(
+        "tests",
+        [sys.executable, "-m", "pytest", str(test_dir), "-vv", "-s", "-rA"],
         cwd=str(test_dir.parent),
-        timeout=240,
+        timeout=TESTS_TIMEOUT,
     )
+    return _job_handle(job, deduplicated)
+
+
+def _job_handle(job, deduplicated=False):
+    """Réponse immédiate d'un lancement : état de la tâche et URLs de suivi."""
+    return {
+        **job.to_dict(),
+        "ran_at": job.created_at,
+        "deduplicated": deduplicated,
+        "status_url": f"/api/internal/jobs/{job.id}",
+        "stream_url": f"/api/internal/jobs/{job.id}/stream",
+    }
+
+
+@router.get("/jobs")
+def list_jobs():
+    return {"jobs": JOBS.list()}
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Tache inconnue: {job_id}")
+    return job if isinstance(job, dict) else job.to_dict(output=True)
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Sortie d'une tâche en SSE, depuis sa première ligne conservée jusqu'à sa fin."""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Tache inconnue: {job_id}")
+
+    async def event_stream():
+        if isinstance(job, dict):
+            # Tâche terminée lors d'une exécution précédente de l'API : relecture
+            kind, status, returncode = job["kind"], job["status"], job["returncode"]
+            yield _sse_line("section_start", kind, f"=== {kind} ({job_id}) ===")
+            for line in job.get("output", []):
+                yield _sse_line("log", kind, line)
+        else:
+            kind, index = job.kind, 0
+            yield _sse_line("section_start", kind, f"=== {kind} ({job_id}) ===")
+            while True:
+                done = job.done
+                lines, index = job.lines_since(index)
+                for line in lines:
+                    yield _sse_line("log", kind, line)
+                if done:
+                    break
+                await asyncio.sleep(JOBS_STREAM_POLL)
+            status, returncode = job.status, job.returncode
+        yield _sse_line("section_end", kind, f"{kind}: {status} (code {returncode})")
+        yield _sse_line("done", kind, "Execution terminee")
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.post("/profile")
+async def profile_worker(
+    request: Request,
+    seconds: float = 10,
+    format: str = "collapsed",
+    route_prefix: Optional[str] = None,
+    interval_ms: float = profiler.PROFILER_INTERVAL_MS,
+    idle: bool = False,
+    x_profiler_token: Optional[str] = Header(default=None),
+):
+    """
+    Profile le worker courant par échantillonnage pendant `seconds` secondes
+    (bornées à PROFILER_MAX_SECONDS) et renvoie les piles repliées ou un
+    profil speedscope. Le trafic continue d'être servi pendant la mesure.
+    """
+    if not PROFILER_TOKEN:
+        raise HTTPException(status_code=404, detail="Profileur desactive (PROFILER_TOKEN non defini)")
+    if not x_profiler_token or not secrets.compare_digest(x_profiler_token, PROFILER_TOKEN):
+        raise HTTPException(status_code=401, detail="Jeton X-Profiler-Token invalide")
+    if format not in profiler.FORMATS:
+        raise HTTPException(status_code=422, detail=f"Format inconnu: {format} (attendu: {', '.join(profiler.FORMATS)})")
+
+    codes = None
+    if route_prefix:
+        codes = profiler.route_codes(request.app.routes, route_prefix)
+        if not codes:
+            raise HTTPException(status_code=404, detail=f"Aucune route ne commence par {route_prefix}")
+
+    try:
+        result = await run_in_threadpool(profiler.sample, seconds, interval_ms, codes, idle)
+    except profiler.ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    headers = {
+        "X-Profile-Samples": str(result.sample_count),
+        "X-Profile-Duration": f"{result.duration:.3f}",
+    }
+    if format == "speedscope":
+        headers["Content-Disposition"] = f'attachment; filename="profile-{stamp}.speedscope.json"'
+        return JSONResponse(result.speedscope(), headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="profile-{stamp}.collapsed.txt"'
+    return PlainTextResponse(result.collapsed(), headers=headers)
 
 
 def _sse_line(kind, category, text):
@@ -1,22 +1,37 @@
 # server/app/routers/night_trains.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Float, case, cast, func, select
 from typing import List, Optional
 from app.dependencies import get_db
 from app.models import FactsNightTrains, DimCountries, DimOperators, DimYears
+from app.responses import rows_response
 from app.schemas.trains import NightTrainResponse, NightTrainFilter, NightTrainSummary
+from app.services.aggregates import get_kpi_aggregates
 
 router = APIRouter()
 
 
-def _build_night_trains_query(db: Session, is_night: Optional[bool] = None):
-    query = db.query(
-        FactsNightTrains,
+def _build_night_trains_query(is_night: Optional[bool] = None):
+    """
+    Requête de base (select 2.0) partagée par les routes sync et async.
+    Les colonnes sont labellisées et typées comme NightTrainResponse :
+    chaque ligne se sérialise telle quelle, sans modèle Pydantic intermédiaire.
+    """
+    query = select(
+        FactsNightTrains.fact_id,
+        FactsNightTrains.route_id,
+        FactsNightTrains.night_train,
         DimCountries.country_name,
         DimCountries.country_code,
         DimOperators.operator_name,
-        DimYears.year
+        DimYears.year,
+        FactsNightTrains.is_night,
+        cast(FactsNightTrains.distance_km, Float).label("distance_km"),
+        cast(FactsNightTrains.duration_min, Float).label("duration_min"),
+        case((FactsNightTrains.is_night.is_(True), "night"), else_="day").label("train_type"),
+    ).select_from(
+        FactsNightTrains
     ).join(
         DimCountries, FactsNightTrains.country_id == DimCountries.country_id
     ).join(
@@ -31,6 +46,17 @@ def _build_night_trains_query(db: Session, is_night: Optional[bool] = None):
     return query
 
 
+def _apply_filters(query, country_code: Optional[str], operator_name: Optional[str], year: Optional[int]):
+    """Applique les filtres optionnels pays / opérateur / année."""
+    if country_code:
+        query = query.filter(DimCountries.country_code == country_code)
+    if operator_name:
+        query = query.filter(DimOperators.operator_name.ilike(f"%{operator_name}%"))
+    if year:
+        query = query.filter(DimYears.year == year)
+    return query
+
+
 def _apply_pagination(query, skip: int, limit: Optional[int]):
     """Applique offset et limit uniquement si limit est fourni."""
     query = query.offset(skip)
@@ -39,35 +65,17 @@ def _apply_pagination(query, skip: int, limit: Optional[int]):
     return query
 
 
-def _to_response(train, country_name, country_code, operator_name, year) -> NightTrainResponse:
-    return NightTrainResponse(
-        fact_id=train.fact_id,
-        route_id=train.route_id,
-        night_train=train.night_train,
-        country_name=country_name,
-        country_code=country_code,
-        operator_name=operator_name,
-        year=year,
-        is_night=train.is_night,
-        distance_km=float(train.distance_km) if train.distance_km is not None else None,
-        duration_min=float(train.duration_min) if train.duration_min is not None else None,
-        train_type="night" if train.is_night else "day",
-    )
-
-
 @router.get("/api/night-trains/summary", response_model=NightTrainSummary)
 def get_night_trains_summary(db: Session = Depends(get_db)):
     """
     Retourne le nombre total de trains, de trains de nuit et de trains de jour.
     """
-    total = db.query(FactsNightTrains).count()
-    total_night = db.query(FactsNightTrains).filter(FactsNightTrains.is_night.is_(True)).count()
-    total_day = db.query(FactsNightTrains).filter(FactsNightTrains.is_night.is_(False)).count()
+    totals = get_kpi_aggregates(db)
 
     return NightTrainSummary(
-        total_trains=total,
-        total_night_trains=total_night,
-        total_day_trains=total_day,
+        total_trains=totals["total_trains"],
+        total_night_trains=totals["total_night_trains"],
+        total_day_trains=totals["total_day_trains"],
     )
 
 
@@ -81,17 +89,10 @@ def get_all_night_trains(
     year: Optional[int] = None,
 ):
     """Récupère tous les trains (jour et nuit)."""
-    query = _build_night_trains_query(db, is_night=None)
+    query = _build_night_trains_query(is_night=None)
+    query = _apply_filters(query, country_code, operator_name, year)
 
-    if country_code:
-        query = query.filter(DimCountries.country_code == country_code)
-    if operator_name:
-        query = query.filter(DimOperators.operator_name.ilike(f"%{operator_name}%"))
-    if year:
-        query = query.filter(DimYears.year == year)
-
-    results = _apply_pagination(query, skip, limit).all()
-    return [_to_response(*row) for row in results]
+    return rows_response(db.execute(_apply_pagination(query, skip, limit)))
 
 
 @router.get("/api/night-trains/night", response_model=List[NightTrainResponse])
@@ -104,17 +105,10 @@ def get_night_trains_only(
     year: Optional[int] = None,
 ):
     """Récupère uniquement les trains de nuit (is_night = true)."""
-    query = _build_night_trains_query(db, is_night=True)
-
-    if country_code:
-        query = query.filter(DimCountries.country_code == country_code)
-    if operator_name:
-        query = query.filter(DimOperators.operator_name.ilike(f"%{operator_name}%"))
-    if year:
-        query = query.filter(DimYears.year == year)
+    query = _build_night_trains_query(is_night=True)
+    query = _apply_filters(query, country_code, operator_name, year)
 
-    results = _apply_pagination(query, skip, limit).all()
-    return [_to_response(*row) for row in results]
+    return rows_response(db.execute(_apply_pagination(query, skip, limit)))
 
 
 @router.get("/api/night-trains/day", response_model=List[NightTrainResponse])
@@ -127,17 +121,10 @@ def get_day_trains_only(
     year: Optional[int] = None,
 ):
     """Récupère uniquement les trains de jour (is_night = false)."""
-    query = _build_night_trains_query(db, is_night=False)
+    query = _build_night_trains_query(is_night=False)
+    query = _apply_filters(query, country_code, operator_name, year)
 
-    if country_code:
-        query = query.filter(DimCountries.country_code == country_code)
-    if operator_name:
-        query = query.filter(DimOperators.operator_name.ilike(f"%{operator_name}%"))
-    if year:
-        query = query.filter(DimYears.year == year)
-
-    results = _apply_pagination(query, skip, limit).all()
-    return [_to_response(*row) for row in results]
+    return rows_response(db.execute(_apply_pagination(query, skip, limit)))
 
 
 @router.get("/api/night-trains/by-operator/{operator_id}", response_model=List[NightTrainResponse])
@@ -150,11 +137,9 @@ def get_night_trains_by_operator(
     if not operator:
         raise HTTPException(status_code=404, detail="Opérateur non trouvé")
 
-    results = _build_night_trains_query(db, is_night=None).filter(
+    return rows_response(db.execute(_build_night_trains_query(is_night=None).filter(
         FactsNightTrains.operator_id == operator_id
-    ).all()
-
-    return [_to_response(*row) for row in results]
+    )))
 
 
 @router.get("/api/geographic/coverage")
@@ -11,17 +11,27 @@
 #   - Documentation Swagger/OpenAPI complète
 #   - Détection des valeurs négatives en régression (garde métier)
 #   - Avertissement si pays inconnu du référentiel
+#   - Cache des réponses (LRU + TTL, clé = entrée normalisée + version du modèle)
+#   - Projection multi-horizon (/regression/forecast) depuis facts_country_stats
+#   - Métriques Prometheus d'inférence (étapes, pays inconnus, distribution des prédictions)
 
 import logging
 import time
-from datetime import datetime
 from functools import lru_cache
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Request
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field, field_validator, model_validator
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.orm import Session
 
+from app.dependencies import get_db
+from app.models import DimCountries, DimYears, FactsCountryStats
+from app.services import inference_metrics, prediction_cache
+from ia.src.ml.predict import model_info as ml_model_info
 from ia.src.ml.predict import predict as ml_predict
+from ia.src.ml.predict import predict_batch as ml_predict_batch
 
 # ---------------------------------------------------------------------------
 # Configuration du logger
@@ -60,37 +70,16 @@ KNOWN_COUNTRIES = {
 # ---------------------------------------------------------------------------
 _model_cache: dict = {}
 
+# Taille maximale d'un lot /batch (41 pays × 23 années 2013–2035 ≈ 950 lignes)
+MAX_BATCH_SIZE = 5000
+
+# Horizon maximal de /regression/forecast (années projetées après la dernière observée)
+MAX_FORECAST_HORIZON = 15
+
 # Note : MODELS_DIR et DATA_ML_DIR ne sont PAS définis ici.
 # Leurs chemins sont résolus dans ia/src/ml/predict.py via ROOT = parents[3],
 # ce qui fonctionne quelle que soit la profondeur d'arborescence locale ou Docker.
-# Ce router délègue toute résolution de chemins au module ML.
-
-
-def _get_model_mtime(axis: str) -> str:
-    """
-    Retourne la date de modification du fichier modèle, ou 'inconnue'.
-    Utilise ia.src.ml.config pour résoudre les chemins de façon portable
-    (fonctionne en local ET dans Docker avec PYTHONPATH=/app).
-    """
-    try:
-        from ia.src.ml.config import MODELS_DIR
-        candidates = {
-            "classification": [
-                MODELS_DIR / "xgboost_optimized_clf.joblib",
-                MODELS_DIR / "xgboost_clf.joblib",
-            ],
-            "regression": [
-                MODELS_DIR / "ridge_optimized_reg.joblib",
-                MODELS_DIR / "ridge_reg.joblib",
-            ],
-        }
-        for path in candidates.get(axis, []):
-            if path.exists():
-                mtime = datetime.fromtimestamp(path.stat().st_mtime)
-                return mtime.strftime("%Y-%m-%d")
-    except Exception:
-        pass
-    return "inconnue"
+# Ce router délègue toute résolution de chemins et de versions (registre) au module ML.
 
 
 def _get_cached_prediction(axis: str, **kwargs) -> dict:
@@ -194,6 +183,17 @@ class PredictionInput(BaseModel):
     }
 
 
+class BatchPredictionInput(BaseModel):
+    """Lot de prédictions scorées en un seul appel au modèle."""
+
+    items: list[PredictionInput] = Field(
+        ...,
+        description=f"Lignes à scorer (1 à {MAX_BATCH_SIZE}), chacune validée comme une requête unitaire.",
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Schémas Pydantic — Réponses
 # ---------------------------------------------------------------------------
@@ -202,7 +202,8 @@ class ModelMetadata(BaseModel):
     """Métadonnées du modèle utilisé pour la prédiction."""
     model_name: str = Field(description="Identifiant du modèle ML utilisé.")
     model_type: str = Field(description="Famille algorithmique (ex: XGBoost, Ridge).")
-    training_date: str = Field(description="Date de dernière modification du fichier modèle.")
+    model_version: str = Field(description="Version du modèle ayant produit la prédiction (registre ou fichier).")
+    training_date: str = Field(description="Date d'entraînement du modèle (AAAA-MM-JJ).")
     axis: str = Field(description="Axe de prédiction : classification ou regression.")
 
 
@@ -307,6 +308,55 @@ class RegressionResponse(BaseModel):
     inference_ms: float = Field(description="Temps d'inférence en millisecondes.")
 
 
+class ClassificationBatchResponse(BaseModel):
+    """Réponse de /classification/batch : une ClassificationResponse par ligne, dans l'ordre."""
+    count: int = Field(description="Nombre de prédictions du lot.")
+    items: list[ClassificationResponse]
+    inference_ms: float = Field(description="Temps d'inférence total du lot en millisecondes.")
+
+
+class RegressionBatchResponse(BaseModel):
+    """Réponse de /regression/batch : une RegressionResponse par ligne, dans l'ordre."""
+    count: int = Field(description="Nombre de prévisions du lot.")
+    items: list[RegressionResponse]
+    inference_ms: float = Field(description="Temps d'inférence total du lot en millisecondes.")
+
+
+class ForecastPoint(BaseModel):
+    """Une année projetée de la trajectoire d'un pays."""
+    year: int = Field(description="Année projetée.")
+    prediction_raw: float = Field(description="Valeur brute prédite (milliers de passagers).")
+    prediction_valid: bool = Field(description="Indique si la prédiction est dans une plage métier réaliste (>= 0).")
+    trend_vs_previous: Optional[float] = Field(
+        default=None,
+        description="Variation par rapport à l'année précédente (observée ou projetée), en pourcentage.",
+    )
+
+
+class CountryForecast(BaseModel):
+    """Trajectoire projetée d'un pays à partir de ses deux dernières années observées."""
+    country: str = Field(description="Pays projeté.")
+    country_code: str = Field(description="Code pays (dim_countries).")
+    last_observed_year: int = Field(description="Dernière année observée dans facts_country_stats.")
+    last_observed_passengers: float = Field(description="Passagers observés cette année-là (milliers).")
+    trajectory: list[ForecastPoint]
+    warnings: list[str] = Field(default=[], description="Avertissements éventuels (pays inconnu, valeur négative).")
+
+
+class RegressionForecastResponse(BaseModel):
+    """Réponse de /regression/forecast : une trajectoire par pays."""
+    horizon: int = Field(description="Nombre d'années projetées par pays.")
+    count: int = Field(description="Nombre de pays projetés.")
+    countries: list[CountryForecast]
+    skipped: list[str] = Field(
+        default=[],
+        description="Pays ignorés faute de deux années observées (passengers_lag2 indisponible).",
+    )
+    assumptions: str = Field(description="Hypothèses de la projection récursive.")
+    metadata: ModelMetadata
+    inference_ms: float = Field(description="Temps d'inférence cumulé (un appel vectorisé par année projetée).")
+
+
 # ---------------------------------------------------------------------------
 # Fonctions d'enrichissement des réponses
 # ---------------------------------------------------------------------------
@@ -440,67 +490,31 @@ def _compute_trend(prediction: float, lag1: float, lag2: float) -> tuple[Optiona
     return trend_vs_lag1, trend_vs_lag2, label
 
 
-# ---------------------------------------------------------------------------
-# Endpoints
-# ---------------------------------------------------------------------------
-
-@router.post(
-    "/classification",
-    response_model=ClassificationResponse,
-    summary="Détecter un déclin ferroviaire",
-    description="""
-Prédit si le réseau ferroviaire d'un pays européen est **en déclin** ou **en croissance**
-pour une année donnée, en s'appuyant sur un modèle **XGBoost optimisé**
-(F1-Score = 0.63, ROC-AUC = 0.83, entraîné sur 436 observations, 41 pays, 2012–2024).
-
-### Variables utilisées par le modèle
-- `passengers_lag1` / `passengers_lag2` : dynamique historique de fréquentation
-- `co2_per_passenger` / `co2_lag1` : efficacité environnementale
-- `year` : tendance temporelle globale
-- `country` : contexte national (encodé via One-Hot Encoding)
-
-### Définition du déclin
-Un pays est classé **en déclin** si sa fréquentation prédite est inférieure
-à celle de l'année N-2 (seuil objectif, sans règle arbitraire).
-
-### Cas d'usage
-- Identification des zones de sous-desserte ferroviaire
-- Aide à la décision pour les institutions européennes (TEN-T, Green Deal)
-- Priorisation des investissements opérateurs (SNCF, DB, ÖBB...)
-    """,
-    responses={
-        200: {"description": "Prédiction réussie avec analyse complète."},
-        422: {"description": "Données d'entrée invalides (validation Pydantic)."},
-        503: {"description": "Modèle ML non disponible (fichier .joblib absent)."},
-        500: {"description": "Erreur interne du serveur."},
-    },
-)
-def predict_classification(data: PredictionInput, request: Request):
-    warnings: list[str] = []
-
-    # Vérification pays connu
-    if data.country not in KNOWN_COUNTRIES:
-        warnings.append(
-            f"Le pays '{data.country}' n'a pas été vu lors de l'entraînement du modèle. "
+def _unknown_country_warnings(country: str, axis: str) -> list[str]:
+    """Avertissement si le pays n'appartient pas au référentiel d'entraînement."""
+    if country in KNOWN_COUNTRIES:
+        return []
+    if axis == "classification":
+        message = (
+            f"Le pays '{country}' n'a pas été vu lors de l'entraînement du modèle. "
             "Les colonnes One-Hot Encoding correspondantes seront nulles — "
             "la prédiction reste possible mais sa fiabilité est réduite."
         )
-        logger.warning(f"Pays inconnu soumis à la classification : {data.country}")
-
-    try:
-        raw = _get_cached_prediction(
-            axis="classification",
-            country=data.country,
-            year=data.year,
-            co2_emissions=data.co2_emissions,
-            co2_per_passenger=data.co2_per_passenger,
-            co2_lag1=data.co2_lag1,
-            passengers_lag1=data.passengers_lag1,
-            passengers_lag2=data.passengers_lag2,
+    else:
+        message = (
+            f"Le pays '{country}' n'a pas été vu lors de l'entraînement. "
+            "La prédiction est extrapolée à partir des effets des autres pays — fiabilité réduite."
         )
-    except FileNotFoundError as e:
-        logger.error(f"Modèle classification introuvable : {e}")
-        raise HTTPException(
+    logger.warning(f"Pays inconnu soumis à la {axis} : {country}")
+    inference_metrics.count_unknown_country(axis)
+    return [message]
+
+
+def _inference_error(axis: str, e: Exception) -> HTTPException:
+    """Traduit une erreur d'inférence en HTTPException (503 si modèle absent, sinon 500)."""
+    if isinstance(e, FileNotFoundError):
+        logger.error(f"Modèle {axis} introuvable : {e}")
+        return HTTPException(
             status_code=503,
             detail={
                 "error": "Modèle non disponible",
@@ -508,18 +522,21 @@ def predict_classification(data: PredictionInput, request: Request):
                 "resolution": "Lancez d'abord run_training.py pour entraîner et sauvegarder les modèles.",
             },
         )
-    except Exception as e:
-        logger.exception(f"Erreur inattendue lors de la prédiction classification : {e}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Erreur interne",
-                "message": "Une erreur inattendue s'est produite lors de la prédiction.",
-            },
-        )
+    logger.exception(f"Erreur inattendue lors de la prédiction {axis} : {e}")
+    return HTTPException(
+        status_code=500,
+        detail={
+            "error": "Erreur interne",
+            "message": "Une erreur inattendue s'est produite lors de la prédiction.",
+        },
+    )
 
+
+def _build_classification_response(data: PredictionInput, raw: dict, warnings: list[str]) -> ClassificationResponse:
+    """Enrichit une prédiction brute de classification (risque, messages, drivers)."""
     prediction = int(raw["prediction"])
-    probability = float(raw.get("probability", 0.5))
+    probability = raw.get("probability")
+    probability = float(probability if probability is not None else 0.5)
     confidence_score = round(abs(probability - 0.5) * 200, 1)  # 0–100%
     risk_level, risk_description = _build_risk_level(probability)
 
@@ -538,12 +555,6 @@ def predict_classification(data: PredictionInput, request: Request):
             f"dans le cadre du programme TEN-T et du Green Deal européen."
         )
 
-    logger.info(
-        f"[CLF] {data.country} {data.year} → pred={prediction} | "
-        f"proba={probability:.3f} | confiance={confidence_score:.1f}% | "
-        f"risque={risk_level} | {raw['inference_ms']}ms"
-    )
-
     return ClassificationResponse(
         country=data.country,
         year=data.year,
@@ -563,87 +574,16 @@ def predict_classification(data: PredictionInput, request: Request):
         metadata=ModelMetadata(
             model_name="XGBoost Classifier (optimisé RandomizedSearchCV)",
             model_type="Gradient Boosting — XGBoost",
-            training_date=_get_model_mtime("classification"),
+            model_version=raw["model_version"],
+            training_date=raw["model_trained_at"][:10],
             axis="classification",
         ),
         inference_ms=raw["inference_ms"],
     )
 
 
-@router.post(
-    "/regression",
-    response_model=RegressionResponse,
-    summary="Prévoir le volume de passagers ferroviaires",
-    description="""
-Prédit le **volume de passagers ferroviaires** d'un pays européen pour une année donnée,
-en s'appuyant sur un modèle **Ridge (régression linéaire régularisée)**
-(R² = 0.996, MAE = 4 339 k passagers, entraîné sur 436 observations).
-
-### Pourquoi Ridge ?
-Ridge surpasse XGBoost et Random Forest sur ce dataset car la relation entre
-les lags de passagers et la cible est quasi-linéaire (forte autocorrélation temporelle).
-Le modèle explique 99.6% de la variance observée.
-
-### Variables utilisées par le modèle
-- `passengers_lag1` / `passengers_lag2` : signal principal (autocorrélation temporelle)
-- `co2_per_passenger` / `co2_lag1` : efficacité environnementale
-- `year` : tendance structurelle long terme
-- `country` : effet pays (encodé via One-Hot Encoding)
-
-### Cas d'usage
-- Planification des capacités ferroviaires à horizon 1–3 ans
-- Évaluation de l'impact environnemental futur (émissions CO₂)
-- Alimentation des tableaux de bord des institutions européennes
-    """,
-    responses={
-        200: {"description": "Prévision réussie avec analyse de tendance complète."},
-        422: {"description": "Données d'entrée invalides (validation Pydantic)."},
-        503: {"description": "Modèle ML non disponible (fichier .joblib absent)."},
-        500: {"description": "Erreur interne du serveur."},
-    },
-)
-def predict_regression(data: PredictionInput, request: Request):
-    warnings: list[str] = []
-
-    # Vérification pays connu
-    if data.country not in KNOWN_COUNTRIES:
-        warnings.append(
-            f"Le pays '{data.country}' n'a pas été vu lors de l'entraînement. "
-            "La prédiction est extrapolée à partir des effets des autres pays — fiabilité réduite."
-        )
-        logger.warning(f"Pays inconnu soumis à la régression : {data.country}")
-
-    try:
-        raw = _get_cached_prediction(
-            axis="regression",
-            country=data.country,
-            year=data.year,
-            co2_emissions=data.co2_emissions,
-            co2_per_passenger=data.co2_per_passenger,
-            co2_lag1=data.co2_lag1,
-            passengers_lag1=data.passengers_lag1,
-            passengers_lag2=data.passengers_lag2,
-        )
-    except FileNotFoundError as e:
-        logger.error(f"Modèle régression introuvable : {e}")
-        raise HTTPException(
-            status_code=503,
-            detail={
-                "error": "Modèle non disponible",
-                "message": str(e),
-                "resolution": "Lancez d'abord run_training.py pour entraîner et sauvegarder les modèles.",
-            },
-        )
-    except Exception as e:
-        logger.exception(f"Erreur inattendue lors de la prédiction régression : {e}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "error": "Erreur interne",
-                "message": "Une erreur inattendue s'est produite lors de la prédiction.",
-            },
-        )
-
+def _build_regression_response(data: PredictionInput, raw: dict, warnings: list[str]) -> RegressionResponse:
+    """Enrichit une prédiction brute de régression (tendance, garde métier, drivers)."""
     prediction_raw = float(raw["prediction"])
     prediction_valid = prediction_raw >= 0
 
@@ -691,11 +631,6 @@ def predict_regression(data: PredictionInput, request: Request):
             f"({display_value:,.0f} k passagers, {trend_vs_lag1:+.1f}% vs année précédente)."
         )
 
-    logger.info(
-        f"[REG] {data.country} {data.year} → pred={prediction_raw:.0f} | "
-        f"tendance={trend_label} | Δlag1={trend_vs_lag1}% | {raw['inference_ms']}ms"
-    )
-
     return RegressionResponse(
         country=data.country,
         year=data.year,
@@ -719,8 +654,493 @@ def predict_regression(data: PredictionInput, request: Request):
         metadata=ModelMetadata(
             model_name="Ridge Regression (baseline — meilleure performance)",
             model_type="Régression linéaire régularisée L2 — scikit-learn",
-            training_date=_get_model_mtime("regression"),
+            model_version=raw["model_version"],
+            training_date=raw["model_trained_at"][:10],
             axis="regression",
         ),
         inference_ms=raw["inference_ms"],
-    )
\ No newline at end of file
+    )
+
+
+def _predict_batch(axis: str, items: list[PredictionInput]) -> tuple[list[dict], float]:
+    """
+    Score un lot en un seul appel vectorisé (un transform + un predict).
+    Le temps d'inférence total est réparti sur chaque ligne.
+    """
+    start = time.perf_counter()
+    raws = ml_predict_batch(axis, [item.model_dump() for item in items])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    per_row_ms = round(elapsed_ms / len(items), 3)
+    for raw in raws:
+        raw["inference_ms"] = per_row_ms
+    return raws, round(elapsed_ms, 1)
+
+
+def _served_version(axis: str) -> str:
+    try:
+        return ml_model_info(axis)["version"]
+    except Exception as e:
+        raise _inference_error(axis, e)
+
+
+def _cached_single(axis: str, data: PredictionInput, response: Response, compute, response_cls):
+    """
+    Sert une prédiction unitaire depuis le cache (clé = entrée normalisée +
+    version du modèle), sinon la calcule et la stocke.
+    """
+    payload = data.model_dump()
+    cached = prediction_cache.lookup(axis, prediction_cache.make_key(axis, _served_version(axis), payload))
+    if cached is not None:
+        response.headers["X-Prediction-Cache"] = "hit"
+        return response_cls(**cached)
+
+    start = time.perf_counter()
+    result = compute(data)
+    compute_ms = (time.perf_counter() - start) * 1000
+    prediction_cache.store(
+        prediction_cache.make_key(axis, result.metadata.model_version, payload),
+        result.model_dump(), compute_ms,
+    )
+    response.headers["X-Prediction-Cache"] = "miss"
+    return result
+
+
+def _cached_batch(axis: str, items: list[PredictionInput], response: Response, compute_batch):
+    """
+    Version lot : seules les lignes absentes du cache sont scorées (en un appel).
+    Retourne (réponses dans l'ordre des lignes, temps d'inférence du lot calculé).
+    """
+    version = _served_version(axis)
+    payloads = [item.model_dump() for item in items]
+    results = [prediction_cache.lookup(axis, prediction_cache.make_key(axis, version, p)) for p in payloads]
+    missing = [i for i, r in enumerate(results) if r is None]
+    elapsed_ms = 0.0
+
+    if missing:
+        start = time.perf_counter()
+        computed, elapsed_ms = compute_batch([items[i] for i in missing])
+        per_row_ms = (time.perf_counter() - start) * 1000 / len(missing)
+        for i, result in zip(missing, computed):
+            prediction_cache.store(
+                prediction_cache.make_key(axis, result.metadata.model_version, payloads[i]),
+                result.model_dump(), per_row_ms,
+            )
+            results[i] = result
+
+    response.headers["X-Prediction-Cache"] = f"hits={len(items) - len(missing)};misses={len(missing)}"
+    return results, elapsed_ms
+
+
+# ---------------------------------------------------------------------------
+# Projection multi-horizon
+# ---------------------------------------------------------------------------
+
+def _last_observations(db: Session, country: Optional[str]) -> list:
+    """Deux dernières années observées par pays (ordre pays, année croissante)."""
+    ranked = select(
+        DimCountries.country_name,
+        DimCountries.country_code,
+        DimYears.year,
+        cast(FactsCountryStats.passengers, Float).label("passengers"),
+        cast(FactsCountryStats.co2_emissions, Float).label("co2_emissions"),
+        cast(FactsCountryStats.co2_per_passenger, Float).label("co2_per_passenger"),
+        func.row_number().over(
+            partition_by=FactsCountryStats.country_id,
+            order_by=DimYears.year.desc(),
+        ).label("rank"),
+    ).select_from(
+        FactsCountryStats
+    ).join(
+        DimCountries, FactsCountryStats.country_id == DimCountries.country_id
+    ).join(
+        DimYears, FactsCountryStats.year_id == DimYears.year_id
+    )
+    if country is not None:
+        ranked = ranked.where(DimCountries.country_name == country)
+    ranked = ranked.subquery()
+
+    query = select(ranked).where(ranked.c.rank <= 2).order_by(ranked.c.country_name, ranked.c.year)
+    return db.execute(query).all()
+
+
+def _forecast_trajectories(observations: list, horizon: int) -> tuple[list[dict], list[str], list[dict], np.ndarray, float]:
+    """
+    Projection récursive : à chaque pas, une ligne par pays scorée en un seul
+    appel ml_predict_batch ; la prédiction devient passengers_lag1 du pas
+    suivant et l'ancien lag1 devient lag2. Les émissions CO₂ sont maintenues
+    à leur dernier niveau observé (pas de projection CO₂ disponible).
+
+    Retourne (états initiaux par pays, pays ignorés, sorties brutes du dernier
+    pas, matrice pays × horizon des prédictions, temps d'inférence en ms).
+    """
+    by_country: dict[str, list] = {}
+    for row in observations:
+        by_country.setdefault(row.country_name, []).append(row)
+
+    states, skipped = [], []
+    for name, rows in by_country.items():
+        if len(rows) < 2:
+            skipped.append(name)
+            continue
+        prev, last = rows
+        states.append({
+            "country": name,
+            "country_code": last.country_code,
+            "year": last.year,
+            "passengers": last.passengers,
+            "co2_emissions": last.co2_emissions,
+            "co2_per_passenger": last.co2_per_passenger,
+            "passengers_lag2": prev.passengers,
+        })
+    if not states:
+        return [], skipped, [], np.empty((0, 0)), 0.0
+
+    lag1 = np.array([s["passengers"] for s in states], dtype=np.float64)
+    lag2 = np.array([s["passengers_lag2"] for s in states], dtype=np.float64)
+    predictions = np.empty((len(states), horizon), dtype=np.float64)
+    raws: list[dict] = []
+    elapsed_ms = 0.0
+
+    for step in range(horizon):
+        rows = [
+            {
+                "country": s["country"],
+                "year": s["year"] + step + 1,
+                "co2_emissions": s["co2_emissions"],
+                "co2_per_passenger": s["co2_per_passenger"],
+                "co2_lag1": s["co2_emissions"],
+                "passengers_lag1": float(l1),
+                "passengers_lag2": float(l2),
+            }
+            for s, l1, l2 in zip(states, lag1, lag2)
+        ]
+        start = time.perf_counter()
+        raws = ml_predict_batch("regression", rows)
+        elapsed_ms += (time.perf_counter() - start) * 1000
+        predictions[:, step] = [raw["prediction"] for raw in raws]
+        # Une valeur négative (hors distribution) n'est pas réinjectée telle quelle
+        lag1, lag2 = np.maximum(predictions[:, step], 0.0), lag1
+
+    return states, skipped, raws, predictions, elapsed_ms
+
+
+def _build_country_forecast(state: dict, predictions: np.ndarray) -> CountryForecast:
+    warnings = _unknown_country_warnings(state["country"], "regression")
+    previous = np.concatenate(([state["passengers"]], np.maximum(predictions[:-1], 0.0)))
+    trajectory = []
+    for step, (value, before) in enumerate(zip(predictions, previous), start=1):
+        trajectory.append(ForecastPoint(
+            year=state["year"] + step,
+            prediction_raw=round(float(value), 2),
+            prediction_valid=bool(value >= 0),
+            trend_vs_previous=round(float((value - before) / before * 100), 2) if before > 0 else None,
+        ))
+    invalid = [p.year for p in trajectory if not p.prediction_valid]
+    if invalid:
+        warnings.append(
+            f"Valeurs négatives projetées pour {invalid} : ramenées à 0 pour les années suivantes. "
+            "La trajectoire sort de la distribution d'entraînement, à utiliser avec précaution."
+        )
+    return CountryForecast(
+        country=state["country"],
+        country_code=state["country_code"],
+        last_observed_year=state["year"],
+        last_observed_passengers=round(state["passengers"], 2),
+        trajectory=trajectory,
+        warnings=warnings,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Calcul des réponses (hors cache)
+# ---------------------------------------------------------------------------
+
+def _compute_classification(data: PredictionInput) -> ClassificationResponse:
+    warnings = _unknown_country_warnings(data.country, "classification")
+
+    try:
+        raw = _get_cached_prediction(axis="classification", **data.model_dump())
+    except Exception as e:
+        raise _inference_error("classification", e)
+
+    inference_metrics.observe_predictions("classification", [raw])
+    start = time.perf_counter()
+    response = _build_classification_response(data, raw, warnings)
+    inference_metrics.observe_stage("classification", "response", time.perf_counter() - start)
+
+    logger.info(
+        f"[CLF] {data.country} {data.year} → pred={response.prediction} | "
+        f"proba={response.probability_decline:.3f} | confiance={response.confidence_score:.1f}% | "
+        f"risque={response.risk_level} | {raw['inference_ms']}ms"
+    )
+    return response
+
+
+def _compute_regression(data: PredictionInput) -> RegressionResponse:
+    warnings = _unknown_country_warnings(data.country, "regression")
+
+    try:
+        raw = _get_cached_prediction(axis="regression", **data.model_dump())
+    except Exception as e:
+        raise _inference_error("regression", e)
+
+    inference_metrics.observe_predictions("regression", [raw])
+    start = time.perf_counter()
+    response = _build_regression_response(data, raw, warnings)
+    inference_metrics.observe_stage("regression", "response", time.perf_counter() - start)
+
+    logger.info(
+        f"[REG] {data.country} {data.year} → pred={response.prediction_raw:.0f} | "
+        f"tendance={response.trend_label} | Δlag1={response.trend_vs_lag1}% | {raw['inference_ms']}ms"
+    )
+    return response
+
+
+def _compute_classification_batch(items: list[PredictionInput]) -> tuple[list[ClassificationResponse], float]:
+    warnings = [_unknown_country_warnings(item.country, "classification") for item in items]
+
+    try:
+        raws, elapsed_ms = _predict_batch("classification", items)
+    except Exception as e:
+        raise _inference_error("classification", e)
+
+    inference_metrics.observe_predictions("classification", raws)
+    start = time.perf_counter()
+    responses = [
+        _build_classification_response(item, raw, item_warnings)
+        for item, raw, item_warnings in zip(items, raws, warnings)
+    ]
+    inference_metrics.observe_stage("classification", "response", time.perf_counter() - start)
+    return responses, elapsed_ms
+
+
+def _compute_regression_batch(items: list[PredictionInput]) -> tuple[list[RegressionResponse], float]:
+    warnings = [_unknown_country_warnings(item.country, "regression") for item in items]
+
+    try:
+        raws, elapsed_ms = _predict_batch("regression", items)
+    except Exception as e:
+        raise _inference_error("regression", e)
+
+    inference_metrics.observe_predictions("regression", raws)
+    start = time.perf_counter()
+    responses = [
+        _build_regression_response(item, raw, item_warnings)
+        for item, raw, item_warnings in zip(items, raws, warnings)
+    ]
+    inference_metrics.observe_stage("regression", "response", time.perf_counter() - start)
+    return responses, elapsed_ms
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+@router.post(
+    "/classification",
+    response_model=ClassificationResponse,
+    summary="Détecter un déclin ferroviaire",
+    description="""
+Prédit si le réseau ferroviaire d'un pays européen est **en déclin** ou **en croissance**
+pour une année donnée, en s'appuyant sur un modèle **XGBoost optimisé**
+(F1-Score = 0.63, ROC-AUC = 0.83, entraîné sur 436 observations, 41 pays, 2012–2024).
+
+### Variables utilisées par le modèle
+- `passengers_lag1` / `passengers_lag2` : dynamique historique de fréquentation
+- `co2_per_passenger` / `co2_lag1` : efficacité environnementale
+- `year` : tendance temporelle globale
+- `country` : contexte national (encodé via One-Hot Encoding)
+
+### Définition du déclin
+Un pays est classé **en déclin** si sa fréquentation prédite est inférieure
+à celle de l'année N-2 (seuil objectif, sans règle arbitraire).
+
+### Cas d'usage
+- Identification des zones de sous-desserte ferroviaire
+- Aide à la décision pour les institutions européennes (TEN-T, Green Deal)
+- Priorisation des investissements opérateurs (SNCF, DB, ÖBB...)
+    """,
+    responses={
+        200: {"description": "Prédiction réussie avec analyse complète."},
+        422: {"description": "Données d'entrée invalides (validation Pydantic)."},
+        503: {"description": "Modèle ML non disponible (fichier .joblib absent)."},
+        500: {"description": "Erreur interne du serveur."},
+    },
+)
+def predict_classification(data: PredictionInput, request: Request, response: Response):
+    return _cached_single("classification", data, response, _compute_classification, ClassificationResponse)
+
+
+
+@router.post(
+    "/regression",
+    response_model=RegressionResponse,
+    summary="Prévoir le volume de passagers ferroviaires",
+    description="""
+Prédit le **volume de passagers ferroviaires** d'un pays européen pour une année donnée,
+en s'appuyant sur un modèle **Ridge (régression linéaire régularisée)**
+(R² = 0.996, MAE = 4 339 k passagers, entraîné sur 436 observations).
+
+### Pourquoi Ridge ?
+Ridge surpasse XGBoost et Random Forest sur ce dataset car la relation entre
+les lags de passagers et la cible est quasi-linéaire (forte autocorrélation temporelle).
+Le modèle explique 99.6% de la variance observée.
+
+### Variables utilisées par le modèle
+- `passengers_lag1` / `passengers_lag2` : signal principal (autocorrélation temporelle)
+- `co2_per_passenger` / `co2_lag1` : efficacité environnementale
+- `year` : tendance structurelle long terme
+- `country` : effet pays (encodé via One-Hot Encoding)
+
+### Cas d'usage
+- Planification des capacités ferroviaires à horizon 1–3 ans
+- Évaluation de l'impact environnemental futur (émissions CO₂)
+- Alimentation des tableaux de bord des institutions européennes
+    """,
+    responses={
+        200: {"description": "Prévision réussie avec analyse de tendance complète."},
+        422: {"description": "Données d'entrée invalides (validation Pydantic)."},
+        503: {"description": "Modèle ML non disponible (fichier .joblib absent)."},
+        500: {"description": "Erreur interne du serveur."},
+    },
+)
+def predict_regression(data: PredictionInput, request: Request, response: Response):
+    return _cached_single("regression", data, response, _compute_regression, RegressionResponse)
+
+
+
+@router.post(
+    "/classification/batch",
+    response_model=ClassificationBatchResponse,
+    summary="Détecter un déclin ferroviaire sur un lot de pays/années",
+    description=f"""
+Version lot de `/api/predict/classification` : jusqu'à **{MAX_BATCH_SIZE} lignes** par requête,
+scorées en **un seul appel** au preprocesseur et au modèle XGBoost.
+
+Chaque élément de `items` est validé comme une requête unitaire ; la réponse
+contient, dans le même ordre, exactement les mêmes champs (risque, drivers,
+avertissements) que l'endpoint unitaire. `inference_ms` d'un élément est
+le temps d'inférence du lot réparti sur ses lignes.
+
+Les lignes déjà calculées (même entrée, même version de modèle) sont servies
+depuis le cache de prédiction ; seules les autres sont scorées. L'en-tête
+`X-Prediction-Cache` indique le nombre de hits / misses.
+
+### Cas d'usage
+- Scorer tous les pays pour toutes les années (2013–2035) en une requête
+- Alimenter les grilles de scénarios des tableaux de bord
+    """,
+    responses={
+        200: {"description": "Prédictions réussies pour tout le lot."},
+        422: {"description": "Au moins une ligne invalide (validation Pydantic), ou lot vide / trop grand."},
+        503: {"description": "Modèle ML non disponible (fichier .joblib absent)."},
+        500: {"description": "Erreur interne du serveur."},
+    },
+)
+def predict_classification_batch(data: BatchPredictionInput, request: Request, response: Response):
+    items, elapsed_ms = _cached_batch("classification", data.items, response, _compute_classification_batch)
+
+    logger.info(f"[CLF] lot de {len(items)} prédictions | {elapsed_ms}ms")
+    return ClassificationBatchResponse(count=len(items), items=items, inference_ms=elapsed_ms)
+
+
+@router.post(
+    "/regression/batch",
+    response_model=RegressionBatchResponse,
+    summary="Prévoir le volume de passagers sur un lot de pays/années",
+    description=f"""
+Version lot de `/api/predict/regression` : jusqu'à **{MAX_BATCH_SIZE} lignes** par requête,
+scorées en **un seul appel** au preprocesseur et au modèle Ridge.
+
+Chaque élément de `items` est validé comme une requête unitaire ; la réponse
+contient, dans le même ordre, exactement les mêmes champs (tendance, drivers,
+avertissements) que l'endpoint unitaire. `inference_ms` d'un élément est
+le temps d'inférence du lot réparti sur ses lignes.
+    """,
+    responses={
+        200: {"description": "Prévisions réussies pour tout le lot."},
+        422: {"description": "Au moins une ligne invalide (validation Pydantic), ou lot vide / trop grand."},
+        503: {"description": "Modèle ML non disponible (fichier .joblib absent)."},
+        500: {"description": "Erreur interne du serveur."},
+    },
+)
+def predict_regression_batch(data: BatchPredictionInput, request: Request, response: Response):
+    items, elapsed_ms = _cached_batch("regression", data.items, response, _compute_regression_batch)
+
+    logger.info(f"[REG] lot de {len(items)} prévisions | {elapsed_ms}ms")
+    return RegressionBatchResponse(count=len(items), items=items, inference_ms=elapsed_ms)
+
+
+@router.get(
+    "/regression/forecast",
+    response_model=RegressionForecastResponse,
+    summary="Projeter la fréquentation ferroviaire sur plusieurs années",
+    description=f"""
+Projette le **volume de passagers** d'un pays (ou de tous les pays si `country`
+est omis) sur `horizon` années (1 à {MAX_FORECAST_HORIZON}) après la dernière année observée.
+
+Les lags de départ sont lus dans `facts_country_stats` (deux dernières années
+observées par pays). La projection est **récursive** : la prévision de l'année N
+sert de `passengers_lag1` à l'année N+1. Chaque année projetée est scorée en
+**un seul appel vectorisé** pour tous les pays (42 pays × 10 ans = 10 appels).
+
+### Hypothèses
+- `co2_emissions`, `co2_per_passenger` et `co2_lag1` maintenus au dernier niveau observé
+- L'erreur du modèle se cumule avec l'horizon : à lire comme une tendance, pas une valeur exacte
+    """,
+    responses={
+        200: {"description": "Trajectoires projetées."},
+        404: {"description": "Pays absent de facts_country_stats."},
+        422: {"description": "Horizon hors bornes."},
+        503: {"description": "Modèle ML non disponible (fichier .joblib absent)."},
+        500: {"description": "Erreur interne du serveur."},
+    },
+)
+def forecast_regression(
+    country: Optional[str] = Query(None, description="Pays à projeter (tous les pays si omis).", examples=["France"]),
+    horizon: int = Query(10, ge=1, le=MAX_FORECAST_HORIZON, description="Nombre d'années projetées."),
+    db: Session = Depends(get_db),
+):
+    country = country.strip() if country else None
+    observations = _last_observations(db, country)
+    if country is not None and not observations:
+        raise HTTPException(status_code=404, detail=f"Aucune statistique pour le pays '{country}'.")
+
+    try:
+        states, skipped, raws, predictions, elapsed_ms = _forecast_trajectories(observations, horizon)
+    except Exception as e:
+        raise _inference_error("regression", e)
+
+    if not states:
+        raise HTTPException(
+            status_code=404,
+            detail="Aucun pays ne dispose de deux années observées pour initialiser la projection.",
+        )
+
+    # Projections (lags simulés) hors distribution des prédictions : seules
+    # les prédictions demandées en single / batch y sont comptées
+    start = time.perf_counter()
+    countries = [_build_country_forecast(state, predictions[i]) for i, state in enumerate(states)]
+    inference_metrics.observe_stage("regression", "response", time.perf_counter() - start)
+    elapsed_ms = round(elapsed_ms, 1)
+
+    logger.info(f"[REG] projection {len(countries)} pays × {horizon} ans | {elapsed_ms}ms")
+    return RegressionForecastResponse(
+        horizon=horizon,
+        count=len(countries),
+        countries=countries,
+        skipped=skipped,
+        assumptions=(
+            "Projection récursive (prévision N → passengers_lag1 de N+1). "
+            "Émissions CO₂ maintenues au dernier niveau observé. "
+            "Valeurs négatives ramenées à 0 avant réinjection."
+        ),
+        metadata=ModelMetadata(
+            model_name="Ridge Regression (baseline — meilleure performance)",
+            model_type="Régression linéaire régularisée L2 — scikit-learn",
+            model_version=raws[-1]["model_version"],
+            training_date=raws[-1]["model_trained_at"][:10],
+            axis="regression",
+        ),
+        inference_ms=elapsed_ms,
+    )
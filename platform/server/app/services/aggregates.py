@@ -0,0 +1,137 @@
+# app/services/aggregates.py
+"""
+Agrégats KPI partagés entre /api/dashboard/kpis, /api/night-trains/summary
+et /api/internal/overview.
+
+Tous les compteurs sont calculés en une seule requête SQL
+(COUNT(*) FILTER (WHERE ...) sur facts_night_trains) puis mémoïsés
+par version des données en base : un seul scan par rechargement ETL.
+
+La version est lue côté PostgreSQL (compteurs d'écritures de
+pg_stat_user_tables sur les tables du schéma en étoile) : elle change dès
+que mainload écrit dans ces tables, quel que soit le conteneur qui charge.
+Les statistiques étant publiées de façon asynchrone (~1 s), chaque entrée
+reste de toute façon bornée à AGGREGATES_TTL_SECONDS.
+"""
+import os
+import time
+from threading import Lock
+
+from sqlalchemy import bindparam, func, select, text, true
+from sqlalchemy.orm import Session
+
+from app.models import DimCountries, DimOperators, DimYears, FactsCountryStats, FactsNightTrains
+
+# Durée de vie maximale d'une entrée, même si la version n'a pas changé
+AGGREGATES_TTL_SECONDS = float(os.getenv("AGGREGATES_TTL_SECONDS", "300"))
+
+AGGREGATE_TABLES = [
+    DimCountries.__tablename__,
+    DimOperators.__tablename__,
+    DimYears.__tablename__,
+    FactsCountryStats.__tablename__,
+    FactsNightTrains.__tablename__,
+]
+
+_VERSION_STATEMENT = text(
+    "SELECT COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0) "
+    "FROM pg_stat_user_tables WHERE relname IN :tables"
+).bindparams(bindparam("tables", expanding=True))
+
+_cache = {}
+_cache_lock = Lock()
+
+
+def database_version(db: Session):
+    """
+    Nombre cumulé de lignes insérées / modifiées / supprimées dans les
+    tables agrégées (PostgreSQL). Un rechargement ETL l'incrémente toujours ;
+    None pour les autres moteurs (SQLite des tests).
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return int(db.execute(_VERSION_STATEMENT, {"tables": AGGREGATE_TABLES}).scalar() or 0)
+
+
+def _kpi_statement():
+    """Construit l'unique requête d'agrégation (un scan par table)."""
+    trains = select(
+        func.count().label("total_trains"),
+        func.count().filter(FactsNightTrains.is_night.is_(True)).label("total_night_trains"),
+        func.count().filter(FactsNightTrains.is_night.is_(False)).label("total_day_trains"),
+    ).select_from(FactsNightTrains).subquery("trains")
+
+    stats = select(
+        func.avg(FactsCountryStats.co2_per_passenger).label("avg_co2_per_passenger"),
+        func.sum(FactsCountryStats.passengers).label("total_passengers"),
+        func.sum(FactsCountryStats.co2_emissions).label("total_co2_emissions"),
+    ).subquery("stats")
+
+    years = select(
+        func.min(DimYears.year).label("first_year"),
+        func.max(DimYears.year).label("last_year"),
+    ).subquery("years")
+
+    return select(
+        select(func.count()).select_from(DimCountries).scalar_subquery().label("total_countries"),
+        select(func.count()).select_from(DimOperators).scalar_subquery().label("total_operators"),
+        trains.c.total_trains,
+        trains.c.total_night_trains,
+        trains.c.total_day_trains,
+        stats.c.avg_co2_per_passenger,
+        stats.c.total_passengers,
+        stats.c.total_co2_emissions,
+        years.c.first_year,
+        years.c.last_year,
+    ).select_from(trains).join(stats, true()).join(years, true())
+
+
+def compute_kpi_aggregates(db: Session) -> dict:
+    """Exécute la requête d'agrégation et normalise les types (Decimal → float)."""
+    row = db.execute(_kpi_statement()).mappings().one()
+
+    if row["first_year"] is not None:
+        years_covered = f"{row['first_year']}-{row['last_year']}"
+    else:
+        years_covered = "Pas de données"
+
+    return {
+        "total_countries": int(row["total_countries"] or 0),
+        "total_trains": int(row["total_trains"] or 0),
+        "total_night_trains": int(row["total_night_trains"] or 0),
+        "total_day_trains": int(row["total_day_trains"] or 0),
+        "total_operators": int(row["total_operators"] or 0),
+        "years_covered": years_covered,
+        "avg_co2_per_passenger": float(row["avg_co2_per_passenger"] or 0),
+        "total_passengers": float(row["total_passengers"] or 0),
+        "total_co2_emissions": float(row["total_co2_emissions"] or 0),
+    }
+
+
+def get_kpi_aggregates(db: Session) -> dict:
+    """
+    Retourne les agrégats KPI depuis le cache si la version des données
+    en base n'a pas changé et que l'entrée a moins de AGGREGATES_TTL_SECONDS,
+    sinon les recalcule. Le cache est indexé par base (URL du moteur) pour
+    ne pas mélanger plusieurs bases dans un même process.
+    """
+    key = str(db.get_bind().url)
+    version = database_version(db)
+    now = time.monotonic()
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry["version"] == version:
+            if now - entry["computed_at"] < AGGREGATES_TTL_SECONDS:
+                return dict(entry["data"])
+
+    data = compute_kpi_aggregates(db)
+    with _cache_lock:
+        _cache[key] = {"version": version, "computed_at": now, "data": data}
+    return dict(data)
+
+
+def invalidate():
+    """Vide le cache (tests)."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,42 @@
+# app/services/files.py
+"""
+Utilitaires de lecture rapide des fichiers de données (data/).
+
+count_lines() projette le fichier en mémoire (mmap) et compte les sauts
+de ligne sur le tampon binaire par blocs de BLOCK_SIZE octets, sans
+décodage ni itération ligne à ligne. Les comptages sont mémorisés par
+(chemin, taille, mtime) : un CSV du warehouse inchangé n'est lu qu'une
+fois, quel que soit le nombre d'appels à /overview ou /diagnostic.
+"""
+import mmap
+from functools import lru_cache
+from pathlib import Path
+
+BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def count_buffer_lines(buffer) -> int:
+    """Lignes de données (hors en-tête) d'un tampon binaire (bytes ou mmap)."""
+    size = len(buffer)
+    newlines = sum(buffer[i:i + BLOCK_SIZE].count(b"\n") for i in range(0, size, BLOCK_SIZE))
+    if size and buffer[size - 1:size] != b"\n":
+        newlines += 1  # dernière ligne sans saut final
+    return max(0, newlines - 1)
+
+
+@lru_cache(maxsize=4096)
+def _count(path: str, size: int, mtime_ns: int) -> int:
+    if size == 0:
+        return 0
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return count_buffer_lines(buffer)
+
+
+def count_lines(path, stat=None):
+    """Nombre de lignes de données (hors en-tête), ou None si le fichier est illisible."""
+    try:
+        path = Path(path).resolve()
+        stat = stat or path.stat()
+        return _count(str(path), stat.st_size, stat.st_mtime_ns)
+    except (OSError, ValueError):
+        return None
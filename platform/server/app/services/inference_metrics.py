@@ -0,0 +1,113 @@
+# app/services/inference_metrics.py
+"""
+Métriques Prometheus de l'inférence ML (/api/predict/*).
+
+- durées par axe et par étape : "preprocess" et "model" (mesurées dans
+  ia/src/ml/predict.py via add_stage_observer), "response" (construction
+  de la réponse enrichie côté router) ;
+- avertissements "pays inconnu" par axe (pas de label pays : la valeur
+  vient de l'entrée utilisateur, sa cardinalité n'est pas bornée) ;
+- distribution des prédictions calculées par /predict/* et /predict/*/batch :
+  probabilité de déclin (classification) et volume de passagers prévu
+  (régression). Une fenêtre glissante s'obtient côté PromQL (rate(...[1h])
+  par bucket) ; les réponses servies par le cache ne sont pas recomptées, et
+  les projections de /predict/regression/forecast (construites sur des lags
+  eux-mêmes prédits) n'y entrent pas ;
+- version et âge du modèle servi, lus au moment du scrape dans les modèles
+  déjà en mémoire (aucun chargement déclenché par Prometheus).
+"""
+import time
+from datetime import datetime, timezone
+
+from ia.src.ml.predict import add_stage_observer, loaded_models
+
+try:
+    from prometheus_client import REGISTRY, Counter, Histogram
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:
+    Counter = Histogram = None
+
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+PROBABILITY_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+# Passagers en milliers (unité du dataset facts_country_stats)
+PASSENGERS_BUCKETS = (0, 1000, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000, 2500000)
+
+if Histogram is not None:
+    INFERENCE_STAGE_SECONDS = Histogram(
+        "obrail_inference_stage_seconds",
+        "Durée des étapes d'inférence (preprocess, model, response)",
+        ["axis", "stage"],
+        buckets=STAGE_BUCKETS,
+    )
+    UNKNOWN_COUNTRY_WARNINGS = Counter(
+        "obrail_prediction_unknown_country_total",
+        "Prédictions demandées pour un pays absent du référentiel d'entraînement",
+        ["axis"],
+    )
+    PREDICTED_PROBABILITY = Histogram(
+        "obrail_predicted_decline_probability",
+        "Probabilité de déclin prédite (classification)",
+        buckets=PROBABILITY_BUCKETS,
+    )
+    PREDICTED_PASSENGERS = Histogram(
+        "obrail_predicted_passengers_thousands",
+        "Volume de passagers prédit, en milliers (régression)",
+        buckets=PASSENGERS_BUCKETS,
+    )
+
+
+def observe_stage(axis: str, stage: str, seconds: float):
+    if Histogram is not None:
+        INFERENCE_STAGE_SECONDS.labels(axis=axis, stage=stage).observe(seconds)
+
+
+def count_unknown_country(axis: str):
+    if Histogram is not None:
+        UNKNOWN_COUNTRY_WARNINGS.labels(axis=axis).inc()
+
+
+def observe_predictions(axis: str, raws: list[dict]):
+    """Ajoute les sorties brutes de ml_predict / ml_predict_batch aux distributions."""
+    if Histogram is None:
+        return
+    for raw in raws:
+        if axis == "classification":
+            if raw.get("probability") is not None:
+                PREDICTED_PROBABILITY.observe(raw["probability"])
+        else:
+            PREDICTED_PASSENGERS.observe(raw["prediction"])
+
+
+def _age_seconds(trained_at: str, now: float):
+    try:
+        trained = datetime.fromisoformat(trained_at)
+    except (TypeError, ValueError):
+        return None
+    if trained.tzinfo is None:
+        trained = trained.replace(tzinfo=timezone.utc)
+    return max(0.0, now - trained.timestamp())
+
+
+class ModelCollector:
+    """Version (info) et âge des modèles en mémoire, calculés à chaque scrape."""
+
+    def collect(self):
+        info = GaugeMetricFamily(
+            "obrail_model_info", "Modèle servi par axe (valeur 1)", labels=["axis", "version", "model_name"]
+        )
+        age = GaugeMetricFamily(
+            "obrail_model_age_seconds", "Âge du modèle servi depuis son entraînement", labels=["axis"]
+        )
+        now = time.time()
+        for axis, loaded in sorted(loaded_models().items()):
+            info.add_metric([axis, str(loaded.version), str(loaded.model_name)], 1)
+            seconds = _age_seconds(loaded.trained_at, now)
+            if seconds is not None:
+                age.add_metric([axis], seconds)
+        yield info
+        yield age
+
+
+if Histogram is not None:
+    add_stage_observer(observe_stage)
+    REGISTRY.register(ModelCollector())
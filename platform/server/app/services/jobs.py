@@ -0,0 +1,233 @@
+# app/services/jobs.py
+"""
+Gestionnaire de tâches longues de l'API interne (diagnostic ETL, pytest).
+
+Les commandes ne sont plus exécutées dans la requête HTTP : submit() crée
+une tâche et rend la main immédiatement, un pool borné de JOBS_MAX_WORKERS
+threads lance les sous-processus.
+
+- identifiant par tâche, statut et sortie consultables pendant et après
+  l'exécution (stream SSE côté router) ;
+- dé-duplication : une tâche de même clé encore en file ou en cours est
+  renvoyée au lieu d'en lancer une seconde ;
+- statut et sortie persistés en JSON dans `jobs_dir` à chaque changement
+  d'état : une tâche reste consultable après un redémarrage de l'API
+  (celles interrompues par le redémarrage sont marquées "interrupted").
+"""
+import json
+import os
+import subprocess
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+# Lignes de sortie conservées par tâche (les plus anciennes sont abandonnées)
+JOBS_MAX_LINES = int(os.getenv("JOBS_MAX_LINES", "5000"))
+# Tâches terminées gardées en mémoire (les autres restent lisibles sur disque)
+JOBS_HISTORY = int(os.getenv("JOBS_HISTORY", "50"))
+
+ACTIVE = ("queued", "running")
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class Job:
+    def __init__(self, kind, key, command, cwd=None, timeout=None, on_finish=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.command = [str(part) for part in command]
+        self.cwd = cwd
+        self.timeout = timeout
+        self.on_finish = on_finish
+        self.status = "queued"
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.returncode = None
+        self.error = None
+        self.result = None
+        self.lines = deque(maxlen=JOBS_MAX_LINES)
+        self.line_count = 0
+        self.timed_out = False   # posé par le timer de JobManager._kill
+
+    @property
+    def done(self):
+        # finished_at n'est posé qu'après on_finish : le résultat est alors complet
+        return self.finished_at is not None
+
+    def append(self, line):
+        self.lines.append(line)
+        self.line_count += 1
+
+    def lines_since(self, index):
+        """(lignes à partir de `index`, index suivant) ; les lignes déjà abandonnées sont sautées."""
+        first = self.line_count - len(self.lines)
+        lines = list(self.lines)[max(index - first, 0):]
+        return lines, self.line_count
+
+    def to_dict(self, output=False):
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "success": None if not self.done else self.status == "succeeded",
+            "command": self.command,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "returncode": self.returncode,
+            "error": self.error,
+            "result": self.result,
+            "lines": self.line_count,
+        }
+        if output:
+            data["output"] = list(self.lines)
+        return data
+
+
+class JobManager:
+    def __init__(self, jobs_dir, max_workers=JOBS_MAX_WORKERS):
+        self.jobs_dir = Path(jobs_dir)
+        self.max_workers = max_workers
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    # ------------------------------------------------------------------
+    # Soumission / consultation
+    # ------------------------------------------------------------------
+
+    def submit(self, kind, command, cwd=None, timeout=None, key=None, on_finish=None):
+        """
+        Met une commande en file et renvoie (tâche, dédupliquée).
+        on_finish(job) -> dict : résultat complémentaire calculé à la fin
+        (ex. rapport produit par la commande).
+        """
+        key = key or kind
+        with self._lock:
+            running = next((job for job in self._jobs.values() if job.key == key and not job.done), None)
+            if running is not None:
+                return running, True
+            job = Job(kind, key, command, cwd, timeout, on_finish)
+            self._jobs[job.id] = job
+            self._prune()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="internal-job")
+        self._persist(job)
+        self._executor.submit(self._run, job)
+        return job, False
+
+    def get(self, job_id):
+        """Tâche en mémoire, sinon état persisté (dict), sinon None."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        return self._load(job_id)
+
+    def list(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in sorted(jobs, key=lambda job: job.created_at, reverse=True)]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    # Exécution
+    # ------------------------------------------------------------------
+
+    def _run(self, job):
+        job.status = "running"
+        job.started_at = _now()
+        self._persist(job)
+        timer = None
+        try:
+            process = subprocess.Popen(
+                job.command,
+                cwd=job.cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+            )
+            if job.timeout:
+                timer = threading.Timer(job.timeout, self._kill, (job, process))
+                timer.start()
+            for line in iter(process.stdout.readline, ""):
+                job.append(line.rstrip("\n"))
+            process.wait()
+            job.returncode = process.returncode
+            if job.timed_out:
+                job.status = "timeout"
+                job.error = f"Timeout apres {job.timeout}s"
+            else:
+                job.status = "succeeded" if process.returncode == 0 else "failed"
+        except FileNotFoundError as exc:
+            job.status = "error"
+            job.error = f"Commande indisponible: {exc}"
+        except Exception as exc:
+            job.status = "error"
+            job.error = str(exc)
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if job.on_finish is not None:
+            try:
+                job.result = job.on_finish(job)
+            except Exception as exc:
+                job.result = {"error": str(exc)}
+        job.finished_at = _now()
+        self._persist(job)
+
+    @staticmethod
+    def _kill(job, process):
+        # Timer déclenché entre process.wait() et timer.cancel() : le
+        # processus est déjà terminé, son code de retour fait foi
+        if process.poll() is not None:
+            return
+        job.timed_out = True
+        process.kill()
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def _path(self, job_id):
+        return self.jobs_dir / f"{job_id}.json"
+
+    def _persist(self, job):
+        try:
+            self.jobs_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(job.id).with_suffix(".tmp")
+            tmp.write_text(json.dumps(job.to_dict(output=True), ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self._path(job.id))
+        except OSError:
+            pass
+
+    def _load(self, job_id):
+        if not job_id.isalnum():
+            return None
+        try:
+            data = json.loads(self._path(job_id).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("status") in ACTIVE:
+            # Tâche d'une instance précédente de l'API, arrêtée en cours de route
+            data.update(status="interrupted", success=False)
+        return data
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.done]
+        for job in sorted(finished, key=lambda job: job.created_at)[:max(0, len(finished) - JOBS_HISTORY)]:
+            del self._jobs[job.id]
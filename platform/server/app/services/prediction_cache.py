@@ -0,0 +1,178 @@
+# app/services/prediction_cache.py
+"""
+Cache des réponses de prédiction (formulaire "what-if", grilles de scénarios).
+
+Clé = axe + version du modèle + entrée normalisée : une nouvelle version
+publiée au registre invalide naturellement les entrées précédentes.
+
+Backends :
+- mémoire locale (défaut) : LRU borné (PREDICTION_CACHE_SIZE) + TTL,
+  propre à chaque worker uvicorn ;
+- partagé : si PREDICTION_CACHE_URL est défini (redis://..., compatible
+  Redis / Valkey / KeyDB) et que le paquet redis est installé, le cache est
+  commun à tous les workers. Une indisponibilité du serveur n'est jamais
+  bloquante : la prédiction est alors simplement recalculée.
+
+Métriques Prometheus : hits / misses par axe et temps de calcul économisé.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+try:
+    from prometheus_client import Counter, Gauge
+except ImportError:
+    Counter = Gauge = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger("obrail.prediction_cache")
+
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+PREDICTION_CACHE_URL = os.getenv("PREDICTION_CACHE_URL")
+
+KEY_PREFIX = "obrail:predict:"
+
+if Counter is not None:
+    CACHE_REQUESTS = Counter(
+        "obrail_prediction_cache_requests_total",
+        "Consultations du cache de prédiction",
+        ["axis", "result"],
+    )
+    CACHE_SAVED_SECONDS = Counter(
+        "obrail_prediction_cache_saved_seconds_total",
+        "Temps de calcul (validation + inférence + explications) évité grâce au cache",
+        ["axis"],
+    )
+    CACHE_ENTRIES = Gauge(
+        "obrail_prediction_cache_entries",
+        "Entrées présentes dans le cache local du worker",
+    )
+
+
+def make_key(axis: str, model_version: str, data: dict) -> str:
+    """Clé stable : champs triés, nombres normalisés en float, pays sans espaces."""
+    normalized = {
+        k: (float(v) if isinstance(v, (int, float)) and k != "year" else v)
+        for k, v in data.items()
+    }
+    normalized["country"] = str(normalized.get("country", "")).strip()
+    payload = json.dumps([axis, model_version, normalized], sort_keys=True, separators=(",", ":"))
+    return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LocalBackend:
+    """LRU + TTL en mémoire, protégé par un verrou (threadpool FastAPI)."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Backend partagé entre workers (protocole Redis), valeurs sérialisées en JSON."""
+
+    def __init__(self, url: str, ttl: float):
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.05)
+
+    def get(self, key):
+        try:
+            raw = self._client.get(key)
+        except Exception as e:
+            logger.warning(f"Cache partagé indisponible (lecture) : {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value):
+        try:
+            self._client.set(key, json.dumps(value), ex=max(int(self.ttl), 1))
+        except Exception as e:
+            logger.warning(f"Cache partagé indisponible (écriture) : {e}")
+
+    def clear(self):
+        try:
+            for key in self._client.scan_iter(f"{KEY_PREFIX}*"):
+                self._client.delete(key)
+        except Exception as e:
+            logger.warning(f"Cache partagé indisponible (purge) : {e}")
+
+    def __len__(self):
+        return 0
+
+
+def _build_backend():
+    if PREDICTION_CACHE_URL:
+        if redis is not None:
+            logger.info("Cache de prédiction partagé (PREDICTION_CACHE_URL)")
+            return RedisBackend(PREDICTION_CACHE_URL, PREDICTION_CACHE_TTL)
+        logger.warning("PREDICTION_CACHE_URL défini mais paquet redis absent : cache local utilisé")
+    return LocalBackend(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+
+_backend = _build_backend()
+
+if Gauge is not None:
+    CACHE_ENTRIES.set_function(lambda: len(_backend))
+
+
+def lookup(axis: str, key: str):
+    """Réponse mise en cache (dict) ou None ; comptabilise hit / miss."""
+    if not PREDICTION_CACHE_ENABLED:
+        return None
+    entry = _backend.get(key)
+    if Counter is not None:
+        CACHE_REQUESTS.labels(axis, "hit" if entry is not None else "miss").inc()
+    if entry is None:
+        return None
+    if Counter is not None:
+        CACHE_SAVED_SECONDS.labels(axis).inc(entry["compute_ms"] / 1000)
+    return entry["response"]
+
+
+def store(key: str, response: dict, compute_ms: float):
+    """Stocke une réponse avec son coût de calcul (pour la métrique de temps économisé)."""
+    if PREDICTION_CACHE_ENABLED:
+        _backend.set(key, {"response": response, "compute_ms": compute_ms})
+
+
+def clear():
+    """Vide le cache (tests, purge manuelle)."""
+    _backend.clear()
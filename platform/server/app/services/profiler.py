@@ -0,0 +1,175 @@
+# app/services/profiler.py
+"""
+Profileur par échantillonnage à la demande, sur le worker uvicorn courant.
+
+Un thread lit les piles de tous les threads (sys._current_frames) toutes
+les PROFILER_INTERVAL_MS millisecondes pendant la durée demandée, puis
+s'arrête. Aucun hook n'est installé : hors profilage le coût est nul.
+
+- filtre optionnel par préfixe de route : seuls les échantillons dont la
+  pile contient l'endpoint d'une route de ce préfixe sont gardés (valable
+  pour les endpoints async sur la boucle comme pour les endpoints sync
+  exécutés dans le threadpool) ;
+- sorties : piles repliées ("collapsed", flamegraph.pl / speedscope /
+  inferno) ou JSON speedscope (format "sampled") ;
+- les threads au repos (attente d'un verrou, d'une file, du sélecteur de
+  la boucle asyncio) sont écartés sauf si idle=True ;
+- un seul profilage à la fois par worker (ProfilerBusy sinon).
+
+Avec plusieurs workers uvicorn, seul celui qui reçoit la requête est profilé.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+# Profondeur de pile conservée (les frames les plus proches de la racine sont coupées)
+PROFILER_MAX_DEPTH = int(os.getenv("PROFILER_MAX_DEPTH", "128"))
+
+FORMATS = ("collapsed", "speedscope")
+
+# Feuilles (fichier, fonction) d'un thread bloqué en attente
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def route_codes(routes, prefix):
+    """Code objects des endpoints dont le chemin commence par `prefix`."""
+    codes = set()
+    for route in routes:
+        endpoint = getattr(route, "endpoint", None)
+        path = getattr(route, "path", "")
+        if endpoint is None or not path.startswith(prefix):
+            continue
+        while hasattr(endpoint, "__wrapped__"):
+            endpoint = endpoint.__wrapped__
+        code = getattr(endpoint, "__code__", None)
+        if code is not None:
+            codes.add(code)
+    return codes
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(code):
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+
+
+def _stack(frame, codes, idle=False):
+    """
+    Pile racine -> feuille ; None si le thread est au repos (sauf idle=True)
+    ou si `codes` est donné et n'apparaît pas dans la pile.
+    """
+    if not idle and _is_idle(frame.f_code):
+        return None
+    stack, matched = [], codes is None
+    while frame is not None:
+        code = frame.f_code
+        if not matched and code in codes:
+            matched = True
+        stack.append(code)
+        frame = frame.f_back
+    if not matched:
+        return None
+    return tuple(reversed(stack[:PROFILER_MAX_DEPTH]))
+
+
+class Profile:
+    def __init__(self, samples, duration, interval, sample_count):
+        self.samples = samples          # {(nom du thread, (code, ...)): nombre}
+        self.duration = duration
+        self.interval = interval
+        self.sample_count = sample_count
+
+    def collapsed(self):
+        """Une ligne "thread;frame;frame... N" par pile distincte."""
+        lines = []
+        for (thread, stack), count in self.samples.most_common():
+            frames = ";".join([thread, *(_frame_label(code) for code in stack)])
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name="obrail-api"):
+        """Profil speedscope (https://www.speedscope.app/file-format-schema.json), un profil par thread."""
+        frames, index = [], {}
+
+        def frame_id(code):
+            if code not in index:
+                index[code] = len(frames)
+                frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+            return index[code]
+
+        by_thread = {}
+        for (thread, stack), count in self.samples.items():
+            by_thread.setdefault(thread, []).append(([frame_id(code) for code in stack], count))
+
+        profiles = []
+        for thread, stacks in sorted(by_thread.items()):
+            total = sum(count for _, count in stacks)
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": total * self.interval * 1000,
+                "samples": [stack for stack, _ in stacks],
+                "weights": [count * self.interval * 1000 for _, count in stacks],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "obrail-api",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+def sample(seconds, interval_ms=PROFILER_INTERVAL_MS, codes=None, idle=False):
+    """
+    Échantillonne les piles de tous les threads (sauf le sien) pendant
+    `seconds` secondes. Bloquant : à lancer dans un thread.
+    """
+    if not _lock.acquire(blocking=False):
+        raise ProfilerBusy("Un profilage est deja en cours sur ce worker")
+    try:
+        seconds = min(max(float(seconds), 0.0), PROFILER_MAX_SECONDS)
+        interval = max(float(interval_ms), 1.0) / 1000
+        own = threading.get_ident()
+        samples = Counter()
+        sample_count = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_tick = started
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _stack(frame, codes, idle)
+                if stack:
+                    samples[(names.get(ident, str(ident)), stack)] += 1
+            sample_count += 1
+            next_tick += interval
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            time.sleep(max(0.0, min(next_tick, deadline) - now))
+        return Profile(samples, time.perf_counter() - started, interval, sample_count)
+    finally:
+        _lock.release()
@@ -0,0 +1,153 @@
+# app/services/prometheus.py
+"""
+Client asynchrone minimal de l'API HTTP Prometheus (/api/v1/...).
+
+- encodage des requêtes PromQL en pourcentage (urllib.parse.quote) ;
+- requêtes instantanées lancées en parallèle (query_many) sur le pool de
+  connexions keep-alive du client httpx fourni ;
+- query_range avec sous-échantillonnage : le pas est élargi pour ne pas
+  dépasser `max_points` points et les bornes sont alignées sur ce pas, de
+  sorte que deux appels rapprochés produisent la même requête ;
+- cache des réponses pendant un intervalle de scrape (5s, cf.
+  monitoring/prometheus/prometheus.yml) : Prometheus n'a pas de nouvelle
+  valeur à fournir avant.
+
+L'instance qui a répondu en dernier est essayée en premier ; les autres
+URL ne servent qu'en repli. Les erreurs ne lèvent pas : None est renvoyé.
+"""
+import asyncio
+import math
+import os
+import time
+from urllib.parse import quote, urlencode
+
+PROMETHEUS_SCRAPE_INTERVAL = float(os.getenv("PROMETHEUS_SCRAPE_INTERVAL", "5"))
+# Nombre maximal de points par série renvoyée par query_range (sparklines)
+SPARKLINE_MAX_POINTS = int(os.getenv("SPARKLINE_MAX_POINTS", "60"))
+# Taille au-delà de laquelle les entrées expirées du cache sont purgées
+CACHE_MAX_ENTRIES = 256
+
+
+def encode_params(params: dict) -> str:
+    """Query string avec encodage en pourcentage strict (espaces en %20)."""
+    return urlencode(params, quote_via=quote, safe="")
+
+
+def range_step(start: float, end: float, step: float = None, max_points: int = SPARKLINE_MAX_POINTS,
+               scrape_interval: float = PROMETHEUS_SCRAPE_INTERVAL) -> float:
+    """Pas (s) multiple de l'intervalle de scrape, assez large pour ≤ max_points points."""
+    step = max(step or scrape_interval, (end - start) / max(max_points - 1, 1), scrape_interval)
+    return math.ceil(step / scrape_interval) * scrape_interval
+
+
+class PrometheusClient:
+    def __init__(self, urls, client, cache_ttl: float = PROMETHEUS_SCRAPE_INTERVAL):
+        """
+        urls   : instances Prometheus par ordre de préférence
+        client : callable renvoyant le httpx.AsyncClient partagé
+        """
+        self.urls = list(dict.fromkeys(urls))
+        self._client = client
+        self.cache_ttl = cache_ttl
+        self.base_url = None
+        self._cache = {}
+
+    def clear(self):
+        self._cache.clear()
+        self.base_url = None
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    def _candidates(self):
+        if self.base_url in self.urls:
+            return [self.base_url, *(url for url in self.urls if url != self.base_url)]
+        return self.urls
+
+    async def _fetch(self, path: str, params: dict = None):
+        query = f"?{encode_params(params)}" if params else ""
+        for base_url in self._candidates():
+            try:
+                response = await self._client().get(f"{base_url}{path}{query}")
+                payload = response.json()
+            except Exception:
+                continue
+            if payload.get("status") != "success":
+                # Requête invalide : inutile d'essayer les autres instances
+                return None
+            self.base_url = base_url
+            return payload["data"]
+        self.base_url = None
+        return None
+
+    async def _get(self, path: str, params: dict = None):
+        key = (path, tuple(sorted((params or {}).items())))
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        data = await self._fetch(path, params)
+        if data is not None:
+            if len(self._cache) >= CACHE_MAX_ENTRIES:
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            self._cache[key] = (now + self.cache_ttl, data)
+        return data
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    async def targets(self):
+        """Cibles actives, ou None si aucune instance ne répond."""
+        data = await self._get("/api/v1/targets")
+        return None if data is None else data.get("activeTargets", [])
+
+    async def query(self, expr: str):
+        """Requête instantanée : [{"metric", "value"}], ou None en cas d'erreur."""
+        data = await self._get("/api/v1/query", {"query": expr})
+        if data is None:
+            return None
+        if data.get("resultType") == "scalar":
+            return [{"metric": {}, "value": float(data["result"][1])}]
+        return [
+            {"metric": item.get("metric", {}), "value": float(item["value"][1])}
+            for item in data.get("result", [])
+        ]
+
+    async def query_many(self, exprs: dict) -> dict:
+        """Requêtes instantanées en parallèle : {nom: résultat de query()}."""
+        results = await asyncio.gather(*(self.query(expr) for expr in exprs.values()))
+        return dict(zip(exprs, results))
+
+    async def query_range(self, expr: str, start: float, end: float, step: float = None,
+                          max_points: int = SPARKLINE_MAX_POINTS):
+        """
+        Série temporelle sous-échantillonnée : [{"metric", "values": [[t, v], ...]}],
+        ou None en cas d'erreur.
+        """
+        step = range_step(start, end, step, max_points, self.cache_ttl)
+        end = math.floor(end / step) * step
+        start = max(math.floor(start / step) * step, end - step * (max_points - 1))
+        data = await self._get("/api/v1/query_range", {
+            "query": expr, "start": f"{start:.0f}", "end": f"{end:.0f}", "step": f"{step:g}",
+        })
+        if data is None:
+            return None
+        return [
+            {
+                "metric": item.get("metric", {}),
+                "values": [[float(t), float(v)] for t, v in item.get("values", []) if v not in ("NaN", "+Inf", "-Inf")],
+            }
+            for item in data.get("result", [])
+        ]
+
+    async def query_range_many(self, exprs: dict, window: float, step: float = None,
+                               max_points: int = SPARKLINE_MAX_POINTS) -> dict:
+        """Séries des `window` dernières secondes, en parallèle : {nom: query_range()}."""
+        end = time.time()
+        results = await asyncio.gather(*(
+            self.query_range(expr, end - window, end, step, max_points) for expr in exprs.values()
+        ))
+        return dict(zip(exprs, results))
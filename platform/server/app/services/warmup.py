@@ -0,0 +1,149 @@
+# app/services/warmup.py
+"""
+Préchargement et chauffe des modèles ML au démarrage de l'API.
+
+Sans cela, la première requête /api/predict/* de chaque worker paie le
+joblib.load du modèle et du preprocesseur (~300ms) plus le premier appel
+XGBoost. Le hook lifespan de main.py lance warm_up_models() en tâche de
+fond au démarrage ; /ready répond 503 pendant la chauffe puis expose le
+résultat aux orchestrateurs, qui n'envoient le trafic qu'une fois l'API
+prête (/health reste un simple test de vie du process).
+
+watch_models() vérifie ensuite périodiquement le pointeur "current" du
+registre de modèles et recharge une nouvelle version hors du chemin des
+requêtes.
+"""
+import asyncio
+import logging
+import os
+import time
+from threading import Lock
+
+from fastapi.concurrency import run_in_threadpool
+
+from ia.src.ml.predict import (
+    MODEL_RELOAD_INTERVAL, load_artifacts, loaded_models, muted_stage_observers, predict, predict_batch, refresh,
+)
+
+logger = logging.getLogger("obrail.warmup")
+
+# MODEL_WARMUP=false : pas de préchargement, l'API est prête immédiatement
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() in ("1", "true", "yes")
+# READY_REQUIRES_MODELS=false : /ready passe même si un modèle est absent
+READY_REQUIRES_MODELS = os.getenv("READY_REQUIRES_MODELS", "true").lower() in ("1", "true", "yes")
+# Nombre de prédictions synthétiques par axe (la première seule est froide)
+MODEL_WARMUP_ROUNDS = int(os.getenv("MODEL_WARMUP_ROUNDS", "3"))
+
+AXES = ("classification", "regression")
+
+# Ligne synthétique réaliste (exemple de PredictionInput)
+WARMUP_ROW = {
+    "country": "France",
+    "year": 2024,
+    "co2_emissions": 24800.0,
+    "co2_per_passenger": 1.75,
+    "co2_lag1": 25100.0,
+    "passengers_lag1": 88000.0,
+    "passengers_lag2": 86500.0,
+}
+
+_state_lock = Lock()
+_state = {"finished": False, "axes": {}}
+
+
+def _warm_up_axis(axis: str) -> dict:
+    """Charge les artefacts d'un axe puis exécute les chemins unitaire et lot."""
+    started = time.perf_counter()
+    load_artifacts(axis)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    # Prédictions synthétiques (la première volontairement froide) : hors
+    # histogrammes obrail_inference_stage_seconds
+    timings = []
+    with muted_stage_observers():
+        for _ in range(max(MODEL_WARMUP_ROUNDS, 1)):
+            t0 = time.perf_counter()
+            result = predict(axis, **WARMUP_ROW)
+            timings.append((time.perf_counter() - t0) * 1000)
+        predict_batch(axis, [WARMUP_ROW, {**WARMUP_ROW, "year": WARMUP_ROW["year"] + 1}])
+
+    return {
+        "loaded": True,
+        "version": result.get("model_version"),
+        "load_ms": round(load_ms, 1),
+        "first_prediction_ms": round(timings[0], 2),
+        "warm_prediction_ms": round(min(timings), 2),
+        "error": None,
+    }
+
+
+def warm_up_models() -> dict:
+    """
+    Précharge et chauffe chaque axe. Une erreur sur un axe (modèle absent)
+    est enregistrée sans empêcher la chauffe de l'autre.
+    """
+    with _state_lock:
+        _state.update(finished=False, axes={})
+
+    if not MODEL_WARMUP:
+        logger.info("Chauffe des modèles désactivée (MODEL_WARMUP=false)")
+    else:
+        for axis in AXES:
+            try:
+                result = _warm_up_axis(axis)
+                logger.info(
+                    f"Modèle {axis} chargé en {result['load_ms']}ms | "
+                    f"1re prédiction {result['first_prediction_ms']}ms → "
+                    f"{result['warm_prediction_ms']}ms à chaud"
+                )
+            except Exception as e:
+                logger.error(f"Chauffe du modèle {axis} impossible : {e}")
+                result = {"loaded": False, "error": str(e)}
+            with _state_lock:
+                _state["axes"][axis] = result
+
+    with _state_lock:
+        _state["finished"] = True
+    return readiness()
+
+
+def readiness() -> dict:
+    """État de préparation exposé par /ready."""
+    with _state_lock:
+        axes = {axis: dict(info) for axis, info in _state["axes"].items()}
+        finished = _state["finished"]
+
+    models_ok = all(info.get("loaded") for info in axes.values())
+    ready = finished and (models_ok or not READY_REQUIRES_MODELS or not MODEL_WARMUP)
+    return {"ready": ready, "warmup_finished": finished, "models": axes}
+
+
+async def watch_models(interval: float = MODEL_RELOAD_INTERVAL):
+    """
+    Boucle de fond (lancée par le lifespan) : recharge un axe dès que sa
+    version servie change. Le chargement se fait dans le threadpool ; les
+    requêtes continuent d'utiliser l'ancienne version jusqu'à la bascule.
+    Seuls les axes déjà en mémoire sont surveillés : la boucle ne précharge
+    rien (MODEL_WARMUP=false reste sans préchargement) et un modèle absent
+    n'est pas re-signalé à chaque tour.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        for axis in AXES:
+            if axis not in loaded_models():
+                continue
+            try:
+                loaded = await run_in_threadpool(refresh, axis)
+            except Exception as e:
+                logger.warning(f"Vérification du modèle {axis} impossible : {e}")
+                continue
+            with _state_lock:
+                info = _state["axes"].get(axis)
+                if info is not None and info.get("loaded"):
+                    info["version"] = loaded.version
+
+
+def reset():
+    """Réinitialise l'état (tests)."""
+    with _state_lock:
+        _state.update(finished=False, axes={})
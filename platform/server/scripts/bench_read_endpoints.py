@@ -0,0 +1,103 @@
+# platform/server/scripts/bench_read_endpoints.py
+"""
+Benchmark de charge des endpoints de lecture de l'API ObRail.
+
+Lance N requêtes concurrentes par endpoint et affiche débit, latences
+p50/p95/p99 et erreurs. À exécuter avant/après bascule DB_ASYNC=true
+pour comparer le chemin sync (threadpool) et le chemin async (asyncpg).
+
+Usage :
+  python platform/server/scripts/bench_read_endpoints.py --base-url http://localhost:8000 \\
+    --concurrency 200 --requests 2000 --json bench_async.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+DEFAULT_ENDPOINTS = [
+    "/api/countries",
+    "/api/countries/stats",
+    "/api/night-trains?limit=100",
+    "/api/night-trains/summary",
+    "/api/dashboard/metrics",
+    "/api/dashboard/kpis",
+]
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _bench_endpoint(client, path, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "endpoint": path,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(total / elapsed, 1) if elapsed else None,
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+    }
+
+
+async def run(base_url, endpoints, total, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        results = []
+        for path in endpoints:
+            await client.get(path)  # échauffement
+            results.append(await _bench_endpoint(client, path, total, concurrency))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de charge des endpoints de lecture ObRail")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=1000, help="Requêtes par endpoint")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--endpoint", action="append", help="Endpoint à tester (répétable)")
+    parser.add_argument("--json", help="Fichier de sortie JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.base_url, args.endpoint or DEFAULT_ENDPOINTS, args.requests, args.concurrency))
+
+    print(f"{'endpoint':<32} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for r in results:
+        print(f"{r['endpoint']:<32} {r['rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>5}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ sys.path.insert(0, str(SERVER_DIR))
 
 from app.dependencies import get_db
 from app.main import app
+from app.services import aggregates
 from app.models import (
     Base,
     DimCountries,
@@ -43,6 +44,7 @@ def override_get_db():
 @pytest.fixture(scope="function")
 def db_session():
     Base.metadata.create_all(bind=engine)
+    aggregates.invalidate()
     session = TestingSessionLocal()
     try:
         yield session
@@ -17,6 +17,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.services import aggregates
 from app.dependencies import get_db
 from app.models import Base
 from app.models import (
@@ -52,6 +53,7 @@ def test_engine():
 def db_session(test_engine):
     """Session de base de données pour chaque test"""
     Base.metadata.create_all(bind=test_engine)
+    aggregates.invalidate()
     session = TestingSessionLocal()
     try:
         yield session
@@ -3,6 +3,10 @@ Tests pour les endpoints des pays
 """
 
 import pytest
+from typing import List
+from pydantic import TypeAdapter
+
+from app.schemas.countries import CountryStatsResponse
 
 class TestCountriesEndpoints:
     """Tests pour /api/countries et /api/countries/stats"""
@@ -49,3 +53,11 @@ class TestCountriesEndpoints:
         data = response.json()
         assert len(data) == 2  # 2 stats pour 2010
         assert all(item["year"] == 2010 for item in data)
+
+    def test_country_stats_match_response_schema(self, client, sample_data):
+        """Le chemin orjson ne valide pas par ligne : on valide le schéma ici, une fois"""
+        response = client.get("/api/countries/stats")
+        assert response.status_code == 200
+        items = TypeAdapter(List[CountryStatsResponse]).validate_python(response.json())
+        assert items[0].stats_id == 1
+        assert items[0].passengers == 100000.0
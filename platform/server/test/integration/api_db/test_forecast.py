@@ -0,0 +1,87 @@
+"""
+Tests pour l'endpoint de projection multi-horizon /api/predict/regression/forecast
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.routers import predict as predict_router
+
+
+@pytest.fixture
+def batch_calls(monkeypatch):
+    """Modèle factice : prédiction = passengers_lag1 × 1.1 ; enregistre chaque lot."""
+    calls = []
+
+    def _predict_batch(axis, rows):
+        calls.append(rows)
+        return [
+            {"axis": axis, "country": r["country"], "year": r["year"],
+             "prediction": r["passengers_lag1"] * 1.1, "label": "Prévision passagers",
+             "model_version": "v-forecast", "model_trained_at": "2025-01-02T00:00:00+00:00"}
+            for r in rows
+        ]
+
+    monkeypatch.setattr(predict_router, "ml_predict_batch", _predict_batch)
+    return calls
+
+
+class TestForecastEndpoint:
+    """Tests pour /api/predict/regression/forecast"""
+
+    def test_forecast_rolls_lags_forward(self, client, sample_data, batch_calls):
+        """La prévision N devient passengers_lag1 de N+1, l'ancien lag1 devient lag2"""
+        response = client.get("/api/predict/regression/forecast?country=France&horizon=3")
+        assert response.status_code == 200
+        data = response.json()
+        france = data["countries"][0]
+        assert data["count"] == 1
+        assert france["last_observed_year"] == 2011
+        assert [p["year"] for p in france["trajectory"]] == [2012, 2013, 2014]
+        assert [p["prediction_raw"] for p in france["trajectory"]] == [121000.0, 133100.0, 146410.0]
+        assert france["trajectory"][0]["trend_vs_previous"] == 10.0
+        assert data["metadata"]["model_version"] == "v-forecast"
+
+        first, second = batch_calls[0][0], batch_calls[1][0]
+        assert (first["passengers_lag1"], first["passengers_lag2"]) == (110000.0, 100000.0)
+        assert first["co2_lag1"] == first["co2_emissions"] == 5200.0
+        assert second["passengers_lag1"] == pytest.approx(121000.0)
+        assert second["passengers_lag2"] == 110000.0
+
+    def test_forecast_scores_all_countries_once_per_step(self, client, sample_data, batch_calls):
+        """Sans pays : un appel vectorisé par année ; pays sans lag2 ignorés"""
+        response = client.get("/api/predict/regression/forecast?horizon=4")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(batch_calls) == 4
+        assert [c["country"] for c in data["countries"]] == ["France"]
+        assert data["skipped"] == ["Germany"]
+
+    def test_forecast_does_not_feed_prediction_distribution(self, client, sample_data, batch_calls):
+        """Les projections ne sont pas comptées dans la distribution des prédictions"""
+        before = REGISTRY.get_sample_value("obrail_predicted_passengers_thousands_count") or 0
+        response = client.get("/api/predict/regression/forecast?country=France&horizon=3")
+        assert response.status_code == 200
+        assert (REGISTRY.get_sample_value("obrail_predicted_passengers_thousands_count") or 0) == before
+
+    def test_forecast_unknown_country(self, client, sample_data, batch_calls):
+        """Pays sans statistiques → 404"""
+        response = client.get("/api/predict/regression/forecast?country=Atlantis")
+        assert response.status_code == 404
+        assert batch_calls == []
+
+    def test_forecast_horizon_bounds(self, client, sample_data):
+        """Horizon hors bornes → 422"""
+        response = client.get(
+            f"/api/predict/regression/forecast?horizon={predict_router.MAX_FORECAST_HORIZON + 1}"
+        )
+        assert response.status_code == 422
+
+    def test_forecast_missing_model(self, client, sample_data, monkeypatch):
+        """Modèle absent → 503"""
+        def _missing(axis, rows):
+            raise FileNotFoundError("ridge_reg.joblib")
+
+        monkeypatch.setattr(predict_router, "ml_predict_batch", _missing)
+        response = client.get("/api/predict/regression/forecast?country=France")
+        assert response.status_code == 503
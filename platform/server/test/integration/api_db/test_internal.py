@@ -1,13 +1,35 @@
 from app.routers import internal
+from app.services.jobs import Job
 
 
 class TestInternalEndpoints:
     def test_internal_overview_returns_monitoring_payload(self, client, monkeypatch):
-        monkeypatch.setattr(internal, "_first_ok", lambda urls, path: ({"data": {"activeTargets": []}}, "http://test"))
-        monkeypatch.setattr(internal, "_prometheus_query", lambda query: 0)
-        monkeypatch.setattr(internal, "_prometheus_vector", lambda query: [])
+        async def fake_first_ok(urls, path, params=None):
+            return {"data": {"activeTargets": []}}, "http://test"
+
+        async def fake_targets():
+            return []
+
+        async def fake_query_many(exprs):
+            return {name: [] for name in exprs}
+
+        async def fake_query_range_many(exprs, window):
+            return {name: [] for name in exprs}
+
+        async def fake_github():
+            return {"available": False, "source": "fallback", "runs": []}
+
+        internal.reset_overview_snapshots()
+        monkeypatch.setattr(internal, "_first_ok", fake_first_ok)
+        monkeypatch.setattr(internal.PROMETHEUS, "targets", fake_targets)
+        monkeypatch.setattr(internal.PROMETHEUS, "query_many", fake_query_many)
+        monkeypatch.setattr(internal.PROMETHEUS, "query_range_many", fake_query_range_many)
+        monkeypatch.setattr(internal.PROMETHEUS, "base_url", "http://test")
+        monkeypatch.setattr(internal, "_github_actions_status", fake_github)
         monkeypatch.setattr(internal, "_docker_status", lambda: {"available": False, "success": False, "services": []})
+        monkeypatch.setattr(internal, "_db_totals", lambda: {"total_trains": 0})
         monkeypatch.setattr(internal, "_reports_summary", lambda: {"quality": {}, "diagnostic": None})
+        monkeypatch.setattr(internal, "OVERVIEW_DEADLINE_MS", 2000)
 
         response = client.get("/api/internal/overview")
 
@@ -18,6 +40,11 @@ class TestInternalEndpoints:
         assert "prometheus" in data
         assert "grafana" in data
         assert "docker" in data
+        assert data["metrics"]["api_up"] == 0
+        assert data["prometheus"]["url"] == "http://test"
+        assert data["db_totals"] == {"total_trains": 0}
+        assert {source["status"] for source in data["sources"].values()} == {"fresh"}
+        internal.reset_overview_snapshots()
 
     def test_internal_diagnostic_reports_missing_script(self, client, monkeypatch):
         monkeypatch.setattr(internal.Path, "exists", lambda self: False)
@@ -38,3 +65,21 @@ class TestInternalEndpoints:
         data = response.json()
         assert data["success"] is False
         assert data["available"] is False
+
+    def test_internal_tests_run_returns_job_handle_immediately(self, client, monkeypatch):
+        submitted = []
+
+        class FakeJobs:
+            def submit(self, kind, command, **kwargs):
+                submitted.append((kind, command, kwargs["timeout"]))
+                return Job(kind, kind, command), len(submitted) > 1
+
+        monkeypatch.setattr(internal, "JOBS", FakeJobs())
+
+        first = client.post("/api/internal/tests/run").json()
+        second = client.post("/api/internal/tests/run").json()
+
+        assert first["status"] == "queued" and first["success"] is None
+        assert first["stream_url"] == f"/api/internal/jobs/{first['id']}/stream"
+        assert first["deduplicated"] is False and second["deduplicated"] is True
+        assert submitted[0][0] == "tests" and "pytest" in submitted[0][1]
@@ -3,6 +3,10 @@ Tests pour les endpoints des trains de nuit
 """
 
 import pytest
+from typing import List
+from pydantic import TypeAdapter
+
+from app.schemas.trains import NightTrainResponse
 
 
 def get_first(data):
@@ -110,4 +114,12 @@ class TestNightTrainsEndpoints:
         assert isinstance(first["duration_min"], (int, float))
         assert isinstance(first["is_night"], bool)
         assert isinstance(first["night_train"], str)
-        assert isinstance(first["country_name"], str)
\ No newline at end of file
+        assert isinstance(first["country_name"], str)
+
+    def test_night_trains_match_response_schema(self, client, sample_data):
+        """Le chemin orjson ne valide pas par ligne : on valide le schéma ici, une fois"""
+        for path in ["/api/night-trains", "/api/night-trains/night", "/api/night-trains/day"]:
+            response = client.get(path)
+            assert response.status_code == 200
+            items = TypeAdapter(List[NightTrainResponse]).validate_python(response.json())
+            assert all(isinstance(item.distance_km, float) for item in items)
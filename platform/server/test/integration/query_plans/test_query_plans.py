@@ -0,0 +1,100 @@
+"""
+Régression des plans d'exécution : chaque requête sélective des routeurs
+est passée à EXPLAIN (ANALYZE, BUFFERS) sur la base seedée ; le test échoue
+si le plan retombe sur un Seq Scan d'une table qui devrait être indexée.
+"""
+import json
+
+import pytest
+
+from app.models import FactsNightTrains
+from app.routers.countries import _country_stats_query
+from app.routers.night_trains import _apply_filters, _build_night_trains_query
+from app.schemas.countries import CountryStatsFilter
+
+pytestmark = pytest.mark.plans
+
+
+def _find_seq_scans(plan, relations):
+    """Parcourt un plan JSON et retourne les Seq Scan sur les relations données."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in relations:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_find_seq_scans(child, relations))
+    return found
+
+
+def _explain(engine, statement):
+    compiled = statement.compile(dialect=engine.dialect)
+    with engine.connect() as conn:
+        raw = conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+    payload = json.loads(raw) if isinstance(raw, str) else raw
+    return payload[0]["Plan"]
+
+
+PLAN_CASES = [
+    (
+        "night_trains_by_country",
+        lambda: _apply_filters(_build_night_trains_query(), "C042", None, None),
+        {"facts_night_trains"},
+    ),
+    (
+        "night_trains_night_by_country_year",
+        lambda: _apply_filters(_build_night_trains_query(is_night=True), "C042", None, 1950),
+        {"facts_night_trains"},
+    ),
+    (
+        "day_trains_by_country",
+        lambda: _apply_filters(_build_night_trains_query(is_night=False), "C007", None, None),
+        {"facts_night_trains"},
+    ),
+    (
+        "night_trains_by_operator_id",
+        lambda: _build_night_trains_query().filter(FactsNightTrains.operator_id == 123),
+        {"facts_night_trains"},
+    ),
+    (
+        "night_trains_by_operator_name",
+        lambda: _apply_filters(_build_night_trains_query(), None, "c4ca4238", None),
+        {"dim_operators"},
+    ),
+    (
+        "country_stats_by_country_year",
+        lambda: _country_stats_query(CountryStatsFilter(country_code="C042", year=1950), 0, None),
+        {"facts_country_stats"},
+    ),
+    (
+        "country_stats_by_country",
+        lambda: _country_stats_query(CountryStatsFilter(country_code="C042"), 0, None),
+        {"facts_country_stats"},
+    ),
+]
+
+
+@pytest.mark.parametrize("name, build_statement, indexed_relations", PLAN_CASES, ids=[c[0] for c in PLAN_CASES])
+def test_router_query_uses_indexes(plan_engine, name, build_statement, indexed_relations):
+    plan = _explain(plan_engine, build_statement())
+
+    seq_scans = _find_seq_scans(plan, indexed_relations)
+
+    assert not seq_scans, f"{name}: Seq Scan sur {seq_scans}\n{json.dumps(plan, indent=2)}"
+
+
+def test_find_seq_scans_walks_nested_plans():
+    """Le parcours du plan ne dépend pas de PostgreSQL : vérifié partout."""
+    plan = {
+        "Node Type": "Nested Loop",
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "dim_years"},
+            {"Node Type": "Hash Join", "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "facts_night_trains"},
+                {"Node Type": "Index Scan", "Relation Name": "dim_countries"},
+            ]},
+        ],
+    }
+
+    assert _find_seq_scans(plan, {"facts_night_trains"}) == ["facts_night_trains"]
+    assert _find_seq_scans(plan, {"dim_countries"}) == []
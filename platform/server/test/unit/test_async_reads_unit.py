@@ -0,0 +1,45 @@
+# Tests unitaires pour les routes de lecture async
+
+import asyncio
+import json
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.routers.async_reads import get_night_trains_only_async, get_countries_async
+
+
+def _async_db(rows=None, scalars=None):
+    result = MagicMock()
+    result.__iter__.return_value = iter(rows or [])
+    result.scalars.return_value.all.return_value = scalars or []
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+# Vérifie que la route async sérialise directement les lignes SQL (orjson)
+def test_night_trains_async_builds_responses():
+    Row = namedtuple("Row", ["fact_id", "route_id", "night_train", "country_code", "train_type"])
+    db = _async_db(rows=[Row(1, "FR001", "Paris → Nice", "FR", "night")])
+
+    result = asyncio.run(get_night_trains_only_async(
+        db=db, skip=0, limit=10, country_code="FR", operator_name=None, year=None
+    ))
+
+    payload = json.loads(result.body)
+    assert db.execute.await_count == 1
+    assert len(payload) == 1
+    assert payload[0]["train_type"] == "night"
+    assert payload[0]["country_code"] == "FR"
+
+
+# Vérifie que la liste des pays est lue via une seule requête awaitée
+def test_countries_async_returns_scalars():
+    country = SimpleNamespace(country_id=1, country_code="FR", country_name="France")
+    db = _async_db(scalars=[country])
+
+    result = asyncio.run(get_countries_async(db=db, skip=0, limit=None))
+
+    assert db.execute.await_count == 1
+    assert result == [country]
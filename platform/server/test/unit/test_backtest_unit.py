@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import Ridge
+
+from ia.src.ml import backtest
+
+
+def _dataset(path, years=range(2012, 2022), n_countries=4, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for c in range(n_countries):
+        for year in years:
+            lag1, lag2 = rng.uniform(1000, 5000, size=2)
+            rows.append({
+                "country_name": f"C{c}", "year": year,
+                "co2_emissions": rng.uniform(100, 900), "co2_per_passenger": rng.uniform(0.01, 0.5),
+                "co2_lag1": rng.uniform(100, 900), "passengers_lag1": lag1, "passengers_lag2": lag2,
+                "passengers": 0.9 * lag1 + 0.1 * lag2 + rng.normal(0, 10),
+            })
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+@pytest.fixture
+def regression_axis(tmp_path, monkeypatch):
+    dataset = tmp_path / "regression_dataset.csv"
+    _dataset(dataset)
+    monkeypatch.setattr(backtest, "FEATURE_STORE_DIR", tmp_path / "feature_store")
+    monkeypatch.setitem(backtest.AXES["regression"], "dataset", dataset)
+    loads = []
+
+    def _load():
+        loads.append(1)
+        df = pd.read_csv(dataset)
+        return df[backtest.REG_NUMERIC_FEATURES + backtest.REG_CATEGORICAL_FEATURES], df["passengers"]
+
+    monkeypatch.setitem(backtest.AXES["regression"], "load", _load)
+    return loads
+
+
+def test_year_folds_train_strictly_before_test_years():
+    years = np.repeat(np.arange(2012, 2020), 3)
+
+    folds = backtest.year_folds(years, min_train_years=5, max_horizon=2)
+
+    assert [f["cutoff"] for f in folds] == [2017, 2018, 2019]
+    for fold in folds:
+        assert years[fold["train"]].max() == fold["cutoff"] - 1
+        for h, mask in fold["tests"].items():
+            assert set(years[mask]) == {fold["cutoff"] + h - 1}
+    assert list(folds[-1]["tests"]) == [1]
+
+
+# Folds de validation des recherches : année suivant la fenêtre d'entraînement
+def test_cv_splits_validate_on_the_next_year():
+    years = np.tile(np.arange(2012, 2020), 3)
+
+    splits = backtest.cv_splits(years, min_train_years=5)
+
+    assert [sorted(set(years[val])) for _, val in splits] == [[2017], [2018], [2019]]
+    for train, val in splits:
+        assert years[train].max() < years[val].min()
+    with pytest.raises(ValueError):
+        backtest.cv_splits(np.arange(2012, 2016))
+
+
+def test_backtest_reports_metrics_per_horizon(regression_axis):
+    df = backtest.backtest("regression", {"ridge": Ridge(alpha=1.0)},
+                           min_train_years=5, max_horizon=3, n_jobs=1)
+    summary = backtest.summarize(df)
+
+    assert sorted(df["cutoff"].unique()) == [2017, 2018, 2019, 2020, 2021]
+    assert (df["test_year"] == df["cutoff"] + df["horizon"] - 1).all()
+    assert list(summary["horizon"]) == [1, 2, 3]
+    assert list(summary["folds"]) == [5, 4, 3]
+    assert (summary["r2"] > 0.9).all()
+
+
+def test_fold_matrices_are_prepared_once_for_all_models(regression_axis):
+    models = {"ridge": Ridge(alpha=1.0), "ridge_strong": Ridge(alpha=100.0)}
+
+    backtest.backtest("regression", models, min_train_years=5, max_horizon=2, n_jobs=1)
+    df = backtest.backtest("regression", models, min_train_years=5, max_horizon=2, n_jobs=2)
+
+    assert len(regression_axis) == 1
+    assert set(df["model"]) == {"ridge", "ridge_strong"}
@@ -1,37 +1,30 @@
-from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 from app.routers.dashboard import get_dashboard_kpis
+from app.services import aggregates
 
 
-def test_dashboard_kpis_aggregates_counts_and_totals():
+def _mock_db(row):
     db = MagicMock()
+    db.get_bind.return_value.url = "sqlite://unit-test"
+    db.execute.return_value.mappings.return_value.one.return_value = row
+    return db
 
-    countries_query = MagicMock()
-    countries_query.count.return_value = 2
-
-    trains_query = MagicMock()
-    trains_query.count.return_value = 5
-    trains_query.filter.return_value.count.side_effect = [3, 2]
-
-    operators_query = MagicMock()
-    operators_query.count.return_value = 4
 
-    years_query = MagicMock()
-    years_query.order_by.return_value.all.return_value = [(2010,), (2024,)]
-
-    stats_query = MagicMock()
-    stats_query.first.return_value = (0.041, 120000.0, 4500.0)
-
-    db.query.side_effect = [
-        countries_query,
-        trains_query,
-        trains_query,
-        trains_query,
-        operators_query,
-        years_query,
-        stats_query,
-    ]
+def test_dashboard_kpis_aggregates_counts_and_totals():
+    aggregates.invalidate()
+    db = _mock_db({
+        "total_countries": 2,
+        "total_operators": 4,
+        "total_trains": 5,
+        "total_night_trains": 3,
+        "total_day_trains": 2,
+        "avg_co2_per_passenger": 0.041,
+        "total_passengers": 120000.0,
+        "total_co2_emissions": 4500.0,
+        "first_year": 2010,
+        "last_year": 2024,
+    })
 
     result = get_dashboard_kpis(db)
 
@@ -44,30 +37,24 @@ def test_dashboard_kpis_aggregates_counts_and_totals():
     assert result.avg_co2_per_passenger == 0.041
     assert result.total_passengers == 120000.0
     assert result.total_co2_emissions == 4500.0
+    # Une seule requête SQL pour l'ensemble des KPI
+    assert db.execute.call_count == 1
 
 
 def test_dashboard_kpis_handles_empty_database():
-    db = MagicMock()
-
-    empty_count_query = MagicMock()
-    empty_count_query.count.return_value = 0
-    empty_count_query.filter.return_value.count.return_value = 0
-
-    years_query = MagicMock()
-    years_query.order_by.return_value.all.return_value = []
-
-    stats_query = MagicMock()
-    stats_query.first.return_value = (None, None, None)
-
-    db.query.side_effect = [
-        empty_count_query,
-        empty_count_query,
-        empty_count_query,
-        empty_count_query,
-        empty_count_query,
-        years_query,
-        stats_query,
-    ]
+    aggregates.invalidate()
+    db = _mock_db({
+        "total_countries": 0,
+        "total_operators": 0,
+        "total_trains": 0,
+        "total_night_trains": None,
+        "total_day_trains": None,
+        "avg_co2_per_passenger": None,
+        "total_passengers": None,
+        "total_co2_emissions": None,
+        "first_year": None,
+        "last_year": None,
+    })
 
     result = get_dashboard_kpis(db)
 
@@ -80,3 +67,56 @@ def test_dashboard_kpis_handles_empty_database():
     assert result.avg_co2_per_passenger == 0
     assert result.total_passengers == 0
     assert result.total_co2_emissions == 0
+
+
+def _memo_row():
+    return {
+        "total_countries": 1, "total_operators": 1, "total_trains": 1,
+        "total_night_trains": 1, "total_day_trains": 0,
+        "avg_co2_per_passenger": 0.1, "total_passengers": 1.0, "total_co2_emissions": 1.0,
+        "first_year": 2020, "last_year": 2020,
+    }
+
+
+def test_dashboard_kpis_are_memoized_per_database_version(monkeypatch):
+    aggregates.invalidate()
+    version = [1200]
+    monkeypatch.setattr(aggregates, "database_version", lambda db: version[0])
+    db = _mock_db(_memo_row())
+
+    get_dashboard_kpis(db)
+    get_dashboard_kpis(db)
+    assert db.execute.call_count == 1
+
+    # Rechargement ETL : de nouvelles écritures en base changent la version
+    version[0] = 2400
+    get_dashboard_kpis(db)
+    assert db.execute.call_count == 2
+    aggregates.invalidate()
+
+
+# Même à version constante, une entrée expire après AGGREGATES_TTL_SECONDS
+def test_dashboard_kpis_memo_always_expires(monkeypatch):
+    aggregates.invalidate()
+    monkeypatch.setattr(aggregates, "database_version", lambda db: 1200)
+    clock = [1000.0]
+    monkeypatch.setattr(aggregates.time, "monotonic", lambda: clock[0])
+    db = _mock_db(_memo_row())
+
+    get_dashboard_kpis(db)
+    clock[0] += aggregates.AGGREGATES_TTL_SECONDS - 1
+    get_dashboard_kpis(db)
+    assert db.execute.call_count == 1
+
+    clock[0] += 2
+    get_dashboard_kpis(db)
+    assert db.execute.call_count == 2
+    aggregates.invalidate()
+
+
+def test_database_version_is_none_outside_postgresql():
+    db = _mock_db(_memo_row())
+    db.get_bind.return_value.dialect.name = "sqlite"
+
+    assert aggregates.database_version(db) is None
+    assert db.execute.call_count == 0
@@ -0,0 +1,80 @@
+# Tests unitaires pour les métriques du pool de connexions
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app import db_metrics
+from app.db_metrics import InstrumentedQueuePool, instrument_engine
+
+
+def _sample(name, label):
+    return REGISTRY.get_sample_value(name, {"engine": label}) or 0
+
+
+# Vérifie que le checkout, la saturation et les requêtes lentes sont mesurés
+def test_instrumented_engine_exports_pool_metrics(monkeypatch):
+    monkeypatch.setattr(db_metrics, "DB_SLOW_QUERY_MS", -1)
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1)
+    instrument_engine(engine, "unit")
+
+    before_waits = REGISTRY.get_sample_value("obrail_db_pool_checkout_wait_seconds_count", {"engine": "sync"}) or 0
+    before_slow = _sample("obrail_db_slow_queries_total", "unit")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert _sample("obrail_db_pool_checked_out", "unit") == 1
+        assert _sample("obrail_db_pool_saturation_ratio", "unit") == 1 / 3
+
+    assert _sample("obrail_db_pool_capacity", "unit") == 3
+    assert _sample("obrail_db_pool_checked_out", "unit") == 0
+    assert REGISTRY.get_sample_value("obrail_db_pool_checkout_wait_seconds_count", {"engine": "sync"}) > before_waits
+    assert _sample("obrail_db_slow_queries_total", "unit") == before_slow + 1
+
+
+# Vérifie l'attribution des requêtes SQL à l'endpoint (histogrammes + Server-Timing)
+def test_query_metrics_middleware_attributes_queries_to_handler(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'trains.db'}", poolclass=InstrumentedQueuePool)
+    instrument_engine(engine, "unit-requests")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE trains (id INTEGER)"))
+        conn.execute(text("INSERT INTO trains VALUES (1), (2), (3)"))
+
+    app = FastAPI()
+    app.add_middleware(db_metrics.QueryMetricsMiddleware)
+
+    @app.get("/trains/{train_id}")
+    def get_train(train_id: int):
+        # N+1 volontaire : une requête par ligne
+        with engine.connect() as conn:
+            ids = [row[0] for row in conn.execute(text("SELECT id FROM trains"))]
+            for _ in ids:
+                conn.execute(text("SELECT id FROM trains WHERE id = :id"), {"id": train_id})
+        return {"count": len(ids)}
+
+    labels = {"handler": "/trains/{train_id}"}
+    before = REGISTRY.get_sample_value("obrail_db_queries_per_request_sum", labels) or 0
+
+    assert "server-timing" not in TestClient(app).get("/trains/2").headers
+    monkeypatch.setattr(db_metrics, "DB_SERVER_TIMING", True)
+    response = TestClient(app).get("/trains/2")
+
+    assert response.status_code == 200
+    server_timing = response.headers["server-timing"]
+    assert server_timing.startswith("db;dur=") and 'desc="4 requetes' in server_timing
+    assert REGISTRY.get_sample_value("obrail_db_queries_per_request_sum", labels) == before + 8
+    assert REGISTRY.get_sample_value("obrail_db_queries_per_request_count", labels) >= 1
+    assert REGISTRY.get_sample_value("obrail_db_time_per_request_seconds_count", labels) >= 1
+
+
+# Hors requête HTTP (scripts, warmup), les requêtes ne sont attribuées à personne
+def test_queries_outside_requests_are_ignored():
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool)
+    instrument_engine(engine, "unit-outside")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert db_metrics._current_request.get() is None
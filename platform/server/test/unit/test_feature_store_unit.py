@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ia.src.ml.models import train_utils
+
+
+def _write_dataset(path, n_countries=6, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for c in range(n_countries):
+        for year in range(2014, 2025):
+            lag1, lag2 = rng.uniform(1000, 5000, size=2)
+            passengers = lag1 * rng.uniform(0.9, 1.1)
+            rows.append({
+                "country_name": f"C{c}", "year": year,
+                "co2_emissions": rng.uniform(100, 900), "co2_per_passenger": rng.uniform(0.01, 0.5),
+                "co2_lag1": rng.uniform(100, 900), "passengers_lag1": lag1, "passengers_lag2": lag2,
+                "passengers": passengers, "en_declin": int(passengers < lag2),
+            })
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    dataset = tmp_path / "regression_dataset.csv"
+    _write_dataset(dataset)
+    monkeypatch.setattr(train_utils, "REGRESSION_DATASET_PATH", dataset)
+    monkeypatch.setattr(train_utils, "FEATURE_STORE_DIR", tmp_path / "feature_store")
+
+    calls = []
+    prepare = train_utils.prepare_regression_data
+
+    def _counting_prepare(X, y, **kwargs):
+        calls.append(kwargs)
+        return prepare(X, y, **kwargs)
+
+    monkeypatch.setattr(train_utils, "prepare_regression_data", _counting_prepare)
+    return dataset, tmp_path / "feature_store", calls
+
+
+def test_features_are_prepared_once_and_memory_mapped(store):
+    _, store_dir, calls = store
+
+    first = train_utils.load_regression_features()
+    second = train_utils.load_regression_features()
+
+    assert len(calls) == 1
+    assert isinstance(second[0], np.memmap) and not second[0].flags.writeable
+    for a, b in zip(first[:4], second[:4]):
+        np.testing.assert_array_equal(a, b)
+    assert len(list(store_dir.glob("regression-*"))) == 1
+
+
+def test_cached_features_match_direct_preparation(store):
+    X, y = train_utils.load_regression_data()
+    expected = train_utils.prepare_regression_data(X, y)
+
+    cached = train_utils.load_regression_features()
+
+    for a, b in zip(expected[:4], cached[:4]):
+        np.testing.assert_allclose(np.asarray(a), np.asarray(b))
+    np.testing.assert_allclose(expected[4].transform(X[:5]), cached[4].transform(X[:5]))
+
+
+def test_new_dataset_or_split_changes_the_key(store):
+    dataset, store_dir, calls = store
+    train_utils.load_regression_features()
+    train_utils.load_regression_features(test_size=0.3)
+    assert len(calls) == 2
+
+    _write_dataset(dataset, seed=1)
+    train_utils.load_regression_features()
+
+    assert len(calls) == 3
+    # Les entrées du dataset précédent sont purgées
+    assert len(list(store_dir.glob("regression-*"))) == 1
+
+
+# Split temporel : le test porte sur les dernières années, jamais mélangées à l'entraînement
+def test_split_holds_out_the_last_years(store):
+    X_train, X_test, y_train, y_test, preprocessor = train_utils.load_regression_features()
+
+    train_years = train_utils.train_years(X_train, preprocessor)
+    test_years = train_utils.train_years(X_test, preprocessor)
+    assert set(train_years) == set(range(2014, 2023))
+    assert set(test_years) == {2023, 2024}
+    assert len(train_years) == len(y_train) and len(test_years) == len(y_test)
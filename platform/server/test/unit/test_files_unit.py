@@ -0,0 +1,44 @@
+import os
+
+from app.services import files
+from app.services.files import count_buffer_lines, count_lines
+
+
+def test_count_buffer_lines_excludes_header_and_counts_unterminated_last_line():
+    assert count_buffer_lines(b"header\none\ntwo\n") == 2
+    assert count_buffer_lines(b"header\none\ntwo") == 2
+    assert count_buffer_lines(b"header") == 0
+    assert count_buffer_lines(b"") == 0
+
+
+def test_count_lines_spans_several_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, "BLOCK_SIZE", 7)
+    path = tmp_path / "stops.txt"
+    path.write_bytes(b"stop_id,name\n" + b"".join(b"%d,gare\n" % i for i in range(1000)))
+
+    assert count_lines(path) == 1000
+
+
+def test_count_lines_is_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "facts.csv"
+    path.write_text("header\none\n", encoding="utf-8")
+    files._count.cache_clear()
+
+    assert count_lines(path) == 1
+    assert count_lines(path) == 1
+    assert files._count.cache_info().hits == 1
+
+    with path.open("a", encoding="utf-8") as file:
+        file.write("two\n")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    assert count_lines(path) == 2
+
+
+def test_count_lines_handles_empty_and_missing_files(tmp_path):
+    empty = tmp_path / "empty.csv"
+    empty.touch()
+
+    assert count_lines(empty) == 0
+    assert count_lines(tmp_path / "missing.csv") is None
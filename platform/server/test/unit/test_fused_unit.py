@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.linear_model import Ridge
+from sklearn.neural_network import MLPRegressor
+
+from ia.src.ml import fused
+from ia.src.ml.models.train_utils import build_preprocessor
+
+
+COUNTRIES = ["France", "Germany", "Spain", "Italy"]
+
+
+def _dataset(n=120, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "year": rng.integers(2012, 2025, n),
+        "co2_emissions": rng.uniform(1000, 40000, n),
+        "co2_per_passenger": rng.uniform(0.5, 3, n),
+        "co2_lag1": rng.uniform(0.5, 3, n),
+        "passengers_lag1": rng.uniform(1000, 120000, n),
+        "passengers_lag2": rng.uniform(1000, 120000, n),
+        "country_name": rng.choice(COUNTRIES, n),
+    })
+    target = df["passengers_lag1"] * 1.02 + rng.normal(0, 500, n)
+    return df, target
+
+
+def _fit(model, classify=False):
+    df, target = _dataset()
+    preprocessor = build_preprocessor(fused.NUMERIC_FEATURES, [fused.CATEGORICAL_FEATURE])
+    X = preprocessor.fit_transform(df)
+    y = (target < df["passengers_lag2"]).astype(int) if classify else target
+    return model.fit(X, y), preprocessor
+
+
+def _rows():
+    df, _ = _dataset(n=10, seed=7)
+    rows = df.rename(columns={"country_name": "country"}).to_dict("records")
+    rows[0]["country"] = "Atlantis"
+    return rows
+
+
+def test_ridge_is_folded_into_coefficients():
+    model, preprocessor = _fit(Ridge(alpha=1.0))
+
+    exported = fused.export_fused(model, preprocessor)
+    rows = _rows()
+    expected = fused._sklearn_outputs(model, preprocessor, rows, proba=False)
+
+    assert exported.kind == "linear"
+    assert exported.deviation <= fused.FUSED_TOLERANCE
+    np.testing.assert_allclose(exported.predict(rows), expected, rtol=1e-9)
+
+
+def test_xgboost_uses_booster_on_numpy_features():
+    model, preprocessor = _fit(xgb.XGBClassifier(n_estimators=20, max_depth=3, eval_metric="logloss"), classify=True)
+
+    exported = fused.export_fused(model, preprocessor)
+    rows = _rows()
+    expected = fused._sklearn_outputs(model, preprocessor, rows, proba=True)
+
+    assert exported.kind == "xgboost"
+    np.testing.assert_allclose(exported.predict_proba(rows), expected, atol=1e-9)
+    assert list(exported.predict(rows)) == list((expected > 0.5).astype(int))
+
+
+def test_preprocessor_matches_column_transformer():
+    _, preprocessor = _fit(Ridge())
+    prep = fused.FusedPreprocessor.from_column_transformer(preprocessor)
+    rows = _rows()
+    df = pd.DataFrame(rows).rename(columns={"country": fused.CATEGORICAL_FEATURE})
+
+    np.testing.assert_array_equal(prep.transform(rows), preprocessor.transform(df))
+
+
+def test_unsupported_model_is_rejected():
+    model, preprocessor = _fit(MLPRegressor(hidden_layer_sizes=(4,), max_iter=50))
+
+    with pytest.raises(fused.FusedExportError):
+        fused.export_fused(model, preprocessor)
+
+
+def test_xgboost_regressor_is_rejected_before_verification(monkeypatch):
+    model, preprocessor = _fit(xgb.XGBRegressor(n_estimators=5, max_depth=2))
+    monkeypatch.setattr(fused, "max_deviation", lambda *args: pytest.fail("vérification inattendue"))
+
+    with pytest.raises(fused.FusedExportError, match="XGBRegressor"):
+        fused.export_fused(model, preprocessor)
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from ia.src.ml.models import halving_search
+from ia.src.ml.models.halving_search import HalvingXGBSearch
+
+SPACE = {"max_depth": [2, 3, 4], "learning_rate": [0.1, 0.3], "subsample": [0.8, 1.0]}
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(halving_search, "SEARCH_CACHE_DIR", tmp_path / "search_cache")
+
+
+def _data(n=240, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5))
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(0, 0.3, n) > 0).astype(int)
+    return X, y
+
+
+def _search(**kwargs):
+    params = dict(n_candidates=9, factor=3, min_resource=30, max_resource=90, cv=3, n_jobs=1, verbose=0)
+    params.update(kwargs)
+    return HalvingXGBSearch("classification", SPACE, base_params={"random_state": 0}, **params)
+
+
+def test_rungs_shrink_candidates_and_grow_budget():
+    assert _search().rungs() == [(9, 30), (3, 90)]
+    assert _search(n_candidates=81, min_resource=10, max_resource=200).rungs() == [
+        (81, 10), (27, 30), (9, 90), (3, 200)
+    ]
+
+
+def test_search_refits_best_candidate_with_early_stopped_trees():
+    X, y = _data()
+
+    search = _search().fit(X, y)
+
+    assert search.n_fits_ == (9 + 3) * 3
+    assert 1 <= search.best_n_estimators_ <= 90
+    assert search.best_estimator_.n_estimators == search.best_n_estimators_
+    assert search.best_score_ > 0.7
+    assert [h["rung"] for h in search.history_].count(1) == 3
+
+
+def test_interrupted_search_resumes_from_fold_cache():
+    X, y = _data()
+    first = _search().fit(X, y)
+
+    # Interruption simulée : on tronque le cache au milieu du premier rung
+    lines = first.cache_path_.read_text().splitlines(keepends=True)
+    first.cache_path_.write_text("".join(lines[:10]) + lines[10][:15])
+
+    resumed = _search().fit(X, y)
+
+    assert resumed.n_cached_ == 10
+    assert resumed.n_fits_ == first.n_fits_ - 10
+    assert resumed.best_params_ == first.best_params_
+
+    again = _search().fit(X, y)
+    assert again.n_fits_ == 0
+
+
+def test_regression_task_scores_r2():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(200, 4))
+    y = 3 * X[:, 0] - X[:, 2] + rng.normal(0, 0.1, 200)
+
+    search = HalvingXGBSearch(
+        "regression", SPACE, n_candidates=3, min_resource=60, cv=3, verbose=0
+    ).fit(X, y)
+
+    assert search.best_score_ > 0.8
+
+
+# L'early stopping se fait sur une part du fold d'entraînement, jamais sur le fold évalué
+def test_early_stopping_uses_holdout_from_training_fold(monkeypatch):
+    X, y = _data()
+    search = _search()
+    train_idx, val_idx = search._folds(X, y)[0]
+
+    fit_idx, stop_idx = search._early_stopping_split(train_idx, y)
+
+    assert sorted(np.concatenate([fit_idx, stop_idx])) == sorted(train_idx)
+    assert not set(stop_idx) & set(val_idx)
+    assert len(stop_idx) == pytest.approx(len(train_idx) * halving_search.EARLY_STOPPING_FRACTION, abs=1)
+
+    eval_rows = []
+    train = halving_search.xgb.train
+
+    def _recording_train(params, dtrain, **kwargs):
+        eval_rows.append((dtrain.num_row(), kwargs["evals"][0][0].num_row()))
+        return train(params, dtrain, **kwargs)
+
+    monkeypatch.setattr(halving_search.xgb, "train", _recording_train)
+    search.fit(X, y)
+
+    assert set(eval_rows) == {(len(fit_idx), len(stop_idx))}
+
+
+# Folds explicites (ex. folds temporels) : utilisés tels quels et pris en compte par le cache
+def test_explicit_cv_splits_are_used():
+    X, y = _data()
+    splits = [(np.arange(0, 120), np.arange(120, 180)), (np.arange(0, 180), np.arange(180, 240))]
+
+    search = _search(cv=splits).fit(X, y)
+
+    assert search.n_fits_ == (9 + 3) * 2
+    assert search.cache_path_ != _search().fit(X, y).cache_path_
@@ -0,0 +1,137 @@
+# Tests unitaires des métriques d'inférence ML
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+from app.routers import predict as predict_router
+from app.services import inference_metrics, prediction_cache, warmup
+from ia.src.ml import predict as ml
+
+
+ROW = {
+    "country": "France",
+    "year": 2024,
+    "co2_emissions": 24800.0,
+    "co2_per_passenger": 1.75,
+    "co2_lag1": 25100.0,
+    "passengers_lag1": 88000.0,
+    "passengers_lag2": 86500.0,
+}
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch):
+    prediction_cache.clear()
+    monkeypatch.setattr(predict_router, "ml_model_info", lambda axis: {"version": "v-metrics"})
+    yield
+    prediction_cache.clear()
+
+
+def _mock_loaded(axis):
+    preprocessor = MagicMock()
+    preprocessor.transform.side_effect = lambda df: df[["year"]].to_numpy()
+    model = MagicMock()
+    model.predict.side_effect = lambda X: np.full(len(X), 91000.0)
+    del model.predict_proba
+    return ml.LoadedModel(
+        axis=axis, version="v-test", model_name="mock", trained_at="2025-01-02T00:00:00+00:00",
+        metrics={}, model=model, preprocessor=preprocessor, source_key=("mock",),
+    )
+
+
+# Le chemin sklearn mesure séparément le preprocesseur et le modèle
+def test_sklearn_path_reports_preprocess_and_model_stages(monkeypatch):
+    loaded = _mock_loaded("regression")
+    monkeypatch.setattr(ml, "load_model", lambda axis: loaded)
+    stages = [{"axis": "regression", "stage": stage} for stage in ("preprocess", "model")]
+    before = [_sample("obrail_inference_stage_seconds_count", labels) for labels in stages]
+
+    ml.predict_batch("regression", [ROW, ROW])
+
+    after = [_sample("obrail_inference_stage_seconds_count", labels) for labels in stages]
+    assert after == [count + 1 for count in before]
+
+
+# Les prédictions synthétiques de la chauffe n'alimentent pas les histogrammes
+def test_warmup_does_not_feed_stage_histograms(monkeypatch):
+    models = {axis: _mock_loaded(axis) for axis in warmup.AXES}
+    monkeypatch.setattr(ml, "load_model", lambda axis: models[axis])
+    monkeypatch.setattr(warmup, "load_artifacts", lambda axis: None)
+    stages = [{"axis": axis, "stage": stage} for axis in warmup.AXES for stage in ("preprocess", "model")]
+    before = [_sample("obrail_inference_stage_seconds_count", labels) for labels in stages]
+
+    try:
+        status = warmup.warm_up_models()
+    finally:
+        warmup.reset()
+
+    assert status["models"]["regression"]["loaded"] is True
+    assert models["regression"].model.predict.call_count > warmup.MODEL_WARMUP_ROUNDS
+    assert [_sample("obrail_inference_stage_seconds_count", labels) for labels in stages] == before
+    # Hors chauffe, les observateurs sont de nouveau actifs
+    ml.predict_batch("regression", [ROW])
+    assert _sample("obrail_inference_stage_seconds_count", stages[-1]) == before[-1] + 1
+
+
+# Endpoint : distribution des probabilités, étape "response" et pays inconnus
+def test_classification_batch_feeds_distribution_and_unknown_countries(monkeypatch):
+    monkeypatch.setattr(
+        predict_router,
+        "ml_predict_batch",
+        lambda axis, rows: [
+            {"axis": axis, "country": r["country"], "year": r["year"],
+             "prediction": 1, "label": "En déclin", "probability": 0.85,
+             "model_version": "v-metrics", "model_trained_at": "2025-01-02T00:00:00+00:00"}
+            for r in rows
+        ],
+    )
+    response_labels = {"axis": "classification", "stage": "response"}
+    before = {
+        "high": _sample("obrail_predicted_decline_probability_bucket", {"le": "0.9"}),
+        "low": _sample("obrail_predicted_decline_probability_bucket", {"le": "0.8"}),
+        "response": _sample("obrail_inference_stage_seconds_count", response_labels),
+        "unknown": _sample("obrail_prediction_unknown_country_total", {"axis": "classification"}),
+    }
+
+    items = [ROW, {**ROW, "country": "Atlantis"}, {**ROW, "year": 2030}]
+    response = TestClient(app).post("/api/predict/classification/batch", json={"items": items})
+
+    assert response.status_code == 200
+    assert _sample("obrail_predicted_decline_probability_bucket", {"le": "0.9"}) == before["high"] + 3
+    assert _sample("obrail_predicted_decline_probability_bucket", {"le": "0.8"}) == before["low"]
+    assert _sample("obrail_inference_stage_seconds_count", response_labels) == before["response"] + 1
+    assert _sample("obrail_prediction_unknown_country_total", {"axis": "classification"}) == before["unknown"] + 1
+
+
+def test_regression_predictions_feed_passenger_distribution():
+    before = _sample("obrail_predicted_passengers_thousands_count")
+
+    inference_metrics.observe_predictions("regression", [{"prediction": 88000.0}, {"prediction": -12.0}])
+
+    assert _sample("obrail_predicted_passengers_thousands_count") == before + 2
+    assert _sample("obrail_predicted_passengers_thousands_bucket", {"le": "0.0"}) >= 1
+
+
+# Version et âge : lus au scrape dans les modèles en mémoire
+def test_model_collector_exports_version_and_age(monkeypatch):
+    trained = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat(timespec="seconds")
+    monkeypatch.setattr(inference_metrics, "loaded_models", lambda: {
+        "regression": SimpleNamespace(version="v42", model_name="Ridge", trained_at=trained),
+        "classification": SimpleNamespace(version="v7", model_name="XGB", trained_at="inconnue"),
+    })
+
+    labels = {"axis": "regression", "version": "v42", "model_name": "Ridge"}
+    assert REGISTRY.get_sample_value("obrail_model_info", labels) == 1
+    age = REGISTRY.get_sample_value("obrail_model_age_seconds", {"axis": "regression"})
+    assert 2 * 86400 - 60 < age < 2 * 86400 + 60
+    assert REGISTRY.get_sample_value("obrail_model_age_seconds", {"axis": "classification"}) is None
@@ -1,7 +1,15 @@
+import asyncio
 import json
+import os
+import sys
+import time
 from pathlib import Path
 
+import httpx
+import pytest
+
 from app.routers import internal
+from app.services.prometheus import PrometheusClient
 
 
 def test_read_json_returns_data_for_valid_file(tmp_path):
@@ -49,7 +57,7 @@ def test_run_command_reports_success():
 def test_first_ok_returns_first_success(monkeypatch):
     calls = []
 
-    def fake_http_json(url, timeout=2):
+    async def fake_http_json(url, params=None, headers=None, timeout=2):
         calls.append(url)
         if "bad" in url:
             return {"error": "unavailable"}
@@ -57,8 +65,141 @@ def test_first_ok_returns_first_success(monkeypatch):
 
     monkeypatch.setattr(internal, "_http_json", fake_http_json)
 
-    result, base_url = internal._first_ok(["http://bad", "http://good"], "/health")
+    result, base_url = asyncio.run(internal._first_ok(["http://bad", "http://good"], "/health"))
 
     assert result == {"status": "ok"}
     assert base_url == "http://good"
     assert calls == ["http://bad/health", "http://good/health"]
+
+
+def test_prometheus_status_batches_metrics_and_sparklines(monkeypatch):
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if request.url.path == "/api/v1/targets":
+            return httpx.Response(200, json={"status": "success", "data": {
+                "activeTargets": [{"labels": {"job": "fastapi"}}]
+            }})
+        if request.url.path == "/api/v1/query_range":
+            return httpx.Response(200, json={"status": "success", "data": {"resultType": "matrix", "result": [
+                {"metric": {}, "values": [[1700000000, "3"]]}
+            ]}})
+        return httpx.Response(200, json={"status": "success", "data": {"resultType": "vector", "result": [
+            {"metric": {"handler": "/"}, "value": [1700000000, "1"]}
+        ]}})
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(internal, "PROMETHEUS", PrometheusClient(["http://prom"], lambda: http))
+
+    result = asyncio.run(internal._prometheus_status())
+
+    assert paths.count("/api/v1/query") == len(internal.PROMETHEUS_METRICS) + 1
+    assert paths.count("/api/v1/query_range") == len(internal.PROMETHEUS_SPARKLINES)
+    assert result["metrics"]["api_up"] == 1.0
+    assert result["metrics"]["endpoints"][0]["metric"] == {"handler": "/"}
+    assert result["prometheus"]["url"] == "http://prom"
+    assert result["prometheus"]["target"] == {"labels": {"job": "fastapi"}}
+    assert result["prometheus"]["sparklines"]["requests_per_minute"] == [[1700000000.0, 3.0]]
+
+
+@pytest.fixture
+def fake_sources(monkeypatch):
+    """Remplace les sources de /overview par une source rapide et une lente."""
+    calls = {"fast": 0, "slow": 0}
+
+    async def fast():
+        calls["fast"] += 1
+        return {"value": calls["fast"]}
+
+    async def slow():
+        calls["slow"] += 1
+        await asyncio.sleep(0.2)
+        return {"value": calls["slow"]}
+
+    monkeypatch.setattr(internal, "OVERVIEW_SOURCES", {
+        "fast": internal._Snapshot("fast", fast, 60, lambda: {"value": None}),
+        "slow": internal._Snapshot("slow", slow, 60, lambda: {"value": None}),
+    })
+    return calls
+
+
+def test_overview_returns_partial_results_at_deadline(fake_sources):
+    async def scenario():
+        started = time.perf_counter()
+        values, statuses = await internal._collect_overview(0.05)
+        elapsed = time.perf_counter() - started
+
+        # La source lente termine en arrière-plan et alimente le snapshot
+        await asyncio.sleep(0.3)
+        values_after, statuses_after = await internal._collect_overview(0.05)
+        return elapsed, values, statuses, values_after, statuses_after
+
+    elapsed, values, statuses, values_after, statuses_after = asyncio.run(scenario())
+
+    assert elapsed < 0.15
+    assert values == {"fast": {"value": 1}, "slow": {"value": None}}
+    assert statuses["fast"]["status"] == "fresh"
+    assert statuses["slow"]["status"] == "pending"
+    assert values_after == {"fast": {"value": 1}, "slow": {"value": 1}}
+    assert statuses_after["slow"]["status"] == "fresh"
+    assert fake_sources == {"fast": 1, "slow": 1}
+
+
+def test_overview_serves_stale_snapshot_while_refreshing(fake_sources):
+    async def scenario():
+        await internal._collect_overview(1)
+        internal.OVERVIEW_SOURCES["slow"].updated_at -= 120
+        stale_values, stale_statuses = await internal._collect_overview(0.05)
+        await internal._collect_overview(0.05)  # pas de second rafraîchissement concurrent
+        await asyncio.sleep(0.3)
+        return stale_values, stale_statuses, internal.OVERVIEW_SOURCES["slow"].value
+
+    stale_values, stale_statuses, refreshed = asyncio.run(scenario())
+
+    assert stale_values["slow"] == {"value": 1}
+    assert stale_statuses["slow"]["status"] == "stale"
+    assert refreshed == {"value": 2}
+    assert fake_sources["slow"] == 2
+
+
+def test_cached_diagnostics_flags_reports_older_than_data(tmp_path):
+    audit_dir = tmp_path / "audit"
+    audit_dir.mkdir()
+    warehouse = tmp_path / "warehouse"
+    warehouse.mkdir()
+    data_file = warehouse / "facts.csv"
+    data_file.write_text("a\n1\n", encoding="utf-8")
+    report = audit_dir / "diagnostic_report_avance.json"
+    report.write_text(json.dumps({"statut": "OK"}), encoding="utf-8")
+
+    fresh = internal._cached_diagnostics(audit_dir)
+
+    assert fresh["reports"]["avance"]["report"] == {"statut": "OK"}
+    assert fresh["reports"]["avance"]["stale"] is False
+    assert fresh["reports"]["ml"] == {"available": False, "path": str(audit_dir / "diagnostic_ml_avance.json"), "report": None}
+
+    later = report.stat().st_mtime + 60
+    os.utime(data_file, (later, later))
+
+    assert internal._cached_diagnostics(audit_dir)["reports"]["avance"]["stale"] is True
+
+
+def test_job_stream_replays_output_until_completion(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.jobs import JobManager
+
+    manager = JobManager(tmp_path)
+    monkeypatch.setattr(internal, "JOBS", manager)
+    monkeypatch.setattr(internal, "JOBS_STREAM_POLL", 0.01)
+    job, _ = manager.submit("tests", [sys.executable, "-c", "print('un'); print('deux')"])
+
+    response = TestClient(app).get(f"/api/internal/jobs/{job.id}/stream")
+    events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+    assert [event["kind"] for event in events] == ["section_start", "log", "log", "section_end", "done"]
+    assert [event["line"] for event in events if event["kind"] == "log"] == ["un", "deux"]
+    assert "succeeded" in events[3]["line"]
+    assert TestClient(app).get("/api/internal/jobs/inconnu").status_code == 404
+    manager.shutdown()
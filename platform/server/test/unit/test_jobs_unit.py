@@ -0,0 +1,107 @@
+import json
+import sys
+import time
+
+import pytest
+
+from app.services import jobs
+from app.services.jobs import JobManager
+
+
+def _wait(job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert job.done
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = JobManager(tmp_path / "jobs", max_workers=2)
+    yield manager
+    manager.shutdown()
+
+
+def test_submit_returns_immediately_and_persists_output(manager, tmp_path):
+    script = "import time; print('debut', flush=True); time.sleep(0.3); print('fin')"
+
+    job, deduplicated = manager.submit("diagnostic", [sys.executable, "-c", script], on_finish=lambda job: {"lignes": job.line_count})
+
+    assert deduplicated is False
+    assert job.status in ("queued", "running")
+    _wait(job)
+    assert job.status == "succeeded" and job.to_dict()["success"] is True
+    assert list(job.lines) == ["debut", "fin"]
+    assert job.result == {"lignes": 2}
+    persisted = json.loads((tmp_path / "jobs" / f"{job.id}.json").read_text(encoding="utf-8"))
+    assert persisted["status"] == "succeeded" and persisted["output"] == ["debut", "fin"]
+
+
+def test_identical_running_job_is_deduplicated(manager):
+    command = [sys.executable, "-c", "import time; time.sleep(0.5)"]
+
+    first, _ = manager.submit("tests", command)
+    second, deduplicated = manager.submit("tests", command)
+
+    assert deduplicated is True and second is first
+    _wait(first)
+    third, deduplicated = manager.submit("tests", command)
+    assert deduplicated is False and third is not first
+    _wait(third)
+
+
+def test_timeout_kills_the_process(manager):
+    job, _ = manager.submit("tests", [sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.2)
+
+    _wait(job)
+
+    assert job.status == "timeout"
+    assert job.to_dict()["success"] is False
+
+
+# Timer déclenché après la fin du processus (avant cancel) : pas de faux timeout
+def test_timer_firing_after_exit_keeps_success(manager, monkeypatch):
+    class LateTimer:
+        def __init__(self, interval, function, args):
+            self.function, self.args = function, args
+
+        def start(self):
+            pass
+
+        def cancel(self):
+            self.function(*self.args)
+
+    monkeypatch.setattr(jobs.threading, "Timer", LateTimer)
+
+    job, _ = manager.submit("tests", [sys.executable, "-c", "print('ok')"], timeout=60)
+    _wait(job)
+
+    assert job.status == "succeeded" and job.error is None
+    assert job.timed_out is False
+
+
+def test_missing_command_is_reported(manager):
+    job, _ = manager.submit("tests", ["commande-introuvable-obrail"])
+
+    _wait(job)
+
+    assert job.status == "error" and "indisponible" in job.error
+
+
+def test_unfinished_job_from_previous_run_is_marked_interrupted(manager, tmp_path):
+    (tmp_path / "jobs").mkdir()
+    (tmp_path / "jobs" / "abc123.json").write_text(json.dumps({"id": "abc123", "status": "running"}), encoding="utf-8")
+
+    assert manager.get("abc123")["status"] == "interrupted"
+    assert manager.get("../etc") is None
+
+
+def test_lines_since_skips_dropped_lines(monkeypatch):
+    monkeypatch.setattr(jobs, "JOBS_MAX_LINES", 3)
+    job = jobs.Job("tests", "tests", ["true"])
+    for i in range(5):
+        job.append(str(i))
+
+    assert job.lines_since(0) == (["2", "3", "4"], 5)
+    assert job.lines_since(4) == (["4"], 5)
+    assert job.lines_since(5) == ([], 5)
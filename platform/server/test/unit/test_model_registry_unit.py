@@ -0,0 +1,130 @@
+import json
+import os
+
+import joblib
+import pytest
+
+from ia.src.ml import predict as ml
+from ia.src.ml import registry
+
+
+@pytest.fixture
+def registry_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "REGISTRY_DIR", tmp_path / "registry")
+    monkeypatch.setattr(ml, "_loaded", {})
+    monkeypatch.setattr(ml, "_checked_at", {})
+    monkeypatch.setattr(ml, "_failed_keys", {})
+    return tmp_path / "registry"
+
+
+def test_publish_writes_manifest_and_points_current(registry_dir):
+    version = registry.publish(
+        "regression", {"coef": 1}, {"prep": 1}, "ridge_optimized", metrics={"r2": 0.99}
+    )
+
+    manifest = json.loads((registry_dir / "regression" / version / "manifest.json").read_text())
+    assert registry.current_version("regression") == version
+    assert manifest["model_name"] == "ridge_optimized"
+    assert manifest["metrics"] == {"r2": 0.99}
+    assert len(manifest["model"]["sha256"]) == 64
+    assert version.endswith(manifest["model"]["sha256"][:8])
+
+
+def test_base_model_does_not_replace_optimized(registry_dir):
+    optimized = registry.publish("classification", {"m": "opt"}, {"p": 1}, "xgboost_optimized")
+    base = registry.publish("classification", {"m": "base"}, {"p": 1}, "xgboost")
+
+    assert registry.current_version("classification") == optimized
+    registry.promote("classification", base)
+    assert registry.current_version("classification") == base
+
+
+def test_promote_rejects_unknown_version(registry_dir):
+    with pytest.raises(FileNotFoundError):
+        registry.promote("regression", "does-not-exist")
+
+
+def test_publish_accepts_joblib_paths(registry_dir, tmp_path):
+    model_path = tmp_path / "ridge_reg.joblib"
+    prep_path = tmp_path / "prep.joblib"
+    joblib.dump({"coef": 2}, model_path)
+    joblib.dump({"prep": 2}, prep_path)
+
+    version = registry.publish("regression", model_path, prep_path, "ridge")
+
+    assert joblib.load(registry_dir / "regression" / version / "model.joblib") == {"coef": 2}
+
+
+def test_api_loader_swaps_to_new_current_version(registry_dir, monkeypatch):
+    monkeypatch.setattr(ml, "MODEL_RELOAD_INTERVAL", 0)
+    v1 = registry.publish("regression", {"coef": 1}, {"prep": 1}, "ridge_optimized", activate=True)
+    first = ml.load_model("regression")
+
+    v2 = registry.publish("regression", {"coef": 2}, {"prep": 2}, "ridge_optimized", activate=True)
+    second = ml.load_model("regression")
+
+    assert (first.version, first.model) == (v1, {"coef": 1})
+    assert (second.version, second.model) == (v2, {"coef": 2})
+    assert ml.model_info("regression")["version"] == v2
+
+
+def test_api_loader_keeps_serving_when_new_version_is_broken(registry_dir, monkeypatch):
+    monkeypatch.setattr(ml, "MODEL_RELOAD_INTERVAL", 0)
+    v1 = registry.publish("regression", {"coef": 1}, {"prep": 1}, "ridge_optimized")
+    ml.load_model("regression")
+    registry.pointer_path("regression").write_text("missing-version\n")
+
+    assert ml.load_model("regression").version == v1
+
+
+# Une version cassée n'est ni rechargée ni re-signalée à chaque vérification
+def test_api_loader_does_not_retry_broken_version(registry_dir, monkeypatch, caplog):
+    monkeypatch.setattr(ml, "MODEL_RELOAD_INTERVAL", 0)
+    v1 = registry.publish("regression", {"coef": 1}, {"prep": 1}, "ridge_optimized")
+    ml.load_model("regression")
+    registry.pointer_path("regression").write_text("missing-version\n")
+    loads = []
+    load_source = ml._load_source
+    monkeypatch.setattr(ml, "_load_source", lambda axis, key: loads.append(key) or load_source(axis, key))
+
+    with caplog.at_level("WARNING", logger="obrail.ml.predict"):
+        for _ in range(3):
+            assert ml.load_model("regression").version == v1
+
+    assert len(loads) == 1
+    assert len([r for r in caplog.records if "impossible" in r.message]) == 1
+
+    v2 = registry.publish("regression", {"coef": 2}, {"prep": 2}, "ridge_optimized", activate=True)
+    assert ml.load_model("regression").version == v2
+
+
+def test_publish_prunes_old_versions_but_keeps_current(registry_dir, monkeypatch):
+    monkeypatch.setattr(registry, "MODEL_REGISTRY_KEEP", 2)
+    served = registry.publish("classification", {"m": 0}, {"p": 0}, "xgboost_optimized")
+    for i in range(1, 4):
+        registry.publish("classification", {"m": i}, {"p": i}, "xgboost")
+
+    versions = [m["version"] for m in registry.list_versions("classification")]
+    assert registry.current_version("classification") == served
+    assert len(versions) == 3
+    assert versions[0] == served
+    assert sorted(p.name for p in (registry_dir / "classification").iterdir() if p.is_dir()) == sorted(versions)
+
+
+def test_api_loader_reloads_legacy_file_overwritten_in_place(registry_dir, tmp_path, monkeypatch):
+    model_path = tmp_path / "ridge_optimized_reg.joblib"
+    prep_path = tmp_path / "preprocessor_regression.joblib"
+    joblib.dump({"coef": 1}, model_path)
+    joblib.dump({"prep": 1}, prep_path)
+    monkeypatch.setattr(ml, "_resolve_model_path", lambda axis: (model_path, prep_path))
+    monkeypatch.setattr(ml, "MODEL_RELOAD_INTERVAL", 0)
+
+    assert ml.load_model("regression").model == {"coef": 1}
+
+    joblib.dump({"coef": 2}, model_path)
+    stat = model_path.stat()
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    reloaded = ml.load_model("regression")
+    assert reloaded.model == {"coef": 2}
+    assert reloaded.model_name == "ridge_optimized"
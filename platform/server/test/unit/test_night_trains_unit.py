@@ -1,42 +1,62 @@
 # Importer les modules nécessaires pour les tests unitaires
 
-from types import SimpleNamespace
 from unittest.mock import MagicMock
-from app.routers.night_trains import _to_response, _apply_pagination
-
-
-# Tests unitaires pour les fonctions utilitaires de night_trains.py
-def test_to_response_returns_valid_object():
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app.models import Base, DimCountries, DimOperators, DimYears, FactsNightTrains
+from app.routers.night_trains import _apply_pagination, _build_night_trains_query
+from app.responses import rows_to_dicts
+from app.schemas.trains import NightTrainResponse
+
+
+def _fetch_trains(trains):
+    """Exécute la requête de base sur une base SQLite en mémoire."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add_all([
+            DimCountries(country_id=1, country_code="FR", country_name="France"),
+            DimOperators(operator_id=1, operator_name="SNCF"),
+            DimYears(year_id=1, year=2024, is_after_2010=True),
+        ])
+        db.flush()
+        db.connection().execute(insert(FactsNightTrains.__table__), trains)
+        db.commit()
+        return rows_to_dicts(db.execute(_build_night_trains_query()))
+
+
+# Tests unitaires pour la construction des lignes de réponse (sans Pydantic par ligne)
+def test_train_row_returns_valid_object():
     """
-    Vérifie que _to_response construit correctement
-    une réponse API.
+    Vérifie que la requête produit directement une ligne
+    conforme au schéma de réponse API.
     """
 
-    train = SimpleNamespace(
+    rows = _fetch_trains([dict(
         fact_id=1,
         route_id="FR001",
         night_train="Paris → Nice",
         is_night=True,
         distance_km=1200,
-        duration_min=720
-    )
-
-    response = _to_response(
-        train,
-        country_name="France",
-        country_code="FR",
-        operator_name="SNCF",
-        year=2024
-    )
-
-    assert response.fact_id == 1
-    assert response.route_id == "FR001"
-    assert response.night_train == "Paris → Nice"
-    assert response.country_name == "France"
-    assert response.country_code == "FR"
-    assert response.operator_name == "SNCF"
-    assert response.year == 2024
-    assert response.train_type == "night"
+        duration_min=720,
+        country_id=1,
+        operator_id=1,
+        year_id=1,
+    )])
+
+    response = rows[0]
+    NightTrainResponse.model_validate(response)
+
+    assert response["fact_id"] == 1
+    assert response["route_id"] == "FR001"
+    assert response["night_train"] == "Paris → Nice"
+    assert response["country_name"] == "France"
+    assert response["country_code"] == "FR"
+    assert response["operator_name"] == "SNCF"
+    assert response["year"] == 2024
+    assert response["train_type"] == "night"
+    assert isinstance(response["distance_km"], float)
 
 
 # Tests pour vérifier que les fonctions de pagination fonctionnent correctement
@@ -83,53 +103,44 @@ def test_apply_pagination_without_limit():
 
 
 # Test pour vérifier que les trains de jour ont bien train_type='day'
-def test_to_response_day_train():
+def test_train_row_day_train():
     """
     Vérifie qu'un train de jour retourne train_type='day'
     """
 
-    train = SimpleNamespace(
+    rows = _fetch_trains([dict(
         fact_id=2,
         route_id="FR002",
         night_train="Paris → Lyon",
         is_night=False,
         distance_km=500,
-        duration_min=120
-    )
+        duration_min=120,
+        country_id=1,
+        operator_id=1,
+        year_id=1,
+    )])
 
-    response = _to_response(
-        train,
-        country_name="France",
-        country_code="FR",
-        operator_name="SNCF",
-        year=2024
-    )
-
-    assert response.train_type == "day"
+    assert rows[0]["train_type"] == "day"
+    assert rows[0]["is_night"] is False
 
 
 # Test pour vérifier que les valeurs None sont correctement gérées
-def test_to_response_handles_none_values():
+def test_train_row_handles_none_values():
     """
     Vérifie que les valeurs None sont correctement gérées.
     """
 
-    train = SimpleNamespace(
+    rows = _fetch_trains([dict(
         fact_id=3,
         route_id="FR003",
         night_train="Test Train",
         is_night=True,
         distance_km=None,
-        duration_min=None
-    )
-
-    response = _to_response(
-        train,
-        country_name="France",
-        country_code="FR",
-        operator_name="SNCF",
-        year=2024
-    )
-
-    assert response.distance_km is None
-    assert response.duration_min is None
\ No newline at end of file
+        duration_min=None,
+        country_id=1,
+        operator_id=1,
+        year_id=1,
+    )])
+
+    assert rows[0]["distance_km"] is None
+    assert rows[0]["duration_min"] is None
@@ -0,0 +1,144 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import predict as predict_router
+from app.services import prediction_cache
+from ia.src.ml import predict as ml
+
+
+ROW = {
+    "country": "France",
+    "year": 2024,
+    "co2_emissions": 24800.0,
+    "co2_per_passenger": 1.75,
+    "co2_lag1": 25100.0,
+    "passengers_lag1": 88000.0,
+    "passengers_lag2": 86500.0,
+}
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch):
+    prediction_cache.clear()
+    monkeypatch.setattr(predict_router, "ml_model_info", lambda axis: {"version": "v-batch"})
+    yield
+    prediction_cache.clear()
+
+
+def _mock_artifacts(monkeypatch, preds, probas=None):
+    preprocessor = MagicMock()
+    preprocessor.transform.side_effect = lambda df: df[["year"]].to_numpy()
+    model = MagicMock()
+    model.predict.side_effect = lambda X: np.asarray(preds[: len(X)])
+    if probas is None:
+        del model.predict_proba
+    else:
+        model.predict_proba.side_effect = lambda X: np.asarray([[1 - p, p] for p in probas[: len(X)]])
+    loaded = ml.LoadedModel(
+        axis="test", version="v-test", model_name="mock", trained_at="2025-01-02T00:00:00+00:00",
+        metrics={}, model=model, preprocessor=preprocessor, source_key=("mock",),
+    )
+    monkeypatch.setattr(ml, "load_model", lambda axis: loaded)
+    return model, preprocessor
+
+
+def test_predict_batch_runs_one_transform_and_one_model_call(monkeypatch):
+    model, preprocessor = _mock_artifacts(monkeypatch, [1, 0, 1], probas=[0.9, 0.2, 0.61234])
+    rows = [{**ROW, "year": year} for year in (2024, 2025, 2026)]
+
+    results = ml.predict_batch("classification", rows)
+
+    assert preprocessor.transform.call_count == 1
+    assert model.predict.call_count == 1
+    assert model.predict_proba.call_count == 1
+    assert list(preprocessor.transform.call_args[0][0].columns) == ml.EXPECTED_FEATURES
+    assert [r["year"] for r in results] == [2024, 2025, 2026]
+    assert results[2] == {
+        "axis": "classification",
+        "country": "France",
+        "year": 2026,
+        "prediction": 1,
+        "label": "En déclin",
+        "probability": 0.6123,
+        "model_version": "v-test",
+        "model_trained_at": "2025-01-02T00:00:00+00:00",
+    }
+
+
+def test_predict_batch_matches_single_predict(monkeypatch):
+    _mock_artifacts(monkeypatch, [91234.567])
+
+    single = ml.predict("regression", **ROW)
+    batch = ml.predict_batch("regression", [ROW])
+
+    assert batch == [single]
+
+
+def test_predict_batch_reports_all_incomplete_rows():
+    rows = [ROW, {"country": "Spain", "year": 2024}, {**ROW}]
+    del rows[2]["co2_lag1"]
+
+    with pytest.raises(ValueError) as exc:
+        ml.predict_batch("regression", rows)
+
+    assert "ligne 1" in str(exc.value)
+    assert "ligne 2 : ['co2_lag1']" in str(exc.value)
+
+
+def test_predict_batch_rejects_invalid_axis():
+    with pytest.raises(ValueError):
+        ml.predict_batch("clustering", [ROW])
+
+
+def test_classification_batch_endpoint_keeps_per_row_enrichment(monkeypatch):
+    monkeypatch.setattr(
+        predict_router,
+        "ml_predict_batch",
+        lambda axis, rows: [
+            {"axis": axis, "country": r["country"], "year": r["year"],
+             "prediction": 1, "label": "En déclin", "probability": 0.8,
+             "model_version": "v-batch", "model_trained_at": "2025-01-02T00:00:00+00:00"}
+            for r in rows
+        ],
+    )
+    client = TestClient(app)
+    items = [ROW, {**ROW, "country": "Atlantis"}]
+
+    response = client.post("/api/predict/classification/batch", json={"items": items})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    assert [item["country"] for item in body["items"]] == ["France", "Atlantis"]
+    assert body["items"][0]["risk_level"] == "Critique"
+    assert body["items"][0]["metadata"]["model_version"] == "v-batch"
+    assert body["items"][0]["metadata"]["training_date"] == "2025-01-02"
+    assert body["items"][0]["warnings"] == []
+    assert len(body["items"][1]["warnings"]) == 1
+    assert body["items"][0]["key_drivers"] == predict_router._build_clf_key_drivers(
+        ROW["passengers_lag1"], ROW["passengers_lag2"], ROW["co2_per_passenger"], 1
+    )
+
+
+def test_regression_batch_endpoint_maps_missing_model_to_503(monkeypatch):
+    def _missing(axis, rows):
+        raise FileNotFoundError("ridge_reg.joblib")
+
+    monkeypatch.setattr(predict_router, "ml_predict_batch", _missing)
+    client = TestClient(app)
+
+    response = client.post("/api/predict/regression/batch", json={"items": [ROW]})
+
+    assert response.status_code == 503
+
+
+def test_batch_endpoint_rejects_empty_batch():
+    client = TestClient(app)
+
+    response = client.post("/api/predict/regression/batch", json={"items": []})
+
+    assert response.status_code == 422
@@ -0,0 +1,107 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import predict as predict_router
+from app.services import prediction_cache
+
+
+ROW = {
+    "country": "France",
+    "year": 2024,
+    "co2_emissions": 24800.0,
+    "co2_per_passenger": 1.75,
+    "co2_lag1": 25100.0,
+    "passengers_lag1": 88000.0,
+    "passengers_lag2": 86500.0,
+}
+
+
+@pytest.fixture
+def fake_ml(monkeypatch):
+    prediction_cache.clear()
+    state = {"version": "v1", "single": 0, "batch_rows": []}
+
+    def _predict(axis, **row):
+        state["single"] += 1
+        return {"axis": axis, "country": row["country"], "year": row["year"],
+                "prediction": 91000.0, "label": "91,000 milliers de passagers prévus",
+                "model_version": state["version"], "model_trained_at": "2025-01-02T00:00:00+00:00"}
+
+    def _predict_batch(axis, rows):
+        state["batch_rows"].append(len(rows))
+        return [_predict(axis, **row) for row in rows]
+
+    monkeypatch.setattr(predict_router, "ml_predict", _predict)
+    monkeypatch.setattr(predict_router, "ml_predict_batch", _predict_batch)
+    monkeypatch.setattr(predict_router, "ml_model_info", lambda axis: {"version": state["version"]})
+    yield state
+    prediction_cache.clear()
+
+
+def test_make_key_normalizes_numbers_and_country():
+    key = prediction_cache.make_key("regression", "v1", ROW)
+
+    assert key == prediction_cache.make_key("regression", "v1", {**ROW, "co2_emissions": 24800, "country": " France "})
+    assert key != prediction_cache.make_key("regression", "v2", ROW)
+    assert key != prediction_cache.make_key("classification", "v1", ROW)
+
+
+def test_local_backend_evicts_least_recently_used():
+    backend = prediction_cache.LocalBackend(max_size=2, ttl=60)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.get("b") is None
+    assert (backend.get("a"), backend.get("c")) == (1, 3)
+
+
+def test_local_backend_expires_entries(monkeypatch):
+    backend = prediction_cache.LocalBackend(max_size=10, ttl=5)
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    backend.set("a", 1)
+
+    now[0] += 6
+
+    assert backend.get("a") is None
+    assert len(backend) == 0
+
+
+def test_repeated_request_is_served_from_cache(fake_ml):
+    client = TestClient(app)
+
+    first = client.post("/api/predict/regression", json=ROW)
+    second = client.post("/api/predict/regression", json=ROW)
+
+    assert first.headers["X-Prediction-Cache"] == "miss"
+    assert second.headers["X-Prediction-Cache"] == "hit"
+    assert second.json() == first.json()
+    assert fake_ml["single"] == 1
+
+
+def test_new_model_version_bypasses_cache(fake_ml):
+    client = TestClient(app)
+    client.post("/api/predict/regression", json=ROW)
+
+    fake_ml["version"] = "v2"
+    response = client.post("/api/predict/regression", json=ROW)
+
+    assert response.headers["X-Prediction-Cache"] == "miss"
+    assert response.json()["metadata"]["model_version"] == "v2"
+
+
+def test_batch_scores_only_cache_misses(fake_ml):
+    client = TestClient(app)
+    client.post("/api/predict/regression", json=ROW)
+    items = [ROW, {**ROW, "year": 2025}, {**ROW, "year": 2026}]
+
+    response = client.post("/api/predict/regression/batch", json={"items": items})
+    again = client.post("/api/predict/regression/batch", json={"items": items})
+
+    assert response.headers["X-Prediction-Cache"] == "hits=1;misses=2"
+    assert again.headers["X-Prediction-Cache"] == "hits=3;misses=0"
+    assert fake_ml["batch_rows"] == [2]
+    assert [item["year"] for item in again.json()["items"]] == [2024, 2025, 2026]
@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import internal
+from app.services import profiler
+
+
+def _busy_until(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def _run_busy(target):
+    stop = threading.Event()
+    thread = threading.Thread(target=target, args=(stop,), name="busy-worker", daemon=True)
+    thread.start()
+    return stop, thread
+
+
+# Les piles du thread actif sont échantillonnées, les threads au repos écartés
+def test_sample_collects_busy_thread_stacks():
+    stop, thread = _run_busy(_busy_until)
+    idle_stop = threading.Event()
+    idle = threading.Thread(target=idle_stop.wait, name="idle-worker", daemon=True)
+    idle.start()
+    try:
+        result = profiler.sample(0.2, interval_ms=2)
+    finally:
+        stop.set()
+        idle_stop.set()
+        thread.join()
+
+    assert result.sample_count > 10
+    collapsed = result.collapsed()
+    assert any(line.startswith("busy-worker;") and "_busy_until" in line for line in collapsed.splitlines())
+    assert "idle-worker" not in collapsed
+
+
+# Le filtre par route ne garde que les piles contenant l'endpoint
+def test_sample_filters_on_route_codes():
+    app = FastAPI()
+
+    @app.get("/api/predict/heavy")
+    def heavy():
+        return {}
+
+    codes = profiler.route_codes(app.routes, "/api/predict")
+    assert codes == {heavy.__code__}
+
+    stop, thread = _run_busy(_busy_until)
+    try:
+        filtered = profiler.sample(0.05, interval_ms=2, codes=codes)
+        kept = profiler.sample(0.05, interval_ms=2, codes={_busy_until.__code__})
+    finally:
+        stop.set()
+        thread.join()
+
+    assert filtered.samples == {}
+    assert kept.samples and all(thread == "busy-worker" for thread, _ in kept.samples)
+
+
+def test_speedscope_export_references_shared_frames():
+    stop, thread = _run_busy(_busy_until)
+    try:
+        result = profiler.sample(0.05, interval_ms=2)
+    finally:
+        stop.set()
+        thread.join()
+
+    document = result.speedscope()
+    frames = document["shared"]["frames"]
+    profile = next(p for p in document["profiles"] if p["name"] == "busy-worker")
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert any(frames[i]["name"] == "_busy_until" for stack in profile["samples"] for i in stack)
+
+
+def test_sample_refuses_concurrent_profiles():
+    profiler._lock.acquire()
+    try:
+        with pytest.raises(profiler.ProfilerBusy):
+            profiler.sample(0.01)
+    finally:
+        profiler._lock.release()
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(internal.router)
+    return TestClient(app)
+
+
+# Sans PROFILER_TOKEN l'endpoint est absent, sinon le jeton est exigé
+def test_profile_endpoint_requires_token(monkeypatch):
+    client = _client()
+
+    monkeypatch.setattr(internal, "PROFILER_TOKEN", "")
+    assert client.post("/api/internal/profile?seconds=0").status_code == 404
+
+    monkeypatch.setattr(internal, "PROFILER_TOKEN", "secret")
+    assert client.post("/api/internal/profile?seconds=0").status_code == 401
+    assert client.post("/api/internal/profile?seconds=0", headers={"X-Profiler-Token": "faux"}).status_code == 401
+
+
+def test_profile_endpoint_returns_collapsed_and_speedscope(monkeypatch):
+    monkeypatch.setattr(internal, "PROFILER_TOKEN", "secret")
+    client = _client()
+    headers = {"X-Profiler-Token": "secret"}
+
+    stop, thread = _run_busy(_busy_until)
+    try:
+        collapsed = client.post("/api/internal/profile?seconds=0.1&interval_ms=2", headers=headers)
+        speedscope = client.post("/api/internal/profile?seconds=0.05&format=speedscope", headers=headers)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert collapsed.status_code == 200
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert "collapsed.txt" in collapsed.headers["content-disposition"]
+    assert int(collapsed.headers["x-profile-samples"]) > 0
+    assert "_busy_until" in collapsed.text
+
+    assert speedscope.status_code == 200
+    assert speedscope.json()["profiles"]
+
+
+def test_profile_endpoint_validates_format_and_prefix(monkeypatch):
+    monkeypatch.setattr(internal, "PROFILER_TOKEN", "secret")
+    client = _client()
+    headers = {"X-Profiler-Token": "secret"}
+
+    assert client.post("/api/internal/profile?format=pprof", headers=headers).status_code == 422
+    assert client.post("/api/internal/profile?route_prefix=/inconnu", headers=headers).status_code == 404
+
+    started = time.perf_counter()
+    response = client.post("/api/internal/profile?seconds=0.05&route_prefix=/api/internal/jobs", headers=headers)
+    assert response.status_code == 200
+    assert time.perf_counter() - started < 5
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+
+from app.services.prometheus import PrometheusClient, encode_params, range_step
+
+
+def _client(handler, urls=("http://prom-a", "http://prom-b"), cache_ttl=5):
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return PrometheusClient(list(urls), lambda: http, cache_ttl=cache_ttl)
+
+
+def _vector(value, metric=None):
+    return {"status": "success", "data": {"resultType": "vector", "result": [
+        {"metric": metric or {}, "value": [1700000000, str(value)]}
+    ]}}
+
+
+def test_encode_params_percent_encodes_promql():
+    encoded = encode_params({"query": 'sum(rate(http_requests_total{status=~"5.."}[1m])) * 60'})
+
+    assert encoded == (
+        "query=sum%28rate%28http_requests_total%7Bstatus%3D~%225..%22%7D%5B1m%5D%29%29%20%2A%2060"
+    )
+
+
+def test_range_step_is_a_multiple_of_scrape_interval_within_max_points():
+    assert range_step(0, 1800, max_points=60, scrape_interval=5) == 35
+    assert range_step(0, 60, max_points=60, scrape_interval=5) == 5
+    assert range_step(0, 60, step=12, scrape_interval=5) == 15
+
+
+def test_query_many_runs_concurrently_and_caches_for_scrape_interval():
+    requests = []
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        requests.append(request.url.params["query"])
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200, json=_vector(len(requests)))
+
+    prometheus = _client(handler)
+
+    async def scenario():
+        first = await prometheus.query_many({"a": "up", "b": "sum(up)", "c": "count(up)"})
+        second = await prometheus.query_many({"a": "up", "b": "sum(up)", "c": "count(up)"})
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert sorted(requests) == ["count(up)", "sum(up)", "up"]
+    assert in_flight["max"] == 3
+    assert first == second
+    assert prometheus.base_url == "http://prom-a"
+
+
+def test_falls_back_to_next_instance_and_remembers_it():
+    hosts = []
+
+    def handler(request):
+        hosts.append(request.url.host)
+        if request.url.host == "prom-a":
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200, json=_vector(1))
+
+    prometheus = _client(handler, cache_ttl=0)
+
+    asyncio.run(prometheus.query("up"))
+    asyncio.run(prometheus.query("up"))
+
+    assert hosts == ["prom-a", "prom-b", "prom-b"]
+    assert prometheus.base_url == "http://prom-b"
+
+
+def test_invalid_query_returns_none_without_retrying_other_instances():
+    hosts = []
+
+    def handler(request):
+        hosts.append(request.url.host)
+        return httpx.Response(400, json={"status": "error", "error": "parse error"})
+
+    assert asyncio.run(_client(handler).query("sum(")) is None
+    assert hosts == ["prom-a"]
+
+
+def test_query_range_aligns_bounds_and_downsamples():
+    seen = {}
+
+    def handler(request):
+        seen.update(request.url.params)
+        return httpx.Response(200, json={"status": "success", "data": {"resultType": "matrix", "result": [
+            {"metric": {}, "values": [[1000, "1.5"], [1035, "NaN"], [1070, "2"]]}
+        ]}})
+
+    series = asyncio.run(_client(handler).query_range("up", 1001, 2803, max_points=60))
+
+    step = float(seen["step"])
+    assert step == 35
+    assert float(seen["start"]) % step == 0 and float(seen["end"]) % step == 0
+    assert (float(seen["end"]) - float(seen["start"])) / step <= 59
+    assert series == [{"metric": {}, "values": [[1000.0, 1.5], [1070.0, 2.0]]}]
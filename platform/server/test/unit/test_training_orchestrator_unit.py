@@ -0,0 +1,93 @@
+import os
+
+import pandas as pd
+import pytest
+
+from ia.src.ml import orchestrator
+from ia.src.ml.orchestrator import TrainingTask
+
+
+# Lu à l'import du module : dans le fils, avant tout code de _run_task
+IMPORT_OMP = os.environ.get("OMP_NUM_THREADS")
+
+
+# Fonctions d'entraînement factices, importées par nom dans les processus fils
+def fake_import_budget():
+    print(f"import omp={IMPORT_OMP}")
+
+
+def fake_ok():
+    print(f"n_jobs={os.environ['TRAINING_N_JOBS']} omp={os.environ['OMP_NUM_THREADS']}")
+
+
+def fake_failure():
+    raise ValueError("dataset corrompu")
+
+
+def fake_crash():
+    os._exit(3)
+
+
+def _task(name, func_name, cores=1):
+    return TrainingTask(name, __name__, func_name, cores=cores)
+
+
+def test_tasks_run_in_isolation_with_core_budget(capsys):
+    tasks = [
+        _task("ok", "fake_ok", cores=8),
+        _task("failure", "fake_failure"),
+        _task("crash", "fake_crash"),
+    ]
+
+    report = {row["task"]: row for row in orchestrator.run_tasks(tasks, total_cores=2)}
+
+    assert report["ok"]["status"] == "ok"
+    assert report["ok"]["cores"] == 2
+    assert report["failure"]["error"] == "ValueError: dataset corrompu"
+    assert report["crash"]["status"] == "failed"
+    assert "exit code 3" in report["crash"]["error"]
+    assert "n_jobs=2 omp=2" in capsys.readouterr().out
+
+
+# Le budget est déjà dans l'environnement quand le fils importe ses modules,
+# et l'environnement du parent est restauré
+def test_budget_is_inherited_before_child_imports(capsys, monkeypatch):
+    monkeypatch.setenv("OMP_NUM_THREADS", "64")
+    monkeypatch.delenv("TRAINING_N_JOBS", raising=False)
+
+    report = orchestrator.run_tasks([_task("import", "fake_import_budget", cores=3)], total_cores=4)
+
+    assert report[0]["status"] == "ok"
+    assert "import omp=3" in capsys.readouterr().out
+    assert os.environ["OMP_NUM_THREADS"] == "64"
+    assert "TRAINING_N_JOBS" not in os.environ
+
+
+def test_concurrent_budgets_never_exceed_total():
+    tasks = [_task(f"t{i}", "fake_ok", cores=c) for i, c in enumerate([2, 1, 1, 2])]
+
+    report = orchestrator.run_tasks(tasks, total_cores=2)
+
+    events = sorted(
+        [(row["start_s"], row["cores"]) for row in report]
+        + [(row["start_s"] + row["duration_s"], -row["cores"]) for row in report],
+        key=lambda e: (e[0], e[1]),
+    )
+    in_use, peak = 0, 0
+    for _, delta in events:
+        in_use += delta
+        peak = max(peak, in_use)
+    assert peak <= 2
+    assert [row["status"] for row in report] == ["ok"] * 4
+
+
+def test_save_timings_adds_total_row(tmp_path, monkeypatch):
+    monkeypatch.setattr(orchestrator, "REPORTS_DIR", tmp_path)
+    report = [{"task": "clf/mlp", "function": "train_mlp", "status": "ok",
+               "cores": 1, "start_s": 0.0, "duration_s": 1.5, "error": None}]
+
+    path = orchestrator.save_timings(report, wall_s=1.7)
+
+    df = pd.read_csv(path)
+    assert list(df["task"]) == ["clf/mlp", "TOTAL"]
+    assert df["duration_s"].iloc[-1] == pytest.approx(1.7)
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import warmup
+
+
+@pytest.fixture(autouse=True)
+def _reset_state():
+    warmup.reset()
+    yield
+    warmup.reset()
+
+
+def _fake_ml(monkeypatch, missing_axis=None):
+    calls = []
+
+    def _load(axis):
+        if axis == missing_axis:
+            raise FileNotFoundError(f"modèle {axis} absent")
+        calls.append(("load", axis))
+
+    monkeypatch.setattr(warmup, "load_artifacts", _load)
+
+    def _predict(axis, **row):
+        calls.append(("predict", axis))
+        return {"model_version": f"{axis}-v1"}
+
+    monkeypatch.setattr(warmup, "predict", _predict)
+    monkeypatch.setattr(warmup, "predict_batch", lambda axis, rows: calls.append(("batch", axis)))
+    return calls
+
+
+def test_not_ready_before_warmup():
+    assert warmup.readiness()["ready"] is False
+
+
+def test_warm_up_loads_and_scores_each_axis(monkeypatch):
+    calls = _fake_ml(monkeypatch)
+
+    status = warmup.warm_up_models()
+
+    assert status["ready"] is True
+    assert set(status["models"]) == {"classification", "regression"}
+    assert ("load", "classification") in calls and ("batch", "regression") in calls
+    assert calls.count(("predict", "classification")) == warmup.MODEL_WARMUP_ROUNDS
+    assert status["models"]["regression"]["version"] == "regression-v1"
+
+
+def test_missing_model_keeps_api_not_ready(monkeypatch):
+    _fake_ml(monkeypatch, missing_axis="regression")
+
+    status = warmup.warm_up_models()
+
+    assert status["ready"] is False
+    assert status["models"]["classification"]["loaded"] is True
+    assert "absent" in status["models"]["regression"]["error"]
+
+
+def test_missing_model_tolerated_when_not_required(monkeypatch):
+    _fake_ml(monkeypatch, missing_axis="regression")
+    monkeypatch.setattr(warmup, "READY_REQUIRES_MODELS", False)
+
+    assert warmup.warm_up_models()["ready"] is True
+
+
+# La chauffe tourne en tâche de fond : /ready répond 503 tant qu'elle n'est pas finie
+def test_ready_endpoint_is_503_during_background_warmup(monkeypatch):
+    calls = _fake_ml(monkeypatch)
+    release = threading.Event()
+    load = warmup.load_artifacts
+
+    def _slow_load(axis):
+        release.wait(5)
+        load(axis)
+
+    monkeypatch.setattr(warmup, "load_artifacts", _slow_load)
+
+    with TestClient(app) as client:
+        during = client.get("/ready")
+        health = client.get("/health")
+        release.set()
+        deadline = time.monotonic() + 5
+        while not warmup.readiness()["ready"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        after = client.get("/ready")
+
+    assert during.status_code == 503
+    assert during.json()["warmup_finished"] is False
+    assert health.json() == {"status": "ok"}
+    assert after.status_code == 200
+    assert after.json()["ready"] is True
+    assert ("load", "regression") in calls
+
+
+# La surveillance ne charge pas un axe absent de la mémoire (MODEL_WARMUP=false, modèle absent)
+def test_watch_models_skips_axes_not_loaded(monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(warmup, "loaded_models", lambda: {"regression": object()})
+    monkeypatch.setattr(warmup, "refresh", lambda axis: refreshed.append(axis) or SimpleNamespace(version="v2"))
+
+    async def _one_round():
+        task = asyncio.create_task(warmup.watch_models(interval=0))
+        while not refreshed:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(_one_round())
+
+    assert set(refreshed) == {"regression"}
@@ -0,0 +1,61 @@
+-- 02_indexes.sql
+-- Index des chemins d'accès de l'API sur le schéma en étoile ObRail
+-- Exécuté après 01_init.sql au premier démarrage du conteneur db ;
+-- idempotent (IF NOT EXISTS). Sur une base existante, ces index sont
+-- créés par sql/migrations/001_star_schema_indexes.sql (CONCURRENTLY),
+-- appliqué à chaque chargement par etl/load/migrations.py.
+-- Le chargement ETL fait des TRUNCATE, les index sont donc conservés.
+
+-- ============================================================
+-- EXTENSIONS
+-- ============================================================
+
+-- Trigrammes pour ILIKE '%...%' sur le nom d'opérateur
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ============================================================
+-- DIMENSIONS
+-- ============================================================
+
+-- dim_countries.country_code : déjà indexé par la contrainte UNIQUE
+
+-- Filtre ?year= (jointure dim_years)
+CREATE INDEX IF NOT EXISTS idx_dim_years_year
+    ON dim_years (year);
+
+-- Recherche ?operator_name= (ILIKE '%...%')
+CREATE INDEX IF NOT EXISTS idx_dim_operators_name_trgm
+    ON dim_operators USING gin (operator_name gin_trgm_ops);
+
+-- ============================================================
+-- FAITS
+-- ============================================================
+
+-- Filtres pays / année / type de train de /api/night-trains*
+CREATE INDEX IF NOT EXISTS idx_fnt_country_year_night
+    ON facts_night_trains (country_id, year_id, is_night);
+
+-- Filtre année seule (timeline, ?year= sans pays)
+CREATE INDEX IF NOT EXISTS idx_fnt_year_night
+    ON facts_night_trains (year_id, is_night);
+
+-- /api/night-trains/by-operator/{id} et vue operator_dashboard
+CREATE INDEX IF NOT EXISTS idx_fnt_operator
+    ON facts_night_trains (operator_id, is_night);
+
+-- Index partiels pour /api/night-trains/night et /day filtrés par pays
+CREATE INDEX IF NOT EXISTS idx_fnt_night_country_year
+    ON facts_night_trains (country_id, year_id) WHERE is_night;
+CREATE INDEX IF NOT EXISTS idx_fnt_day_country_year
+    ON facts_night_trains (country_id, year_id) WHERE NOT is_night;
+
+-- /api/countries/stats (pays + année) et jointures pays/année des analyses
+CREATE INDEX IF NOT EXISTS idx_fcs_country_year
+    ON facts_country_stats (country_id, year_id);
+CREATE INDEX IF NOT EXISTS idx_fcs_year
+    ON facts_country_stats (year_id);
+
+ANALYZE dim_years;
+ANALYZE dim_operators;
+ANALYZE facts_night_trains;
+ANALYZE facts_country_stats;
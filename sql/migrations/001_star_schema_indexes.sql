@@ -0,0 +1,40 @@
+-- migrations/001_star_schema_indexes.sql
+-- Index de 02_indexes.sql pour une base EXISTANTE (02_indexes.sql n'est
+-- exécuté par docker-entrypoint-initdb.d que sur un volume neuf).
+-- Appliqué par etl/load/migrations.py, une instruction à la fois hors
+-- transaction : CREATE INDEX CONCURRENTLY ne bloque pas les écritures.
+-- Idempotent (IF NOT EXISTS) ; garder synchronisé avec 02_indexes.sql.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dim_years_year
+    ON dim_years (year);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dim_operators_name_trgm
+    ON dim_operators USING gin (operator_name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fnt_country_year_night
+    ON facts_night_trains (country_id, year_id, is_night);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fnt_year_night
+    ON facts_night_trains (year_id, is_night);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fnt_operator
+    ON facts_night_trains (operator_id, is_night);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fnt_night_country_year
+    ON facts_night_trains (country_id, year_id) WHERE is_night;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fnt_day_country_year
+    ON facts_night_trains (country_id, year_id) WHERE NOT is_night;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fcs_country_year
+    ON facts_country_stats (country_id, year_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fcs_year
+    ON facts_country_stats (year_id);
+
+ANALYZE dim_years;
+ANALYZE dim_operators;
+ANALYZE facts_night_trains;
+ANALYZE facts_country_stats;